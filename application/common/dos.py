@@ -1,10 +1,15 @@
+from collections import OrderedDict
 from collections.abc import Iterable
 from dataclasses import dataclass, fields
 from itertools import groupby
+from os import getenv
+from threading import Lock
+from time import monotonic
 from typing import Self
 
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection
+from psycopg import Connection, Cursor, Error
+from psycopg.rows import DictRow
 
 from .constants import (
     DOS_ACTIVE_STATUS_ID,
@@ -16,11 +21,119 @@ from .constants import (
 )
 from .dos_db_connection import connect_to_db_reader, query_dos_db
 from .dos_location import DoSLocation
-from .opening_times import OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
+from .dos_location_gazetteer import get_dos_location_gazetteer
+from .opening_times import OpenPeriod, SpecifiedOpeningTime, SpecifiedOpeningTimeTuple, StandardOpeningTimes
 from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION, CommissionedServiceType
 
 logger = Logger(child=True)
-dos_location_cache = {}
+# Must match the expression of the NORMALISED_POSTCODE_INDEX index for the index to be used,
+# see scripts/dos_location_postcode_index_migration.py
+NORMALISED_POSTCODE_SQL = "REPLACE(UPPER(postcode), ' ', '')"
+NORMALISED_POSTCODE_INDEX = "locations_normalised_postcode_idx"
+
+
+@dataclass
+class CachedDoSLocations:
+    """The DoS locations for a postcode held in the DoS location cache."""
+
+    dos_locations: list[DoSLocation]
+    expires_at: float
+
+
+class DoSLocationCache:
+    """A bounded in-process cache of the DoS locations for each normalised postcode.
+
+    The least recently used postcode is evicted once the cache is full and entries expire after a TTL.
+    Postcodes without any DoS locations are cached too, with a shorter TTL so newly added postcodes are picked up.
+    Lookups only update the stats, which are logged for the CloudWatch metric filters by log_stats.
+    """
+
+    def __init__(self: Self) -> None:
+        """Creates an empty cache."""
+        self.max_entries = int(getenv("DOS_LOCATION_CACHE_MAX_ENTRIES", "10000"))
+        self.ttl_seconds = float(getenv("DOS_LOCATION_CACHE_TTL_SECONDS", "3600"))
+        self.negative_ttl_seconds = float(getenv("DOS_LOCATION_CACHE_NEGATIVE_TTL_SECONDS", "300"))
+        self.entries: OrderedDict[str, CachedDoSLocations] = OrderedDict()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0}
+        self.logged_stats = dict.fromkeys(self.stats, 0)
+        self.preloaded = False
+        self.lock = Lock()
+
+    def get(self: Self, postcode: str) -> list[DoSLocation] | None:
+        """Gets the cached DoS locations for a postcode.
+
+        Args:
+            postcode (str): Normalised postcode
+
+        Returns:
+            list[DoSLocation] | None: The cached DoS locations, an empty list if the postcode is known to have none
+            or None if the postcode is not in the cache
+        """
+        with self.lock:
+            cached_dos_locations = self.entries.get(postcode)
+            if cached_dos_locations is not None and monotonic() >= cached_dos_locations.expires_at:
+                del self.entries[postcode]
+                cached_dos_locations = None
+            if cached_dos_locations is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(postcode)
+            if cached_dos_locations.dos_locations:
+                self.stats["hits"] += 1
+            else:
+                self.stats["negative_hits"] += 1
+            return cached_dos_locations.dos_locations
+
+    def put(self: Self, postcode: str, dos_locations: list[DoSLocation]) -> None:
+        """Adds the DoS locations for a postcode to the cache, evicting the least recently used postcodes if full.
+
+        Args:
+            postcode (str): Normalised postcode
+            dos_locations (list[DoSLocation]): DoS locations for the postcode, empty if it has none
+        """
+        ttl_seconds = self.ttl_seconds if dos_locations else self.negative_ttl_seconds
+        with self.lock:
+            self.entries[postcode] = CachedDoSLocations(
+                dos_locations=dos_locations,
+                expires_at=monotonic() + ttl_seconds,
+            )
+            self.entries.move_to_end(postcode)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self: Self) -> None:
+        """Removes all postcodes from the cache and resets the stats."""
+        with self.lock:
+            self.entries.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+            self.logged_stats = dict.fromkeys(self.stats, 0)
+            self.preloaded = False
+
+    def log_stats(self: Self) -> None:
+        """Logs the cache stats since they were last logged, to be picked up by the CloudWatch metric filters.
+
+        Called once per invocation rather than on every lookup, and nothing is logged if the cache wasn't used.
+        """
+        with self.lock:
+            stats = {name: count - self.logged_stats[name] for name, count in self.stats.items()}
+            self.logged_stats = self.stats.copy()
+            cache_size = len(self.entries)
+        if not any(stats.values()):
+            return
+        logger.info(
+            "DoS location cache stats",
+            environment=getenv("ENVIRONMENT"),
+            cloudwatch_metric_filter_matching_attribute="DoSLocationCacheStats",
+            dos_location_cache_size=cache_size,
+            dos_location_cache_hits=stats["hits"],
+            dos_location_cache_negative_hits=stats["negative_hits"],
+            dos_location_cache_misses=stats["misses"],
+            dos_location_cache_evictions=stats["evictions"],
+        )
+
+
+dos_location_cache = DoSLocationCache()
 
 
 @dataclass
@@ -107,18 +220,22 @@ class DoSService:
         return self.region
 
 
-def get_matching_dos_services(odscode: str) -> list[DoSService]:
-    """Retrieves DoS Services from DoS database.
+def get_matching_dos_services_for_odscodes(odscodes: Iterable[str]) -> dict[str, list[DoSService]]:
+    """Retrieves DoS Services matching many ODS codes from DoS database with a single query.
 
     Args:
-        odscode (str): ODScode to match on
+        odscodes (Iterable[str]): ODScodes to match on
 
     Returns:
-        list[DoSService]: List of DoSService objects with matching first 5
-        digits of odscode, taken from DoS database
+        dict[str, list[DoSService]]: DoSService objects with matching first 5 digits of odscode,
+        taken from DoS database, keyed by the first 5 digits of the odscode
     """
+    ods_prefixes = list(dict.fromkeys(odscode[:5] for odscode in odscodes))
+    # ODS codes shorter than 5 characters match any DoS ODS code starting with them
+    short_ods_prefixes = [ods_prefix for ods_prefix in ods_prefixes if len(ods_prefix) < 5]  # noqa: PLR2004
     named_args = {
-        "ODS": f"{odscode[:5]}%",
+        "ODS_PREFIXES": ods_prefixes,
+        "SHORT_ODS_PATTERNS": [f"{ods_prefix}%" for ods_prefix in short_ods_prefixes],
         "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137],
         "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
         "PHARMACY_FIRST_SERVICE_TYPE_IDS": [148, 149],
@@ -129,58 +246,167 @@ def get_matching_dos_services(odscode: str) -> list[DoSService]:
         "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
         "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
         "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s "
-        "AND s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
+        "WHERE (LEFT(s.odscode, 5) = ANY(%(ODS_PREFIXES)s) OR s.odscode LIKE ANY(%(SHORT_ODS_PATTERNS)s::varchar[])) "
+        "AND (s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s "
+        "OR s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s))"
     )
+    services: dict[str, list[DoSService]] = {ods_prefix: [] for ods_prefix in ods_prefixes}
+    if not ods_prefixes:
+        return services
     with connect_to_db_reader() as connection:
         cursor = query_dos_db(connection=connection, query=sql_query, query_vars=named_args)
-        # Create list of DoSService objects from returned rows
-        services = [DoSService(row) for row in cursor.fetchall()]
+        # Group the DoSService objects by the change event ODS codes they match
+        for row in cursor.fetchall():
+            dos_service = DoSService(row)
+            if row["odscode"][:5] in services:
+                services[row["odscode"][:5]].append(dos_service)
+            for ods_prefix in short_ods_prefixes:
+                if row["odscode"].startswith(ods_prefix) and ods_prefix != row["odscode"][:5]:
+                    services[ods_prefix].append(dos_service)
         cursor.close()
-        # Connection closed by context manager
     return services
 
 
+normalised_postcode_index_exists: bool | None = None
+
+
+def has_normalised_postcode_index(connection: Connection) -> bool:
+    """Checks whether the locations table has the NORMALISED_POSTCODE_INDEX index, once per Lambda container.
+
+    Args:
+        connection (Connection): Connection to the DoS DB
+
+    Returns:
+        bool: True if the index exists, otherwise False
+    """
+    global normalised_postcode_index_exists  # noqa: PLW0603
+    if normalised_postcode_index_exists is None:
+        cursor = query_dos_db(
+            connection=connection,
+            query="SELECT to_regclass(%(index_name)s) IS NOT NULL AS index_exists",
+            query_vars={"index_name": NORMALISED_POSTCODE_INDEX},
+        )
+        normalised_postcode_index_exists = cursor.fetchone()["index_exists"]
+        cursor.close()
+        if not normalised_postcode_index_exists:
+            logger.warning(
+                f"{NORMALISED_POSTCODE_INDEX} index not found, looking up DoS locations by their postcode variations"
+            )
+    return normalised_postcode_index_exists
+
+
 def get_dos_locations(postcode: str | None = None, try_cache: bool = True) -> list[DoSLocation]:
     """Retrieves DoS Locations from DoS database.
 
     Args:
         postcode (str, optional): Postcode to match on. Defaults to None.
-        try_cache (bool, optional): Whether to try and use the local cache. Defaults to True.
+        try_cache (bool, optional): Whether to try and use the gazetteer and local cache. Defaults to True.
 
     Returns:
         list[DoSLocation]: List of DoSLocation objects with matching postcode, taken from DoS database
     """
     logger.debug(f"Searching for DoS locations with postcode of '{postcode}'")
     norm_pc = postcode.replace(" ", "").upper()
-    global dos_location_cache  # noqa: PLW0602
-    if try_cache and norm_pc in dos_location_cache:
-        logger.info(f"Postcode {norm_pc} location/s found in local cache.")
-        return dos_location_cache[norm_pc]
+    if try_cache:
+        dos_location_gazetteer = get_dos_location_gazetteer()
+        if dos_location_gazetteer is not None:
+            gazetteer_dos_locations = dos_location_gazetteer.get(norm_pc)
+            if gazetteer_dos_locations is not None:
+                logger.info(f"Postcode {norm_pc} location/s found in gazetteer.")
+                return gazetteer_dos_locations
+        if not dos_location_cache.preloaded:
+            preload_dos_location_cache()
+        cached_dos_locations = dos_location_cache.get(norm_pc)
+        if cached_dos_locations is not None:
+            if cached_dos_locations:
+                logger.info(f"Postcode {norm_pc} location/s found in local cache.")
+            else:
+                logger.info(f"Postcode {norm_pc} found in local cache with no locations.")
+            return cached_dos_locations
 
-    # Search for any variation of whitespace in postcode
-    postcode_variations = [norm_pc] + [f"{norm_pc[:i]} {norm_pc[i:]}" for i in range(1, len(norm_pc))]
     db_column_names = [f.name for f in fields(DoSLocation)]
-    sql_command = (
-        f"SELECT {', '.join(db_column_names)} FROM locations WHERE postcode = ANY(%(pc_variations)s)"  # noqa: S608
-        # Safe as conditional is configurable but variables is inputted to psycopg as variables
-    )
-
     with connect_to_db_reader() as connection:
-        cursor = query_dos_db(
-            connection=connection,
-            query=sql_command,
-            query_vars={"pc_variations": postcode_variations},
-        )
+        if has_normalised_postcode_index(connection):
+            # Match on the normalised postcode so any variation of whitespace or case is found with the index
+            sql_command = (
+                f"SELECT {', '.join(db_column_names)} FROM locations "  # noqa: S608
+                f"WHERE {NORMALISED_POSTCODE_SQL} = %(normalised_postcode)s"
+                # Safe as conditional is configurable but variables is inputted to psycopg as variables
+            )
+            query_vars = {"normalised_postcode": norm_pc}
+        else:
+            # Until the index is created match on every variation of whitespace, as the lookup did before it
+            sql_command = (
+                f"SELECT {', '.join(db_column_names)} FROM locations "  # noqa: S608
+                "WHERE postcode = ANY(%(pc_variations)s)"
+                # Safe as conditional is configurable but variables is inputted to psycopg as variables
+            )
+            pc_variations = [norm_pc] + [f"{norm_pc[:i]} {norm_pc[i:]}" for i in range(1, len(norm_pc))]
+            query_vars = {"pc_variations": pc_variations}
+        cursor = query_dos_db(connection=connection, query=sql_command, query_vars=query_vars)
         dos_locations = [DoSLocation(**row) for row in cursor.fetchall()]
         cursor.close()
-    dos_location_cache[norm_pc] = dos_locations
+    dos_location_cache.put(norm_pc, dos_locations)
     logger.debug(f"Postcode location/s for {norm_pc} added to local cache.")
 
     return dos_locations
 
 
+def preload_dos_location_cache() -> None:
+    """Loads the DoS locations for the postcode districts in DOS_LOCATION_CACHE_PRELOAD_DISTRICTS into the cache.
+
+    Runs once per Lambda container, on the first postcode lookup. If the preload query fails the error is logged
+    and the preload is given up on, so postcodes are looked up one at a time as they would be without it.
+
+    Each district is matched with its own LIKE, as the NORMALISED_POSTCODE_INDEX index can serve a LIKE prefix
+    but not LIKE ANY. Without the index the preload reads the whole locations table, once per Lambda container.
+    """
+    postcode_districts = [
+        district.replace(" ", "").upper()
+        for district in getenv("DOS_LOCATION_CACHE_PRELOAD_DISTRICTS", "").split(",")
+        if district.strip()
+    ]
+    if not postcode_districts:
+        dos_location_cache.preloaded = True
+        return
+    db_column_names = [f.name for f in fields(DoSLocation)]
+    district_conditions = [
+        f"{NORMALISED_POSTCODE_SQL} LIKE %(district_pattern_{i})s" for i in range(len(postcode_districts))
+    ]
+    sql_command = (
+        f"SELECT {', '.join(db_column_names)} FROM locations "  # noqa: S608
+        f"WHERE {' OR '.join(district_conditions)}"
+        # Safe as conditional is configurable but variables is inputted to psycopg as variables
+    )
+    try:
+        with connect_to_db_reader() as connection:
+            cursor = query_dos_db(
+                connection=connection,
+                query=sql_command,
+                # A postcode is its district followed by a 3 character inward code
+                query_vars={f"district_pattern_{i}": f"{district}___" for i, district in enumerate(postcode_districts)},
+            )
+            dos_locations = [DoSLocation(**row) for row in cursor.fetchall()]
+            cursor.close()
+    except Error:
+        logger.exception(
+            "Unable to preload the DoS location cache, looking up postcodes in the DoS DB",
+            postcode_districts=postcode_districts,
+        )
+        dos_location_cache.preloaded = True
+        return
+    dos_locations_by_postcode: dict[str, list[DoSLocation]] = {}
+    for dos_location in dos_locations:
+        dos_locations_by_postcode.setdefault(dos_location.normal_postcode(), []).append(dos_location)
+    for norm_pc, postcode_dos_locations in dos_locations_by_postcode.items():
+        dos_location_cache.put(norm_pc, postcode_dos_locations)
+    dos_location_cache.preloaded = True
+    logger.info(
+        f"Preloaded {len(dos_locations_by_postcode)} postcodes into the DoS location cache",
+        postcode_districts=postcode_districts,
+    )
+
+
 def get_valid_dos_location(postcode: str) -> DoSLocation | None:
     """Gets the valid DoS location for the given postcode.
 
@@ -194,16 +420,15 @@ def get_valid_dos_location(postcode: str) -> DoSLocation | None:
     return dos_locations[0] if dos_locations else None
 
 
-def get_specified_opening_times_from_db(connection: Connection, service_id: int) -> list[SpecifiedOpeningTime]:
-    """Retrieves specified opening times from  DoS database.
+def query_specified_opening_times(connection: Connection, service_id: int) -> Cursor[DictRow]:
+    """Runs the query for the specified opening times of a service without fetching the results.
 
     Args:
         connection (Connection): Connection to DoS database
         service_id (int): serviceid to match on
 
     Returns:
-        List[SpecifiedOpeningTime]: List of Specified Opening times with
-        matching serviceid
+        Cursor[DictRow]: Cursor to fetch the specified opening times rows from
     """
     logger.debug(f"Searching for specified opening times with serviceid that matches '{service_id}'")
 
@@ -215,17 +440,35 @@ def get_specified_opening_times_from_db(connection: Connection, service_id: int)
         "WHERE ssod.serviceid = %(SERVICE_ID)s"
     )
     named_args = {"SERVICE_ID": service_id}
-    cursor = query_dos_db(connection=connection, query=sql_query, query_vars=named_args)
+    return query_dos_db(connection=connection, query=sql_query, query_vars=named_args)
+
+
+def get_specified_opening_times_from_db(connection: Connection, service_id: int) -> SpecifiedOpeningTimeTuple:
+    """Retrieves specified opening times from  DoS database.
+
+    Args:
+        connection (Connection): Connection to DoS database
+        service_id (int): serviceid to match on
+
+    Returns:
+        SpecifiedOpeningTimeTuple: Specified Opening times with
+        matching serviceid
+    """
+    cursor = query_specified_opening_times(connection=connection, service_id=service_id)
     specified_opening_times = db_rows_to_spec_open_times(cursor.fetchall())
     cursor.close()
     return specified_opening_times
 
 
-def get_standard_opening_times_from_db(connection: Connection, service_id: int) -> StandardOpeningTimes:
-    """Retrieves standard opening times from DoS database.
+def query_standard_opening_times(connection: Connection, service_id: int) -> Cursor[DictRow]:
+    """Runs the query for the standard opening times of a service without fetching the results.
 
-    If the service id does not even match any service this function will still return a blank StandardOpeningTime
-    with no opening periods.
+    Args:
+        connection (Connection): Connection to DoS database
+        service_id (int): serviceid to match on
+
+    Returns:
+        Cursor[DictRow]: Cursor to fetch the standard opening times rows from
     """
     logger.debug(f"Searching for standard opening times with serviceid that matches '{service_id}'")
     sql_command = (
@@ -238,13 +481,22 @@ def get_standard_opening_times_from_db(connection: Connection, service_id: int)
         "WHERE sdo.serviceid = %(SERVICE_ID)s"
     )
     named_args = {"SERVICE_ID": service_id}
-    cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+    return query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+
+
+def get_standard_opening_times_from_db(connection: Connection, service_id: int) -> StandardOpeningTimes:
+    """Retrieves standard opening times from DoS database.
+
+    If the service id does not even match any service this function will still return a blank StandardOpeningTime
+    with no opening periods.
+    """
+    cursor = query_standard_opening_times(connection=connection, service_id=service_id)
     standard_opening_times = db_rows_to_std_open_times(cursor.fetchall())
     cursor.close()
     return standard_opening_times
 
 
-def db_rows_to_spec_open_times(db_rows: Iterable[dict]) -> list[SpecifiedOpeningTime]:
+def db_rows_to_spec_open_times(db_rows: Iterable[dict]) -> SpecifiedOpeningTimeTuple:
     """Turns a set of dos database rows into a list of SpecifiedOpenTime objects.
 
     note: The rows must to be for the same service.
@@ -261,7 +513,7 @@ def db_rows_to_spec_open_times(db_rows: Iterable[dict]) -> list[SpecifiedOpening
                 open_periods.append(OpenPeriod(row["starttime"], row["endtime"]))
         specified_opening_times.append(SpecifiedOpeningTime(open_periods, date, is_open))
 
-    return specified_opening_times
+    return SpecifiedOpeningTimeTuple(specified_opening_times)
 
 
 def db_rows_to_std_open_times(db_rows: Iterable[dict]) -> StandardOpeningTimes:
@@ -279,6 +531,29 @@ def db_rows_to_std_open_times(db_rows: Iterable[dict]) -> StandardOpeningTimes:
     return standard_opening_times
 
 
+def query_palliative_care(connection: Connection, service_id: int) -> Cursor[DictRow]:
+    """Runs the query for the palliative care z code of a service without fetching the results.
+
+    Args:
+        connection: The database connection to use
+        service_id: The id of the service to check
+
+    Returns:
+        Cursor to fetch the palliative care z code rows from
+    """
+    sql_command = """SELECT sgsds.id as z_code from servicesgsds sgsds
+            WHERE sgsds.serviceid = %(SERVICE_ID)s
+            AND sgsds.sgid = %(PALLIATIVE_CARE_SYMPTOM_GROUP)s
+            AND sgsds.sdid  = %(PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR)s
+            """
+    named_args = {
+        "SERVICE_ID": service_id,
+        "PALLIATIVE_CARE_SYMPTOM_GROUP": DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
+        "PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR": DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
+    }
+    return query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+
+
 def has_palliative_care(service: DoSService, connection: Connection) -> bool:
     """Checks if a service has palliative care.
 
@@ -290,17 +565,7 @@ def has_palliative_care(service: DoSService, connection: Connection) -> bool:
         True if the service has palliative care, False otherwise
     """
     if service.typeid in PHARMACY_SERVICE_TYPE_IDS:
-        sql_command = """SELECT sgsds.id as z_code from servicesgsds sgsds
-            WHERE sgsds.serviceid = %(SERVICE_ID)s
-            AND sgsds.sgid = %(PALLIATIVE_CARE_SYMPTOM_GROUP)s
-            AND sgsds.sdid  = %(PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR)s
-            """
-        named_args = {
-            "SERVICE_ID": service.id,
-            "PALLIATIVE_CARE_SYMPTOM_GROUP": DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
-            "PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR": DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
-        }
-        cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+        cursor = query_palliative_care(connection=connection, service_id=service.id)
         cursor.fetchall()
         logger.debug("Checked if service has palliative care", has_palliative_care=cursor.rowcount != 0)
         return cursor.rowcount != 0
@@ -348,39 +613,137 @@ def has_service(service: DoSService, service_type: CommissionedServiceType) -> b
     return False
 
 
-def get_region(dos_service_id: str) -> str:
-    """Returns the region of the service.
+@dataclass
+class CachedRegion:
+    """The region of a service held in the region resolver."""
+
+    region: str
+    expires_at: float
+
+
+class RegionResolver:
+    """Resolves the region of DoS services, memoising the region of each service.
+
+    The region of a service is the name of its top level ancestor. The regions of many services are resolved
+    with one query walking up the service tree, and the least recently used services are evicted once the
+    memo is full.
+    """
+
+    def __init__(self: Self) -> None:
+        """Creates a resolver with an empty memo."""
+        self.max_entries = int(getenv("DOS_REGION_CACHE_MAX_ENTRIES", "10000"))
+        self.ttl_seconds = float(getenv("DOS_REGION_CACHE_TTL_SECONDS", "3600"))
+        self.entries: OrderedDict[int, CachedRegion] = OrderedDict()
+        self.lock = Lock()
+
+    def get_regions(
+        self: Self,
+        service_ids: Iterable[int | str],
+        connection: Connection | None = None,
+    ) -> dict[int, str]:
+        """Gets the regions of services, only querying the DoS DB for services not already memoised.
+
+        Args:
+            service_ids (Iterable[int | str]): Ids of the services
+            connection (Connection | None): Connection to the DoS DB to use, if None a pooled reader connection is used
+
+        Returns:
+            dict[int, str]: The region of each service, keyed by service id
+        """
+        regions: dict[int, str] = {}
+        unresolved_service_ids: list[int] = []
+        with self.lock:
+            now = monotonic()
+            for service_id in dict.fromkeys(int(service_id) for service_id in service_ids):
+                cached_region = self.entries.get(service_id)
+                if cached_region is not None and now < cached_region.expires_at:
+                    self.entries.move_to_end(service_id)
+                    regions[service_id] = cached_region.region
+                else:
+                    unresolved_service_ids.append(service_id)
+        if unresolved_service_ids:
+            if connection is None:
+                with connect_to_db_reader() as reader_connection:
+                    resolved_regions = query_regions(reader_connection, unresolved_service_ids)
+            else:
+                resolved_regions = query_regions(connection, unresolved_service_ids)
+            with self.lock:
+                expires_at = monotonic() + self.ttl_seconds
+                for service_id, region in resolved_regions.items():
+                    self.entries[service_id] = CachedRegion(region=region, expires_at=expires_at)
+                    self.entries.move_to_end(service_id)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            regions.update(resolved_regions)
+        logger.debug(
+            f"Resolved regions for {len(regions)} services",
+            memoised=len(regions) - len(unresolved_service_ids),
+            queried=len(unresolved_service_ids),
+        )
+        return regions
+
+    def clear(self: Self) -> None:
+        """Removes all services from the memo."""
+        with self.lock:
+            self.entries.clear()
+
+
+def query_regions(connection: Connection, service_ids: list[int]) -> dict[int, str]:
+    """Queries the DoS DB for the regions of services.
 
     Args:
-        dos_service_id: The id of the service
+        connection (Connection): Connection to the DoS DB
+        service_ids (list[int]): Ids of the services
 
     Returns:
-        The region of the service
+        dict[int, str]: The region of each service, keyed by service id
     """
-    with connect_to_db_reader() as connection:
-        logger.debug("Getting region for service")
-        sql_command = """WITH
+    logger.debug("Getting regions for services", service_ids=service_ids)
+    # Walk up the service tree from every service at once, the region is the furthest ancestor
+    sql_command = """WITH
 RECURSIVE servicetree as
-(SELECT ser.parentid, ser.id, ser.uid, ser.name, 1 AS lvl
-FROM services ser where ser.id = %(SERVICE_ID)s
+(SELECT ser.id serviceid, ser.parentid, ser.name, 1 AS lvl
+FROM services ser where ser.id = ANY(%(SERVICE_IDS)s)
 UNION ALL
-SELECT ser.parentid, st.id, ser.uid, ser.name, lvl+1 AS lvl
+SELECT st.serviceid, ser.parentid, ser.name, lvl+1 AS lvl
 FROM services ser
-INNER JOIN servicetree st ON ser.id = st.parentid),
-serviceregion as
-(SELECT st.*, ROW_NUMBER() OVER (PARTITION BY st.id ORDER BY st.lvl desc) rn
-FROM servicetree st)
-SELECT sr.name region
-FROM serviceregion sr
-INNER JOIN services ser ON sr.id = ser.id
-LEFT OUTER JOIN services par ON ser.parentid = par.id
-WHERE sr.rn=1
-ORDER BY ser.name
+INNER JOIN servicetree st ON ser.id = st.parentid)
+SELECT DISTINCT ON (st.serviceid) st.serviceid, st.name region
+FROM servicetree st
+ORDER BY st.serviceid, st.lvl desc
     """
-        named_args = {"SERVICE_ID": dos_service_id}
-        cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
-        region_response = cursor.fetchone()
-        region_name = region_response["region"] if region_response else "Region not found"
-        logger.debug("Got region for service", region_name=region_name)
-        cursor.close()
+    named_args = {"SERVICE_IDS": service_ids}
+    cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+    found_regions = {row["serviceid"]: row["region"] for row in cursor.fetchall()}
+    cursor.close()
+    return {service_id: found_regions.get(service_id, "Region not found") for service_id in service_ids}
+
+
+region_resolver = RegionResolver()
+
+
+def get_regions(service_ids: Iterable[int | str], connection: Connection | None = None) -> dict[int, str]:
+    """Returns the regions of many services.
+
+    Args:
+        service_ids (Iterable[int | str]): The ids of the services
+        connection (Connection | None): Connection to the DoS DB to use, if None a pooled reader connection is used
+
+    Returns:
+        dict[int, str]: The region of each service, keyed by service id
+    """
+    return region_resolver.get_regions(service_ids, connection)
+
+
+def get_region(dos_service_id: str) -> str:
+    """Returns the region of the service.
+
+    Args:
+        dos_service_id: The id of the service
+
+    Returns:
+        The region of the service
+    """
+    region_name = get_regions([dos_service_id])[int(dos_service_id)]
+    logger.debug("Got region for service", region_name=region_name)
     return region_name
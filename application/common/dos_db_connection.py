@@ -1,69 +1,369 @@
-from collections.abc import Generator
-from contextlib import contextmanager
-from os import environ
-from time import time_ns
-from typing import Any, LiteralString
+from asyncio import to_thread
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from os import environ, getenv
+from threading import Lock
+from time import monotonic, time_ns
+from typing import Any, LiteralString, Self
 
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection, Cursor, connect
+from psycopg import AsyncConnection, AsyncCursor, Connection, Cursor, Error, OperationalError, connect
+from psycopg.pq import TransactionStatus
 from psycopg.rows import DictRow, dict_row
 
 from common.secretsmanager import get_secret
 
 logger = Logger(child=True)
-db_connection = None
 
 
-@contextmanager
-def connect_to_db_reader() -> Generator[Connection, None, None]:
+@dataclass
+class PooledConnection:
+    """A connection held by a DoSDBConnectionPool or AsyncDoSDBConnectionPool with the timestamps used for eviction."""
+
+    connection: Connection | AsyncConnection
+    created_at: float
+    last_used_at: float
+
+
+class BaseDoSDBConnectionPool:
+    """The settings and eviction rules shared by DoSDBConnectionPool and AsyncDoSDBConnectionPool.
+
+    Connections are health checked when they have been idle for a while, evicted once they pass the
+    max idle time or max lifetime and replaced with a new connection when they are found to be broken.
+    Subclasses only make the database calls. The lock is only held while the idle connections are changed,
+    never during a database call.
+    """
+
+    def __init__(self: Self, name: str, connection_factory: Callable[[], Any]) -> None:
+        """Creates an empty pool.
+
+        Args:
+            name (str): Name of the pool, used in logs
+            connection_factory (Callable[[], Any]): Function to create a new connection
+        """
+        self.name = name
+        self.connection_factory = connection_factory
+        self.max_size = int(getenv("DB_POOL_MAX_SIZE", "2"))
+        self.max_idle_seconds = float(getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+        self.max_lifetime_seconds = float(getenv("DB_POOL_MAX_LIFETIME_SECONDS", "3600"))
+        self.health_check_after_seconds = float(getenv("DB_POOL_HEALTH_CHECK_AFTER_SECONDS", "30"))
+        self.idle_connections: list[PooledConnection] = []
+        self.lock = Lock()
+
+    def _take_idle_connection(self: Self) -> PooledConnection | None:
+        """Takes the most recently used idle connection out of the pool.
+
+        Returns:
+            PooledConnection | None: Idle connection, or None if the pool has no idle connections
+        """
+        with self.lock:
+            return self.idle_connections.pop() if self.idle_connections else None
+
+    def _take_idle_connections(self: Self) -> list[PooledConnection]:
+        """Takes every idle connection out of the pool.
+
+        Returns:
+            list[PooledConnection]: Idle connections
+        """
+        with self.lock:
+            idle_connections, self.idle_connections = self.idle_connections, []
+        return idle_connections
+
+    def _eviction_reason(self: Self, pooled_connection: PooledConnection, now: float) -> str | None:
+        """Gets why an idle connection should be evicted rather than reused.
+
+        Args:
+            pooled_connection (PooledConnection): Idle connection taken out of the pool
+            now (float): Current monotonic time
+
+        Returns:
+            str | None: Reason to evict the connection, or None if it can be reused
+        """
+        if now - pooled_connection.last_used_at > self.max_idle_seconds:
+            return "max idle time exceeded"
+        if now - pooled_connection.created_at > self.max_lifetime_seconds:
+            return "max lifetime exceeded"
+        if is_closed_or_broken(pooled_connection):
+            return "connection closed or broken"
+        return None
+
+    def _needs_health_check(self: Self, pooled_connection: PooledConnection, now: float) -> bool:
+        """Checks if a connection has been idle long enough that it should be checked on the database.
+
+        Args:
+            pooled_connection (PooledConnection): Idle connection taken out of the pool
+            now (float): Current monotonic time
+
+        Returns:
+            bool: True if the connection should be health checked before it is reused, False otherwise
+        """
+        return now - pooled_connection.last_used_at >= self.health_check_after_seconds
+
+    def _return_idle_connection(self: Self, pooled_connection: PooledConnection) -> bool:
+        """Puts a connection back in the pool if the pool has room for it.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to return to the pool
+
+        Returns:
+            bool: True if the connection was returned to the pool, False if the pool is full
+        """
+        pooled_connection.last_used_at = monotonic()
+        with self.lock:
+            if len(self.idle_connections) < self.max_size:
+                self.idle_connections.append(pooled_connection)
+                return True
+        return False
+
+
+class DoSDBConnectionPool(BaseDoSDBConnectionPool):
+    """A small pool of warm connections to a DoS database that survives across warm Lambda invocations."""
+
+    connection_factory: Callable[[], Connection]
+
+    @contextmanager
+    def connection(self: Self) -> Generator[Connection, None, None]:
+        """Checks out a connection from the pool and returns it to the pool afterwards.
+
+        Any transaction left open by the caller is rolled back before the connection is reused.
+
+        Yields:
+            Generator[Connection, None, None]: Connection to the database
+        """
+        pooled_connection = self._checkout()
+        try:
+            yield pooled_connection.connection
+        finally:
+            self._release(pooled_connection)
+
+    def close(self: Self) -> None:
+        """Closes all idle connections in the pool."""
+        for pooled_connection in self._take_idle_connections():
+            self._discard(pooled_connection, reason="pool closed")
+
+    def _checkout(self: Self) -> PooledConnection:
+        """Gets a healthy idle connection from the pool or creates a new one.
+
+        Returns:
+            PooledConnection: Connection checked out of the pool
+        """
+        while (pooled_connection := self._take_idle_connection()) is not None:
+            now = monotonic()
+            reason = self._eviction_reason(pooled_connection, now)
+            if reason is None and self._needs_health_check(pooled_connection, now):
+                reason = None if self._is_healthy(pooled_connection) else "failed health check"
+            if reason is None:
+                logger.debug(f"Reusing pooled DoS DB {self.name} connection")
+                return pooled_connection
+            self._discard(pooled_connection, reason=reason)
+        logger.debug(f"Creating new DoS DB {self.name} connection")
+        return new_pooled_connection(self.connection_factory())
+
+    def _release(self: Self, pooled_connection: PooledConnection) -> None:
+        """Returns a connection to the pool, rolling back any open transaction.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to return to the pool
+        """
+        if is_closed_or_broken(pooled_connection):
+            self._discard(pooled_connection, reason="connection closed or broken")
+            return
+        if has_open_transaction(pooled_connection):
+            try:
+                pooled_connection.connection.rollback()
+            except Error:
+                self._discard(pooled_connection, reason="rollback failed")
+                return
+        if not self._return_idle_connection(pooled_connection):
+            self._discard(pooled_connection, reason="pool full")
+
+    def _is_healthy(self: Self, pooled_connection: PooledConnection) -> bool:
+        """Checks the connection is still usable by running a query on it.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to check
+
+        Returns:
+            bool: True if the connection is usable, False otherwise
+        """
+        try:
+            pooled_connection.connection.execute("SELECT 1")
+            pooled_connection.connection.rollback()
+        except Error:
+            logger.warning(f"Pooled DoS DB {self.name} connection failed health check, reconnecting")
+            return False
+        return True
+
+    def _discard(self: Self, pooled_connection: PooledConnection, reason: str) -> None:
+        """Closes a connection that is no longer wanted in the pool.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to close
+            reason (str): Reason the connection is being discarded, used in logs
+        """
+        logger.debug(f"Discarding DoS DB {self.name} connection", reason=reason)
+        try:
+            pooled_connection.connection.close()
+        except Error:
+            logger.debug(f"Unable to cleanly close DoS DB {self.name} connection", reason=reason)
+
+
+def new_pooled_connection(connection: Connection | AsyncConnection) -> PooledConnection:
+    """Wraps a new connection to be held by a pool.
+
+    Args:
+        connection (Connection | AsyncConnection): New connection to the database
+
+    Returns:
+        PooledConnection: Connection with its creation time
+    """
+    now = monotonic()
+    return PooledConnection(connection=connection, created_at=now, last_used_at=now)
+
+
+def is_closed_or_broken(pooled_connection: PooledConnection) -> bool:
+    """Checks if a pooled connection can no longer be used, without going to the database.
+
+    Args:
+        pooled_connection (PooledConnection): Connection to check
+
+    Returns:
+        bool: True if the connection is closed or broken, False otherwise
+    """
+    return pooled_connection.connection.closed or pooled_connection.connection.broken
+
+
+def has_open_transaction(pooled_connection: PooledConnection) -> bool:
+    """Checks if a pooled connection has a transaction which must be rolled back before it is reused.
+
+    Args:
+        pooled_connection (PooledConnection): Connection to check
+
+    Returns:
+        bool: True if the connection is not idle, False otherwise
+    """
+    return pooled_connection.connection.info.transaction_status != TransactionStatus.IDLE
+
+
+def create_db_reader_connection() -> Connection:
     """Creates a new connection to the DoS DB Reader.
 
-    Yields:
-        Generator[connection, None, None]: Connection to the database
+    Returns:
+        Connection: Connection to the database
     """
+    connection_args = get_db_reader_connection_args()
     # Use AWS secret values, or failing that check env for DB password
     if "DB_READER_SECRET_NAME" in environ and "DB_READER_SECRET_KEY" in environ:
-        db_secret = get_secret(environ["DB_READER_SECRET_NAME"])
-        db_password = db_secret[environ["DB_READER_SECRET_KEY"]]
-    else:
-        db_password = environ["DB_SECRET"]
-
-    # Before the context manager is entered, the connection is created
-    db_connection = connection_to_db(
-        server=environ["DB_READER_SERVER"],
+        return connection_to_db_using_secret(
+            secret_name=environ["DB_READER_SECRET_NAME"],
+            secret_key=environ["DB_READER_SECRET_KEY"],
+            **connection_args,
+        )
+    return connection_to_db(db_password=environ["DB_SECRET"], **connection_args)
+
+
+def get_db_reader_connection_args() -> dict[str, str]:
+    """Gets the arguments for connecting to the DoS DB Reader other than the password.
+
+    Returns:
+        dict[str, str]: Arguments for connection_to_db or connection_to_db_async
+    """
+    return {
+        "server": environ["DB_READER_SERVER"],
+        "port": environ["DB_PORT"],
+        "db_name": environ["DB_NAME"],
+        "db_schema": environ["DB_SCHEMA"],
+        "db_user": environ["DB_READ_ONLY_USER_NAME"],
+    }
+
+
+def create_db_writer_connection() -> Connection[DictRow]:
+    """Creates a new connection to the DoS DB Writer.
+
+    Returns:
+        Connection[DictRow]: Connection to the database
+    """
+    return connection_to_db_using_secret(
+        secret_name=environ["DB_WRITER_SECRET_NAME"],
+        secret_key=environ["DB_WRITER_SECRET_KEY"],
+        server=environ["DB_WRITER_SERVER"],
         port=environ["DB_PORT"],
         db_name=environ["DB_NAME"],
         db_schema=environ["DB_SCHEMA"],
-        db_user=environ["DB_READ_ONLY_USER_NAME"],
-        db_password=db_password,
+        db_user=environ["DB_READ_AND_WRITE_USER_NAME"],
     )
-    # Yield the connection object to the context manager
-    yield db_connection
-    # After the context manager is exited, the connection is closed
-    db_connection.close()
+
+
+def connection_to_db_using_secret(secret_name: str, secret_key: str, **connection_args: str) -> Connection:
+    """Creates a new connection to a database using a password from AWS Secrets Manager.
+
+    The password normally comes from the secret cache, so if authentication fails the secret
+    is refreshed in case it has been rotated and the connection is retried once.
+
+    Args:
+        secret_name (str): Name of the secret holding the database password
+        secret_key (str): Key of the database password within the secret
+        **connection_args (str): Arguments for connection_to_db other than the password
+
+    Returns:
+        Connection: Connection to the database
+    """
+    db_secret = get_secret(secret_name)
+    try:
+        return connection_to_db(db_password=db_secret[secret_key], **connection_args)
+    except OperationalError as err:
+        if not is_authentication_error(err):
+            raise
+        logger.warning("DoS DB authentication failed, refreshing secret and retrying connection")
+    db_secret = get_secret(secret_name, force_refresh=True)
+    return connection_to_db(db_password=db_secret[secret_key], **connection_args)
+
+
+def is_authentication_error(err: OperationalError) -> bool:
+    """Checks if a connection error was caused by the database rejecting the credentials.
+
+    Args:
+        err (OperationalError): Error raised when connecting to the database
+
+    Returns:
+        bool: True if the error is an authentication failure, False otherwise
+    """
+    return err.sqlstate in ("28000", "28P01") or "password authentication failed" in str(err)
+
+
+db_reader_pool = DoSDBConnectionPool(name="reader", connection_factory=lambda: create_db_reader_connection())
+db_writer_pool = DoSDBConnectionPool(name="writer", connection_factory=lambda: create_db_writer_connection())
+
+
+@contextmanager
+def connect_to_db_reader() -> Generator[Connection, None, None]:
+    """Gets a pooled connection to the DoS DB Reader.
+
+    Yields:
+        Generator[connection, None, None]: Connection to the database
+    """
+    with db_reader_pool.connection() as db_connection:
+        yield db_connection
 
 
 @contextmanager
 def connect_to_db_writer() -> Generator[Connection[DictRow], None, None]:
-    """Creates a new connection to the DoS DB Writer.
+    """Gets a pooled connection to the DoS DB Writer.
+
+    Uncommitted changes are rolled back when the context manager exits.
 
     Yields:
         Generator[connection, None, None]: Connection to the database
     """
-    # Before the context manager is entered, the connection is created
-    db_secret = get_secret(environ["DB_WRITER_SECRET_NAME"])
-    db_connection = connection_to_db(
-        server=environ["DB_WRITER_SERVER"],
-        port=environ["DB_PORT"],
-        db_name=environ["DB_NAME"],
-        db_schema=environ["DB_SCHEMA"],
-        db_user=environ["DB_READ_AND_WRITE_USER_NAME"],
-        db_password=db_secret[environ["DB_WRITER_SECRET_KEY"]],
-    )
-    # Yield the connection object to the context manager
-    yield db_connection
-    # After the context manager is exited, the connection is closed
-    db_connection.close()
+    with db_writer_pool.connection() as db_connection:
+        yield db_connection
+
+
+def close_db_connections() -> None:
+    """Closes all idle pooled connections to the DoS DB Reader and Writer."""
+    db_reader_pool.close()
+    db_writer_pool.close()
 
 
 def connection_to_db(
@@ -124,3 +424,263 @@ def query_dos_db(
     cursor.execute(query=query, params=query_vars)
     logger.debug(f"DoS DB query completed in {(time_ns() // 1000000) - time_start}ms")
     return cursor
+
+
+def stream_dos_db(
+    connection: Connection,
+    query: LiteralString,
+    query_vars: dict[str, Any] | None = None,
+    cursor_name: str = "dos_db_stream",
+    itersize: int | None = None,
+) -> Generator[DictRow, None, None]:
+    """Streams the results of a query from the database with a server side cursor.
+
+    Only itersize rows are held in memory at a time, however many rows the query returns.
+    The cursor is declared in the connection's transaction, so the connection must not be committed or
+    rolled back until the rows have been read, but can be used for other queries in between.
+
+    Args:
+        connection (Connection): Connection to the database
+        query (str): Query to execute
+        query_vars (Optional[Dict[str, Any]], optional): Variables to use in the query. Defaults to None.
+        cursor_name (str): Name of the server side cursor, unique among the connection's open cursors
+        itersize (int | None): Number of rows to fetch at a time. Defaults to DB_CURSOR_ITERSIZE or 1000.
+
+    Yields:
+        Generator[DictRow, None, None]: Rows of the query results
+    """
+    with connection.cursor(name=cursor_name, row_factory=dict_row) as cursor:
+        cursor.itersize = itersize or int(getenv("DB_CURSOR_ITERSIZE", "1000"))
+        logger.debug("Query to stream", query=query, vars=query_vars, itersize=cursor.itersize)
+        time_start = time_ns() // 1000000
+        cursor.execute(query=query, params=query_vars)
+        row_count = 0
+        for row in cursor:
+            row_count += 1
+            yield row
+        logger.debug(f"DoS DB query streamed {row_count} rows in {(time_ns() // 1000000) - time_start}ms")
+
+
+class AsyncDoSDBConnectionPool(BaseDoSDBConnectionPool):
+    """An asyncio counterpart of DoSDBConnectionPool for AsyncConnections to a DoS database.
+
+    Each concurrent task checks out its own connection, so independent queries can wait on the database at the
+    same time. The pool isn't tied to an event loop, so connections are reused by the event loops of warm
+    Lambda invocations.
+    """
+
+    connection_factory: Callable[[], Awaitable[AsyncConnection]]
+
+    @asynccontextmanager
+    async def connection(self: Self) -> AsyncGenerator[AsyncConnection, None]:
+        """Checks out a connection from the pool and returns it to the pool afterwards.
+
+        Any transaction left open by the caller is rolled back before the connection is reused.
+
+        Yields:
+            AsyncGenerator[AsyncConnection, None]: Connection to the database
+        """
+        pooled_connection = await self._checkout()
+        try:
+            yield pooled_connection.connection
+        finally:
+            await self._release(pooled_connection)
+
+    async def close(self: Self) -> None:
+        """Closes all idle connections in the pool."""
+        for pooled_connection in self._take_idle_connections():
+            await self._discard(pooled_connection, reason="pool closed")
+
+    async def _checkout(self: Self) -> PooledConnection:
+        """Gets a healthy idle connection from the pool or creates a new one.
+
+        Returns:
+            PooledConnection: Connection checked out of the pool
+        """
+        while (pooled_connection := self._take_idle_connection()) is not None:
+            now = monotonic()
+            reason = self._eviction_reason(pooled_connection, now)
+            if reason is None and self._needs_health_check(pooled_connection, now):
+                reason = None if await self._is_healthy(pooled_connection) else "failed health check"
+            if reason is None:
+                logger.debug(f"Reusing pooled async DoS DB {self.name} connection")
+                return pooled_connection
+            await self._discard(pooled_connection, reason=reason)
+        logger.debug(f"Creating new async DoS DB {self.name} connection")
+        return new_pooled_connection(await self.connection_factory())
+
+    async def _release(self: Self, pooled_connection: PooledConnection) -> None:
+        """Returns a connection to the pool, rolling back any open transaction.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to return to the pool
+        """
+        if is_closed_or_broken(pooled_connection):
+            await self._discard(pooled_connection, reason="connection closed or broken")
+            return
+        if has_open_transaction(pooled_connection):
+            try:
+                await pooled_connection.connection.rollback()
+            except Error:
+                await self._discard(pooled_connection, reason="rollback failed")
+                return
+        if not self._return_idle_connection(pooled_connection):
+            await self._discard(pooled_connection, reason="pool full")
+
+    async def _is_healthy(self: Self, pooled_connection: PooledConnection) -> bool:
+        """Checks the connection is still usable by running a query on it.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to check
+
+        Returns:
+            bool: True if the connection is usable, False otherwise
+        """
+        try:
+            await pooled_connection.connection.execute("SELECT 1")
+            await pooled_connection.connection.rollback()
+        except Error:
+            logger.warning(f"Pooled async DoS DB {self.name} connection failed health check, reconnecting")
+            return False
+        return True
+
+    async def _discard(self: Self, pooled_connection: PooledConnection, reason: str) -> None:
+        """Closes a connection that is no longer wanted in the pool.
+
+        Args:
+            pooled_connection (PooledConnection): Connection to close
+            reason (str): Reason the connection is being discarded, used in logs
+        """
+        logger.debug(f"Discarding async DoS DB {self.name} connection", reason=reason)
+        try:
+            await pooled_connection.connection.close()
+        except Error:
+            logger.debug(f"Unable to cleanly close async DoS DB {self.name} connection", reason=reason)
+
+
+async def create_db_reader_connection_async() -> AsyncConnection:
+    """Creates a new async connection to the DoS DB Reader.
+
+    Returns:
+        AsyncConnection: Connection to the database
+    """
+    connection_args = get_db_reader_connection_args()
+    # Use AWS secret values, or failing that check env for DB password
+    if "DB_READER_SECRET_NAME" in environ and "DB_READER_SECRET_KEY" in environ:
+        return await connection_to_db_using_secret_async(
+            secret_name=environ["DB_READER_SECRET_NAME"],
+            secret_key=environ["DB_READER_SECRET_KEY"],
+            **connection_args,
+        )
+    return await connection_to_db_async(db_password=environ["DB_SECRET"], **connection_args)
+
+
+async def connection_to_db_using_secret_async(
+    secret_name: str,
+    secret_key: str,
+    **connection_args: str,
+) -> AsyncConnection:
+    """Creates a new async connection to a database using a password from AWS Secrets Manager.
+
+    The secret is fetched in a thread so other tasks keep running while Secrets Manager is called, and is
+    refreshed and the connection retried once if authentication fails, as in connection_to_db_using_secret.
+
+    Args:
+        secret_name (str): Name of the secret holding the database password
+        secret_key (str): Key of the database password within the secret
+        **connection_args (str): Arguments for connection_to_db_async other than the password
+
+    Returns:
+        AsyncConnection: Connection to the database
+    """
+    db_secret = await to_thread(get_secret, secret_name)
+    try:
+        return await connection_to_db_async(db_password=db_secret[secret_key], **connection_args)
+    except OperationalError as err:
+        if not is_authentication_error(err):
+            raise
+        logger.warning("DoS DB authentication failed, refreshing secret and retrying connection")
+    db_secret = await to_thread(get_secret, secret_name, force_refresh=True)
+    return await connection_to_db_async(db_password=db_secret[secret_key], **connection_args)
+
+
+async_db_reader_pool = AsyncDoSDBConnectionPool(
+    name="reader",
+    connection_factory=lambda: create_db_reader_connection_async(),
+)
+
+
+@asynccontextmanager
+async def connect_to_db_reader_async() -> AsyncGenerator[AsyncConnection, None]:
+    """Gets a pooled async connection to the DoS DB Reader.
+
+    Yields:
+        AsyncGenerator[AsyncConnection, None]: Connection to the database
+    """
+    async with async_db_reader_pool.connection() as db_connection:
+        yield db_connection
+
+
+async def close_db_connections_async() -> None:
+    """Closes all idle pooled async connections to the DoS DB Reader."""
+    await async_db_reader_pool.close()
+
+
+async def connection_to_db_async(
+    server: str,
+    port: str,
+    db_name: str,
+    db_schema: str,
+    db_user: str,
+    db_password: str,
+) -> AsyncConnection:
+    """Creates a new async connection to a database.
+
+    Args:
+        server (str): Database server to connect to
+        port (str): Database port to connect to
+        db_name (str): Database name to connect to
+        db_schema (str): Database schema to connect to
+        db_user (str): Database user to connect as
+        db_password (str): Database password for the user
+
+    Returns:
+        AsyncConnection: Connection to the database
+    """
+    logger.debug(
+        f"Attempting async connection to database: '{server}', host={server}, port={port}, "
+        f"dbname={db_name}, schema={db_schema}, user={db_user}",
+    )
+    return await AsyncConnection.connect(
+        host=server,
+        port=port,
+        dbname=db_name,
+        user=db_user,
+        password=db_password,
+        connect_timeout=2,
+        options=f"-c search_path=dbo,{db_schema}",
+        application_name="DOS INTEGRATION <psycopg>",
+    )
+
+
+async def query_dos_db_async(
+    connection: AsyncConnection,
+    query: LiteralString,
+    query_vars: dict[str, Any] | None = None,
+) -> AsyncCursor[DictRow]:
+    """Queries the database given in the async connection object.
+
+    Args:
+        connection (AsyncConnection): Connection to the database
+        query (str): Query to execute
+        query_vars (Optional[Dict[str, Any]], optional): Variables to use in the query. Defaults to None.
+
+    Returns:
+        AsyncCursor[DictRow]: Cursor to the query results
+    """
+    cursor = connection.cursor(row_factory=dict_row)
+    logger.debug("Query to execute", query=query, vars=query_vars)
+    time_start = time_ns() // 1000000
+    await cursor.execute(query=query, params=query_vars)
+    logger.debug(f"DoS DB query completed in {(time_ns() // 1000000) - time_start}ms")
+    return cursor
@@ -0,0 +1,162 @@
+from collections.abc import Iterable
+from math import isnan, nan
+from mmap import ACCESS_READ, mmap
+from os import getenv
+from os.path import isfile
+from struct import Struct
+from typing import Self
+
+from aws_lambda_powertools.logging import Logger
+
+from .dos_location import DoSLocation
+
+logger = Logger(child=True)
+
+GAZETTEER_MAGIC = b"DOSGAZ01"
+# Magic, number of records, offset of the postal towns
+HEADER = Struct("<8sII")
+# Normalised postcode, postcode, id, easting, northing, latitude, longitude, postal town offset and length
+RECORD = Struct("<8s8siiiddIH")
+NULL_INTEGER = -(2**31)
+
+
+class DoSLocationGazetteer:
+    """A read only, memory mapped copy of the DoS locations table for looking up locations without the DoS DB.
+
+    The file is a header, then fixed width records sorted by normalised postcode, then the postal towns.
+    Opening it only maps the file into memory, and lookups binary search the records in place.
+    The gazetteer is a snapshot from when it was built, so postcodes missing from it should still be looked up
+    in the DoS DB.
+    """
+
+    def __init__(self: Self, path: str) -> None:
+        """Memory maps a gazetteer file built with write_dos_location_gazetteer.
+
+        Args:
+            path (str): Path to the gazetteer file
+
+        Raises:
+            ValueError: If the file is not a DoS location gazetteer
+        """
+        with open(path, "rb") as file:
+            self.mmap = mmap(file.fileno(), 0, access=ACCESS_READ)
+        magic, self.record_count, self.towns_offset = HEADER.unpack_from(self.mmap, 0)
+        if magic != GAZETTEER_MAGIC:
+            msg = f"{path} is not a DoS location gazetteer"
+            raise ValueError(msg)
+
+    def get(self: Self, postcode: str) -> list[DoSLocation] | None:
+        """Gets the DoS locations for a postcode.
+
+        Args:
+            postcode (str): Postcode in any format
+
+        Returns:
+            list[DoSLocation] | None: The DoS locations for the postcode or None if it isn't in the gazetteer
+        """
+        key = postcode.replace(" ", "").upper().encode().ljust(8, b"\0")
+        low, high = 0, self.record_count
+        # Find the first record with the postcode
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        dos_locations = []
+        while low < self.record_count and self._key(low) == key:
+            dos_locations.append(self._dos_location(low))
+            low += 1
+        return dos_locations or None
+
+    def close(self: Self) -> None:
+        """Unmaps the gazetteer file."""
+        self.mmap.close()
+
+    def _key(self: Self, index: int) -> bytes:
+        """Gets the normalised postcode of a record."""
+        offset = HEADER.size + index * RECORD.size
+        return self.mmap[offset : offset + 8]
+
+    def _dos_location(self: Self, index: int) -> DoSLocation:
+        """Unpacks a record into a DoSLocation."""
+        _, postcode, location_id, easting, northing, latitude, longitude, town_offset, town_length = RECORD.unpack_from(
+            self.mmap, HEADER.size + index * RECORD.size
+        )
+        town_start = self.towns_offset + town_offset
+        return DoSLocation(
+            id=location_id,
+            postcode=postcode.rstrip(b"\0").decode(),
+            easting=None if easting == NULL_INTEGER else easting,
+            northing=None if northing == NULL_INTEGER else northing,
+            postaltown=self.mmap[town_start : town_start + town_length].decode() if town_length else None,
+            latitude=None if isnan(latitude) else latitude,
+            longitude=None if isnan(longitude) else longitude,
+        )
+
+
+def write_dos_location_gazetteer(dos_locations: Iterable[DoSLocation], path: str) -> int:
+    """Writes DoS locations to a gazetteer file that can be read with DoSLocationGazetteer.
+
+    Args:
+        dos_locations (Iterable[DoSLocation]): DoS locations to write
+        path (str): Path of the gazetteer file
+
+    Returns:
+        int: Number of DoS locations written
+    """
+    towns: dict[str, int] = {}
+    town_bytes = bytearray()
+    records = []
+    for dos_location in dos_locations:
+        key = dos_location.normal_postcode().encode()
+        postcode = dos_location.postcode.encode()
+        if len(key) > 8 or len(postcode) > 8:  # noqa: PLR2004
+            logger.warning(f"Skipping DoS location {dos_location.id} as its postcode is not a valid postcode")
+            continue
+        town = dos_location.postaltown or ""
+        if town not in towns:
+            towns[town] = len(town_bytes)
+            town_bytes += town.encode()
+        records.append(
+            (
+                key,
+                postcode,
+                dos_location.id,
+                NULL_INTEGER if dos_location.easting is None else int(dos_location.easting),
+                NULL_INTEGER if dos_location.northing is None else int(dos_location.northing),
+                nan if dos_location.latitude is None else dos_location.latitude,
+                nan if dos_location.longitude is None else dos_location.longitude,
+                towns[town],
+                len(town.encode()),
+            ),
+        )
+    records.sort(key=lambda record: (record[0], record[2]))
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(GAZETTEER_MAGIC, len(records), HEADER.size + len(records) * RECORD.size))
+        for record in records:
+            file.write(RECORD.pack(*record))
+        file.write(town_bytes)
+    return len(records)
+
+
+dos_location_gazetteer: DoSLocationGazetteer | None = None
+dos_location_gazetteer_loaded = False
+
+
+def get_dos_location_gazetteer() -> DoSLocationGazetteer | None:
+    """Gets the gazetteer at DOS_LOCATION_GAZETTEER_PATH, opening it on first use.
+
+    Returns:
+        DoSLocationGazetteer | None: The gazetteer or None if there isn't one
+    """
+    global dos_location_gazetteer, dos_location_gazetteer_loaded  # noqa: PLW0603
+    if not dos_location_gazetteer_loaded:
+        dos_location_gazetteer_loaded = True
+        path = getenv("DOS_LOCATION_GAZETTEER_PATH")
+        if path and isfile(path):
+            dos_location_gazetteer = DoSLocationGazetteer(path)
+            logger.info(f"Opened DoS location gazetteer with {dos_location_gazetteer.record_count} locations")
+        elif path:
+            logger.warning(f"DoS location gazetteer {path} not found, looking up postcodes in the DoS DB")
+    return dos_location_gazetteer
@@ -1,8 +1,10 @@
 import hashlib
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from json import dumps, loads
 from os import environ
-from time import time
+from time import sleep, time
 from typing import Any
 
 from aws_lambda_powertools.logging.logger import Logger
@@ -12,6 +14,8 @@ from boto3.dynamodb.types import TypeSerializer
 from common.errors import DynamoDBError
 
 TTL = 157680000  # int((365*5)*24*60*60) 5 years in seconds
+BATCH_WRITE_MAX_ATTEMPTS = 3
+MAX_PARALLEL_QUERIES = 10
 logger = Logger(child=True)
 dynamodb = client("dynamodb", region_name=environ["AWS_REGION"])
 
@@ -24,16 +28,20 @@ def dict_hash(change_event: dict[str, Any], sequence_number: str) -> str:
     return change_event_hash.hexdigest()
 
 
-def add_change_event_to_dynamodb(change_event: dict[str, Any], sequence_number: int, event_received_time: int) -> str:
-    """Add change event to dynamodb but store the message and use the event for details.
+def change_event_to_dynamodb_item(
+    change_event: dict[str, Any],
+    sequence_number: int | None,
+    event_received_time: int,
+) -> tuple[str, dict[str, Any]]:
+    """Builds the serialised dynamodb item for a change event.
 
     Args:
-        change_event (Dict[str, Any]): sequence id for given ODSCode
-        sequence_number (int): sequence id for given ODSCode
-        event_received_time (str): received timestamp from SQSEvent.
+        change_event (Dict[str, Any]): change event to store
+        sequence_number (int | None): sequence id for given ODSCode
+        event_received_time (int): received timestamp from SQSEvent.
 
     Returns:
-        dict: returns response from dynamodb
+        tuple[str, dict[str, Any]]: record id of the change event and the serialised dynamodb item
     """
     record_id = dict_hash(change_event, sequence_number)
     dynamo_record = {
@@ -44,9 +52,23 @@ def add_change_event_to_dynamodb(change_event: dict[str, Any], sequence_number:
         "SequenceNumber": sequence_number,
         "Event": loads(dumps(change_event), parse_float=Decimal),
     }
+    serializer = TypeSerializer()
+    return record_id, {k: serializer.serialize(v) for k, v in dynamo_record.items()}
+
+
+def add_change_event_to_dynamodb(change_event: dict[str, Any], sequence_number: int, event_received_time: int) -> str:
+    """Add change event to dynamodb but store the message and use the event for details.
+
+    Args:
+        change_event (Dict[str, Any]): sequence id for given ODSCode
+        sequence_number (int): sequence id for given ODSCode
+        event_received_time (str): received timestamp from SQSEvent.
+
+    Returns:
+        dict: returns response from dynamodb
+    """
     try:
-        serializer = TypeSerializer()
-        put_item = {k: serializer.serialize(v) for k, v in dynamo_record.items()}
+        record_id, put_item = change_event_to_dynamodb_item(change_event, sequence_number, event_received_time)
         response = dynamodb.put_item(TableName=environ["CHANGE_EVENTS_TABLE_NAME"], Item=put_item)
         logger.info("Added record to dynamodb", response=response, item=put_item)
     except Exception as err:
@@ -55,6 +77,55 @@ def add_change_event_to_dynamodb(change_event: dict[str, Any], sequence_number:
     return record_id
 
 
+def add_change_events_to_dynamodb(
+    change_events: list[tuple[dict[str, Any], int | None, int]],
+) -> tuple[list[str], set[str]]:
+    """Add a batch of change events to dynamodb using BatchWriteItem.
+
+    Items dynamodb leaves unprocessed are retried up to BATCH_WRITE_MAX_ATTEMPTS times in total.
+
+    Args:
+        change_events (list[tuple[dict[str, Any], int | None, int]]): change event, sequence number
+            and event received time of each change event
+
+    Returns:
+        tuple[list[str], set[str]]: record ids in the same order as the change events
+            and the record ids of any change events that could not be written
+    """
+    record_ids = []
+    put_items: dict[str, dict[str, Any]] = {}
+    for change_event, sequence_number, event_received_time in change_events:
+        record_id, put_item = change_event_to_dynamodb_item(change_event, sequence_number, event_received_time)
+        record_ids.append(record_id)
+        # A batch can't write the same key twice, duplicate change events share a record id
+        put_items[record_id] = put_item
+    table_name = environ["CHANGE_EVENTS_TABLE_NAME"]
+    unprocessed_record_ids: set[str] = set()
+    items = list(put_items.items())
+    # BatchWriteItem accepts at most 25 items per request
+    for i in range(0, len(items), 25):
+        requests = [{"PutRequest": {"Item": put_item}} for _, put_item in items[i : i + 25]]
+        for attempt in range(1, BATCH_WRITE_MAX_ATTEMPTS + 1):
+            try:
+                response = dynamodb.batch_write_item(RequestItems={table_name: requests})
+            except Exception as err:
+                msg = f"Unable to add batch of {len(requests)} change events into dynamodb"
+                raise DynamoDBError(msg) from err
+            requests = response.get("UnprocessedItems", {}).get(table_name, [])
+            if not requests:
+                break
+            logger.warning("Dynamodb left change events unprocessed", unprocessed=len(requests), attempt=attempt)
+            if attempt < BATCH_WRITE_MAX_ATTEMPTS:
+                sleep(0.05 * 2**attempt)
+        unprocessed_record_ids.update(request["PutRequest"]["Item"]["Id"]["S"] for request in requests)
+    logger.info(
+        "Added batch of records to dynamodb",
+        records=len(put_items),
+        unprocessed_records=len(unprocessed_record_ids),
+    )
+    return record_ids, unprocessed_record_ids
+
+
 def get_latest_sequence_id_for_a_given_odscode_from_dynamodb(odscode: str) -> int:
     """Get latest sequence id for a given odscode from dynamodb.
 
@@ -78,3 +149,23 @@ def get_latest_sequence_id_for_a_given_odscode_from_dynamodb(odscode: str) -> in
         sequence_number = int(resp.get("Items")[0]["SequenceNumber"]["N"])
     logger.debug(f"Sequence number for osdscode '{odscode}'= {sequence_number}")
     return sequence_number
+
+
+def get_latest_sequence_ids_for_odscodes_from_dynamodb(odscodes: Iterable[str]) -> dict[str, int]:
+    """Get latest sequence ids for many odscodes from dynamodb.
+
+    The latest sequence id comes from a query on the gsi_ods_sequence index which BatchGetItem can't read,
+    so the queries for each distinct odscode are run in parallel.
+
+    Args:
+        odscodes (Iterable[str]): odscodes for the change events
+
+    Returns:
+        dict[str, int]: Sequence number of the latest message for each odscode, 0 if not present.
+    """
+    unique_odscodes = list(dict.fromkeys(odscodes))
+    if not unique_odscodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(unique_odscodes), MAX_PARALLEL_QUERIES)) as executor:
+        sequence_numbers = executor.map(get_latest_sequence_id_for_a_given_odscode_from_dynamodb, unique_odscodes)
+        return dict(zip(unique_odscodes, sequence_numbers, strict=True))
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import cached_property, lru_cache
 from itertools import groupby
 from typing import Self
 
@@ -13,9 +14,67 @@ from common.constants import (
     PHARMACY_SERVICE_TYPE_IDS,
 )
 from common.dos import DoSService
-from common.opening_times import WEEKDAYS, OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
+from common.opening_times import (
+    WEEKDAYS,
+    OpenPeriod,
+    SpecifiedOpeningTime,
+    SpecifiedOpeningTimeTuple,
+    StandardOpeningTimes,
+)
 
 logger = Logger(child=True)
+NHS_UK_DATE_FORMAT = "%b  %d  %Y"
+MONTHS = {
+    month: number
+    for number, month in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+
+
+@dataclass
+class NHSEntityPayloadIndex:
+    """The parts of an NHS UK payload that NHSEntity looks things up in, gathered in one pass over each list."""
+
+    standard_opening_times: list[dict] = field(default_factory=list)
+    specified_opening_times: list[dict] = field(default_factory=list)
+    # Primary office hours contact values keyed by upper case contact method type
+    contacts: dict[str, str | None] = field(default_factory=dict)
+    # Service codes keyed by service list name, or None if the payload list isn't a list
+    service_codes: dict[str, set[str] | None] = field(default_factory=dict)
+
+    @classmethod
+    def from_entity_data(cls: type["NHSEntityPayloadIndex"], entity_data: dict) -> "NHSEntityPayloadIndex":
+        """Builds the index from the NHS UK payload.
+
+        Args:
+            entity_data (dict): NHS UK payload
+
+        Returns:
+            NHSEntityPayloadIndex: The index of the payload
+        """
+        index = cls()
+        for item in entity_data.get("OpeningTimes", []):
+            opening_time_type = str(item.get("OpeningTimeType")).upper()
+            if opening_time_type == "GENERAL":
+                index.standard_opening_times.append(item)
+            elif opening_time_type == "ADDITIONAL":
+                index.specified_opening_times.append(item)
+
+        for item in entity_data.get("Contacts", []):
+            if (
+                item.get("ContactType", "").upper() == "PRIMARY"
+                and item.get("ContactAvailabilityType", "").upper() == "OFFICE HOURS"
+            ):
+                index.contacts.setdefault(item.get("ContactMethodType", "").upper(), item.get("ContactValue"))
+
+        for list_name in ("Services", "UecServices"):
+            services = entity_data.get(list_name, [])
+            index.service_codes[list_name] = (
+                {item.get("ServiceCode") for item in services} if isinstance(services, list) else None
+            )
+        return index
 
 
 @dataclass
@@ -24,6 +83,9 @@ class NHSEntity:
 
     Some fields are pulled straight from the payload while others are processed first. So attribute
     names differ from payload format for consistency within object.
+
+    The opening times, contacts and services are only worked out from the payload when they are first used, so
+    entities that are discarded early don't pay for parsing them.
     """
 
     entity_data: dict
@@ -35,13 +97,6 @@ class NHSEntity:
     org_status: str
     address_lines: list[str]
     postcode: str
-    website: str
-    phone: str
-    standard_opening_times: StandardOpeningTimes | None
-    specified_opening_times: list[SpecifiedOpeningTime] | None
-    palliative_care: bool
-    blood_pressure: bool
-    contraception: bool
 
     def __init__(self: Self, entity_data: dict) -> None:
         """Initialise the object with the entity data."""
@@ -61,38 +116,59 @@ class NHSEntity:
             if isinstance(line, str) and line.strip()
         ]
 
-        self.standard_opening_times = self._get_standard_opening_times()
-        self.specified_opening_times = self._get_specified_opening_times()
-        self.phone = self.extract_contact("Telephone")
-        self.website = self.extract_contact("Website")
-        self.palliative_care = self.check_for_uec_service(NHS_UK_PALLIATIVE_CARE_SERVICE_CODE)
-        self.blood_pressure = self.check_for_service(NHS_UK_BLOOD_PRESSURE_SERVICE_CODE)
-        self.contraception = self.check_for_service(NHS_UK_CONTRACEPTION_SERVICE_CODE)
-
         logger.append_keys(nhsuk_organisation_typeid=self.org_type_id, nhsuk_organisation_name=self.org_name)
 
     def __repr__(self: Self) -> str:
         """Returns a string representation of the object."""
         return f"<NHSEntity: name={self.org_name} odscode={self.odscode}>"
 
+    @cached_property
+    def payload_index(self: Self) -> NHSEntityPayloadIndex:
+        """The index of the opening times, contacts and services in the payload."""
+        return NHSEntityPayloadIndex.from_entity_data(self.entity_data)
+
+    @cached_property
+    def standard_opening_times(self: Self) -> StandardOpeningTimes:
+        """The NHS UK standard opening times."""
+        return self._get_standard_opening_times()
+
+    @cached_property
+    def specified_opening_times(self: Self) -> SpecifiedOpeningTimeTuple:
+        """The NHS UK specified opening times."""
+        return self._get_specified_opening_times()
+
+    @cached_property
+    def phone(self: Self) -> str | None:
+        """The primary office hours telephone number."""
+        return self.extract_contact("Telephone")
+
+    @cached_property
+    def website(self: Self) -> str | None:
+        """The primary office hours website."""
+        return self.extract_contact("Website")
+
+    @cached_property
+    def palliative_care(self: Self) -> bool | None:
+        """Whether the palliative care UEC service is in the payload."""
+        return self.check_for_uec_service(NHS_UK_PALLIATIVE_CARE_SERVICE_CODE)
+
+    @cached_property
+    def blood_pressure(self: Self) -> bool | None:
+        """Whether the blood pressure service is in the payload."""
+        return self.check_for_service(NHS_UK_BLOOD_PRESSURE_SERVICE_CODE)
+
+    @cached_property
+    def contraception(self: Self) -> bool | None:
+        """Whether the contraception service is in the payload."""
+        return self.check_for_service(NHS_UK_CONTRACEPTION_SERVICE_CODE)
+
     def normal_postcode(self: Self) -> str:
         """Returns the postcode in a normalised format."""
         return self.postcode.replace(" ", "").upper()
 
     def extract_contact(self: Self, contact_type: str) -> str | None:
         """Returns the nested contact value within the input payload."""
-        return next(
-            (
-                item.get("ContactValue")
-                for item in self.entity_data.get("Contacts", [])
-                if (
-                    item.get("ContactMethodType", "").upper() == contact_type.upper()
-                    and item.get("ContactType", "").upper() == "PRIMARY"
-                    and item.get("ContactAvailabilityType", "").upper() == "OFFICE HOURS"
-                )
-            ),
-            None,
-        )
+        return self.payload_index.contacts.get(contact_type.upper())
 
     def check_for_uec_service(self: Self, service_code: str) -> bool | None:
         """Checks if the UEC service exists in the payload.
@@ -117,9 +193,8 @@ class NHSEntity:
         return self._extract_service_from_list("Services", service_code)
 
     def _extract_service_from_list(self: Self, list_name: str, service_code: str) -> bool | None:
-        if isinstance(self.entity_data.get(list_name, []), list):
-            return any(item.get("ServiceCode") == service_code for item in self.entity_data.get(list_name, []))
-        return None
+        service_codes = self.payload_index.service_codes[list_name]
+        return None if service_codes is None else service_code in service_codes
 
     def _get_standard_opening_times(self: Self) -> StandardOpeningTimes:
         """Get the standard opening times.
@@ -134,7 +209,7 @@ class NHSEntity:
             StandardOpeningTimes: NHS UK standard opening times
         """
         std_opening_times = StandardOpeningTimes()
-        for open_time in filter(is_std_opening_json, self.entity_data.get("OpeningTimes", [])):
+        for open_time in filter(is_std_opening_json, self.payload_index.standard_opening_times):
             weekday = open_time["Weekday"].lower()
 
             # Populate StandardOpeningTimes obj depending on IsOpen status
@@ -146,23 +221,23 @@ class NHSEntity:
 
         return std_opening_times
 
-    def _get_specified_opening_times(self: Self) -> list[SpecifiedOpeningTime]:
+    def _get_specified_opening_times(self: Self) -> SpecifiedOpeningTimeTuple:
         """Get all the Specified Opening Times.
 
         Args:
             opening_time_type (str): OpeningTimeType to filter the data, General for pharmacy
 
         Returns:
-            dict: key=date and value = List[OpenPeriod] objects in a sort order
+            SpecifiedOpeningTimeTuple: The specified opening times in date order
         """
-        specified_times_list = list(filter(is_spec_opening_json, self.entity_data.get("OpeningTimes", [])))
+        specified_times_list = list(filter(is_spec_opening_json, self.payload_index.specified_opening_times))
         specified_times_list = sorted(specified_times_list, key=lambda item: item["AdditionalOpeningDate"])
         specified_opening_times = []
 
         # Grouping data by date, and create open_period objects from values
         for date_str, op_dict_list in groupby(specified_times_list, lambda item: (item["AdditionalOpeningDate"])):
             open_periods = []
-            date = datetime.strptime(date_str, "%b  %d  %Y").date()
+            opening_date = string_to_date(date_str)
             is_open = True
 
             for item in list(op_dict_list):
@@ -171,9 +246,9 @@ class NHSEntity:
                 else:
                     is_open = False
 
-            specified_opening_times.append(SpecifiedOpeningTime(open_periods, date, is_open))
+            specified_opening_times.append(SpecifiedOpeningTime(open_periods, opening_date, is_open))
 
-        return specified_opening_times
+        return SpecifiedOpeningTimeTuple(specified_opening_times)
 
     def is_status_hidden_or_closed(self: Self) -> bool:
         """Check if the status is hidden or closed. If so, return True.
@@ -249,7 +324,7 @@ def is_spec_opening_json(item: dict) -> bool:
         return False
 
     try:
-        datetime.strptime(str(item.get("AdditionalOpeningDate")), "%b  %d  %Y")
+        string_to_date(str(item.get("AdditionalOpeningDate")))
     except ValueError:
         return False
 
@@ -290,3 +365,28 @@ def get_palliative_care_log_value(palliative_care: bool, skip_palliative_care: b
         if skip_palliative_care
         else palliative_care
     )
+
+
+@lru_cache(maxsize=1024)
+def string_to_date(date_str: str) -> date:
+    """Converts an NHS UK additional opening date such as 'Nov 12 2021' to a date.
+
+    Dates in the expected format are parsed directly without depending on the locale, and anything else falls back
+    to strptime. Change events for the same pharmacies repeat the same dates so the results are cached.
+
+    Args:
+        date_str (str): The NHS UK date string
+
+    Returns:
+        date: The date
+
+    Raises:
+        ValueError: If the string isn't a valid NHS UK date
+    """
+    parts = date_str.split()
+    if len(parts) == 3 and date_str == date_str.strip():  # noqa: PLR2004
+        month_name, day, year = parts
+        month = MONTHS.get(month_name.lower())
+        if month and 1 <= len(day) <= 2 and len(year) == 4 and (day + year).isascii() and (day + year).isdigit():  # noqa: PLR2004
+            return date(int(year), month, int(day))
+    return datetime.strptime(date_str, NHS_UK_DATE_FORMAT).date()
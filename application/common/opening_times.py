@@ -1,6 +1,10 @@
+from collections.abc import Callable, Iterable, Iterator
 from contextlib import suppress
-from dataclasses import dataclass
 from datetime import date, datetime, time
+from functools import lru_cache
+from hashlib import blake2b
+from operator import attrgetter
+from struct import Struct
 from typing import Any, Optional, Self
 
 from aws_lambda_powertools.logging import Logger
@@ -8,21 +12,77 @@ from aws_lambda_powertools.logging import Logger
 logger = Logger(child=True)
 WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
 DAY_IDS = (1, 2, 3, 4, 5, 6, 7)
+WEEKDAY_INDEXES = {weekday: index for index, weekday in enumerate(WEEKDAYS)}
 DOS_DATE_FORMAT = "%Y-%m-%d"
 DOS_TIME_FORMAT = "%H:%M"
+# Start and end seconds of an open period
+OPEN_PERIOD_RECORD = Struct("<II")
+# Date ordinal and open flag of a specified opening time
+SPECIFIED_OPENING_TIME_RECORD = Struct("<I?")
+FINGERPRINT_RECORD = Struct("<Q")
 
 
-@dataclass(unsafe_hash=True, init=True)
 class OpenPeriod:
     """Represents a period of time when a service is open.
 
+    The start and end are held as seconds since midnight, so open periods are cheap to create, compare and sort.
+    Open periods are immutable values, so they can be hashed and the fingerprint of a list of them can be cached.
+
     Attributes:
         start (time): The start time of the open period
         end (time): The end time of the open period
     """
 
-    start: time
-    end: time
+    __slots__ = ("start_seconds", "end_seconds")
+
+    def __init__(self: Self, start: time, end: time) -> None:
+        """Initialise an OpenPeriod object.
+
+        Args:
+            start (time): The start time of the open period
+            end (time): The end time of the open period
+        """
+        object.__setattr__(self, "start_seconds", seconds_since_midnight(start))
+        object.__setattr__(self, "end_seconds", seconds_since_midnight(end))
+
+    @classmethod
+    def from_seconds(cls: type["OpenPeriod"], start_seconds: int, end_seconds: int) -> "OpenPeriod":
+        """Builds an OpenPeriod object from seconds since midnight.
+
+        Args:
+            start_seconds (int): The start of the open period in seconds since midnight
+            end_seconds (int): The end of the open period in seconds since midnight
+
+        Returns:
+            OpenPeriod: The open period
+        """
+        open_period = cls.__new__(cls)
+        object.__setattr__(open_period, "start_seconds", start_seconds)
+        object.__setattr__(open_period, "end_seconds", end_seconds)
+        return open_period
+
+    def __setattr__(self: Self, name: str, value: object) -> None:
+        """Stops the open period being changed, as changing it would leave cached fingerprints stale.
+
+        Raises:
+            AttributeError: Always, replace the open period instead
+        """
+        msg = f"OpenPeriod is immutable, so {name} can't be set. Replace the open period instead."
+        raise AttributeError(msg)
+
+    def __reduce__(self: Self) -> tuple[Callable, tuple[int, int]]:
+        """Copies the open period with from_seconds, as its attributes can't be set."""
+        return OpenPeriod.from_seconds, (self.start_seconds, self.end_seconds)
+
+    @property
+    def start(self: Self) -> time:
+        """The start time of the open period."""
+        return seconds_to_time(self.start_seconds)
+
+    @property
+    def end(self: Self) -> time:
+        """The end time of the open period."""
+        return seconds_to_time(self.end_seconds)
 
     def start_string(self: Self) -> str:
         """Get the start time as a string.
@@ -30,7 +90,7 @@ class OpenPeriod:
         Returns:
             str: The start time as a string
         """
-        return self.start.strftime("%H:%M:%S")
+        return seconds_to_string(self.start_seconds, with_seconds=True)
 
     def end_string(self: Self) -> str:
         """Get the end time as a string.
@@ -38,7 +98,7 @@ class OpenPeriod:
         Returns:
             str: The end time as a string
         """
-        return self.end.strftime("%H:%M:%S")
+        return seconds_to_string(self.end_seconds, with_seconds=True)
 
     def __str__(self: Self) -> str:
         """Get the open period as a string.
@@ -56,6 +116,14 @@ class OpenPeriod:
         """
         return f"OpenPeriod({self})"
 
+    def __hash__(self: Self) -> int:
+        """Get a hash of the open period.
+
+        Returns:
+            int: A hash of the open period
+        """
+        return hash((self.start_seconds, self.end_seconds))
+
     def __eq__(self: Self, other: object) -> bool:
         """Check if two OpenPeriod objects are equal.
 
@@ -65,7 +133,11 @@ class OpenPeriod:
         Returns:
             bool: True if the objects are equal, False otherwise
         """
-        return isinstance(other, OpenPeriod) and self.start == other.start and self.end == other.end
+        return (
+            isinstance(other, OpenPeriod)
+            and self.start_seconds == other.start_seconds
+            and self.end_seconds == other.end_seconds
+        )
 
     def __lt__(self: Self, other: Any) -> bool:  # noqa: ANN401
         """Check if one OpenPeriod object is less than another.
@@ -76,9 +148,7 @@ class OpenPeriod:
         Returns:
             bool: True if the first object is less than the second, False otherwise
         """
-        if self.start == other.start:
-            return self.end < other.end
-        return self.start < other.start
+        return (self.start_seconds, self.end_seconds) < (other.start_seconds, other.end_seconds)
 
     def __gt__(self: Self, other: Any) -> bool:  # noqa: ANN401
         """Check if one OpenPeriod object is less than another.
@@ -89,9 +159,7 @@ class OpenPeriod:
         Returns:
             bool: True if the first object is less than the second, False otherwise
         """
-        if self.start == other.start:
-            return self.end > other.end
-        return self.start > other.start
+        return (self.start_seconds, self.end_seconds) > (other.start_seconds, other.end_seconds)
 
     def start_before_end(self: Self) -> bool:
         """Check if the start time is before the end time.
@@ -99,7 +167,7 @@ class OpenPeriod:
         Returns:
             bool: True if the start time is before the end time, False otherwise
         """
-        return self.start < self.end
+        return self.start_seconds < self.end_seconds
 
     def overlaps(self: Self, other: Any) -> bool:  # noqa: ANN401
         """Check if two OpenPeriod objects overlap.
@@ -112,29 +180,27 @@ class OpenPeriod:
         """
         assert self.start_before_end()  # noqa: S101
         assert other.start_before_end()  # noqa: S101
-        return self.start <= other.end and other.start <= self.end
+        return self.start_seconds <= other.end_seconds and other.start_seconds <= self.end_seconds
 
     def export_db_string_format(self: Self) -> str:
         """Exports open period into a DoS db accepted format for previous value in the service history entry."""
-        return f"{self.start.strftime(DOS_TIME_FORMAT)}-{self.end.strftime(DOS_TIME_FORMAT)}"
+        return f"{seconds_to_string(self.start_seconds)}-{seconds_to_string(self.end_seconds)}"
 
     def export_time_in_seconds(self: Self) -> str:
         """Exports open period into a DoS DB accepted format for service history."""
-        return f"{self._seconds_since_midnight(self.start)}-{self._seconds_since_midnight(self.end)}"
-
-    def _seconds_since_midnight(self: Self, time: time) -> int:
-        """Returns the number of seconds since midnight for the given time."""
-        return time.hour * 60 * 60 + time.minute * 60 + time.second
+        return f"{self.start_seconds}-{self.end_seconds}"
 
     @staticmethod
     def any_overlaps(open_periods: list["OpenPeriod"]) -> bool:
-        """Returns whether any OpenPeriod object in list overlaps any others in the list."""
-        untested = open_periods.copy()
-        while len(untested) > 1:
-            test_op = untested.pop(0)
-            for op in untested:
-                if test_op.overlaps(op):
-                    return True
+        """Returns whether any OpenPeriod object in list overlaps any others in the list, including ones that touch.
+
+        Once sorted by start, a period overlaps an earlier one only if it starts before the latest end seen so far.
+        """
+        latest_end = -1
+        for open_period in sort_open_periods(open_periods):
+            if open_period.start_seconds <= latest_end:
+                return True
+            latest_end = max(latest_end, open_period.end_seconds)
         return False
 
     @staticmethod
@@ -144,7 +210,7 @@ class OpenPeriod:
         eg.
         '[08:00:00-13:00:00, 14:00:00-17:00:00, 18:00:00-20:00:00]
         """
-        sorted_str_list = [str(op) for op in sorted(open_periods)]
+        sorted_str_list = [str(op) for op in sort_open_periods(open_periods)]
         return f"[{', '.join(sorted_str_list)}]"
 
     @staticmethod
@@ -154,42 +220,200 @@ class OpenPeriod:
 
     @staticmethod
     def equal_lists(a: list["OpenPeriod"], b: list["OpenPeriod"]) -> bool:
-        """Checks equality between 2 lists of open periodsRelies on sorting and eq functions in OpenPeriod."""
-        return sorted(a) == sorted(b)
+        """Checks equality between 2 lists of open periods, ignoring their order."""
+        return len(a) == len(b) and sorted(map(OPEN_PERIOD_KEY, a)) == sorted(map(OPEN_PERIOD_KEY, b))
 
     @staticmethod
     def from_string_times(opening_time_str: str, closing_time_str: str) -> Optional["OpenPeriod"]:
         """Builds an OpenPeriod object from string time arguments."""
-        open_time = string_to_time(opening_time_str)
-        close_time = string_to_time(closing_time_str)
-        if None in (open_time, close_time):
+        open_seconds = string_to_seconds(str(opening_time_str))
+        close_seconds = string_to_seconds(str(closing_time_str))
+        if None in (open_seconds, close_seconds):
             return None
 
-        return OpenPeriod(open_time, close_time)
+        return OpenPeriod.from_seconds(open_seconds, close_seconds)
 
     def export_test_format(self: Self) -> dict[str, str]:
         """Exports open period for use in the DoS DB Hander."""
         return {
-            "start_time": self.start.strftime(DOS_TIME_FORMAT),
-            "end_time": self.end.strftime(DOS_TIME_FORMAT),
+            "start_time": seconds_to_string(self.start_seconds),
+            "end_time": seconds_to_string(self.end_seconds),
         }
 
 
+class OpenPeriodSet:
+    """A set of open periods kept sorted by start and then end.
+
+    Keeping the open periods sorted means overlaps can be found in one pass, and the differences between two sets
+    can be found by walking both sets together.
+    """
+
+    __slots__ = ("open_periods",)
+
+    def __init__(self: Self, open_periods: Iterable[OpenPeriod] = ()) -> None:
+        """Initialise an OpenPeriodSet object.
+
+        Args:
+            open_periods (Iterable[OpenPeriod]): The open periods in any order, duplicates are removed
+        """
+        sorted_open_periods = []
+        for open_period in sort_open_periods(open_periods):
+            if not sorted_open_periods or sorted_open_periods[-1] != open_period:
+                sorted_open_periods.append(open_period)
+        self.open_periods: tuple[OpenPeriod, ...] = tuple(sorted_open_periods)
+
+    def __iter__(self: Self) -> Iterator[OpenPeriod]:
+        """Iterates over the open periods in order."""
+        return iter(self.open_periods)
+
+    def __len__(self: Self) -> int:
+        """Returns the number of open periods in the set."""
+        return len(self.open_periods)
+
+    def __eq__(self: Self, other: object) -> bool:
+        """Checks whether two OpenPeriodSet objects hold the same open periods."""
+        return isinstance(other, OpenPeriodSet) and self.open_periods == other.open_periods
+
+    def __hash__(self: Self) -> int:
+        """Returns a hash of the open periods."""
+        return hash(self.open_periods)
+
+    def __repr__(self: Self) -> str:
+        """Returns a string representation of the set."""
+        return f"OpenPeriodSet({OpenPeriod.list_string(self.open_periods)})"
+
+    def __or__(self: Self, other: "OpenPeriodSet") -> "OpenPeriodSet":
+        """Returns the open periods in either set."""
+        return self.union(other)
+
+    def __sub__(self: Self, other: "OpenPeriodSet") -> "OpenPeriodSet":
+        """Returns the open periods in this set that aren't in the other set."""
+        return self.difference(other)
+
+    def any_overlaps(self: Self) -> bool:
+        """Returns whether any open period overlaps another, including periods that touch."""
+        return OpenPeriod.any_overlaps(self.open_periods)
+
+    def normalised(self: Self) -> "OpenPeriodSet":
+        """Returns a set with overlapping and adjacent open periods merged together.
+
+        eg.
+        [08:00-12:00, 12:00-13:00, 14:00-17:00, 16:00-18:00] -> [08:00-13:00, 14:00-18:00]
+        """
+        merged: list[list[int]] = []
+        for open_period in self.open_periods:
+            if merged and open_period.start_seconds <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], open_period.end_seconds)
+            else:
+                merged.append([open_period.start_seconds, open_period.end_seconds])
+        normalised = OpenPeriodSet()
+        normalised.open_periods = tuple(OpenPeriod.from_seconds(start, end) for start, end in merged)
+        return normalised
+
+    def union(self: Self, other: "OpenPeriodSet") -> "OpenPeriodSet":
+        """Returns the open periods in either set.
+
+        Args:
+            other (OpenPeriodSet): The set to combine with
+
+        Returns:
+            OpenPeriodSet: The open periods in either set
+        """
+        return OpenPeriodSet(self.open_periods + other.open_periods)
+
+    def difference(self: Self, other: "OpenPeriodSet") -> "OpenPeriodSet":
+        """Returns the open periods in this set that aren't in the other set.
+
+        Args:
+            other (OpenPeriodSet): The set to remove
+
+        Returns:
+            OpenPeriodSet: The open periods only in this set
+        """
+        difference = []
+        other_keys = [OPEN_PERIOD_KEY(open_period) for open_period in other.open_periods]
+        index = 0
+        for open_period in self.open_periods:
+            key = OPEN_PERIOD_KEY(open_period)
+            while index < len(other_keys) and other_keys[index] < key:
+                index += 1
+            if index == len(other_keys) or other_keys[index] != key:
+                difference.append(open_period)
+        open_period_set = OpenPeriodSet()
+        open_period_set.open_periods = tuple(difference)
+        return open_period_set
+
+
+class OpenPeriodTuple(tuple):
+    """An immutable tuple of open periods sorted by start and then end, with its fingerprint computed once.
+
+    The open periods are sorted when the tuple is built, so they can be exported without sorting them again and
+    compared by their fingerprints.
+
+    Attributes:
+        fingerprint (int): The fingerprint of the open periods, see open_periods_fingerprint
+    """
+
+    fingerprint: int
+
+    def __new__(cls: type["OpenPeriodTuple"], open_periods: Iterable[OpenPeriod] = ()) -> "OpenPeriodTuple":
+        """Builds an OpenPeriodTuple object.
+
+        Args:
+            open_periods (Iterable[OpenPeriod]): The open periods in any order
+
+        Returns:
+            OpenPeriodTuple: The sorted open periods
+        """
+        open_period_tuple = super().__new__(cls, sort_open_periods(open_periods))
+        open_period_tuple.fingerprint = sorted_open_periods_fingerprint(open_period_tuple)
+        return open_period_tuple
+
+
 class SpecifiedOpeningTime:
-    """A class to represent a specified opening time for a service."""
+    """A class to represent a specified opening time for a service.
+
+    Specified opening times are immutable, so their fingerprint is computed once when they are created.
 
-    def __init__(self: Self, open_periods: list[OpenPeriod], specified_date: date, is_open: bool = True) -> None:
+    Attributes:
+        open_periods (OpenPeriodTuple): The sorted open periods
+        date (date): The date the open periods apply to
+        is_open (bool): Whether the service is open on the date
+        fingerprint (int): A stable 64 bit fingerprint of the date, open flag and open periods
+    """
+
+    __slots__ = ("open_periods", "date", "is_open", "fingerprint")
+
+    def __init__(self: Self, open_periods: Iterable[OpenPeriod], specified_date: date, is_open: bool = True) -> None:
         """Initialise a SpecifiedOpeningTime object.
 
         Args:
-            open_periods (list[OpenPeriod]): A list of OpenPeriod objects
+            open_periods (Iterable[OpenPeriod]): The OpenPeriod objects in any order
             specified_date (date): The date the open periods apply to
             is_open (bool, optional): Whether the service is open on the specified date. Defaults to True.
         """
         assert isinstance(specified_date, date)  # noqa: S101
-        self.open_periods = open_periods
-        self.date = specified_date
-        self.is_open = is_open
+        if not isinstance(open_periods, OpenPeriodTuple):
+            open_periods = OpenPeriodTuple(open_periods)
+        object.__setattr__(self, "open_periods", open_periods)
+        object.__setattr__(self, "date", specified_date)
+        object.__setattr__(self, "is_open", is_open)
+        digest = blake2b(SPECIFIED_OPENING_TIME_RECORD.pack(specified_date.toordinal(), is_open), digest_size=8)
+        digest.update(FINGERPRINT_RECORD.pack(open_periods.fingerprint))
+        object.__setattr__(self, "fingerprint", int.from_bytes(digest.digest(), "little"))
+
+    def __setattr__(self: Self, name: str, value: object) -> None:
+        """Stops the specified opening time being changed, as changing it would leave its fingerprint stale.
+
+        Raises:
+            AttributeError: Always, create a new specified opening time instead
+        """
+        msg = f"SpecifiedOpeningTime is immutable, so {name} can't be set. Create a new specified opening time instead."
+        raise AttributeError(msg)
+
+    def __reduce__(self: Self) -> tuple[Callable, tuple[OpenPeriodTuple, date, bool]]:
+        """Copies the specified opening time by creating it again, as its attributes can't be set."""
+        return SpecifiedOpeningTime, (self.open_periods, self.date, self.is_open)
 
     def date_string(self: Self) -> str:
         """Returns the date as a string in the format DD-MM-YYYY.
@@ -213,7 +437,7 @@ class SpecifiedOpeningTime:
         Returns:
             int: A hash of the object
         """
-        return hash((tuple(sorted(self.open_periods)), self.date, self.is_open))
+        return hash(self.fingerprint)
 
     def __repr__(self: Self) -> str:
         """Returns a string representation of the object.
@@ -252,18 +476,18 @@ class SpecifiedOpeningTime:
             isinstance(other, SpecifiedOpeningTime)
             and self.is_open == other.is_open
             and self.date == other.date
-            and OpenPeriod.equal_lists(self.open_periods, other.open_periods)
+            and self.open_periods == other.open_periods
         )
 
     def export_service_history_format(self: Self) -> list[str]:
         """Exports Specified opening time into a DoS service history accepted format."""
-        exp_open_periods = [op.export_time_in_seconds() for op in sorted(self.open_periods)]
+        exp_open_periods = [op.export_time_in_seconds() for op in self.open_periods]
         date_str = self.date.strftime(DOS_DATE_FORMAT)
         return [f"{date_str}-{period}" for period in exp_open_periods] if self.is_open else [f"{date_str}-closed"]
 
     def export_dos_log_format(self: Self) -> list[str]:
         """Exports Specified opening times into a DoS Logs accepted format."""
-        exp_open_periods = [op.export_db_string_format() for op in sorted(self.open_periods)]
+        exp_open_periods = [op.export_db_string_format() for op in self.open_periods]
         date_str = self.date.strftime(DOS_DATE_FORMAT)
         return [f"{date_str}-{period}" for period in exp_open_periods] if self.is_open else [f"{date_str}-closed"]
 
@@ -285,14 +509,11 @@ class SpecifiedOpeningTime:
 
     @staticmethod
     def equal_lists(a: list["SpecifiedOpeningTime"], b: list["SpecifiedOpeningTime"]) -> bool:
-        """Checks equality between 2 lists of SpecifiedOpeningTime.
+        """Checks equality between 2 lists of SpecifiedOpeningTime by comparing their fingerprints.
 
-        Checks equality between 2 lists of SpecifiedOpeningTime Relies on equality,
-        and hash functions of SpecifiedOpeningTime.
+        The fingerprint of a SpecifiedOpeningTimeTuple is cached, so comparing two of them doesn't look at the items.
         """
-        hash_list_a = [hash(a) for a in a]
-        hash_list_b = [hash(b) for b in b]
-        return sorted(hash_list_a) == sorted(hash_list_b)
+        return len(a) == len(b) and specified_opening_times_fingerprint(a) == specified_opening_times_fingerprint(b)
 
     @staticmethod
     def valid_list(times_list: list["SpecifiedOpeningTime"]) -> bool:
@@ -307,11 +528,13 @@ class SpecifiedOpeningTime:
         """Removes any SpecifiedOpeningTime objects from the list that are in the past."""
         if date_now is None:
             date_now = datetime.now().date()  # noqa: DTZ005
-        return [item for item in times_list if item.date >= date_now]
+        future_times = SpecifiedOpeningTimeTuple(item for item in times_list if item.date >= date_now)
+        # Keep the list if nothing was removed, so its cached fingerprint is reused
+        return times_list if len(future_times) == len(times_list) else future_times
 
     def export_test_format(self: Self) -> dict:
         """Exports Specified opening time into a test format that can be used in the tests."""
-        exp_open_periods = [op.export_test_format() for op in sorted(self.open_periods)]
+        exp_open_periods = [op.export_test_format() for op in self.open_periods]
         date_str = self.date.strftime(DOS_DATE_FORMAT)
         return {date_str: exp_open_periods}
 
@@ -325,6 +548,45 @@ class SpecifiedOpeningTime:
         return opening_dates_cr_format
 
 
+class SpecifiedOpeningTimeTuple(tuple):
+    """An immutable tuple of specified opening times, with the fingerprint of all of them computed once.
+
+    Attributes:
+        fingerprint (int): The fingerprint of the specified opening times, see specified_opening_times_fingerprint
+    """
+
+    fingerprint: int
+
+    def __new__(
+        cls: type["SpecifiedOpeningTimeTuple"],
+        specified_opening_times: Iterable[SpecifiedOpeningTime] = (),
+    ) -> "SpecifiedOpeningTimeTuple":
+        """Builds a SpecifiedOpeningTimeTuple object.
+
+        Args:
+            specified_opening_times (Iterable[SpecifiedOpeningTime]): The specified opening times
+
+        Returns:
+            SpecifiedOpeningTimeTuple: The specified opening times
+        """
+        specified_opening_times = tuple(specified_opening_times)
+        specified_opening_time_tuple = super().__new__(cls, specified_opening_times)
+        specified_opening_time_tuple.fingerprint = specified_opening_times_fingerprint(specified_opening_times)
+        return specified_opening_time_tuple
+
+
+def _weekday_open_periods(weekday_index: int) -> property:
+    """Builds the property for the open periods of a weekday in StandardOpeningTimes."""
+
+    def get_open_periods(self: "StandardOpeningTimes") -> OpenPeriodTuple:
+        return self.days[weekday_index]
+
+    def set_open_periods(self: "StandardOpeningTimes", open_periods: Iterable[OpenPeriod]) -> None:
+        self.days[weekday_index] = OpenPeriodTuple(open_periods)
+
+    return property(get_open_periods, set_open_periods, doc=f"The open periods on {WEEKDAYS[weekday_index]}.")
+
+
 class StandardOpeningTimes:
     """Represents the standard openings times for a week. Structured as a set of OpenPeriods per day.
 
@@ -334,12 +596,22 @@ class StandardOpeningTimes:
     etc etc...
 
     An empty list that no open periods means CLOSED
+
+    The open periods are held in 7 slots indexed by weekday, with a property for each weekday. Each slot is an
+    OpenPeriodTuple, which is sorted when the day is set so the days can be compared and exported without sorting.
     """
 
+    monday = _weekday_open_periods(0)
+    tuesday = _weekday_open_periods(1)
+    wednesday = _weekday_open_periods(2)
+    thursday = _weekday_open_periods(3)
+    friday = _weekday_open_periods(4)
+    saturday = _weekday_open_periods(5)
+    sunday = _weekday_open_periods(6)
+
     def __init__(self: Self) -> None:
-        """Initialises the StandardOpeningTimes object with empty lists for each day."""
-        for day in WEEKDAYS:
-            setattr(self, day, [])
+        """Initialises the StandardOpeningTimes object with no open periods for each day."""
+        self.days: list[OpenPeriodTuple] = [OpenPeriodTuple() for _ in WEEKDAYS]
         self.generic_bankholiday = []
         self.explicit_closed_days = set()
 
@@ -357,7 +629,7 @@ class StandardOpeningTimes:
 
     def __len__(self: Self) -> int:
         """Returns the number of OpenPeriods in the StandardOpeningTimes object."""
-        return sum(len(getattr(self, day)) for day in WEEKDAYS)
+        return sum(len(open_periods) for open_periods in self.days)
 
     def __eq__(self: Self, other: "StandardOpeningTimes") -> bool:
         """Check equality of 2 StandardOpeningTimes (generic bankholiday values are ignored)."""
@@ -367,38 +639,55 @@ class StandardOpeningTimes:
         if self.all_closed_days() != other.all_closed_days():
             return False
 
-        return all(OpenPeriod.equal_lists(self.get_openings(day), other.get_openings(day)) for day in WEEKDAYS)
+        return self.fingerprints() == other.fingerprints()
 
     def to_string(self: Self, seperator: str = ", ") -> str:
         """Returns a string representation of the StandardOpeningTimes object."""
-        return seperator.join([f"{day}={OpenPeriod.list_string(getattr(self, day))}" for day in WEEKDAYS])
+        return seperator.join(
+            [
+                f"{day}={OpenPeriod.list_string(open_periods)}"
+                for day, open_periods in zip(WEEKDAYS, self.days, strict=True)
+            ],
+        )
 
-    def get_openings(self: Self, day: str) -> list[OpenPeriod]:
+    def get_openings(self: Self, day: str) -> OpenPeriodTuple:
         """Returns the list of OpenPeriods for the given day."""
-        return getattr(self, day.lower())
+        return self.days[WEEKDAY_INDEXES[day.lower()]]
 
     def all_closed_days(self: Self) -> list[str]:
         """Returns a set of all implicit AND explicit closed days."""
         all_closed_days = self.explicit_closed_days
 
         # Add implicit closed days to explicit set
-        for day in WEEKDAYS:
-            if len(getattr(self, day)) == 0:
+        for day, open_periods in zip(WEEKDAYS, self.days, strict=True):
+            if len(open_periods) == 0:
                 all_closed_days.add(day)
 
         return all_closed_days
 
     def fully_closed(self: Self) -> bool:
         """Returns whether the object contains any openings."""
-        return all(len(getattr(self, day)) <= 0 for day in WEEKDAYS)
+        return not any(self.days)
 
     def is_open(self: Self, weekday: str) -> bool:
         """Returns whether the object contains any openings for the given day."""
-        return len(getattr(self, weekday)) > 0
+        return len(self.get_openings(weekday)) > 0
+
+    def get_open_period_set(self: Self, day: str) -> OpenPeriodSet:
+        """Returns the OpenPeriods for the given day as an OpenPeriodSet."""
+        return OpenPeriodSet(self.get_openings(day))
+
+    def fingerprint(self: Self, day: str) -> int:
+        """Returns the fingerprint of the OpenPeriods for the given day, see open_periods_fingerprint."""
+        return self.get_openings(day).fingerprint
+
+    def fingerprints(self: Self) -> tuple[int, ...]:
+        """Returns the fingerprints of the OpenPeriods for each day of the week."""
+        return tuple(open_periods.fingerprint for open_periods in self.days)
 
     def same_openings(self: Self, other: "StandardOpeningTimes", day: str) -> bool:
         """Returns whether the object contains the same openings for the given day."""
-        return OpenPeriod.equal_lists(self.get_openings(day), other.get_openings(day))
+        return self.fingerprint(day) == other.fingerprint(day)
 
     def add_open_period(self: Self, open_period: OpenPeriod, weekday: str) -> None:
         """Adds a formatted open period to the specified weekday.
@@ -408,8 +697,9 @@ class StandardOpeningTimes:
             weekday (str): The weekday to add the open period to
         """
         day_key = weekday.lower()
-        if day_key in WEEKDAYS:
-            getattr(self, day_key).append(open_period)
+        if day_key in WEEKDAY_INDEXES:
+            weekday_index = WEEKDAY_INDEXES[day_key]
+            self.days[weekday_index] = OpenPeriodTuple((*self.days[weekday_index], open_period))
         elif day_key == "bankholiday":
             logger.warning(f"A generic bank holiday OpenPeriod '{open_period}' was found. This will be ignored.")
             self.generic_bankholiday.append(open_period)
@@ -418,11 +708,11 @@ class StandardOpeningTimes:
 
     def any_overlaps(self: Self) -> bool:
         """Returns True if any open period overlaps with another open period."""
-        return any(OpenPeriod.any_overlaps(getattr(self, weekday)) for weekday in WEEKDAYS)
+        return any(OpenPeriod.any_overlaps(open_periods) for open_periods in self.days)
 
     def all_start_before_end(self: Self) -> bool:
         """Returns True if all open periods start before they end."""
-        return all(OpenPeriod.all_start_before_end(getattr(self, weekday)) for weekday in WEEKDAYS)
+        return all(OpenPeriod.all_start_before_end(open_periods) for open_periods in self.days)
 
     def any_contradictions(self: Self) -> bool:
         """Returns True if any open period falls on a day that is marked as closed."""
@@ -434,28 +724,25 @@ class StandardOpeningTimes:
 
     def export_opening_times_for_day(self: Self, weekday: str) -> list[str]:
         """Exports standard opening times into DoS format for a specific day in the week."""
-        open_periods = sorted(getattr(self, weekday))
-        return [open_period.export_db_string_format() for open_period in open_periods]
+        return [open_period.export_db_string_format() for open_period in self.get_openings(weekday)]
 
     def export_opening_times_in_seconds_for_day(self: Self, weekday: str) -> list[str]:
         """Exports standard opening times into time in seconds format for a specific day in the week."""
-        open_periods = sorted(getattr(self, weekday))
-        return [open_period.export_time_in_seconds() for open_period in open_periods]
+        return [open_period.export_time_in_seconds() for open_period in self.get_openings(weekday)]
 
     def export_test_format(self: Self) -> dict[str, list[dict[str, str]]]:
         """Exports standard opening times into a test format."""
         change = {}
-        for weekday in WEEKDAYS:
-            open_periods = sorted(getattr(self, weekday))
+        for weekday, open_periods in zip(WEEKDAYS, self.days, strict=True):
             change[weekday.capitalize()] = [op.export_test_format() for op in open_periods]
         return change
 
 
-def opening_period_times_from_list(open_periods: list[OpenPeriod], with_space: bool = True) -> str:
+def opening_period_times_from_list(open_periods: Iterable[OpenPeriod], with_space: bool = True) -> str:
     """Converts a list of OpenPeriods into a string of times separated by a space.
 
     Args:
-        open_periods (List[OpenPeriod]): The list of OpenPeriods to convert
+        open_periods (Iterable[OpenPeriod]): The list of OpenPeriods to convert
         with_space (bool): Whether to add a space between each time
     """
     return (
@@ -467,7 +754,97 @@ def opening_period_times_from_list(open_periods: list[OpenPeriod], with_space: b
 
 def string_to_time(time_str: str) -> time | None:
     """Converts a string to a time object."""
+    seconds = string_to_seconds(str(time_str))
+    return None if seconds is None else seconds_to_time(seconds)
+
+
+@lru_cache(maxsize=4096)
+def string_to_seconds(time_str: str) -> int | None:
+    """Converts a HH:MM or HH:MM:SS string to the number of seconds since midnight.
+
+    Zero padded times are parsed directly, and anything else falls back to strptime. There are only a few thousand
+    distinct times so the results are cached.
+
+    Args:
+        time_str (str): The time string
+
+    Returns:
+        int | None: The number of seconds since midnight, or None if the string isn't a valid time
+    """
+    parts = time_str.split(":")
+    if len(parts) in (2, 3) and all(len(part) == 2 and part.isascii() and part.isdigit() for part in parts):  # noqa: PLR2004
+        hours, minutes, seconds = int(parts[0]), int(parts[1]), int(parts[2]) if len(parts) == 3 else 0  # noqa: PLR2004
+        if hours < 24 and minutes < 60 and seconds < 60:  # noqa: PLR2004
+            return hours * 3600 + minutes * 60 + seconds
     for time_format in ("%H:%M", "%H:%M:%S"):
         with suppress(ValueError):
-            return datetime.strptime(str(time_str), time_format).time()
+            return seconds_since_midnight(datetime.strptime(time_str, time_format).time())
     return None
+
+
+def seconds_since_midnight(time_of_day: time) -> int:
+    """Converts a time to the number of seconds since midnight."""
+    return time_of_day.hour * 3600 + time_of_day.minute * 60 + time_of_day.second
+
+
+def seconds_to_time(seconds: int) -> time:
+    """Converts a number of seconds since midnight to a time."""
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def seconds_to_string(seconds: int, with_seconds: bool = False) -> str:
+    """Formats a number of seconds since midnight as HH:MM, or HH:MM:SS if with_seconds is set."""
+    if with_seconds:
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+
+# Sort key for open periods, which compares them by start and then end without calling OpenPeriod.__lt__
+OPEN_PERIOD_KEY = attrgetter("start_seconds", "end_seconds")
+
+
+def sort_open_periods(open_periods: Iterable[OpenPeriod]) -> list[OpenPeriod]:
+    """Sorts open periods by their start and then their end."""
+    return sorted(open_periods, key=OPEN_PERIOD_KEY)
+
+
+def open_periods_fingerprint(open_periods: Iterable[OpenPeriod]) -> int:
+    """Returns a 64 bit fingerprint of open periods that doesn't depend on their order.
+
+    The fingerprint is a digest of the sorted start and end seconds of the open periods, so it is the same across
+    invocations and can be stored and compared later.
+
+    Args:
+        open_periods (Iterable[OpenPeriod]): The open periods
+
+    Returns:
+        int: The fingerprint
+    """
+    if isinstance(open_periods, OpenPeriodTuple):
+        return open_periods.fingerprint
+    return sorted_open_periods_fingerprint(sort_open_periods(open_periods))
+
+
+def sorted_open_periods_fingerprint(sorted_open_periods: Iterable[OpenPeriod]) -> int:
+    """Returns the fingerprint of open periods that are already sorted, see open_periods_fingerprint."""
+    digest = blake2b(digest_size=8)
+    for open_period in sorted_open_periods:
+        digest.update(OPEN_PERIOD_RECORD.pack(open_period.start_seconds, open_period.end_seconds))
+    return int.from_bytes(digest.digest(), "little")
+
+
+def specified_opening_times_fingerprint(specified_opening_times: Iterable[SpecifiedOpeningTime]) -> int:
+    """Returns a 64 bit fingerprint of specified opening times that doesn't depend on their order.
+
+    Args:
+        specified_opening_times (Iterable[SpecifiedOpeningTime]): The specified opening times
+
+    Returns:
+        int: The fingerprint
+    """
+    if isinstance(specified_opening_times, SpecifiedOpeningTimeTuple):
+        return specified_opening_times.fingerprint
+    digest = blake2b(digest_size=8)
+    for fingerprint in sorted(opening_time.fingerprint for opening_time in specified_opening_times):
+        digest.update(FINGERPRINT_RECORD.pack(fingerprint))
+    return int.from_bytes(digest.digest(), "little")
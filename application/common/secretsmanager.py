@@ -1,4 +1,7 @@
+from dataclasses import dataclass
 from json import loads
+from os import getenv
+from time import monotonic
 
 from aws_lambda_powertools.logging import Logger
 from boto3 import client
@@ -9,11 +12,27 @@ logger = Logger()
 secrets_manager = client(service_name="secretsmanager")
 
 
-def get_secret(secret_name: str) -> dict[str, str]:
+@dataclass
+class CachedSecret:
+    """A secret held in the in-process secret cache."""
+
+    value: dict[str, str]
+    expires_at: float
+
+
+secret_cache: dict[str, CachedSecret] = {}
+secret_cache_stats = {"hits": 0, "misses": 0}
+
+
+def get_secret(secret_name: str, force_refresh: bool = False) -> dict[str, str]:
     """Get the secret from AWS Secrets Manager.
 
+    Secrets are cached in memory for SECRET_CACHE_TTL_SECONDS (default 300 seconds) so warm invocations
+    don't need to go to Secrets Manager.
+
     Args:
         secret_name (str): Secret name to get
+        force_refresh (bool): Whether to ignore the cached secret, e.g. after the secret has been rotated
 
     Raises:
         e: ClientError caused by secrets manager
@@ -21,10 +40,31 @@ def get_secret(secret_name: str) -> dict[str, str]:
     Returns:
         Dict[str, str]: Secrets as a dictionary
     """
+    cached_secret = secret_cache.get(secret_name)
+    if cached_secret is not None and not force_refresh and monotonic() < cached_secret.expires_at:
+        secret_cache_stats["hits"] += 1
+        logger.info(
+            f"Secret '{secret_name}' found in cache",
+            secret_cache_hits=secret_cache_stats["hits"],
+            secret_cache_misses=secret_cache_stats["misses"],
+        )
+        return cached_secret.value
+    secret_cache_stats["misses"] += 1
+    logger.info(
+        f"Getting secret '{secret_name}' from secrets manager",
+        force_refresh=force_refresh,
+        secret_cache_hits=secret_cache_stats["hits"],
+        secret_cache_misses=secret_cache_stats["misses"],
+    )
     try:
         secret_value_response = secrets_manager.get_secret_value(SecretId=secret_name)
     except ClientError as err:
         msg = f"Failed getting secret '{secret_name}' from secrets manager"
         raise Exception(msg) from err  # noqa: TRY002
     secrets_json_str = secret_value_response["SecretString"]
-    return loads(secrets_json_str)
+    secret = loads(secrets_json_str)
+    secret_cache[secret_name] = CachedSecret(
+        value=secret,
+        expires_at=monotonic() + float(getenv("SECRET_CACHE_TTL_SECONDS", "300")),
+    )
+    return secret
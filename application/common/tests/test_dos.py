@@ -1,22 +1,38 @@
 from datetime import UTC, date, datetime, time
+from os import environ
 from random import choices
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+from aws_lambda_powertools.logging import Logger
+from psycopg import OperationalError
 
 from application.common.dos import (
+    DoSLocationCache,
     DoSService,
+    RegionResolver,
     db_rows_to_spec_open_times,
     db_rows_to_std_open_times,
+    dos_location_cache,
     get_dos_locations,
-    get_matching_dos_services,
+    get_matching_dos_services_for_odscodes,
     get_region,
+    get_regions,
     get_specified_opening_times_from_db,
     get_standard_opening_times_from_db,
     get_valid_dos_location,
     has_blood_pressure,
     has_contraception,
+    has_normalised_postcode_index,
     has_palliative_care,
+    region_resolver,
+)
+from application.common.opening_times import (
+    OpenPeriod,
+    SpecifiedOpeningTime,
+    StandardOpeningTimes,
+    specified_opening_times_fingerprint,
 )
-from application.common.opening_times import OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
 from application.conftest import dummy_dos_service
 from common.constants import (
     DOS_ACTIVE_STATUS_ID,
@@ -141,88 +157,82 @@ def test_dos_service_get_region_if_none(mock_get_region: MagicMock) -> None:
 
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
-def test_get_matching_dos_services_pharmacy_services_returned(
+def test_get_matching_dos_services_for_odscodes(
     mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
 ) -> None:
     # Arrange
-    odscode = "FQ038"
-    name = "My Pharmacy"
-    service_id = 22851351399
-    db_return = [get_db_item(odscode, name, id=service_id)]
+    db_return = [
+        get_db_item("FQ038", "My Pharmacy", id=1),
+        get_db_item("FQ038001", "My Pharmacy First", id=2),
+        get_db_item("FA123", "Other Pharmacy", id=3),
+    ]
     mock_connection = MagicMock()
     mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
     mock_cursor = MagicMock()
     mock_cursor.fetchall.return_value = db_return
     mock_query_dos_db.return_value = mock_cursor
     # Act
-    response = get_matching_dos_services(odscode)
+    response = get_matching_dos_services_for_odscodes(["FQ038", "FA123", "FQ038", "FX999"])
     # Assert
-    service = response[0]
-    assert service.odscode == odscode
-    assert service.id == service_id
-    assert service.name == name
+    assert {ods_prefix: [service.id for service in services] for ods_prefix, services in response.items()} == {
+        "FQ038": [1, 2],
+        "FA123": [3],
+        "FX999": [],
+    }
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
         query=(
             "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
             "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
-            "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
+            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE (LEFT(s.odscode, 5) = "
+            "ANY(%(ODS_PREFIXES)s) OR s.odscode LIKE ANY(%(SHORT_ODS_PATTERNS)s::varchar[])) AND (s.typeid = "
+            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.typeid = "
+            "ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s))"
         ),
         query_vars={
-            "ODS": "FQ038%",
+            "ODS_PREFIXES": ["FQ038", "FA123", "FX999"],
+            "SHORT_ODS_PATTERNS": [],
             "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137],
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "PHARMACY_FIRST_SERVICE_TYPE_IDS": [148, 149],
             "PHARMACY_FIRST_STATUSES": [1, 2, 3],
         },
     )
-    mock_cursor.fetchall.assert_called_with()
     mock_cursor.close.assert_called_with()
 
 
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
-def test_get_matching_dos_services_pharmacy_first_services_returned(
+def test_get_matching_dos_services_for_odscodes_short_odscode(
     mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
 ) -> None:
     # Arrange
-    odscode = "FQ038"
-    name = "My Pharmacy"
-    service_id = 22851351399
-    db_return = [get_db_item(odscode, name, id=service_id)]
-    mock_connection = MagicMock()
-    mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
+    db_return = [
+        get_db_item("FA1", "Short Pharmacy", id=1),
+        get_db_item("FA123", "My Pharmacy", id=2),
+        get_db_item("FA1999", "Other Pharmacy", id=3),
+    ]
     mock_cursor = MagicMock()
     mock_cursor.fetchall.return_value = db_return
     mock_query_dos_db.return_value = mock_cursor
     # Act
-    response = get_matching_dos_services(odscode)
+    response = get_matching_dos_services_for_odscodes(["FA1", "FA123"])
     # Assert
-    service = response[0]
-    assert service.odscode == odscode
-    assert service.id == service_id
-    assert service.name == name
-    mock_query_dos_db.assert_called_once_with(
-        connection=mock_connection,
-        query=(
-            "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
-            "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
-            "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
-        ),
-        query_vars={
-            "ODS": "FQ038%",
-            "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137],
-            "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
-            "PHARMACY_FIRST_SERVICE_TYPE_IDS": [148, 149],
-            "PHARMACY_FIRST_STATUSES": [1, 2, 3],
-        },
-    )
-    mock_cursor.fetchall.assert_called_with()
-    mock_cursor.close.assert_called_with()
+    assert {ods_prefix: [service.id for service in services] for ods_prefix, services in response.items()} == {
+        "FA1": [1, 2, 3],
+        "FA123": [2],
+    }
+    assert mock_query_dos_db.call_args.kwargs["query_vars"]["ODS_PREFIXES"] == ["FA1", "FA123"]
+    assert mock_query_dos_db.call_args.kwargs["query_vars"]["SHORT_ODS_PATTERNS"] == ["FA1%"]
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_get_matching_dos_services_for_odscodes_no_odscodes(mock_connect_to_db_reader: MagicMock) -> None:
+    # Act
+    response = get_matching_dos_services_for_odscodes([])
+    # Assert
+    assert response == {}
+    mock_connect_to_db_reader.assert_not_called()
 
 
 def test_any_generic_bankholiday_open_periods() -> None:
@@ -257,44 +267,6 @@ def test_any_generic_bankholiday_open_periods() -> None:
     assert dos_service.any_generic_bankholiday_open_periods() is False
 
 
-@patch(f"{FILE_PATH}.connect_to_db_reader")
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_get_matching_dos_services_no_services_returned(
-    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
-) -> None:
-    # Arrange
-    odscode = "FQ038"
-    db_return = []
-    mock_connection = MagicMock()
-    mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
-    mock_cursor = MagicMock()
-    mock_cursor.fetchall.return_value = db_return
-    mock_query_dos_db.return_value = mock_cursor
-    # Act
-    response = get_matching_dos_services(odscode)
-    # Assert
-    assert response == []
-    mock_query_dos_db.assert_called_once_with(
-        connection=mock_connection,
-        query=(
-            "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
-            "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
-            "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
-        ),
-        query_vars={
-            "ODS": "FQ038%",
-            "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137],
-            "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
-            "PHARMACY_FIRST_SERVICE_TYPE_IDS": [148, 149],
-            "PHARMACY_FIRST_STATUSES": [1, 2, 3],
-        },
-    )
-    mock_cursor.fetchall.assert_called_with()
-    mock_cursor.close.assert_called_with()
-
-
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_specified_opening_times_from_db_times_returned(
@@ -460,10 +432,14 @@ def test_get_specified_opening_times_from_db_no_times_returned(
     )
 
 
+@patch(f"{FILE_PATH}.has_normalised_postcode_index", return_value=True)
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
-def test_get_dos_locations(mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock) -> None:
+def test_get_dos_locations(
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_has_normalised_postcode_index: MagicMock
+) -> None:
     # Arrange
+    dos_location_cache.clear()
     mock_connection = MagicMock()
     mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
     mock_cursor = MagicMock()
@@ -493,15 +469,260 @@ def test_get_dos_locations(mock_query_dos_db: MagicMock, mock_connect_to_db_read
     assert dos_location.latitude == 4.0
     assert dos_location.longitude == 2.0
 
-    norm_pc = postcode.replace(" ", "").upper()
-    postcode_variations = [norm_pc] + [f"{norm_pc[:i]} {norm_pc[i:]}" for i in range(1, len(norm_pc))]
+    mock_query_dos_db.assert_called_once_with(
+        connection=mock_connection,
+        query="SELECT id, postcode, easting, northing, postaltown, latitude, longitude "
+        "FROM locations WHERE REPLACE(UPPER(postcode), ' ', '') = %(normalised_postcode)s",
+        query_vars={"normalised_postcode": "BA27AF"},
+    )
 
+
+@patch(f"{FILE_PATH}.has_normalised_postcode_index", return_value=False)
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_locations_without_normalised_postcode_index(
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_has_normalised_postcode_index: MagicMock
+) -> None:
+    # Arrange
+    dos_location_cache.clear()
+    mock_connection = MagicMock()
+    mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [dos_location_row("BA2 7AF")]
+    mock_query_dos_db.return_value = mock_cursor
+    # Act
+    responses = get_dos_locations("BA2 7AF")
+    # Assert
+    assert [dos_location.id for dos_location in responses] == [111]
+    mock_has_normalised_postcode_index.assert_called_once_with(mock_connection)
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
         query="SELECT id, postcode, easting, northing, postaltown, latitude, longitude "
         "FROM locations WHERE postcode = ANY(%(pc_variations)s)",
-        query_vars={"pc_variations": postcode_variations},
+        query_vars={"pc_variations": ["BA27AF", "B A27AF", "BA 27AF", "BA2 7AF", "BA27 AF", "BA27A F"]},
+    )
+    # Clean up
+    dos_location_cache.clear()
+
+
+@pytest.mark.parametrize("index_exists", [True, False])
+@patch(f"{FILE_PATH}.normalised_postcode_index_exists", None)
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_has_normalised_postcode_index(mock_query_dos_db: MagicMock, index_exists: bool) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_query_dos_db.return_value.fetchone.return_value = {"index_exists": index_exists}
+    # Act
+    first_response = has_normalised_postcode_index(mock_connection)
+    second_response = has_normalised_postcode_index(mock_connection)
+    # Assert
+    assert first_response is second_response is index_exists
+    mock_query_dos_db.assert_called_once_with(
+        connection=mock_connection,
+        query="SELECT to_regclass(%(index_name)s) IS NOT NULL AS index_exists",
+        query_vars={"index_name": "locations_normalised_postcode_idx"},
+    )
+
+
+def dos_location_row(postcode: str, location_id: int = 111) -> dict:
+    """Creates a DoS locations table row for the given postcode."""
+    return {
+        "id": location_id,
+        "postcode": postcode,
+        "easting": 2,
+        "northing": 3,
+        "postaltown": "town",
+        "latitude": 4.0,
+        "longitude": 2.0,
+    }
+
+
+@patch(f"{FILE_PATH}.has_normalised_postcode_index", return_value=True)
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_locations_cached(
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_has_normalised_postcode_index: MagicMock
+) -> None:
+    # Arrange
+    dos_location_cache.clear()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [[dos_location_row("BA2 7AF")], []]
+    mock_query_dos_db.return_value = mock_cursor
+    # Act
+    first_responses = get_dos_locations("BA2 7AF")
+    second_responses = get_dos_locations("ba27af")
+    first_unknown_responses = get_dos_locations("ZZ9 9ZZ")
+    second_unknown_responses = get_dos_locations("ZZ99ZZ")
+    # Assert
+    assert first_responses == second_responses
+    assert first_unknown_responses == second_unknown_responses == []
+    assert mock_query_dos_db.call_count == 2
+    assert dos_location_cache.stats == {"hits": 1, "negative_hits": 1, "misses": 2, "evictions": 0}
+    # Clean up
+    dos_location_cache.clear()
+
+
+@patch(f"{FILE_PATH}.has_normalised_postcode_index", return_value=True)
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_locations_preload(
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_has_normalised_postcode_index: MagicMock
+) -> None:
+    # Arrange
+    dos_location_cache.clear()
+    mock_connection = MagicMock()
+    mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [dos_location_row("BA2 7AF"), dos_location_row("BA27AF", 112)]
+    mock_query_dos_db.return_value = mock_cursor
+    environ["DOS_LOCATION_CACHE_PRELOAD_DISTRICTS"] = "ba2, EX1"
+    # Act
+    responses = get_dos_locations("BA2 7AF")
+    get_dos_locations("BA2 7AG")
+    # Assert
+    assert [dos_location.id for dos_location in responses] == [111, 112]
+    assert mock_query_dos_db.call_count == 2
+    mock_query_dos_db.assert_any_call(
+        connection=mock_connection,
+        query="SELECT id, postcode, easting, northing, postaltown, latitude, longitude FROM locations "
+        "WHERE REPLACE(UPPER(postcode), ' ', '') LIKE %(district_pattern_0)s "
+        "OR REPLACE(UPPER(postcode), ' ', '') LIKE %(district_pattern_1)s",
+        query_vars={"district_pattern_0": "BA2___", "district_pattern_1": "EX1___"},
     )
+    # Clean up
+    del environ["DOS_LOCATION_CACHE_PRELOAD_DISTRICTS"]
+    dos_location_cache.clear()
+
+
+@patch.object(Logger, "exception")
+@patch(f"{FILE_PATH}.has_normalised_postcode_index", return_value=True)
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_locations_preload_failure(
+    mock_query_dos_db: MagicMock,
+    mock_connect_to_db_reader: MagicMock,
+    mock_has_normalised_postcode_index: MagicMock,
+    mock_logger: MagicMock,
+) -> None:
+    # Arrange
+    dos_location_cache.clear()
+    mock_connection = MagicMock()
+    mock_connect_to_db_reader.return_value.__enter__.return_value = mock_connection
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [dos_location_row("BA2 7AF")]
+    mock_query_dos_db.side_effect = [OperationalError("Preload timed out"), mock_cursor]
+    environ["DOS_LOCATION_CACHE_PRELOAD_DISTRICTS"] = "BA2"
+    # Act
+    first_responses = get_dos_locations("BA2 7AF")
+    second_responses = get_dos_locations("BA2 7AF")
+    # Assert
+    assert [dos_location.id for dos_location in first_responses] == [111]
+    assert first_responses == second_responses
+    assert mock_query_dos_db.call_count == 2
+    assert mock_query_dos_db.call_args.kwargs["query_vars"] == {"normalised_postcode": "BA27AF"}
+    assert dos_location_cache.preloaded is True
+    mock_logger.assert_called_once_with(
+        "Unable to preload the DoS location cache, looking up postcodes in the DoS DB",
+        postcode_districts=["BA2"],
+    )
+    # Clean up
+    del environ["DOS_LOCATION_CACHE_PRELOAD_DISTRICTS"]
+    dos_location_cache.clear()
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.get_dos_location_gazetteer")
+def test_get_dos_locations_gazetteer(
+    mock_get_dos_location_gazetteer: MagicMock, mock_connect_to_db_reader: MagicMock
+) -> None:
+    # Arrange
+    dos_location_cache.clear()
+    mock_gazetteer = mock_get_dos_location_gazetteer.return_value
+    mock_gazetteer.get.return_value = dos_locations = [MagicMock()]
+    # Act
+    responses = get_dos_locations("BA2 7AF")
+    # Assert
+    assert responses == dos_locations
+    mock_gazetteer.get.assert_called_once_with("BA27AF")
+    mock_connect_to_db_reader.assert_not_called()
+
+
+def test_dos_location_cache_evicts_least_recently_used() -> None:
+    # Arrange
+    environ["DOS_LOCATION_CACHE_MAX_ENTRIES"] = "2"
+    cache = DoSLocationCache()
+    dos_locations = [MagicMock()]
+    # Act
+    cache.put("BA27AF", dos_locations)
+    cache.put("EX11AA", dos_locations)
+    cache.get("BA27AF")
+    cache.put("TQ11AA", dos_locations)
+    # Assert
+    assert list(cache.entries) == ["BA27AF", "TQ11AA"]
+    assert cache.stats["evictions"] == 1
+    # Clean up
+    del environ["DOS_LOCATION_CACHE_MAX_ENTRIES"]
+
+
+@patch.object(Logger, "info")
+def test_dos_location_cache_log_stats(mock_logger: MagicMock) -> None:
+    # Arrange
+    cache = DoSLocationCache()
+    cache.put("BA27AF", [MagicMock()])
+    cache.put("ZZ99ZZ", [])
+    cache.get("BA27AF")
+    cache.get("BA27AF")
+    cache.get("ZZ99ZZ")
+    cache.get("EX11AA")
+    # Act
+    cache.log_stats()
+    cache.log_stats()
+    cache.get("EX11AA")
+    cache.log_stats()
+    # Assert
+    assert mock_logger.call_args_list == [
+        call(
+            "DoS location cache stats",
+            environment=environ.get("ENVIRONMENT"),
+            cloudwatch_metric_filter_matching_attribute="DoSLocationCacheStats",
+            dos_location_cache_size=2,
+            dos_location_cache_hits=2,
+            dos_location_cache_negative_hits=1,
+            dos_location_cache_misses=1,
+            dos_location_cache_evictions=0,
+        ),
+        call(
+            "DoS location cache stats",
+            environment=environ.get("ENVIRONMENT"),
+            cloudwatch_metric_filter_matching_attribute="DoSLocationCacheStats",
+            dos_location_cache_size=2,
+            dos_location_cache_hits=0,
+            dos_location_cache_negative_hits=0,
+            dos_location_cache_misses=1,
+            dos_location_cache_evictions=0,
+        ),
+    ]
+    assert cache.stats == {"hits": 2, "negative_hits": 1, "misses": 2, "evictions": 0}
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_dos_location_cache_expires_entries(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    cache = DoSLocationCache()
+    mock_monotonic.return_value = 0
+    cache.put("BA27AF", [MagicMock()])
+    cache.put("ZZ99ZZ", [])
+    # Act
+    mock_monotonic.return_value = cache.negative_ttl_seconds
+    unknown_postcode = cache.get("ZZ99ZZ")
+    known_postcode = cache.get("BA27AF")
+    mock_monotonic.return_value = cache.ttl_seconds
+    expired_known_postcode = cache.get("BA27AF")
+    # Assert
+    assert unknown_postcode is None
+    assert known_postcode is not None
+    assert expired_known_postcode is None
+    assert cache.entries == {}
 
 
 @patch(f"{FILE_PATH}.get_dos_locations")
@@ -569,7 +790,7 @@ def test_db_rows_to_spec_open_times() -> None:
 
     spec_open_times = db_rows_to_spec_open_times(db_rows)
 
-    expected_spec_open_times = [
+    expected_spec_open_times = (
         SpecifiedOpeningTime(
             [OpenPeriod.from_string_times("08:00", "20:00"), OpenPeriod.from_string_times("21:00", "22:00")],
             date(2019, 5, 6),
@@ -579,9 +800,10 @@ def test_db_rows_to_spec_open_times() -> None:
         SpecifiedOpeningTime([OpenPeriod.from_string_times("08:00", "20:00")], date(2019, 8, 26), True),
         SpecifiedOpeningTime([], date(2019, 9, 20), False),
         SpecifiedOpeningTime([OpenPeriod.from_string_times("06:00", "07:00")], date(2020, 5, 6), True),
-    ]
+    )
 
     assert spec_open_times == expected_spec_open_times
+    assert spec_open_times.fingerprint == specified_opening_times_fingerprint(expected_spec_open_times)
 
 
 def test_db_rows_to_std_open_time() -> None:
@@ -714,8 +936,9 @@ def test_has_contraception_not_correct_type() -> None:
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 def test_get_region(mock_connect_to_db_reader: MagicMock, mock_query_dos_db: MagicMock) -> None:
     # Arrange
+    region_resolver.clear()
     mock_connect_to_db_reader.return_value = mock_connection = MagicMock()
-    mock_query_dos_db.return_value.fetchone.return_value = {"region": "South East"}
+    mock_query_dos_db.return_value.fetchall.return_value = [{"serviceid": 123, "region": "South East"}]
     service_id = 123
     # Act
     region = get_region(service_id)
@@ -726,21 +949,58 @@ def test_get_region(mock_connect_to_db_reader: MagicMock, mock_query_dos_db: Mag
         connection=mock_connection.__enter__.return_value,
         query="""WITH
 RECURSIVE servicetree as
-(SELECT ser.parentid, ser.id, ser.uid, ser.name, 1 AS lvl
-FROM services ser where ser.id = %(SERVICE_ID)s
+(SELECT ser.id serviceid, ser.parentid, ser.name, 1 AS lvl
+FROM services ser where ser.id = ANY(%(SERVICE_IDS)s)
 UNION ALL
-SELECT ser.parentid, st.id, ser.uid, ser.name, lvl+1 AS lvl
+SELECT st.serviceid, ser.parentid, ser.name, lvl+1 AS lvl
 FROM services ser
-INNER JOIN servicetree st ON ser.id = st.parentid),
-serviceregion as
-(SELECT st.*, ROW_NUMBER() OVER (PARTITION BY st.id ORDER BY st.lvl desc) rn
-FROM servicetree st)
-SELECT sr.name region
-FROM serviceregion sr
-INNER JOIN services ser ON sr.id = ser.id
-LEFT OUTER JOIN services par ON ser.parentid = par.id
-WHERE sr.rn=1
-ORDER BY ser.name
+INNER JOIN servicetree st ON ser.id = st.parentid)
+SELECT DISTINCT ON (st.serviceid) st.serviceid, st.name region
+FROM servicetree st
+ORDER BY st.serviceid, st.lvl desc
     """,
-        query_vars={"SERVICE_ID": service_id},
+        query_vars={"SERVICE_IDS": [service_id]},
     )
+    # Clean up
+    region_resolver.clear()
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+@patch(f"{FILE_PATH}.query_regions")
+def test_get_regions(mock_query_regions: MagicMock, mock_connect_to_db_reader: MagicMock) -> None:
+    # Arrange
+    region_resolver.clear()
+    mock_query_regions.side_effect = [
+        {1: "South East", 2: "Region not found"},
+        {3: "North West"},
+    ]
+    # Act
+    first_regions = get_regions([1, "2", 1])
+    second_regions = get_regions([2, 3, 1])
+    # Assert
+    assert first_regions == {1: "South East", 2: "Region not found"}
+    assert second_regions == {1: "South East", 2: "Region not found", 3: "North West"}
+    assert mock_query_regions.call_args_list == [
+        call(mock_connect_to_db_reader.return_value.__enter__.return_value, [1, 2]),
+        call(mock_connect_to_db_reader.return_value.__enter__.return_value, [3]),
+    ]
+    # Clean up
+    region_resolver.clear()
+
+
+@patch(f"{FILE_PATH}.query_regions")
+def test_region_resolver_evicts_least_recently_used(mock_query_regions: MagicMock) -> None:
+    # Arrange
+    environ["DOS_REGION_CACHE_MAX_ENTRIES"] = "2"
+    resolver = RegionResolver()
+    mock_query_regions.side_effect = lambda _, service_ids: dict.fromkeys(service_ids, "South East")
+    connection = MagicMock()
+    # Act
+    resolver.get_regions([1, 2], connection)
+    resolver.get_regions([1], connection)
+    resolver.get_regions([3], connection)
+    # Assert
+    assert list(resolver.entries) == [1, 3]
+    assert mock_query_regions.call_count == 2
+    # Clean up
+    del environ["DOS_REGION_CACHE_MAX_ENTRIES"]
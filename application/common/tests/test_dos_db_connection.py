@@ -1,13 +1,26 @@
+from asyncio import gather, run, sleep
 from os import environ
-from unittest.mock import MagicMock, patch
+from threading import current_thread, main_thread
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
+import pytest
+from psycopg import OperationalError
+from psycopg.pq import TransactionStatus
 from psycopg.rows import dict_row
 
 from application.common.dos_db_connection import (
+    AsyncDoSDBConnectionPool,
+    DoSDBConnectionPool,
+    close_db_connections,
     connect_to_db_reader,
     connect_to_db_writer,
     connection_to_db,
+    connection_to_db_async,
+    connection_to_db_using_secret,
+    create_db_reader_connection_async,
     query_dos_db,
+    query_dos_db_async,
+    stream_dos_db,
 )
 
 FILE_PATH = "application.common.dos_db_connection"
@@ -19,6 +32,24 @@ DB_NAME = "my-db"
 DB_SCHEMA = "db_schema"
 DB_USER = "my-user"
 DB_PASSWORD = "my-password"
+OLD_DB_PASSWORD = "my-old-password"
+SECRET_NAME = "my_secret_name"
+SECRET_KEY = "DB_SECRET_KEY"
+
+
+@pytest.fixture(autouse=True)
+def _close_db_connections() -> None:
+    """Make sure no pooled connections are shared between tests."""
+    close_db_connections()
+
+
+def mock_connection() -> MagicMock:
+    """Creates a mock connection which looks open and idle to the pool."""
+    connection = MagicMock()
+    connection.closed = False
+    connection.broken = False
+    connection.info.transaction_status = TransactionStatus.IDLE
+    return connection
 
 
 @patch(f"{FILE_PATH}.connection_to_db")
@@ -90,6 +121,46 @@ def test_connect_to_db_writer(mock_get_secret: MagicMock, mock_connection_to_db:
     del environ["DB_WRITER_SECRET_KEY"]
 
 
+@patch(f"{FILE_PATH}.connection_to_db")
+@patch(f"{FILE_PATH}.get_secret")
+def test_connection_to_db_using_secret_refreshes_secret_on_authentication_failure(
+    mock_get_secret: MagicMock,
+    mock_connection_to_db: MagicMock,
+) -> None:
+    # Arrange
+    mock_get_secret.side_effect = [{SECRET_KEY: OLD_DB_PASSWORD}, {SECRET_KEY: DB_PASSWORD}]
+    mock_connection_to_db.side_effect = [
+        OperationalError('password authentication failed for user "my-user"'),
+        connection := MagicMock(),
+    ]
+    # Act
+    response = connection_to_db_using_secret(secret_name=SECRET_NAME, secret_key=SECRET_KEY, server=DB_WRITER_SERVER)
+    # Assert
+    assert response is connection
+    assert mock_get_secret.call_args_list == [call(SECRET_NAME), call(SECRET_NAME, force_refresh=True)]
+    assert mock_connection_to_db.call_args_list == [
+        call(db_password=OLD_DB_PASSWORD, server=DB_WRITER_SERVER),
+        call(db_password=DB_PASSWORD, server=DB_WRITER_SERVER),
+    ]
+
+
+@patch(f"{FILE_PATH}.connection_to_db")
+@patch(f"{FILE_PATH}.get_secret")
+def test_connection_to_db_using_secret_other_error(
+    mock_get_secret: MagicMock,
+    mock_connection_to_db: MagicMock,
+) -> None:
+    # Arrange
+    mock_get_secret.return_value = {SECRET_KEY: DB_PASSWORD}
+    mock_connection_to_db.side_effect = OperationalError("connection timeout expired")
+    # Act
+    with pytest.raises(OperationalError, match="connection timeout expired"):
+        connection_to_db_using_secret(secret_name=SECRET_NAME, secret_key=SECRET_KEY, server=DB_WRITER_SERVER)
+    # Assert
+    mock_get_secret.assert_called_once_with(SECRET_NAME)
+    mock_connection_to_db.assert_called_once_with(db_password=DB_PASSWORD, server=DB_WRITER_SERVER)
+
+
 @patch(f"{FILE_PATH}.connect")
 def test_connection_to_db(mock_connect: MagicMock) -> None:
     # Act
@@ -124,3 +195,462 @@ def test_query_dos_db() -> None:
     assert result == connection.cursor.return_value
     connection.cursor.assert_called_once_with(row_factory=dict_row)
     connection.cursor.return_value.execute.assert_called_once_with(query=query, params=None)
+
+
+def test_stream_dos_db() -> None:
+    # Arrange
+    query = "SELECT * FROM my_table WHERE id = %(ID)s"
+    query_vars = {"ID": 1}
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.__iter__.return_value = iter([{"id": 1}, {"id": 2}])
+    # Act
+    result = stream_dos_db(connection, query, query_vars, cursor_name="my_cursor", itersize=50)
+    # Assert
+    connection.cursor.assert_not_called()
+    assert list(result) == [{"id": 1}, {"id": 2}]
+    connection.cursor.assert_called_once_with(name="my_cursor", row_factory=dict_row)
+    assert cursor.itersize == 50
+    cursor.execute.assert_called_once_with(query=query, params=query_vars)
+    connection.cursor.return_value.__exit__.assert_called_once()
+
+
+def test_stream_dos_db_default_itersize() -> None:
+    # Arrange
+    environ["DB_CURSOR_ITERSIZE"] = "250"
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.__iter__.return_value = iter([])
+    # Act
+    result = list(stream_dos_db(connection, "SELECT * FROM my_table"))
+    # Assert
+    assert result == []
+    connection.cursor.assert_called_once_with(name="dos_db_stream", row_factory=dict_row)
+    assert cursor.itersize == 250
+    # Clean up
+    del environ["DB_CURSOR_ITERSIZE"]
+
+
+def test_connection_pool_reuses_connection() -> None:
+    # Arrange
+    connection = mock_connection()
+    connection_factory = MagicMock(return_value=connection)
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    # Act
+    with pool.connection() as first_connection:
+        pass
+    with pool.connection() as second_connection:
+        pass
+    # Assert
+    assert first_connection is connection
+    assert second_connection is connection
+    connection_factory.assert_called_once_with()
+    connection.close.assert_not_called()
+
+
+def test_connection_pool_creates_new_connection_when_in_use() -> None:
+    # Arrange
+    connection_factory = MagicMock(side_effect=[mock_connection(), mock_connection()])
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    # Act
+    with pool.connection() as first_connection, pool.connection() as second_connection:
+        pass
+    # Assert
+    assert first_connection is not second_connection
+    assert connection_factory.call_count == 2
+    assert len(pool.idle_connections) == 2
+
+
+def test_connection_pool_rolls_back_open_transaction_on_release() -> None:
+    # Arrange
+    connection = mock_connection()
+    connection.info.transaction_status = TransactionStatus.INTRANS
+    pool = DoSDBConnectionPool(name="test", connection_factory=MagicMock(return_value=connection))
+    # Act
+    with pool.connection():
+        pass
+    # Assert
+    connection.rollback.assert_called_once_with()
+    assert len(pool.idle_connections) == 1
+
+
+def test_connection_pool_rolls_back_on_exception() -> None:
+    # Arrange
+    connection = mock_connection()
+    connection.info.transaction_status = TransactionStatus.INERROR
+    pool = DoSDBConnectionPool(name="test", connection_factory=MagicMock(return_value=connection))
+    # Act
+    with pytest.raises(ValueError, match="Test Error"), pool.connection():
+        raise ValueError("Test Error")  # noqa: EM101, TRY003
+    # Assert
+    connection.rollback.assert_called_once_with()
+    assert len(pool.idle_connections) == 1
+
+
+def test_connection_pool_discards_broken_connection() -> None:
+    # Arrange
+    broken_connection = mock_connection()
+    new_connection = mock_connection()
+    connection_factory = MagicMock(side_effect=[broken_connection, new_connection])
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    # Act
+    with pool.connection():
+        broken_connection.broken = True
+    with pool.connection() as connection:
+        pass
+    # Assert
+    assert connection is new_connection
+    broken_connection.close.assert_called_once_with()
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_connection_pool_evicts_idle_connection(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_monotonic.return_value = 0
+    old_connection = mock_connection()
+    new_connection = mock_connection()
+    connection_factory = MagicMock(side_effect=[old_connection, new_connection])
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    with pool.connection():
+        pass
+    mock_monotonic.return_value = pool.max_idle_seconds + 1
+    # Act
+    with pool.connection() as connection:
+        pass
+    # Assert
+    assert connection is new_connection
+    old_connection.close.assert_called_once_with()
+    old_connection.execute.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_connection_pool_evicts_connection_past_max_lifetime(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_monotonic.return_value = 0
+    old_connection = mock_connection()
+    new_connection = mock_connection()
+    connection_factory = MagicMock(side_effect=[old_connection, new_connection])
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    pool.max_idle_seconds = pool.max_lifetime_seconds * 2
+    with pool.connection():
+        pass
+    mock_monotonic.return_value = pool.max_lifetime_seconds + 1
+    # Act
+    with pool.connection() as connection:
+        pass
+    # Assert
+    assert connection is new_connection
+    old_connection.close.assert_called_once_with()
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_connection_pool_health_check(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_monotonic.return_value = 0
+    connection = mock_connection()
+    pool = DoSDBConnectionPool(name="test", connection_factory=MagicMock(return_value=connection))
+    with pool.connection():
+        pass
+    mock_monotonic.return_value = pool.health_check_after_seconds + 1
+    # Act
+    with pool.connection() as pooled_connection:
+        pass
+    # Assert
+    assert pooled_connection is connection
+    connection.execute.assert_called_once_with("SELECT 1")
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_connection_pool_reconnects_on_failed_health_check(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_monotonic.return_value = 0
+    old_connection = mock_connection()
+    old_connection.execute.side_effect = OperationalError("server closed the connection unexpectedly")
+    new_connection = mock_connection()
+    connection_factory = MagicMock(side_effect=[old_connection, new_connection])
+    pool = DoSDBConnectionPool(name="test", connection_factory=connection_factory)
+    with pool.connection():
+        pass
+    mock_monotonic.return_value = pool.health_check_after_seconds + 1
+    # Act
+    with pool.connection() as connection:
+        pass
+    # Assert
+    assert connection is new_connection
+    old_connection.close.assert_called_once_with()
+
+
+def test_connection_pool_close() -> None:
+    # Arrange
+    connection = mock_connection()
+    pool = DoSDBConnectionPool(name="test", connection_factory=MagicMock(return_value=connection))
+    with pool.connection():
+        pass
+    # Act
+    pool.close()
+    # Assert
+    assert pool.idle_connections == []
+    connection.close.assert_called_once_with()
+
+
+def mock_async_connection() -> AsyncMock:
+    """Creates a mock async connection which looks open and idle to the pool."""
+    connection = AsyncMock()
+    connection.closed = False
+    connection.broken = False
+    connection.info = MagicMock()
+    connection.info.transaction_status = TransactionStatus.IDLE
+    return connection
+
+
+@patch(f"{FILE_PATH}.connection_to_db_async")
+@patch(f"{FILE_PATH}.get_secret")
+def test_create_db_reader_connection_async(mock_get_secret: MagicMock, mock_connection_to_db_async: AsyncMock) -> None:
+    # Arrange
+    get_secret_threads = []
+
+    def get_secret(secret_name: str) -> dict:
+        get_secret_threads.append(current_thread())
+        return {"DB_READER_SECRET_KEY": DB_PASSWORD}
+
+    mock_get_secret.side_effect = get_secret
+    environ["DB_READER_SECRET_NAME"] = "my_secret_name"
+    environ["DB_READER_SECRET_KEY"] = "DB_READER_SECRET_KEY"
+    environ["DB_READER_SERVER"] = DB_READER_SERVER
+    environ["DB_PORT"] = DB_PORT
+    environ["DB_NAME"] = DB_NAME
+    environ["DB_SCHEMA"] = DB_SCHEMA
+    environ["DB_READ_ONLY_USER_NAME"] = DB_USER
+    # Act
+    db_connection = run(create_db_reader_connection_async())
+    # Assert
+    assert db_connection == mock_connection_to_db_async.return_value
+    mock_get_secret.assert_called_once_with("my_secret_name")
+    # The secret is fetched in a thread so the event loop isn't blocked by Secrets Manager
+    assert get_secret_threads[0] is not main_thread()
+    mock_connection_to_db_async.assert_awaited_once_with(
+        server=DB_READER_SERVER,
+        port=DB_PORT,
+        db_name=DB_NAME,
+        db_schema=DB_SCHEMA,
+        db_user=DB_USER,
+        db_password=DB_PASSWORD,
+    )
+    # Clean up
+    del environ["DB_READER_SECRET_NAME"]
+    del environ["DB_READER_SECRET_KEY"]
+    del environ["DB_READER_SERVER"]
+    del environ["DB_PORT"]
+    del environ["DB_NAME"]
+    del environ["DB_SCHEMA"]
+    del environ["DB_READ_ONLY_USER_NAME"]
+
+
+@patch(f"{FILE_PATH}.connection_to_db_async")
+@patch(f"{FILE_PATH}.get_secret")
+def test_create_db_reader_connection_async_refreshes_secret_on_authentication_failure(
+    mock_get_secret: MagicMock,
+    mock_connection_to_db_async: AsyncMock,
+) -> None:
+    # Arrange
+    mock_get_secret.side_effect = [{SECRET_KEY: OLD_DB_PASSWORD}, {SECRET_KEY: DB_PASSWORD}]
+    connection = mock_async_connection()
+    mock_connection_to_db_async.side_effect = [
+        OperationalError('password authentication failed for user "my-user"'),
+        connection,
+    ]
+    environ["DB_READER_SECRET_NAME"] = SECRET_NAME
+    environ["DB_READER_SECRET_KEY"] = SECRET_KEY
+    environ["DB_READER_SERVER"] = DB_READER_SERVER
+    environ["DB_PORT"] = DB_PORT
+    environ["DB_NAME"] = DB_NAME
+    environ["DB_SCHEMA"] = DB_SCHEMA
+    environ["DB_READ_ONLY_USER_NAME"] = DB_USER
+    # Act
+    db_connection = run(create_db_reader_connection_async())
+    # Assert
+    assert db_connection is connection
+    mock_get_secret.assert_has_calls([call(SECRET_NAME), call(SECRET_NAME, force_refresh=True)])
+    assert mock_connection_to_db_async.await_args_list[1].kwargs["db_password"] == DB_PASSWORD
+    # Clean up
+    del environ["DB_READER_SECRET_NAME"]
+    del environ["DB_READER_SECRET_KEY"]
+    del environ["DB_READER_SERVER"]
+    del environ["DB_PORT"]
+    del environ["DB_NAME"]
+    del environ["DB_SCHEMA"]
+    del environ["DB_READ_ONLY_USER_NAME"]
+
+
+@patch(f"{FILE_PATH}.AsyncConnection")
+def test_connection_to_db_async(mock_async_connection_class: MagicMock) -> None:
+    # Arrange
+    mock_async_connection_class.connect = AsyncMock()
+    # Act
+    db_connection = run(connection_to_db_async(DB_READER_SERVER, DB_PORT, DB_NAME, DB_SCHEMA, DB_USER, DB_PASSWORD))
+    # Assert
+    assert db_connection == mock_async_connection_class.connect.return_value
+    mock_async_connection_class.connect.assert_awaited_once_with(
+        host=DB_READER_SERVER,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        connect_timeout=2,
+        options=f"-c search_path=dbo,{DB_SCHEMA}",
+        application_name="DOS INTEGRATION <psycopg>",
+    )
+
+
+def test_query_dos_db_async() -> None:
+    # Arrange
+    query = "SELECT * FROM my_table"
+    connection = MagicMock()
+    connection.cursor.return_value = AsyncMock()
+    # Act
+    result = run(query_dos_db_async(connection, query))
+    # Assert
+    assert result == connection.cursor.return_value
+    connection.cursor.assert_called_once_with(row_factory=dict_row)
+    connection.cursor.return_value.execute.assert_awaited_once_with(query=query, params=None)
+
+
+def test_async_connection_pool_reuses_connection() -> None:
+    # Arrange
+    connection = mock_async_connection()
+    connection_factory = AsyncMock(return_value=connection)
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=connection_factory)
+
+    async def use_pool_twice() -> tuple:
+        async with pool.connection() as first_connection:
+            pass
+        async with pool.connection() as second_connection:
+            pass
+        return first_connection, second_connection
+
+    # Act
+    first_connection, second_connection = run(use_pool_twice())
+    # Assert
+    assert first_connection is connection
+    assert second_connection is connection
+    connection_factory.assert_awaited_once_with()
+
+
+def test_async_connection_pool_reuses_connection_in_second_event_loop() -> None:
+    # Arrange
+    connection = mock_async_connection()
+    connection_factory = AsyncMock(return_value=connection)
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=connection_factory)
+
+    async def use_pool() -> object:
+        async with pool.connection() as db_connection:
+            await db_connection.execute("SELECT 1")
+            return db_connection
+
+    # Act
+    # Each warm Lambda invocation runs its coroutines in a new event loop
+    first_connection = run(use_pool())
+    second_connection = run(use_pool())
+    # Assert
+    assert first_connection is second_connection is connection
+    connection_factory.assert_awaited_once_with()
+    assert connection.execute.await_count == 2
+    assert len(pool.idle_connections) == 1
+
+
+def test_async_connection_pool_creates_connection_per_concurrent_task() -> None:
+    # Arrange
+    connections = [mock_async_connection(), mock_async_connection()]
+    connection_factory = AsyncMock(side_effect=connections)
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=connection_factory)
+
+    async def use_connection() -> object:
+        async with pool.connection() as db_connection:
+            # Let the other task run while this one holds its connection
+            await sleep(0)
+            return db_connection
+
+    async def use_pool_concurrently() -> list:
+        return await gather(use_connection(), use_connection())
+
+    # Act
+    used_connections = run(use_pool_concurrently())
+    # Assert
+    assert used_connections == connections
+    assert len(pool.idle_connections) == 2
+
+
+def test_async_connection_pool_rolls_back_open_transaction_on_release() -> None:
+    # Arrange
+    connection = mock_async_connection()
+    connection.info.transaction_status = TransactionStatus.INTRANS
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=AsyncMock(return_value=connection))
+
+    async def use_pool() -> None:
+        async with pool.connection():
+            pass
+
+    # Act
+    run(use_pool())
+    # Assert
+    connection.rollback.assert_awaited_once_with()
+    assert len(pool.idle_connections) == 1
+
+
+def test_async_connection_pool_discards_broken_connection() -> None:
+    # Arrange
+    connection = mock_async_connection()
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=AsyncMock(return_value=connection))
+
+    async def use_pool() -> None:
+        async with pool.connection():
+            connection.broken = True
+
+    # Act
+    run(use_pool())
+    # Assert
+    connection.close.assert_awaited_once_with()
+    assert pool.idle_connections == []
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_async_connection_pool_reconnects_on_failed_health_check(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    old_connection = mock_async_connection()
+    old_connection.execute.side_effect = OperationalError("server closed the connection unexpectedly")
+    new_connection = mock_async_connection()
+    pool = AsyncDoSDBConnectionPool(
+        name="test",
+        connection_factory=AsyncMock(side_effect=[old_connection, new_connection]),
+    )
+
+    async def use_pool() -> object:
+        mock_monotonic.return_value = 0
+        async with pool.connection():
+            pass
+        mock_monotonic.return_value = pool.health_check_after_seconds + 1
+        async with pool.connection() as db_connection:
+            return db_connection
+
+    # Act
+    db_connection = run(use_pool())
+    # Assert
+    assert db_connection is new_connection
+    old_connection.close.assert_awaited_once_with()
+
+
+def test_async_connection_pool_close() -> None:
+    # Arrange
+    connection = mock_async_connection()
+    pool = AsyncDoSDBConnectionPool(name="test", connection_factory=AsyncMock(return_value=connection))
+
+    async def use_and_close_pool() -> None:
+        async with pool.connection():
+            pass
+        await pool.close()
+
+    # Act
+    run(use_and_close_pool())
+    # Assert
+    connection.close.assert_awaited_once_with()
+    assert pool.idle_connections == []
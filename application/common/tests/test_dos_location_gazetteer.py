@@ -0,0 +1,86 @@
+from os import environ
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from application.common.dos_location import DoSLocation
+from application.common.dos_location_gazetteer import (
+    DoSLocationGazetteer,
+    get_dos_location_gazetteer,
+    write_dos_location_gazetteer,
+)
+
+FILE_PATH = "application.common.dos_location_gazetteer"
+
+DOS_LOCATIONS = [
+    DoSLocation(id=3, postcode="TQ1 1AA", easting=1, northing=2, postaltown="TORQUAY", latitude=50.1, longitude=-3.5),
+    DoSLocation(id=1, postcode="EX1 1AA", easting=3, northing=4, postaltown="EXETER", latitude=50.7, longitude=-3.5),
+    DoSLocation(id=2, postcode="EX11AA", easting=5, northing=6, postaltown="EXETER", latitude=50.8, longitude=-3.6),
+    DoSLocation(id=4, postcode="BA2 7AF", easting=None, northing=None, postaltown=None, latitude=None, longitude=None),
+]
+
+
+def test_dos_location_gazetteer(tmp_path: Path) -> None:
+    # Arrange
+    path = str(tmp_path / "dos_locations.gazetteer")
+    # Act
+    location_count = write_dos_location_gazetteer(DOS_LOCATIONS, path)
+    gazetteer = DoSLocationGazetteer(path)
+    # Assert
+    assert location_count == 4
+    assert gazetteer.record_count == 4
+    assert gazetteer.get("ex1 1aa") == [DOS_LOCATIONS[1], DOS_LOCATIONS[2]]
+    assert gazetteer.get("TQ11AA") == [DOS_LOCATIONS[0]]
+    assert gazetteer.get("BA27AF") == [DOS_LOCATIONS[3]]
+    assert gazetteer.get("BA27AF")[0].is_valid() is False
+    assert gazetteer.get("AA11AA") is None
+    assert gazetteer.get("ZZ99ZZ") is None
+    gazetteer.close()
+
+
+def test_dos_location_gazetteer_empty(tmp_path: Path) -> None:
+    # Arrange
+    path = str(tmp_path / "dos_locations.gazetteer")
+    write_dos_location_gazetteer([], path)
+    # Act
+    gazetteer = DoSLocationGazetteer(path)
+    # Assert
+    assert gazetteer.get("EX11AA") is None
+    gazetteer.close()
+
+
+def test_dos_location_gazetteer_invalid_file(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "dos_locations.gazetteer"
+    path.write_bytes(b"not a gazetteer file")
+    # Act & Assert
+    with pytest.raises(ValueError, match="is not a DoS location gazetteer"):
+        DoSLocationGazetteer(str(path))
+
+
+def test_get_dos_location_gazetteer(tmp_path: Path) -> None:
+    # Arrange
+    path = str(tmp_path / "dos_locations.gazetteer")
+    write_dos_location_gazetteer(DOS_LOCATIONS, path)
+    environ["DOS_LOCATION_GAZETTEER_PATH"] = path
+    # Act
+    with patch(f"{FILE_PATH}.dos_location_gazetteer_loaded", False), patch(f"{FILE_PATH}.dos_location_gazetteer", None):
+        gazetteer = get_dos_location_gazetteer()
+    # Assert
+    assert gazetteer.get("EX11AA") == [DOS_LOCATIONS[1], DOS_LOCATIONS[2]]
+    # Clean up
+    gazetteer.close()
+    del environ["DOS_LOCATION_GAZETTEER_PATH"]
+
+
+def test_get_dos_location_gazetteer_missing_file(tmp_path: Path) -> None:
+    # Arrange
+    environ["DOS_LOCATION_GAZETTEER_PATH"] = str(tmp_path / "missing.gazetteer")
+    # Act
+    with patch(f"{FILE_PATH}.dos_location_gazetteer_loaded", False), patch(f"{FILE_PATH}.dos_location_gazetteer", None):
+        gazetteer = get_dos_location_gazetteer()
+    # Assert
+    assert gazetteer is None
+    # Clean up
+    del environ["DOS_LOCATION_GAZETTEER_PATH"]
@@ -181,6 +181,69 @@ def test_get_latest_sequence_id_for_different_change_event_from_dynamodb(
     assert latest_sequence_number == expected_latest_sequence_number
 
 
+def test_add_change_events_to_dynamodb(
+    dynamodb_table_create: dict[str, str], change_event: dict[str, str], dynamodb_client: object
+) -> None:
+    from application.common.dynamodb import (
+        add_change_events_to_dynamodb,
+        dict_hash,
+        get_latest_sequence_ids_for_odscodes_from_dynamodb,
+    )
+
+    # Arrange
+    event_received_time = int(time())
+    other_change_event = change_event | {"ODSCode": "FXX99"}
+    change_events = [(change_event.copy(), sequence_number, event_received_time) for sequence_number in range(1, 30)]
+    change_events.append((change_event.copy(), 29, event_received_time))
+    change_events.append((other_change_event, 7, event_received_time))
+    # Act
+    record_ids, unprocessed_record_ids = add_change_events_to_dynamodb(change_events)
+    # Assert
+    assert record_ids == [dict_hash(event, sequence_number) for event, sequence_number, _ in change_events]
+    assert unprocessed_record_ids == set()
+    item = dynamodb_client.get_item(
+        TableName=environ["CHANGE_EVENTS_TABLE_NAME"],
+        Key={"Id": {"S": record_ids[-1]}, "ODSCode": {"S": "FXX99"}},
+    )["Item"]
+    assert item["SequenceNumber"] == {"N": "7"}
+    assert get_latest_sequence_ids_for_odscodes_from_dynamodb(
+        [change_event["ODSCode"], "FXX99", change_event["ODSCode"], "FXX00"],
+    ) == {change_event["ODSCode"]: 29, "FXX99": 7, "FXX00": 0}
+
+
+@patch(f"{FILE_PATH}.sleep")
+@patch(f"{FILE_PATH}.dynamodb")
+def test_add_change_events_to_dynamodb_unprocessed_items(
+    mock_dynamodb: MagicMock, mock_sleep: MagicMock, change_event: dict[str, str]
+) -> None:
+    from application.common.dynamodb import add_change_events_to_dynamodb
+
+    # Arrange
+    table_name = environ["CHANGE_EVENTS_TABLE_NAME"]
+    event_received_time = int(time())
+    change_events = [(change_event.copy(), 1, event_received_time), (change_event.copy(), 2, event_received_time)]
+
+    def batch_write_item(RequestItems: dict) -> dict:  # noqa: N803
+        # The second change event is never processed
+        return {"UnprocessedItems": {table_name: RequestItems[table_name][-1:]}}
+
+    mock_dynamodb.batch_write_item.side_effect = batch_write_item
+    # Act
+    record_ids, unprocessed_record_ids = add_change_events_to_dynamodb(change_events)
+    # Assert
+    assert unprocessed_record_ids == {record_ids[1]}
+    assert mock_dynamodb.batch_write_item.call_count == 3
+    assert len(mock_dynamodb.batch_write_item.call_args_list[0].kwargs["RequestItems"][table_name]) == 2
+    assert len(mock_dynamodb.batch_write_item.call_args_list[1].kwargs["RequestItems"][table_name]) == 1
+    assert mock_sleep.call_count == 2
+
+
+def test_get_latest_sequence_ids_for_odscodes_from_dynamodb_no_odscodes() -> None:
+    from application.common.dynamodb import get_latest_sequence_ids_for_odscodes_from_dynamodb
+
+    assert get_latest_sequence_ids_for_odscodes_from_dynamodb([]) == {}
+
+
 def copy_and_modify_website(change_event: dict[str, str], new_website: str) -> None:
     copy = change_event.copy()
     copy["Contacts"][0]["ContactValue"] = new_website
@@ -9,6 +9,7 @@ from application.common.nhs import (
     is_spec_opening_json,
     is_std_opening_json,
     skip_if_key_is_none,
+    string_to_date,
 )
 from application.conftest import PHARMACY_STANDARD_EVENT, dummy_dos_service
 from common.constants import PHARMACY_SERVICE_TYPE_IDS
@@ -40,6 +41,77 @@ def test__init__() -> None:
     ]
 
 
+def test__init__lazy_attributes() -> None:
+    # Arrange
+    test_data = PHARMACY_STANDARD_EVENT
+    # Act
+    nhs_entity = NHSEntity(test_data)
+    # Assert
+    assert "payload_index" not in vars(nhs_entity)
+    assert "standard_opening_times" not in vars(nhs_entity)
+    assert nhs_entity.is_status_hidden_or_closed() is False
+    assert "payload_index" not in vars(nhs_entity)
+    assert nhs_entity.phone == "01234 567890"
+    assert nhs_entity.website == "http://www.FakePharmacy.co.uk/"
+    assert "payload_index" in vars(nhs_entity)
+    assert "standard_opening_times" not in vars(nhs_entity)
+    assert nhs_entity.standard_opening_times is nhs_entity.standard_opening_times
+    assert nhs_entity.palliative_care is False
+
+
+def test_lazy_attributes_can_be_set() -> None:
+    # Arrange
+    nhs_entity = NHSEntity(PHARMACY_STANDARD_EVENT)
+    # Act
+    nhs_entity.phone = "01234 000000"
+    nhs_entity.palliative_care = True
+    # Assert
+    assert nhs_entity.phone == "01234 000000"
+    assert nhs_entity.palliative_care is True
+
+
+def test_payload_index() -> None:
+    # Arrange
+    entity_data = {
+        "OpeningTimes": [
+            {"OpeningTimeType": "General", "Weekday": "Monday"},
+            {"OpeningTimeType": "Additional", "AdditionalOpeningDate": "Nov 12 2021"},
+            {"OpeningTimeType": "Other"},
+        ],
+        "Contacts": [
+            {
+                "ContactType": "Secondary",
+                "ContactAvailabilityType": "Office hours",
+                "ContactMethodType": "Telephone",
+                "ContactValue": "01234 000000",
+            },
+            {
+                "ContactType": "Primary",
+                "ContactAvailabilityType": "Office hours",
+                "ContactMethodType": "Telephone",
+                "ContactValue": "01234 567890",
+            },
+            {
+                "ContactType": "Primary",
+                "ContactAvailabilityType": "Office hours",
+                "ContactMethodType": "Telephone",
+                "ContactValue": "01234 111111",
+            },
+        ],
+        "Services": [{"ServiceCode": "SRV0560"}],
+        "UecServices": "",
+    }
+    # Act
+    nhs_entity = NHSEntity(entity_data)
+    # Assert
+    assert nhs_entity.payload_index.standard_opening_times == [entity_data["OpeningTimes"][0]]
+    assert nhs_entity.payload_index.specified_opening_times == [entity_data["OpeningTimes"][1]]
+    assert nhs_entity.payload_index.contacts == {"TELEPHONE": "01234 567890"}
+    assert nhs_entity.payload_index.service_codes == {"Services": {"SRV0560"}, "UecServices": None}
+    assert nhs_entity.check_for_service("SRV0560") is True
+    assert nhs_entity.check_for_uec_service("SRV0559") is None
+
+
 def test_get_specified_opening_times() -> None:
     # Arrange
     nhs_entity = NHSEntity(
@@ -177,8 +249,8 @@ def test_get_standard_opening_times() -> None:
     )
     # Act
     expected_std_open_times = StandardOpeningTimes()
-    expected_std_open_times.friday.append(OpenPeriod(time(8, 45, 0), time(17, 0, 0)))
-    expected_std_open_times.thursday.append(OpenPeriod(time(9, 0, 0), time(17, 0, 0)))
+    expected_std_open_times.add_open_period(OpenPeriod(time(8, 45, 0), time(17, 0, 0)), "friday")
+    expected_std_open_times.add_open_period(OpenPeriod(time(9, 0, 0), time(17, 0, 0)), "thursday")
 
     actual_std_open_times = nhs_entity.standard_opening_times
 
@@ -664,3 +736,26 @@ def test_get_palliative_care_log_value(
     palliative_care: bool, skip_palliative_care: bool, output_value: bool | str
 ) -> None:
     assert get_palliative_care_log_value(palliative_care, skip_palliative_care) == output_value
+
+
+@pytest.mark.parametrize(
+    ("date_str", "expected"),
+    [
+        ("Nov 12 2021", date(2021, 11, 12)),
+        ("Nov  12  2021", date(2021, 11, 12)),
+        ("DEC 1 2021", date(2021, 12, 1)),
+        ("feb 29 2024", date(2024, 2, 29)),
+        ("Nov\t12\t2021", date(2021, 11, 12)),
+    ],
+)
+def test_string_to_date(date_str: str, expected: date) -> None:
+    assert string_to_date(date_str) == expected
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    ["Feb 29 2021", "Nov 31 2021", "Nov 00 2021", "November 12 2021", " Nov 12 2021", "Nov 12 21", "Nov12 2021", ""],
+)
+def test_string_to_date_invalid(date_str: str) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        string_to_date(date_str)
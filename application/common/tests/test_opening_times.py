@@ -1,3 +1,4 @@
+from copy import copy, deepcopy
 from datetime import date, datetime, time, timedelta
 
 import pytest
@@ -5,9 +6,17 @@ import pytest
 from application.common.opening_times import (
     WEEKDAYS,
     OpenPeriod,
+    OpenPeriodSet,
+    OpenPeriodTuple,
     SpecifiedOpeningTime,
+    SpecifiedOpeningTimeTuple,
     StandardOpeningTimes,
+    open_periods_fingerprint,
     opening_period_times_from_list,
+    seconds_since_midnight,
+    specified_opening_times_fingerprint,
+    string_to_seconds,
+    string_to_time,
 )
 
 
@@ -62,11 +71,11 @@ def test_open_period_eq_hash() -> None:
     assert c != d
     assert hash(c) != hash(d)
 
-    b.end = time(17, 0, 0)
+    b = OpenPeriod(b.start, time(17, 0, 0))
     assert a == b
     assert hash(a) == hash(b)
 
-    a.start = time(3, 0, 0)
+    a = OpenPeriod(time(3, 0, 0), a.end)
     assert a != a2
     assert hash(a) != hash(a2)
 
@@ -122,12 +131,66 @@ def test_openperiod_any_overlaps() -> None:
 
     new_op = OpenPeriod(time(7, 0, 0), time(12, 0, 0))
     open_periods.append(new_op)
+    std.monday = open_periods
+    spec = SpecifiedOpeningTime(open_periods, date(2022, 12, 26))
 
     assert OpenPeriod.any_overlaps(open_periods)
     assert std.any_overlaps()
     assert spec.any_overlaps()
 
 
+def test_openperiod_any_overlaps_duplicates() -> None:
+    open_periods = [OpenPeriod(time(8, 0, 0), time(12, 0, 0)), OpenPeriod(time(8, 0, 0), time(12, 0, 0))]
+
+    assert OpenPeriod.any_overlaps(open_periods)
+    assert OpenPeriod.any_overlaps(open_periods[:1]) is False
+
+
+def test_open_period_set() -> None:
+    # Arrange
+    open_periods = [
+        OpenPeriod(time(14, 0, 0), time(17, 0, 0)),
+        OpenPeriod(time(8, 0, 0), time(12, 0, 0)),
+        OpenPeriod(time(12, 0, 0), time(13, 0, 0)),
+        OpenPeriod(time(8, 0, 0), time(12, 0, 0)),
+        OpenPeriod(time(16, 0, 0), time(18, 0, 0)),
+    ]
+    # Act
+    open_period_set = OpenPeriodSet(open_periods)
+    # Assert
+    assert list(open_period_set) == sorted(set(open_periods))
+    assert len(open_period_set) == 4
+    assert open_period_set.any_overlaps()
+    assert open_period_set == OpenPeriodSet(reversed(open_periods))
+    assert hash(open_period_set) == hash(OpenPeriodSet(reversed(open_periods)))
+    assert list(open_period_set.normalised()) == [
+        OpenPeriod(time(8, 0, 0), time(13, 0, 0)),
+        OpenPeriod(time(14, 0, 0), time(18, 0, 0)),
+    ]
+    assert open_period_set.normalised().any_overlaps() is False
+
+
+def test_open_period_set_difference_and_union() -> None:
+    # Arrange
+    current = OpenPeriodSet([OpenPeriod(time(8, 0, 0), time(12, 0, 0)), OpenPeriod(time(13, 0, 0), time(17, 0, 0))])
+    new = OpenPeriodSet([OpenPeriod(time(13, 0, 0), time(17, 0, 0)), OpenPeriod(time(18, 0, 0), time(20, 0, 0))])
+    # Act
+    added = new - current
+    removed = current - new
+    # Assert
+    assert list(added) == [OpenPeriod(time(18, 0, 0), time(20, 0, 0))]
+    assert list(removed) == [OpenPeriod(time(8, 0, 0), time(12, 0, 0))]
+    assert current - current == OpenPeriodSet()
+    assert current | new == OpenPeriodSet(
+        [
+            OpenPeriod(time(8, 0, 0), time(12, 0, 0)),
+            OpenPeriod(time(13, 0, 0), time(17, 0, 0)),
+            OpenPeriod(time(18, 0, 0), time(20, 0, 0)),
+        ],
+    )
+    assert (removed | (current - removed)) == current
+
+
 def test_openperiod_all_start_before_end() -> None:
     open_periods = [
         OpenPeriod(time(1, 0, 0), time(2, 0, 0)),
@@ -144,6 +207,8 @@ def test_openperiod_all_start_before_end() -> None:
 
     new_op = OpenPeriod(time(9, 0, 0), time(8, 59, 0))
     open_periods.append(new_op)
+    std.wednesday = open_periods
+    spec = SpecifiedOpeningTime(open_periods, date(2022, 12, 24))
 
     assert OpenPeriod.all_start_before_end(open_periods) is False
     assert std.all_start_before_end() is False
@@ -235,6 +300,21 @@ def test_open_period_hash(opening_period_2: OpenPeriod) -> None:
     ), f"hash {hash(open_period_1)} not found to be equal to {hash(opening_period_2)}"
 
 
+def test_open_period_seconds() -> None:
+    # Arrange
+    open_period = OpenPeriod(time(8, 30, 15), time(17, 0, 0))
+    # Act
+    open_period = OpenPeriod(open_period.start, time(18, 45, 0))
+    # Assert
+    assert not hasattr(open_period, "__dict__")
+    assert (open_period.start_seconds, open_period.end_seconds) == (30615, 67500)
+    assert open_period.start == time(8, 30, 15)
+    assert open_period.end == time(18, 45, 0)
+    assert OpenPeriod.from_seconds(30615, 67500) == open_period
+    assert open_period.export_db_string_format() == "08:30-18:45"
+    assert open_period.export_time_in_seconds() == "30615-67500"
+
+
 def test_openperiod_from_string_times() -> None:
     a = OpenPeriod.from_string_times("08:34", "15:13")
     assert a.start == time(8, 34, 0)
@@ -338,7 +418,7 @@ def test_specifiedopeningtime_open_string() -> None:
     s = SpecifiedOpeningTime([], date(2020, 5, 5), is_open=True)
     assert s.open_string() == "OPEN"
 
-    s.is_open = False
+    s = SpecifiedOpeningTime([], date(2020, 5, 5), is_open=False)
     assert s.open_string() == "CLOSED"
 
 
@@ -348,13 +428,13 @@ def test_specifiedopentime_contradiction() -> None:
 
     assert spec.contradiction() is False
 
-    spec.is_open = True
+    spec = SpecifiedOpeningTime([], date(2021, 12, 24), is_open=True)
     assert spec.contradiction()
 
-    spec.open_periods.append(op)
+    spec = SpecifiedOpeningTime([op], date(2021, 12, 24), is_open=True)
     assert spec.contradiction() is False
 
-    spec.is_open = False
+    spec = SpecifiedOpeningTime([op], date(2021, 12, 24), is_open=False)
     assert spec.contradiction()
 
 
@@ -365,43 +445,19 @@ def test_specifiedopentimes_is_valid() -> None:
     d = OpenPeriod(time(9, 0, 0), time(18, 30, 0))  # Overlaps
     e = OpenPeriod(time(9, 0, 0), time(2, 30, 0))  # Start not before end
 
-    sp1 = SpecifiedOpeningTime([], date(2022, 12, 24), is_open=False)
-    assert sp1.is_valid()
-
-    sp1.is_open = True
-    assert sp1.is_valid() is False
-
-    sp1.open_periods.append(a)
-    assert sp1.is_valid()
-
-    sp1.is_open = False
-    assert sp1.is_valid() is False
-
-    sp1.open_periods.append(b)
-    sp1.open_periods.append(c)
-    assert sp1.is_valid() is False
-
-    sp1.is_open = True
-    assert sp1.is_valid()
-
-    sp1.open_periods.pop(0)
-    sp1.open_periods.insert(0, d)
-    assert sp1.is_valid() is False
-
-    sp1.is_open = False
-    assert sp1.is_valid() is False
-
-    sp1.open_periods.pop(0)
-    assert sp1.is_valid() is False
-
-    sp1.is_open = True
-    assert sp1.is_valid()
-
-    sp1.open_periods.insert(0, e)
-    assert sp1.is_valid() is False
-
-    sp1.is_open = False
-    assert sp1.is_valid() is False
+    spec_date = date(2022, 12, 24)
+    assert SpecifiedOpeningTime([], spec_date, is_open=False).is_valid()
+    assert SpecifiedOpeningTime([], spec_date, is_open=True).is_valid() is False
+    assert SpecifiedOpeningTime([a], spec_date, is_open=True).is_valid()
+    assert SpecifiedOpeningTime([a], spec_date, is_open=False).is_valid() is False
+    assert SpecifiedOpeningTime([a, b, c], spec_date, is_open=False).is_valid() is False
+    assert SpecifiedOpeningTime([a, b, c], spec_date, is_open=True).is_valid()
+    assert SpecifiedOpeningTime([d, b, c], spec_date, is_open=True).is_valid() is False
+    assert SpecifiedOpeningTime([d, b, c], spec_date, is_open=False).is_valid() is False
+    assert SpecifiedOpeningTime([b, c], spec_date, is_open=False).is_valid() is False
+    assert SpecifiedOpeningTime([b, c], spec_date, is_open=True).is_valid()
+    assert SpecifiedOpeningTime([e, b, c], spec_date, is_open=True).is_valid() is False
+    assert SpecifiedOpeningTime([e, b, c], spec_date, is_open=False).is_valid() is False
 
 
 def test_specifiedopentimes_equal_lists() -> None:
@@ -450,7 +506,7 @@ def test_specifiedopentimes_remove_past_dates() -> None:
     future2 = SpecifiedOpeningTime([a, b, c], (now_date + timedelta(weeks=5)))
     past = SpecifiedOpeningTime([b], (now_date - timedelta(weeks=4)))
 
-    assert SpecifiedOpeningTime.remove_past_dates(times_list=[future1, future2, past]) == [future1, future2]
+    assert SpecifiedOpeningTime.remove_past_dates(times_list=[future1, future2, past]) == (future1, future2)
 
 
 def test_specifiedopentime_export_service_history_format_open() -> None:
@@ -555,26 +611,26 @@ def test_stdopeningtimes_eq_len() -> None:
     assert st1 != 23
     assert st1 != "Harry Potter"
 
-    st1.monday.append(a)
+    st1.add_open_period(a, "monday")
     assert st1 != st2
     assert len(st1) == 1
 
-    st2.monday.append(a)
+    st2.add_open_period(a, "monday")
     assert st1 == st2
     assert len(st2) == 1
 
-    st2.friday += [a, b, c]
-    st1.friday += [a, b]
+    st2.friday += (a, b, c)
+    st1.friday += (a, b)
     assert st1 != st2
     assert len(st1) == 3
     assert len(st2) == 4
 
-    st1.friday.append(c)
+    st1.add_open_period(c, "friday")
     assert st1 == st2
     assert len(st1) == 4
 
-    st1.sunday += [b, a, c]
-    st2.sunday += [c, b, a]
+    st1.sunday += (b, a, c)
+    st2.sunday += (c, b, a)
     assert st1 == st2
     assert len(st1) == 7
     assert len(st2) == 7
@@ -603,7 +659,7 @@ def test_stdopeningtimes_any_contradiction() -> None:
 
     assert st1.any_contradictions() is False
 
-    st1.monday.append(a)
+    st1.add_open_period(a, "monday")
     assert st1.any_contradictions() is False
 
     st1.explicit_closed_days.add("monday")
@@ -667,23 +723,23 @@ def test_standard_opening_times_export_test_format() -> None:
     assert std_opening_times.export_test_format() == expected
 
     # Add single opening time for monday
-    std_opening_times.monday.append(OpenPeriod(time(8, 0, 0), time(15, 0, 0)))
+    std_opening_times.add_open_period(OpenPeriod(time(8, 0, 0), time(15, 0, 0)), "monday")
     expected["Monday"].append({"start_time": "08:00", "end_time": "15:00"})
     assert std_opening_times.export_test_format() == expected
 
     # Add another to tuesday
-    std_opening_times.tuesday.append(OpenPeriod(time(8, 0, 0), time(20, 0, 0)))
+    std_opening_times.add_open_period(OpenPeriod(time(8, 0, 0), time(20, 0, 0)), "tuesday")
     expected["Tuesday"].append({"start_time": "08:00", "end_time": "20:00"})
     assert std_opening_times.export_test_format() == expected
 
     # Add another to monday
-    std_opening_times.monday.append(OpenPeriod(time(16, 0, 0), time(20, 0, 0)))
+    std_opening_times.add_open_period(OpenPeriod(time(16, 0, 0), time(20, 0, 0)), "monday")
     expected["Monday"].append({"start_time": "16:00", "end_time": "20:00"})
     assert std_opening_times.export_test_format() == expected
 
     # Add to every other day
     for day in ["Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
-        getattr(std_opening_times, day.lower()).append(OpenPeriod(time(16, 0, 0), time(20, 0, 0)))
+        std_opening_times.add_open_period(OpenPeriod(time(16, 0, 0), time(20, 0, 0)), day)
         expected[day].append({"start_time": "16:00", "end_time": "20:00"})
     assert std_opening_times.export_test_format() == expected
 
@@ -705,3 +761,151 @@ def test_std_open_times_fully_closed() -> None:
         std_open_times.add_open_period(OpenPeriod.from_string_times("08:00", "13:00"), day)
         assert not std_open_times.fully_closed()
         setattr(std_open_times, day, [])
+
+
+def test_std_open_times_weekday_properties() -> None:
+    # Arrange
+    std_open_times = StandardOpeningTimes()
+    open_period = OpenPeriod(time(8, 0, 0), time(13, 0, 0))
+    # Act
+    std_open_times.tuesday = [open_period]
+    std_open_times.add_open_period(open_period, "Friday")
+    # Assert
+    assert std_open_times.days == [(), (open_period,), (), (), (open_period,), (), ()]
+    assert std_open_times.get_openings("TUESDAY") is std_open_times.tuesday
+    assert std_open_times.friday == (open_period,)
+
+
+def test_std_open_times_days_are_sorted_when_set() -> None:
+    # Arrange
+    std_open_times = StandardOpeningTimes()
+    a = OpenPeriod(time(8, 0, 0), time(12, 0, 0))
+    b = OpenPeriod(time(13, 0, 0), time(17, 30, 0))
+    c = OpenPeriod(time(13, 0, 0), time(18, 0, 0))
+    # Act
+    std_open_times.monday = [c, a]
+    std_open_times.add_open_period(b, "monday")
+    # Assert
+    assert std_open_times.monday == (a, b, c)
+    assert isinstance(std_open_times.monday, OpenPeriodTuple)
+    assert std_open_times.monday.fingerprint == open_periods_fingerprint([c, b, a])
+    assert std_open_times.export_opening_times_for_day("monday") == ["08:00-12:00", "13:00-17:30", "13:00-18:00"]
+    with pytest.raises(AttributeError):
+        std_open_times.monday.append(a)
+
+
+def test_open_periods_fingerprint() -> None:
+    # Arrange
+    a = OpenPeriod(time(8, 0, 0), time(12, 0, 0))
+    b = OpenPeriod(time(13, 0, 0), time(17, 30, 0))
+    # Act
+    fingerprint = open_periods_fingerprint([a, b])
+    # Assert
+    assert fingerprint == 7964492823751181447
+    assert open_periods_fingerprint([b, a]) == fingerprint
+    assert open_periods_fingerprint([a]) != fingerprint
+    assert open_periods_fingerprint([]) != open_periods_fingerprint([a])
+
+
+def test_open_period_tuple() -> None:
+    # Arrange
+    a = OpenPeriod(time(8, 0, 0), time(12, 0, 0))
+    b = OpenPeriod(time(13, 0, 0), time(17, 30, 0))
+    # Act
+    open_periods = OpenPeriodTuple([b, a])
+    # Assert
+    assert open_periods == (a, b)
+    assert open_periods.fingerprint == open_periods_fingerprint([a, b])
+    assert open_periods_fingerprint(open_periods) == open_periods.fingerprint
+    assert OpenPeriodTuple().fingerprint == open_periods_fingerprint([])
+    assert copy(open_periods).fingerprint == deepcopy(open_periods).fingerprint == open_periods.fingerprint
+
+
+def test_open_period_is_immutable_after_comparison() -> None:
+    # Arrange
+    dos_times = StandardOpeningTimes()
+    dos_times.add_open_period(OpenPeriod(time(8, 0, 0), time(12, 0, 0)), "monday")
+    nhs_times = StandardOpeningTimes()
+    nhs_times.add_open_period(OpenPeriod(time(8, 0, 0), time(12, 0, 0)), "monday")
+    assert dos_times == nhs_times
+    open_period = nhs_times.monday[0]
+    # Act & Assert
+    with pytest.raises(AttributeError, match="OpenPeriod is immutable"):
+        open_period.end = time(17, 0, 0)
+    with pytest.raises(AttributeError, match="OpenPeriod is immutable"):
+        open_period.end_seconds = 61200
+    assert open_period == OpenPeriod(time(8, 0, 0), time(12, 0, 0))
+    assert dos_times == nhs_times
+    with pytest.raises(TypeError):
+        nhs_times.monday[0] = OpenPeriod(open_period.start, time(17, 0, 0))
+    nhs_times.monday = [OpenPeriod(open_period.start, time(17, 0, 0))]
+    assert dos_times != nhs_times
+    assert copy(open_period) == deepcopy(open_period) == open_period
+
+
+def test_specified_opening_times_fingerprint() -> None:
+    # Arrange
+    christmas = SpecifiedOpeningTime([OpenPeriod(time(8, 0, 0), time(12, 0, 0))], date(2025, 12, 25))
+    boxing_day = SpecifiedOpeningTime([], date(2025, 12, 26), is_open=False)
+    # Act
+    fingerprint = specified_opening_times_fingerprint([christmas, boxing_day])
+    # Assert
+    assert fingerprint == 9359085473820237241
+    assert specified_opening_times_fingerprint([boxing_day, christmas]) == fingerprint
+    assert specified_opening_times_fingerprint([christmas]) != fingerprint
+    assert SpecifiedOpeningTime([], date(2025, 12, 25), is_open=False).fingerprint != christmas.fingerprint
+    assert SpecifiedOpeningTime.equal_lists([christmas, boxing_day], [boxing_day, christmas])
+    assert not SpecifiedOpeningTime.equal_lists([christmas, christmas], [christmas])
+
+
+def test_specified_opening_time_tuple() -> None:
+    # Arrange
+    christmas = SpecifiedOpeningTime([OpenPeriod(time(8, 0, 0), time(12, 0, 0))], date(2025, 12, 25))
+    boxing_day = SpecifiedOpeningTime([], date(2025, 12, 26), is_open=False)
+    # Act
+    specified_opening_times = SpecifiedOpeningTimeTuple([christmas, boxing_day])
+    # Assert
+    assert specified_opening_times == (christmas, boxing_day)
+    assert specified_opening_times.fingerprint == specified_opening_times_fingerprint([boxing_day, christmas])
+    assert SpecifiedOpeningTime.equal_lists(specified_opening_times, SpecifiedOpeningTimeTuple([boxing_day, christmas]))
+    assert SpecifiedOpeningTime.remove_past_dates(specified_opening_times, date(2025, 12, 1)) is specified_opening_times
+    assert SpecifiedOpeningTime.remove_past_dates(specified_opening_times, date(2025, 12, 26)).fingerprint == (
+        specified_opening_times_fingerprint([boxing_day])
+    )
+
+
+def test_specified_opening_time_is_immutable() -> None:
+    # Arrange
+    open_period = OpenPeriod(time(8, 0, 0), time(12, 0, 0))
+    christmas = SpecifiedOpeningTime([open_period], date(2025, 12, 25))
+    fingerprint = christmas.fingerprint
+    # Act & Assert
+    with pytest.raises(AttributeError, match="SpecifiedOpeningTime is immutable"):
+        christmas.is_open = False
+    with pytest.raises(AttributeError):
+        christmas.open_periods.append(open_period)
+    assert christmas.fingerprint == fingerprint
+    assert isinstance(christmas.open_periods, OpenPeriodTuple)
+    assert copy(christmas) == deepcopy(christmas) == christmas
+    assert deepcopy(christmas).fingerprint == fingerprint
+
+
+@pytest.mark.parametrize(
+    ("time_str", "expected"),
+    [
+        ("08:30", time(8, 30, 0)),
+        ("23:59:59", time(23, 59, 59)),
+        ("00:00", time(0, 0, 0)),
+        ("8:05", time(8, 5, 0)),
+        ("08:5", time(8, 5, 0)),
+        ("24:00", None),
+        ("12:60", None),
+        (" 08:30", None),
+        ("08:30:00:00", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_string_to_time(time_str: str | None, expected: time | None) -> None:
+    assert string_to_time(time_str) == expected
+    assert string_to_seconds(str(time_str)) == (None if expected is None else seconds_since_midnight(expected))
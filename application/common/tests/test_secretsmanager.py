@@ -1,4 +1,5 @@
 from json import dumps
+from os import environ
 
 import boto3
 import pytest
@@ -7,6 +8,14 @@ from moto import mock_aws
 FILE_PATH = "application.common.secretsmanager"
 
 
+@pytest.fixture(autouse=True)
+def _clear_secret_cache() -> None:
+    """Make sure no cached secrets are shared between tests."""
+    from application.common.secretsmanager import secret_cache
+
+    secret_cache.clear()
+
+
 @mock_aws
 def test_get_secret() -> None:
     from application.common.secretsmanager import get_secret
@@ -28,3 +37,58 @@ def test_get_secret_resource_not_found() -> None:
 
     with pytest.raises(Exception, match="Failed getting secret 'fake_secret_name' from secrets manager"):
         get_secret("fake_secret_name")
+
+
+@mock_aws
+def test_get_secret_cached() -> None:
+    from application.common.secretsmanager import get_secret, secret_cache_stats
+
+    # Arrangement
+    secret_name = "dummy_name"
+    secret = {"username": "dummy_username", "password": "dummy_password"}
+    sm = boto3.client("secretsmanager")
+    sm.create_secret(Name=secret_name, SecretString=dumps(secret))
+    get_secret(secret_name=secret_name)
+    sm.put_secret_value(SecretId=secret_name, SecretString=dumps({"password": "rotated_password"}))
+    hits = secret_cache_stats["hits"]
+    # Act
+    return_value = get_secret(secret_name=secret_name)
+    # Assert
+    assert return_value == secret
+    assert secret_cache_stats["hits"] == hits + 1
+
+
+@mock_aws
+def test_get_secret_force_refresh() -> None:
+    from application.common.secretsmanager import get_secret
+
+    # Arrangement
+    secret_name = "dummy_name"
+    sm = boto3.client("secretsmanager")
+    sm.create_secret(Name=secret_name, SecretString=dumps({"password": "dummy_password"}))
+    get_secret(secret_name=secret_name)
+    sm.put_secret_value(SecretId=secret_name, SecretString=dumps({"password": "rotated_password"}))
+    # Act
+    return_value = get_secret(secret_name=secret_name, force_refresh=True)
+    # Assert
+    assert return_value == {"password": "rotated_password"}
+    assert get_secret(secret_name=secret_name) == {"password": "rotated_password"}
+
+
+@mock_aws
+def test_get_secret_cache_expired() -> None:
+    from application.common.secretsmanager import get_secret
+
+    # Arrangement
+    environ["SECRET_CACHE_TTL_SECONDS"] = "0"
+    secret_name = "dummy_name"
+    sm = boto3.client("secretsmanager")
+    sm.create_secret(Name=secret_name, SecretString=dumps({"password": "dummy_password"}))
+    get_secret(secret_name=secret_name)
+    sm.put_secret_value(SecretId=secret_name, SecretString=dumps({"password": "rotated_password"}))
+    # Act
+    return_value = get_secret(secret_name=secret_name)
+    # Assert
+    assert return_value == {"password": "rotated_password"}
+    # Clean up
+    del environ["SECRET_CACHE_TTL_SECONDS"]
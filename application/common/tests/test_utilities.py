@@ -4,7 +4,9 @@ import pytest
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 
 from application.common.utilities import (
+    BatchItemFailures,
     extract_body,
+    get_message_group_id,
     get_sequence_number,
     get_sqs_msg_attribute,
     handle_sqs_msg_attributes,
@@ -67,6 +69,34 @@ def test_get_sequence_number_empty() -> None:
     assert sequence_number is None
 
 
+def test_get_message_group_id() -> None:
+    # Arrange
+    record = SQSRecord({"messageId": "1", "attributes": {"MessageGroupId": "FA001"}})
+    # Act & Assert
+    assert get_message_group_id(record) == "FA001"
+
+
+def test_get_message_group_id_no_message_group() -> None:
+    # Arrange
+    record = SQSRecord({"messageId": "1", "attributes": {}})
+    # Act & Assert
+    assert get_message_group_id(record) == "1"
+
+
+def test_batch_item_failures() -> None:
+    # Arrange
+    failures = BatchItemFailures()
+    record = SQSRecord({"messageId": "1", "attributes": {"MessageGroupId": "FA001"}})
+    # Act
+    failures.add(record, "FA001")
+    failures.add(record, "FA001")
+    # Assert
+    assert failures.is_failed(record) is True
+    assert failures.is_message_group_failed("FA001") is True
+    assert failures.is_message_group_failed("FB001") is False
+    assert failures.response() == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+
+
 def test_get_sqs_msg_attribute_string(dead_letter_message: dict[str, str]) -> None:
     # Arrange
     attribute = "error_msg"
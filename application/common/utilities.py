@@ -1,5 +1,5 @@
 from json import dumps, loads
-from typing import Any
+from typing import Any, Self
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
@@ -103,3 +103,68 @@ def handle_sqs_msg_attributes(msg_attributes: dict[str, Any]) -> dict[str, Any]
 
         return attributes
     return None
+
+
+def get_message_group_id(record: SQSRecord) -> str:
+    """Gets the FIFO message group id of the SQS record.
+
+    Records without a message group are put in a group of their own.
+
+    Args:
+        record (SQSRecord): SQS record
+
+    Returns:
+        str: Message group id of the record
+    """
+    return record.attributes.message_group_id or record.message_id
+
+
+class BatchItemFailures:
+    """The records of an SQS batch that failed, reported back to SQS as a partial batch response.
+
+    Once a record fails, the rest of its FIFO message group must be failed too so SQS retries them in order.
+    """
+
+    def __init__(self: Self) -> None:
+        """Initialises an empty set of failures."""
+        self.batch_item_failures: list[dict[str, str]] = []
+        self.failed_message_ids: set[str] = set()
+        self.failed_message_groups: set[str] = set()
+
+    def add(self: Self, record: SQSRecord, message_group_id: str) -> None:
+        """Adds a failed record, failing the rest of its message group so they are retried in order.
+
+        Args:
+            record (SQSRecord): The record that failed
+            message_group_id (str): FIFO message group of the record
+        """
+        self.failed_message_groups.add(message_group_id)
+        if record.message_id not in self.failed_message_ids:
+            self.failed_message_ids.add(record.message_id)
+            self.batch_item_failures.append({"itemIdentifier": record.message_id})
+
+    def is_message_group_failed(self: Self, message_group_id: str) -> bool:
+        """Checks if an earlier record in the message group has failed.
+
+        Args:
+            message_group_id (str): FIFO message group to check
+
+        Returns:
+            bool: True if a record in the message group has failed
+        """
+        return message_group_id in self.failed_message_groups
+
+    def is_failed(self: Self, record: SQSRecord) -> bool:
+        """Checks if the record has failed.
+
+        Args:
+            record (SQSRecord): The record to check
+
+        Returns:
+            bool: True if the record has failed
+        """
+        return record.message_id in self.failed_message_ids
+
+    def response(self: Self) -> dict[str, list[dict[str, str]]]:
+        """Returns the partial batch response for the lambda."""
+        return {"batchItemFailures": self.batch_item_failures}
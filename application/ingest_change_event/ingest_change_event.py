@@ -1,24 +1,43 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
 from json import dumps
 from os import getenv
 from time import gmtime, strftime
+from typing import Any
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
+from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing.lambda_context import LambdaContext
 from boto3 import client
 
 from .change_event_validation import validate_change_event
-from common.dynamodb import add_change_event_to_dynamodb, get_latest_sequence_id_for_a_given_odscode_from_dynamodb
+from common.dynamodb import add_change_events_to_dynamodb, get_latest_sequence_ids_for_odscodes_from_dynamodb
+from common.errors import ValidationError
 from common.middlewares import redact_staff_key_from_event, unhandled_exception_logging
 from common.types import HoldingQueueChangeEventItem
-from common.utilities import extract_body, get_sequence_number
+from common.utilities import BatchItemFailures, extract_body, get_message_group_id, get_sequence_number
 
 logger = Logger()
 tracer = Tracer()
 sqs = client("sqs")
 
 
+@dataclass
+class IngestedChangeEvent:
+    """A change event from the batch being ingested."""
+
+    record: SQSRecord
+    change_event: dict[str, Any]
+    ods_code: str
+    sequence_number: int | None
+    sqs_timestamp: int
+    correlation_id: str | None
+    message_group_id: str
+    record_id: str = ""
+
+
 @redact_staff_key_from_event()
 @unhandled_exception_logging()
 @tracer.capture_lambda_handler()
@@ -27,63 +46,206 @@ sqs = client("sqs")
     clear_state=True,
     correlation_id_path='Records[0].messageAttributes."correlation-id".stringValue',
 )
-def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: ARG001
+def lambda_handler(event: SQSEvent, context: LambdaContext) -> dict[str, list[dict[str, str]]]:  # noqa: ARG001
     """Entrypoint handler for the ingest change event lambda.
 
-    This lambda runs the change event validation, puts the change event on the dynamodb table
-    and then sends the validated change event to the delay queue.
+    This lambda runs the change event validation on a batch of change events, puts the change events on the
+    dynamodb table and then sends the validated change events to the holding queue. Once a change event fails,
+    the rest of the change events in its FIFO message group are reported as failures too so they are retried in order.
 
     Args:
         event (SQSEvent): Lambda function invocation event
         context (LambdaContext): Lambda function context object
 
-    Event: The event payload should contain an Update Request
+    Event: The event payload should contain a batch of Change Events
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Partial batch response with the change events that failed
+    """
+    failures = BatchItemFailures()
+    change_events = read_change_events(event.records, failures)
+    if not change_events:
+        return failures.response()
+
+    logger.debug("Getting latest sequence numbers")
+    db_latest_sequence_numbers = get_latest_sequence_ids_for_odscodes_from_dynamodb(
+        ingested_change_event.ods_code for ingested_change_event in change_events
+    )
+    logger.info("Writing change events to dynamo")
+    record_ids, unprocessed_record_ids = add_change_events_to_dynamodb(
+        [
+            (
+                ingested_change_event.change_event,
+                ingested_change_event.sequence_number,
+                ingested_change_event.sqs_timestamp,
+            )
+            for ingested_change_event in change_events
+        ],
+    )
+    change_events_to_send: list[IngestedChangeEvent] = []
+    for ingested_change_event, record_id in zip(change_events, record_ids, strict=True):
+        ingested_change_event.record_id = record_id
+        if failures.is_message_group_failed(ingested_change_event.message_group_id) or (
+            record_id in unprocessed_record_ids
+        ):
+            failures.add(ingested_change_event.record, ingested_change_event.message_group_id)
+        elif is_latest_change_event(ingested_change_event, db_latest_sequence_numbers):
+            change_events_to_send.append(ingested_change_event)
+
+    failed_to_send_message_ids = send_change_events_to_holding_queue(change_events_to_send)
+    if failed_to_send_message_ids:
+        # The change events after one that couldn't be sent in its message group are failed too, even if they
+        # were sent, so they are retried in order after it
+        failed_to_send_message_groups: set[str] = set()
+        for ingested_change_event in change_events:
+            if (
+                ingested_change_event.record.message_id in failed_to_send_message_ids
+                or ingested_change_event.message_group_id in failed_to_send_message_groups
+            ):
+                failed_to_send_message_groups.add(ingested_change_event.message_group_id)
+                failures.add(ingested_change_event.record, ingested_change_event.message_group_id)
+    return failures.response()
+
+
+def read_change_events(records: Iterator[SQSRecord], failures: BatchItemFailures) -> list[IngestedChangeEvent]:
+    """Reads the change events from the SQS records, skipping any that fail validation.
+
+    Args:
+        records (Iterator[SQSRecord]): SQS records containing the change events
+        failures (BatchItemFailures): Failures in the batch so far
+
+    Returns:
+        list[IngestedChangeEvent]: The validated change events
     """
-    if len(list(event.records)) != 1:
-        msg = f"{len(list(event.records))} records found in event. Expected 1."
-        raise ValueError(msg)
+    change_events: list[IngestedChangeEvent] = []
+    for record in records:
+        message_group_id = get_message_group_id(record)
+        if failures.is_message_group_failed(message_group_id):
+            failures.add(record, message_group_id)
+            continue
+        try:
+            change_events.append(read_change_event(record, message_group_id))
+        except ValidationError as error:
+            # Invalid change events will never pass validation so aren't retried
+            logger.exception(f"Validation Error - {error}", message_id=record.message_id)  # noqa: TRY401
+        except Exception:
+            logger.exception("Unable to read change event", message_id=record.message_id)
+            failures.add(record, message_group_id)
+    return change_events
+
 
-    record = next(event.records)
+def read_change_event(record: SQSRecord, message_group_id: str) -> IngestedChangeEvent:
+    """Extracts and validates the change event from an SQS record.
+
+    Args:
+        record (SQSRecord): SQS record containing the change event
+        message_group_id (str): FIFO message group of the record
+
+    Returns:
+        IngestedChangeEvent: The validated change event
+    """
+    correlation_id = record.message_attributes.get("correlation-id", {}).get("stringValue")
+    logger.set_correlation_id(correlation_id)
     change_event = extract_body(record.body)
     validate_change_event(change_event)
     ods_code = change_event.get("ODSCode")
-    logger.append_keys(ods_code=ods_code)
     sequence_number = get_sequence_number(record)
     sqs_timestamp = int(record.attributes["SentTimestamp"])
     s, ms = divmod(sqs_timestamp, 1000)
     logger.warning(
         "Change Event received",
+        ods_code=ods_code,
         sequence_number=sequence_number,
         message_received="%s.%03d" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(s)), ms),
         environment=getenv("ENVIRONMENT"),
         cloudwatch_metric_filter_matching_attribute="ChangeEventReceived",
     )
-    logger.debug("Getting latest sequence number")
-    db_latest_sequence_number = get_latest_sequence_id_for_a_given_odscode_from_dynamodb(ods_code)
-    logger.info("Writing change event to dynamo")
-    record_id = add_change_event_to_dynamodb(change_event, sequence_number, sqs_timestamp)
-    logger.append_keys(dynamo_record_id=record_id)
+    return IngestedChangeEvent(
+        record=record,
+        change_event=change_event,
+        ods_code=ods_code,
+        sequence_number=sequence_number,
+        sqs_timestamp=sqs_timestamp,
+        correlation_id=correlation_id,
+        message_group_id=message_group_id,
+    )
+
+
+def is_latest_change_event(
+    ingested_change_event: IngestedChangeEvent,
+    db_latest_sequence_numbers: dict[str, int],
+) -> bool:
+    """Checks the change event is newer than the latest change event already stored for its odscode.
+
+    Later change events in a batch are compared against the earlier ones, as if they were already in dynamo.
 
+    Args:
+        ingested_change_event (IngestedChangeEvent): Change event to check
+        db_latest_sequence_numbers (dict[str, int]): Latest sequence number for each odscode, updated in place
+
+    Returns:
+        bool: True if the change event should be sent to the holding queue, False if it should be ignored
+    """
+    ods_code = ingested_change_event.ods_code
+    sequence_number = ingested_change_event.sequence_number
     if sequence_number is None:
-        logger.error("No sequence number provided, so message will be ignored.")
-        return
-    elif sequence_number < db_latest_sequence_number:  # noqa: RET505
+        logger.error(
+            "No sequence number provided, so message will be ignored.",
+            ods_code=ods_code,
+            dynamo_record_id=ingested_change_event.record_id,
+        )
+        return False
+    db_latest_sequence_number = db_latest_sequence_numbers[ods_code]
+    db_latest_sequence_numbers[ods_code] = max(db_latest_sequence_number, sequence_number)
+    if sequence_number < db_latest_sequence_number:
         logger.error(
             "Sequence id is smaller than the existing one in db for a given odscode, so will be ignored",
             incoming_sequence_number=sequence_number,
             db_latest_sequence_number=db_latest_sequence_number,
+            ods_code=ods_code,
+            dynamo_record_id=ingested_change_event.record_id,
         )
-        return
-    holding_queue_change_event_item = HoldingQueueChangeEventItem(
-        change_event=change_event,
-        sequence_number=sequence_number,
-        message_received=sqs_timestamp,
-        dynamo_record_id=record_id,
-        correlation_id=logger.get_correlation_id(),
-    )
-    logger.debug("Change event validated", holding_queue_change_event_item=holding_queue_change_event_item)
-    sqs.send_message(
-        QueueUrl=getenv("HOLDING_QUEUE_URL"),
-        MessageBody=dumps(holding_queue_change_event_item),
-        MessageGroupId=ods_code,
-    )
+        return False
+    return True
+
+
+def send_change_events_to_holding_queue(change_events: list[IngestedChangeEvent]) -> set[str]:
+    """Sends the validated change events to the holding queue with send_message_batch.
+
+    Args:
+        change_events (list[IngestedChangeEvent]): Change events to send
+
+    Returns:
+        set[str]: SQS message ids of the change events that could not be sent
+    """
+    failed_message_ids: set[str] = set()
+    # SQS allows at most 10 messages to be sent in a batch
+    for i in range(0, len(change_events), 10):
+        chunk = change_events[i : i + 10]
+        entries = []
+        for entry_id, ingested_change_event in enumerate(chunk):
+            holding_queue_change_event_item = HoldingQueueChangeEventItem(
+                change_event=ingested_change_event.change_event,
+                sequence_number=ingested_change_event.sequence_number,
+                message_received=ingested_change_event.sqs_timestamp,
+                dynamo_record_id=ingested_change_event.record_id,
+                correlation_id=ingested_change_event.correlation_id,
+            )
+            logger.debug("Change event validated", holding_queue_change_event_item=holding_queue_change_event_item)
+            entries.append(
+                {
+                    "Id": str(entry_id),
+                    "MessageBody": dumps(holding_queue_change_event_item),
+                    "MessageGroupId": ingested_change_event.ods_code,
+                },
+            )
+        response = sqs.send_message_batch(QueueUrl=getenv("HOLDING_QUEUE_URL"), Entries=entries)
+        for failure in response.get("Failed", []):
+            failed_change_event = chunk[int(failure["Id"])]
+            logger.error(
+                "Unable to send change event to holding queue",
+                ods_code=failed_change_event.ods_code,
+                failure=failure,
+            )
+            failed_message_ids.add(failed_change_event.record.message_id)
+    return failed_message_ids
@@ -1,4 +1,5 @@
-from json import dumps
+from copy import deepcopy
+from json import dumps, loads
 from os import environ
 from unittest.mock import MagicMock, patch
 
@@ -11,283 +12,379 @@ from application.ingest_change_event.ingest_change_event import lambda_handler
 
 FILE_PATH = "application.ingest_change_event.ingest_change_event"
 
+QUEUE_URL = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
+SQS_TIMESTAMP = 1642619743522
+RECORD_ID = "1234567890"
+
+
+@pytest.fixture(autouse=True)
+def _environment() -> None:
+    environ["ENV"] = "test"
+    environ["HOLDING_QUEUE_URL"] = QUEUE_URL
+    yield
+    del environ["ENV"]
+    del environ["HOLDING_QUEUE_URL"]
+
+
+def sqs_record(change_event: dict, message_id: str = "1", sequence_number: str | None = "2") -> dict:
+    """Creates an SQS record for a change event."""
+    record = deepcopy(SQS_EVENT["Records"][0])
+    record["messageId"] = message_id
+    record["body"] = dumps(change_event)
+    record["attributes"]["MessageGroupId"] = change_event["ODSCode"]
+    if sequence_number is None:
+        del record["messageAttributes"]["sequence-number"]
+    else:
+        record["messageAttributes"]["sequence-number"]["stringValue"] = sequence_number
+    return record
+
+
+def sent_messages(mock_sqs: MagicMock) -> list[dict]:
+    """Returns the bodies of the messages sent to the holding queue."""
+    return [
+        loads(entry["MessageBody"])
+        for call in mock_sqs.send_message_batch.call_args_list
+        for entry in call.kwargs["Entries"]
+    ]
+
 
 @patch(f"{FILE_PATH}.sqs")
-@patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
-@patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
-@patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
-@patch(f"{FILE_PATH}.get_sequence_number")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
 @patch(f"{FILE_PATH}.validate_change_event")
-@patch(f"{FILE_PATH}.extract_body")
 def test_lambda_handler(
-    mock_extract_body: MagicMock,
     mock_validate_change_event: MagicMock,
-    mock_get_sequence_number: MagicMock,
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
-    mock_add_change_event_to_dynamodb: MagicMock,
-    mock_holding_queue_change_event_item: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
     mock_sqs: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    event = SQS_EVENT.copy()
-    event["Records"][0]["body"] = dumps(change_event)
-    mock_extract_body.return_value = change_event
-    environ["ENV"] = "test"
-    environ["HOLDING_QUEUE_URL"] = queue_url = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
-    sqs_timestamp = 1642619743522
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.return_value = 1
-    mock_get_sequence_number.return_value = sequence_number = 2
-    mock_add_change_event_to_dynamodb.return_value = dynamodb_record = "1234567890"
-    mock_holding_queue_change_event_item.return_value = holding_queue_change_event_item = HoldingQueueChangeEventItem(
-        change_event=None,
-        dynamo_record_id=None,
-        correlation_id=None,
-        sequence_number=None,
-        message_received=None,
-    )
+    event = {"Records": [sqs_record(change_event)]}
+    ods_code = change_event["ODSCode"]
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {ods_code: 1}
+    mock_add_change_events_to_dynamodb.return_value = [RECORD_ID], set()
+    mock_sqs.send_message_batch.return_value = {"Successful": [{"Id": "0"}]}
     # Act
     response = lambda_handler(event, lambda_context)
     # Assert
-    assert response is None
-    mock_extract_body.assert_called_once_with(dumps(change_event))
+    assert response == {"batchItemFailures": []}
     mock_validate_change_event.assert_called_once_with(change_event)
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
-    mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
-    mock_holding_queue_change_event_item.assert_called_once_with(
-        change_event=change_event,
-        sequence_number=sequence_number,
-        message_received=sqs_timestamp,
-        dynamo_record_id=dynamodb_record,
-        correlation_id="1",
-    )
-    mock_sqs.send_message.assert_called_once_with(
-        QueueUrl=queue_url,
-        MessageBody=dumps(holding_queue_change_event_item),
-        MessageGroupId=change_event["ODSCode"],
+    assert list(mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.call_args.args[0]) == [ods_code]
+    mock_add_change_events_to_dynamodb.assert_called_once_with([(change_event, 2, SQS_TIMESTAMP)])
+    mock_sqs.send_message_batch.assert_called_once_with(
+        QueueUrl=QUEUE_URL,
+        Entries=[
+            {
+                "Id": "0",
+                "MessageBody": dumps(
+                    HoldingQueueChangeEventItem(
+                        change_event=change_event,
+                        sequence_number=2,
+                        message_received=SQS_TIMESTAMP,
+                        dynamo_record_id=RECORD_ID,
+                        correlation_id="1",
+                    ),
+                ),
+                "MessageGroupId": ods_code,
+            },
+        ],
     )
-    # Cleanup
-    del environ["ENV"]
-    del environ["HOLDING_QUEUE_URL"]
 
 
 @patch(f"{FILE_PATH}.sqs")
-@patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
-@patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
-@patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
-@patch(f"{FILE_PATH}.get_sequence_number")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
 @patch(f"{FILE_PATH}.validate_change_event")
 def test_lambda_handler_with_sensitive_staff_key(
     mock_validate_change_event: MagicMock,
-    mock_get_sequence_number: MagicMock,
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
-    mock_add_change_event_to_dynamodb: MagicMock,
-    mock_holding_queue_change_event_item: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
     mock_sqs: MagicMock,
     change_event_staff: dict,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    event = SQS_EVENT.copy()
-    event["Records"][0]["body"] = dumps(change_event_staff.copy())
-    environ["ENV"] = "test"
-    environ["HOLDING_QUEUE_URL"] = queue_url = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
-    sqs_timestamp = 1642619743522
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.return_value = 1
-    mock_get_sequence_number.return_value = sequence_number = 2
-    mock_add_change_event_to_dynamodb.return_value = dynamodb_record = "1234567890"
-    mock_holding_queue_change_event_item.return_value = holding_queue_change_event_item = HoldingQueueChangeEventItem(
-        change_event=None,
-        dynamo_record_id=None,
-        correlation_id=None,
-        sequence_number=None,
-        message_received=None,
-    )
+    event = {"Records": [sqs_record(change_event_staff.copy())]}
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {change_event["ODSCode"]: 1}
+    mock_add_change_events_to_dynamodb.return_value = [RECORD_ID], set()
+    mock_sqs.send_message_batch.return_value = {"Successful": [{"Id": "0"}]}
     # Act
     response = lambda_handler(event, lambda_context)
     # Assert
-    assert response is None
+    assert response == {"batchItemFailures": []}
     mock_validate_change_event.assert_called_once_with(change_event)
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
-    mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
-    mock_holding_queue_change_event_item.assert_called_once_with(
-        change_event=change_event,
-        sequence_number=sequence_number,
-        message_received=sqs_timestamp,
-        dynamo_record_id=dynamodb_record,
-        correlation_id="1",
-    )
-    mock_sqs.send_message.assert_called_once_with(
-        QueueUrl=queue_url,
-        MessageBody=dumps(holding_queue_change_event_item),
-        MessageGroupId=change_event["ODSCode"],
-    )
-    # Cleanup
-    del environ["ENV"]
-    del environ["HOLDING_QUEUE_URL"]
+    mock_add_change_events_to_dynamodb.assert_called_once_with([(change_event, 2, SQS_TIMESTAMP)])
+    assert [message["change_event"] for message in sent_messages(mock_sqs)] == [change_event]
 
 
 @patch.object(Logger, "error")
 @patch(f"{FILE_PATH}.sqs")
-@patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
-@patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
-@patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
-@patch(f"{FILE_PATH}.get_sequence_number")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
 @patch(f"{FILE_PATH}.validate_change_event")
-@patch(f"{FILE_PATH}.extract_body")
 def test_lambda_handler_no_sequence_number(
-    mock_extract_body: MagicMock,
     mock_validate_change_event: MagicMock,
-    mock_get_sequence_number: MagicMock,
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
-    mock_add_change_event_to_dynamodb: MagicMock,
-    mock_holding_queue_change_event_item: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
     mock_sqs: MagicMock,
     mock_logger_error: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    event = SQS_EVENT.copy()
-    event["Records"][0]["body"] = dumps(change_event)
-    mock_extract_body.return_value = change_event
-    environ["ENV"] = "test"
-    environ["HOLDING_QUEUE_URL"] = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
-    sqs_timestamp = 1642619743522
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.return_value = 1
-    mock_get_sequence_number.return_value = sequence_number = None
-    mock_add_change_event_to_dynamodb.return_value = "1234567890"
-    mock_holding_queue_change_event_item.return_value = HoldingQueueChangeEventItem(
-        change_event=None,
-        dynamo_record_id=None,
-        correlation_id=None,
-        sequence_number=None,
-        message_received=None,
-    )
+    event = {"Records": [sqs_record(change_event, sequence_number=None)]}
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {change_event["ODSCode"]: 1}
+    mock_add_change_events_to_dynamodb.return_value = [RECORD_ID], set()
     # Act
     response = lambda_handler(event, lambda_context)
     # Assert
-    assert response is None
-    mock_extract_body.assert_called_once_with(dumps(change_event))
+    assert response == {"batchItemFailures": []}
     mock_validate_change_event.assert_called_once_with(change_event)
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
-    mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
-    mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
-    mock_logger_error.assert_called_once_with("No sequence number provided, so message will be ignored.")
-    # Cleanup
-    del environ["ENV"]
-    del environ["HOLDING_QUEUE_URL"]
+    mock_add_change_events_to_dynamodb.assert_called_once_with([(change_event, None, SQS_TIMESTAMP)])
+    mock_sqs.send_message_batch.assert_not_called()
+    mock_logger_error.assert_called_once_with(
+        "No sequence number provided, so message will be ignored.",
+        ods_code=change_event["ODSCode"],
+        dynamo_record_id=RECORD_ID,
+    )
 
 
 @patch.object(Logger, "error")
 @patch(f"{FILE_PATH}.sqs")
-@patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
-@patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
-@patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
-@patch(f"{FILE_PATH}.get_sequence_number")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
 @patch(f"{FILE_PATH}.validate_change_event")
-@patch(f"{FILE_PATH}.extract_body")
 def test_lambda_handler_less_than_latest_sequence_number(
-    mock_extract_body: MagicMock,
     mock_validate_change_event: MagicMock,
-    mock_get_sequence_number: MagicMock,
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
-    mock_add_change_event_to_dynamodb: MagicMock,
-    mock_holding_queue_change_event_item: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
     mock_sqs: MagicMock,
     mock_logger_error: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    event = SQS_EVENT.copy()
-    event["Records"][0]["body"] = dumps(change_event)
-    mock_extract_body.return_value = change_event
-    environ["ENV"] = "test"
-    environ["HOLDING_QUEUE_URL"] = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
-    sqs_timestamp = 1642619743522
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.return_value = db_latest_sequence_number = 2
-    mock_get_sequence_number.return_value = sequence_number = 1
-    mock_add_change_event_to_dynamodb.return_value = "1234567890"
-    mock_holding_queue_change_event_item.return_value = HoldingQueueChangeEventItem(
-        change_event=None,
-        dynamo_record_id=None,
-        correlation_id=None,
-        sequence_number=None,
-        message_received=None,
-    )
+    event = {"Records": [sqs_record(change_event, sequence_number="1")]}
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {change_event["ODSCode"]: 2}
+    mock_add_change_events_to_dynamodb.return_value = [RECORD_ID], set()
     # Act
     response = lambda_handler(event, lambda_context)
     # Assert
-    assert response is None
-    mock_extract_body.assert_called_once_with(dumps(change_event))
+    assert response == {"batchItemFailures": []}
     mock_validate_change_event.assert_called_once_with(change_event)
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
-    mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
-    mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
+    mock_add_change_events_to_dynamodb.assert_called_once_with([(change_event, 1, SQS_TIMESTAMP)])
+    mock_sqs.send_message_batch.assert_not_called()
     mock_logger_error.assert_called_once_with(
         "Sequence id is smaller than the existing one in db for a given odscode, so will be ignored",
-        incoming_sequence_number=sequence_number,
-        db_latest_sequence_number=db_latest_sequence_number,
+        incoming_sequence_number=1,
+        db_latest_sequence_number=2,
+        ods_code=change_event["ODSCode"],
+        dynamo_record_id=RECORD_ID,
     )
-    # Cleanup
-    del environ["ENV"]
-    del environ["HOLDING_QUEUE_URL"]
 
 
 @patch(f"{FILE_PATH}.sqs")
-@patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
-@patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
-@patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
-@patch(f"{FILE_PATH}.get_sequence_number")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
 @patch(f"{FILE_PATH}.validate_change_event")
-@patch(f"{FILE_PATH}.extract_body")
-def test_lambda_handler_mutiple_records(
-    mock_extract_body: MagicMock,
+def test_lambda_handler_multiple_records(
     mock_validate_change_event: MagicMock,
-    mock_get_sequence_number: MagicMock,
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
-    mock_add_change_event_to_dynamodb: MagicMock,
-    mock_holding_queue_change_event_item: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
     mock_sqs: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    event = SQS_EVENT.copy()
-    record = event["Records"][0]
-    records_list = [record, record, record]
-    event["Records"] = records_list
-    mock_extract_body.return_value = change_event
-    environ["ENV"] = "test"
-    environ["HOLDING_QUEUE_URL"] = "https://sqs.eu-west-1.amazonaws.com/000000000000/holding-queue"
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.return_value = 2
-    mock_get_sequence_number.return_value = 1
-    mock_add_change_event_to_dynamodb.return_value = "1234567890"
-    mock_holding_queue_change_event_item.return_value = HoldingQueueChangeEventItem(
-        change_event=None,
-        dynamo_record_id=None,
-        correlation_id=None,
-        sequence_number=None,
-        message_received=None,
+    other_change_event = change_event | {"ODSCode": "FXX99"}
+    event = {
+        "Records": [
+            sqs_record(change_event, message_id="1", sequence_number="3"),
+            sqs_record(other_change_event, message_id="2", sequence_number="5"),
+            # Older than the first change event for the same odscode in the batch
+            sqs_record(change_event, message_id="3", sequence_number="2"),
+            sqs_record(change_event, message_id="4", sequence_number="4"),
+        ],
+    }
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {
+        change_event["ODSCode"]: 1,
+        other_change_event["ODSCode"]: 1,
+    }
+    mock_add_change_events_to_dynamodb.return_value = ["a", "b", "c", "d"], set()
+    mock_sqs.send_message_batch.return_value = {"Successful": []}
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    assert mock_validate_change_event.call_count == 4
+    assert list(mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.call_args.args[0]) == [
+        change_event["ODSCode"],
+        other_change_event["ODSCode"],
+        change_event["ODSCode"],
+        change_event["ODSCode"],
+    ]
+    mock_add_change_events_to_dynamodb.assert_called_once_with(
+        [
+            (change_event, 3, SQS_TIMESTAMP),
+            (other_change_event, 5, SQS_TIMESTAMP),
+            (change_event, 2, SQS_TIMESTAMP),
+            (change_event, 4, SQS_TIMESTAMP),
+        ],
     )
+    mock_sqs.send_message_batch.assert_called_once()
+    assert [(message["dynamo_record_id"], message["sequence_number"]) for message in sent_messages(mock_sqs)] == [
+        ("a", 3),
+        ("b", 5),
+        ("d", 4),
+    ]
+
+
+@patch.object(Logger, "exception")
+@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
+def test_lambda_handler_invalid_change_event(
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
+    mock_sqs: MagicMock,
+    mock_logger_exception: MagicMock,
+    change_event: dict,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    invalid_change_event = change_event | {"ODSCode": "FXX99", "OrganisationTypeId": "invalid"}
+    event = {
+        "Records": [
+            sqs_record(invalid_change_event, message_id="1"),
+            sqs_record(change_event, message_id="2"),
+        ],
+    }
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {change_event["ODSCode"]: 1}
+    mock_add_change_events_to_dynamodb.return_value = [RECORD_ID], set()
+    mock_sqs.send_message_batch.return_value = {"Successful": [{"Id": "0"}]}
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    mock_logger_exception.assert_called_once()
+    mock_add_change_events_to_dynamodb.assert_called_once_with([(change_event, 2, SQS_TIMESTAMP)])
+    assert [message["dynamo_record_id"] for message in sent_messages(mock_sqs)] == [RECORD_ID]
+
+
+@patch.object(Logger, "error")
+@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
+@patch(f"{FILE_PATH}.validate_change_event")
+def test_lambda_handler_partial_failures(
+    mock_validate_change_event: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
+    mock_sqs: MagicMock,
+    mock_logger_error: MagicMock,
+    change_event: dict,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    other_change_event = change_event | {"ODSCode": "FXX99"}
+    event = {
+        "Records": [
+            sqs_record(change_event, message_id="1", sequence_number="2"),
+            sqs_record(other_change_event, message_id="2", sequence_number="2"),
+            sqs_record(change_event, message_id="3", sequence_number="3"),
+            sqs_record(other_change_event, message_id="4", sequence_number="3"),
+        ],
+    }
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {
+        change_event["ODSCode"]: 1,
+        other_change_event["ODSCode"]: 1,
+    }
+    # The first change event couldn't be written to dynamodb, so the later one for the same odscode is failed too
+    mock_add_change_events_to_dynamodb.return_value = ["a", "b", "c", "d"], {"a"}
+    mock_sqs.send_message_batch.return_value = {
+        "Successful": [{"Id": "0"}],
+        "Failed": [{"Id": "1", "SenderFault": False, "Code": "InternalError"}],
+    }
     # Act
-    with pytest.raises(ValueError, match="3 records found in event. Expected 1."):
-        lambda_handler(event, lambda_context)
+    response = lambda_handler(event, lambda_context)
     # Assert
-    mock_extract_body.assert_not_called()
-    mock_validate_change_event.assert_not_called()
-    mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_not_called()
-    mock_add_change_event_to_dynamodb.assert_not_called()
-    mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
-    # Cleanup
-    del environ["ENV"]
-    del environ["HOLDING_QUEUE_URL"]
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "1"}, {"itemIdentifier": "3"}, {"itemIdentifier": "4"}],
+    }
+    assert [message["dynamo_record_id"] for message in sent_messages(mock_sqs)] == ["b", "d"]
+    mock_logger_error.assert_called_once()
+
+
+@patch.object(Logger, "error")
+@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
+@patch(f"{FILE_PATH}.validate_change_event")
+def test_lambda_handler_send_failure_fails_later_change_events_in_message_group(
+    mock_validate_change_event: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
+    mock_sqs: MagicMock,
+    mock_logger_error: MagicMock,
+    change_event: dict,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    other_change_event = change_event | {"ODSCode": "FXX99"}
+    event = {
+        "Records": [
+            sqs_record(change_event, message_id="1", sequence_number="2"),
+            sqs_record(change_event, message_id="2", sequence_number="3"),
+            sqs_record(other_change_event, message_id="3", sequence_number="2"),
+            sqs_record(change_event, message_id="4", sequence_number="4"),
+        ],
+    }
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {
+        change_event["ODSCode"]: 1,
+        other_change_event["ODSCode"]: 1,
+    }
+    mock_add_change_events_to_dynamodb.return_value = ["a", "b", "c", "d"], set()
+    # Only the second change event couldn't be sent
+    mock_sqs.send_message_batch.return_value = {
+        "Successful": [{"Id": "0"}, {"Id": "2"}, {"Id": "3"}],
+        "Failed": [{"Id": "1", "SenderFault": False, "Code": "InternalError"}],
+    }
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": [{"itemIdentifier": "2"}, {"itemIdentifier": "4"}]}
+    mock_logger_error.assert_called_once()
+
+
+@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.add_change_events_to_dynamodb")
+@patch(f"{FILE_PATH}.get_latest_sequence_ids_for_odscodes_from_dynamodb")
+@patch(f"{FILE_PATH}.validate_change_event")
+def test_lambda_handler_sends_in_chunks_of_ten(
+    mock_validate_change_event: MagicMock,
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb: MagicMock,
+    mock_add_change_events_to_dynamodb: MagicMock,
+    mock_sqs: MagicMock,
+    change_event: dict,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    change_events = [change_event | {"ODSCode": f"FXX{i:02}"} for i in range(12)]
+    event = {"Records": [sqs_record(event, message_id=str(i)) for i, event in enumerate(change_events)]}
+    mock_get_latest_sequence_ids_for_odscodes_from_dynamodb.return_value = {
+        event["ODSCode"]: 1 for event in change_events
+    }
+    mock_add_change_events_to_dynamodb.return_value = [str(i) for i in range(12)], set()
+    mock_sqs.send_message_batch.return_value = {"Successful": []}
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    assert [len(call.kwargs["Entries"]) for call in mock_sqs.send_message_batch.call_args_list] == [10, 2]
+    assert [message["dynamo_record_id"] for message in sent_messages(mock_sqs)] == [str(i) for i in range(12)]
 
 
 SQS_EVENT = {
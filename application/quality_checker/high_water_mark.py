@@ -0,0 +1,42 @@
+from datetime import datetime
+from os import environ
+
+from aws_lambda_powertools.logging import Logger
+from boto3 import client
+
+logger = Logger(child=True)
+dynamodb = client("dynamodb", region_name=environ["AWS_REGION"])
+
+HIGH_WATER_MARK_ID = "services-modifiedtime-high-water-mark"
+
+
+def get_high_water_mark() -> datetime | None:
+    """Get the latest DoS services modifiedtime that the quality checker has checked up to.
+
+    Returns:
+        datetime | None: The high water mark, or None if the quality checker hasn't finished a run yet
+    """
+    response = dynamodb.get_item(
+        TableName=environ["QUALITY_CHECKER_STATE_TABLE_NAME"],
+        Key={"Id": {"S": HIGH_WATER_MARK_ID}},
+        ConsistentRead=True,
+    )
+    if "Item" not in response:
+        logger.info("No quality checker high water mark found")
+        return None
+    high_water_mark = datetime.fromisoformat(response["Item"]["ModifiedTime"]["S"])
+    logger.info(f"Quality checker high water mark is {high_water_mark.isoformat()}")
+    return high_water_mark
+
+
+def put_high_water_mark(high_water_mark: datetime) -> None:
+    """Save the latest DoS services modifiedtime that the quality checker has checked up to.
+
+    Args:
+        high_water_mark (datetime): The modifiedtime of the most recently modified service that has been checked
+    """
+    dynamodb.put_item(
+        TableName=environ["QUALITY_CHECKER_STATE_TABLE_NAME"],
+        Item={"Id": {"S": HIGH_WATER_MARK_ID}, "ModifiedTime": {"S": high_water_mark.isoformat()}},
+    )
+    logger.info(f"Saved quality checker high water mark {high_water_mark.isoformat()}")
@@ -1,32 +1,53 @@
+from asyncio import gather, run, to_thread
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
 from os import getenv
+from time import perf_counter
+from typing import Any, TypeVar
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import EventBridgeEvent, event_source
 from aws_lambda_powertools.utilities.typing.lambda_context import LambdaContext
+from psycopg import Connection
 
 from .check_dos import (
     check_for_palliative_care_profiling,
     check_for_zcode_profiling_on_incorrect_type,
     check_pharmacy_profiling,
 )
+from .high_water_mark import get_high_water_mark, put_high_water_mark
+from .search_dos import get_latest_service_modified_time, search_for_modified_pharmacy_odscodes
 from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION
-from common.dos_db_connection import connect_to_db_reader
+from common.dos_db_connection import connect_to_db_reader, connect_to_db_reader_async
 from common.middlewares import unhandled_exception_logging
 
 logger = Logger()
 tracer = Tracer()
 
+INCREMENTAL_MODE = "incremental"
+# Services are rechecked if they were modified shortly before the high water mark, in case the transaction
+# that modified them committed after the previous run read the high water mark
+HIGH_WATER_MARK_OVERLAP = timedelta(minutes=5)
+
+T = TypeVar("T")
+
 
 @tracer.capture_lambda_handler()
 @logger.inject_lambda_context(clear_state=True)
 @unhandled_exception_logging
 @event_source(data_class=EventBridgeEvent)
 def lambda_handler(event: EventBridgeEvent, context: LambdaContext) -> None:  # noqa: ARG001
-    """Lambda handler for quality checker."""
+    """Lambda handler for quality checker.
+
+    The quality checker checks every pharmacy, unless the event's detail has a mode of incremental.
+    """
+    incremental = (event.get("detail") or {}).get("mode") == INCREMENTAL_MODE
     try:
-        logger.info("Quality checker started")
-        check_dos_data_quality()
+        logger.info("Quality checker started", incremental=incremental)
+        check_dos_data_quality(incremental=incremental)
         logger.warning(
             "Quality checker finished",
             environment=getenv("ENVIRONMENT"),
@@ -41,17 +62,149 @@ def lambda_handler(event: EventBridgeEvent, context: LambdaContext) -> None:  #
         raise
 
 
-def check_dos_data_quality() -> None:
-    """Check the data quality of the dos database."""
-    with connect_to_db_reader() as db_connection:
-        # Checks matched odscode services for pharmacy profiling
-        check_pharmacy_profiling(db_connection)
+def get_quality_checks(odscodes: list[str] | None = None) -> dict[str, Callable[[Connection], None]]:
+    """Get the quality checks, which are independent of each other so can be run in any order.
 
-        # Checks matched odscode services for incorrectly profiled palliative care
-        check_for_palliative_care_profiling(db_connection)
+    Args:
+        odscodes (list[str] | None): Pharmacy ODS codes to check, or None to check every pharmacy
 
+    Returns:
+        dict[str, Callable[[Connection], None]]: Quality checks keyed by name
+    """
+    return {
+        # Checks matched odscode services for pharmacy profiling
+        "pharmacy_profiling": partial(check_pharmacy_profiling, odscodes=odscodes),
+        # Checks matched odscode services for incorrectly profiled palliative care
+        "palliative_care_profiling": partial(check_for_palliative_care_profiling, odscodes=odscodes),
         # Checks matched odscode services for incorrectly profiled blood pressure
-        check_for_zcode_profiling_on_incorrect_type(db_connection, BLOOD_PRESSURE)
-
+        "blood_pressure_profiling": partial(
+            check_for_zcode_profiling_on_incorrect_type,
+            service_type=BLOOD_PRESSURE,
+            odscodes=odscodes,
+        ),
         # Checks matched odscode services for incorrectly profiled contraception
-        check_for_zcode_profiling_on_incorrect_type(db_connection, CONTRACEPTION)
+        "contraception_profiling": partial(
+            check_for_zcode_profiling_on_incorrect_type,
+            service_type=CONTRACEPTION,
+            odscodes=odscodes,
+        ),
+    }
+
+
+def check_dos_data_quality(incremental: bool = False) -> None:
+    """Check the data quality of the dos database.
+
+    The checks are run concurrently, each on its own DoS DB reader connection, with at most
+    QUALITY_CHECKER_MAX_CONCURRENCY (default 4) running at once.
+
+    After the checks pass the latest services modifiedtime is saved as the high water mark, so an incremental
+    run only checks the pharmacies with services modified since the previous run. An incremental run without
+    a high water mark checks every pharmacy.
+
+    Args:
+        incremental (bool): Whether to only check pharmacies with services modified since the previous run
+    """
+    latest_modified_time, odscodes = run(get_quality_check_scope(incremental))
+    if odscodes is not None and not odscodes:
+        logger.info("No pharmacies have been modified since the previous run")
+    else:
+        run_quality_checks(get_quality_checks(odscodes))
+    if latest_modified_time is not None:
+        put_high_water_mark(latest_modified_time)
+
+
+async def get_quality_check_scope(incremental: bool) -> tuple[datetime | None, list[str] | None]:
+    """Get the latest services modifiedtime and the pharmacy ODS codes to check.
+
+    The latest modifiedtime is read while the high water mark is fetched and the modified pharmacies are
+    searched for, each on its own async DoS DB reader connection.
+
+    Args:
+        incremental (bool): Whether to only check pharmacies with services modified since the previous run
+
+    Returns:
+        tuple[datetime | None, list[str] | None]: Latest services modifiedtime, and the pharmacy ODS codes to
+            check or None to check every pharmacy
+    """
+    return await gather(
+        search_dos_db(get_latest_service_modified_time),
+        get_modified_pharmacy_odscodes(incremental),
+    )
+
+
+async def get_modified_pharmacy_odscodes(incremental: bool) -> list[str] | None:
+    """Get the pharmacy ODS codes with services modified since the high water mark, less HIGH_WATER_MARK_OVERLAP.
+
+    Args:
+        incremental (bool): Whether to only check pharmacies with services modified since the previous run
+
+    Returns:
+        list[str] | None: Pharmacy ODS codes to check, or None to check every pharmacy
+    """
+    if not incremental:
+        return None
+    high_water_mark = await to_thread(get_high_water_mark)
+    if high_water_mark is None:
+        return None
+    return await search_dos_db(search_for_modified_pharmacy_odscodes, high_water_mark - HIGH_WATER_MARK_OVERLAP)
+
+
+async def search_dos_db(search: Callable[..., Awaitable[T]], *args: Any) -> T:  # noqa: ANN401
+    """Run a DoS DB search on its own async DoS DB reader connection.
+
+    Args:
+        search (Callable[..., Awaitable[T]]): Search to run, taking the connection as its first argument
+        *args (Any): Other arguments for the search
+
+    Returns:
+        T: Result of the search
+    """
+    async with connect_to_db_reader_async() as db_connection:
+        return await search(db_connection, *args)
+
+
+def run_quality_checks(quality_checks: dict[str, Callable[[Connection], None]]) -> None:
+    """Run quality checks concurrently, raising the first error once every check has finished.
+
+    Args:
+        quality_checks (dict[str, Callable[[Connection], None]]): Quality checks keyed by name
+    """
+    max_concurrency = int(getenv("QUALITY_CHECKER_MAX_CONCURRENCY", "4"))
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(quality_checks), max_concurrency))) as executor:
+        futures = [
+            executor.submit(run_quality_check, check_name, quality_check)
+            for check_name, quality_check in quality_checks.items()
+        ]
+    # Every check has finished by now, so raise the first error from any of them
+    for future in futures:
+        future.result()
+    logger.info(
+        f"Quality checks finished in {perf_counter() - start:.3f}s",
+        max_concurrency=max_concurrency,
+    )
+
+
+def run_quality_check(check_name: str, quality_check: Callable[[Connection], None]) -> None:
+    """Run a quality check on its own DoS DB reader connection and log how long it took.
+
+    Args:
+        check_name (str): Name of the quality check
+        quality_check (Callable[[Connection], None]): Quality check to run
+    """
+    start = perf_counter()
+    with connect_to_db_reader() as db_connection:
+        try:
+            quality_check(db_connection)
+        except Exception:
+            logger.exception(
+                f"Quality check {check_name} errored after {perf_counter() - start:.3f}s",
+                quality_check=check_name,
+            )
+            raise
+    duration = perf_counter() - start
+    logger.info(
+        f"Quality check {check_name} finished in {duration:.3f}s",
+        quality_check=check_name,
+        duration_ms=round(duration * 1000),
+    )
@@ -1,8 +1,11 @@
+from collections.abc import Iterable
+from itertools import islice
 from os import getenv
 
 from aws_lambda_powertools.logging import Logger
+from psycopg import Connection
 
-from common.dos import DoSService
+from common.dos import DoSService, get_regions
 
 QUALITY_CHECK_REPORT_KEY = "QUALITY_CHECK_REPORT_KEY"
 
@@ -10,30 +13,48 @@ logger = Logger(child=True)
 
 
 def log_to_quality_check_report(
-    matched_services: list[DoSService],
+    connection: Connection,
+    matched_services: Iterable[DoSService],
     reason: str,
     z_code: str = "",
-) -> None:
-    """Log a service to the quality check report.
+) -> int:
+    """Log services to the quality check report.
+
+    The services are reported in batches as they are read, so they can be streamed from the DoS DB.
+    The regions of each batch of services are resolved with a single query on the quality checker's connection.
 
     Args:
-        matched_services (list[DoSService]): The DoS service to report
+        connection (Connection): Connection to the DoS DB.
+        matched_services (Iterable[DoSService]): The DoS services to report
         reason (str): The reason for the report
         z_code (str): The z-code for the report
+
+    Returns:
+        int: The number of services reported
     """
-    for service in matched_services:
-        logger.warning(
-            reason,
-            report_key=QUALITY_CHECK_REPORT_KEY,
-            dos_service_uid=service.uid,
-            dos_service_odscode=service.odscode,
-            dos_service_name=service.name,
-            dos_service_type_name=service.service_type_name,
-            dos_service_type_id=service.typeid,
-            dos_region=service.get_region(),
-            z_code=z_code,
-            reason=reason,
-            odscode=service.odscode[:5],
-            environment=getenv("ENVIRONMENT"),
-            cloudwatch_metric_filter_matching_attribute="QualityCheckerIssueFound",
-        )
+    batch_size = int(getenv("QUALITY_CHECK_REPORT_BATCH_SIZE", "1000"))
+    services = iter(matched_services)
+    reported_count = 0
+    while batch := list(islice(services, batch_size)):
+        if services_without_region := [service for service in batch if not service.region]:
+            regions = get_regions((service.id for service in services_without_region), connection)
+            for service in services_without_region:
+                service.region = regions[int(service.id)]
+        for service in batch:
+            logger.warning(
+                reason,
+                report_key=QUALITY_CHECK_REPORT_KEY,
+                dos_service_uid=service.uid,
+                dos_service_odscode=service.odscode,
+                dos_service_name=service.name,
+                dos_service_type_name=service.service_type_name,
+                dos_service_type_id=service.typeid,
+                dos_region=service.get_region(),
+                z_code=z_code,
+                reason=reason,
+                odscode=service.odscode[:5],
+                environment=getenv("ENVIRONMENT"),
+                cloudwatch_metric_filter_matching_attribute="QualityCheckerIssueFound",
+            )
+        reported_count += len(batch)
+    return reported_count
@@ -1,91 +1,100 @@
+from collections.abc import Generator
+from datetime import datetime
+from itertools import groupby
 from os import getenv
 
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection
+from psycopg import AsyncConnection, Connection
 
 from common.commissioned_service_type import CommissionedServiceType
 from common.constants import DOS_ACTIVE_STATUS_ID, PHARMACY_SERVICE_TYPE_IDS
 from common.dos import DoSService
-from common.dos_db_connection import query_dos_db
+from common.dos_db_connection import query_dos_db_async, stream_dos_db
 
 logger = Logger(child=True)
 
 
-def search_for_pharmacy_ods_codes(connection: Connection) -> set[str]:
-    """Search for pharmacy ODS codes in DoS DB.
+def search_for_pharmacies_with_multiple_of_service_types(
+    connection: Connection,
+    service_types: list[CommissionedServiceType],
+    odscodes: list[str] | None = None,
+) -> Generator[tuple[str, list[DoSService]], None, None]:
+    """Search for pharmacy ODS codes in DoS DB with more than one active service of any of the service types.
+
+    The pharmacy ODS codes are the first 5 characters of the ODS codes of active pharmacy services, and the
+    services for an ODS code are the active pharmacy services with an ODS code starting with it. Every ODS code
+    is checked with a single grouped query, which is streamed so only one ODS code's services are held at a time.
 
     Args:
         connection (Connection): Connection to the DoS DB.
+        service_types (list[CommissionedServiceType]): Service types to check for.
+        odscodes (list[str] | None): Pharmacy ODS codes to search, or None to search every pharmacy.
 
-    Returns:
-        set[str]: Unique set of pharmacy ODS codes.
+    Yields:
+        Generator[tuple[str, list[DoSService]], None, None]: Pharmacy ODS code and its duplicated services.
     """
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
-    cursor = query_dos_db(
+    rows = stream_dos_db(
         connection,
-        "SELECT LEFT(odscode, 5) FROM services s WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
-        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        "WITH pharmacy_odscodes AS (SELECT DISTINCT LEFT(odscode, 5) odscode FROM services s "
+        "WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s "
+        "AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s) "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(odscode, 5) = ANY(%(ODSCODES)s))), "
+        # Match on the first 5 characters of the ODS code with an equality join so the services can be hash joined,
+        # and match ODS codes shorter than 5 characters on any ODS code starting with them
+        "matched_services AS (SELECT po.odscode pharmacy_odscode, s.id, s.typeid FROM services s "
+        "INNER JOIN pharmacy_odscodes po ON LEFT(s.odscode, 5) = po.odscode "
+        "WHERE s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
+        "UNION ALL SELECT po.odscode pharmacy_odscode, s.id, s.typeid FROM services s "
+        "INNER JOIN pharmacy_odscodes po ON LENGTH(po.odscode) < 5 AND s.odscode LIKE po.odscode || '%%' "
+        "AND LEFT(s.odscode, 5) <> po.odscode "
+        "WHERE s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s)), "
+        "multiple_of_service_type AS (SELECT pharmacy_odscode, typeid FROM matched_services "
+        "GROUP BY pharmacy_odscode, typeid HAVING COUNT(*) > 1) "
+        "SELECT ms.pharmacy_odscode, s.id, uid, s.name, odscode, address, postcode, web, s.typeid,"
+        "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
+        "FROM matched_services ms INNER JOIN multiple_of_service_type mst "
+        "ON ms.pharmacy_odscode = mst.pharmacy_odscode AND ms.typeid = mst.typeid "
+        "INNER JOIN services s ON ms.id = s.id LEFT JOIN servicetypes st ON s.typeid = st.id "
+        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+        "ORDER BY ms.pharmacy_odscode, s.typeid, s.id",
         {
             "PHARMACY_SERVICE_TYPE_IDS": PHARMACY_SERVICE_TYPE_IDS,
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "ODSCODE_STARTING_CHARACTER_CAPITALISED": starting_character.upper(),
             "ODSCODE_STARTING_CHARACTER": starting_character.lower(),
+            "SERVICE_TYPE_IDS": [service_type.DOS_TYPE_ID for service_type in service_types],
+            "ODSCODES": odscodes,
         },
+        cursor_name="pharmacies_with_multiple_of_service_types",
     )
-    odscodes = {odscode_row["left"] for odscode_row in cursor.fetchall()}
-    cursor.close()
-    logger.info(f"Found {len(odscodes)} pharmacy ODS codes.", odscodes=odscodes)
-    return odscodes
-
-
-def search_for_matching_services(connection: Connection, odscode: str) -> list[DoSService]:
-    """Search for matching services in DoS DB using odscode.
-
-    Args:
-        connection (Connection): Connection to the DoS DB.
-        odscode (str): Search for matching services using this odscode.
-
-    Returns:
-        list[DoSService]: List of matching services.
-    """
-    cursor = query_dos_db(
-        connection,
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,"
-        "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
-        "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
-        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "WHERE s.odscode LIKE %(ODSCODE)s AND s.statusid = %(ACTIVE_STATUS_ID)s "
-        "AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s)",
-        {
-            "ODSCODE": f"{odscode}%",
-            "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
-            "PHARMACY_SERVICE_TYPE_IDS": PHARMACY_SERVICE_TYPE_IDS,
-        },
-    )
-    services = [DoSService(row) for row in cursor.fetchall()]
-    cursor.close()
-    logger.info(f"Found {len(services)} active matching services.", services=services)
-    return services
+    odscode_count = 0
+    for odscode, odscode_rows in groupby(rows, key=lambda row: row.pop("pharmacy_odscode")):
+        odscode_count += 1
+        yield odscode, [DoSService(row) for row in odscode_rows]
+    logger.info(f"Found {odscode_count} pharmacy ODS codes with multiple active services of the same type.")
 
 
 def search_for_incorrectly_profiled_z_code_on_incorrect_type(
     connection: Connection,
     service_type: CommissionedServiceType,
-) -> list[DoSService]:
-    """Search for incorrectly profiled services in DoS DB on wrong service type.
+    odscodes: list[str] | None = None,
+) -> Generator[DoSService, None, None]:
+    """Search for incorrectly profiled services in DoS DB on wrong service type, streaming the services found.
 
     Args:
         connection (Connection): Connection to the DoS DB.
         service_type (CommissionedServiceType): Service type to check for.
+        odscodes (list[str] | None): Pharmacy ODS codes to search, or None to search every pharmacy.
 
-    Returns:
-        list[DoSService]: List of matching services.
+    Yields:
+        Generator[DoSService, None, None]: Matching services.
     """
     matchable_service_types = PHARMACY_SERVICE_TYPE_IDS.copy()
     matchable_service_types.remove(service_type.DOS_TYPE_ID)
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
-    cursor = query_dos_db(
+    rows = stream_dos_db(
         connection,
         "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
         "publicphone, publicname, st.name service_type_name "
@@ -94,7 +103,8 @@ def search_for_incorrectly_profiled_z_code_on_incorrect_type(
         "LEFT JOIN servicesgsds sgsds on s.id = sgsds.serviceid "
         "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
         "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
-        "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s) "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(s.odscode, 5) = ANY(%(ODSCODES)s))",
         {
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "SERVICE_TYPE_IDS": matchable_service_types,
@@ -102,33 +112,37 @@ def search_for_incorrectly_profiled_z_code_on_incorrect_type(
             "SYMPTOM_DISCRIMINATOR": service_type.DOS_SYMPTOM_DISCRIMINATOR,
             "ODSCODE_STARTING_CHARACTER_CAPITALISED": starting_character.upper(),
             "ODSCODE_STARTING_CHARACTER": starting_character.lower(),
+            "ODSCODES": odscodes,
         },
+        cursor_name="incorrectly_profiled_z_code_on_incorrect_type",
     )
-    services = [DoSService(row) for row in cursor.fetchall()]
-    cursor.close()
+    service_count = 0
+    for row in rows:
+        service_count += 1
+        yield DoSService(row)
     logger.info(
-        f"Found {len(services)} {service_type.TYPE_NAME} active offending services on incorrect type .",
+        f"Found {service_count} {service_type.TYPE_NAME} active offending services on incorrect type .",
         matchable_service_types=matchable_service_types,
-        services=services,
     )
-    return services
 
 
 def search_for_incorrectly_profiled_z_code_on_correct_type(
     connection: Connection,
     service_type: CommissionedServiceType,
-) -> list[DoSService]:
-    """Search for incorrectly profiled services in DoS DB on correct service type.
+    odscodes: list[str] | None = None,
+) -> Generator[DoSService, None, None]:
+    """Search for incorrectly profiled services in DoS DB on correct service type, streaming the services found.
 
     Args:
         connection (Connection): Connection to the DoS DB.
         service_type (CommissionedServiceType): Service type to check for.
+        odscodes (list[str] | None): Pharmacy ODS codes to search, or None to search every pharmacy.
 
-    Returns:
-        list[DoSService]: List of matching services.
+    Yields:
+        Generator[DoSService, None, None]: Matching services.
     """
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
-    cursor = query_dos_db(
+    rows = stream_dos_db(
         connection,
         "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
         "publicphone, publicname, st.name service_type_name "
@@ -138,7 +152,8 @@ def search_for_incorrectly_profiled_z_code_on_correct_type(
         "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
         "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
         "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)"
-        "AND LENGTH(s.odscode) > 5",
+        "AND LENGTH(s.odscode) > 5 "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(s.odscode, 5) = ANY(%(ODSCODES)s))",
         {
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "SERVICE_TYPE_IDS": [service_type.DOS_TYPE_ID],
@@ -146,9 +161,59 @@ def search_for_incorrectly_profiled_z_code_on_correct_type(
             "SYMPTOM_DISCRIMINATOR": service_type.DOS_SYMPTOM_DISCRIMINATOR,
             "ODSCODE_STARTING_CHARACTER_CAPITALISED": starting_character.upper(),
             "ODSCODE_STARTING_CHARACTER": starting_character.lower(),
+            "ODSCODES": odscodes,
         },
+        cursor_name="incorrectly_profiled_z_code_on_correct_type",
     )
-    services = [DoSService(row) for row in cursor.fetchall()]
-    cursor.close()
-    logger.info(f"Found {len(services)} active offending services on correct type.", services=services)
-    return services
+    service_count = 0
+    for row in rows:
+        service_count += 1
+        yield DoSService(row)
+    logger.info(f"Found {service_count} active offending services on correct type.")
+
+
+async def get_latest_service_modified_time(connection: AsyncConnection) -> datetime | None:
+    """Get the modifiedtime of the most recently modified service in DoS DB.
+
+    Args:
+        connection (AsyncConnection): Connection to the DoS DB.
+
+    Returns:
+        datetime | None: The latest modifiedtime, or None if no services have one.
+    """
+    cursor = await query_dos_db_async(connection, "SELECT MAX(modifiedtime) latest_modified_time FROM services")
+    latest_modified_time = (await cursor.fetchone())["latest_modified_time"]
+    await cursor.close()
+    return latest_modified_time
+
+
+async def search_for_modified_pharmacy_odscodes(connection: AsyncConnection, modified_after: datetime) -> list[str]:
+    """Search for pharmacy ODS codes in DoS DB with services modified after a given time.
+
+    Services of any type and status are included, so a pharmacy is rechecked when one of its services
+    is closed or changes type. Changes to a service's symptom groups and discriminators through DoS also
+    update the service's modifiedtime.
+
+    Args:
+        connection (AsyncConnection): Connection to the DoS DB.
+        modified_after (datetime): Time to find services modified after.
+
+    Returns:
+        list[str]: Pharmacy ODS codes (the first 5 characters of the ODS codes) of the modified services.
+    """
+    starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
+    cursor = await query_dos_db_async(
+        connection,
+        "SELECT DISTINCT LEFT(odscode, 5) odscode FROM services WHERE modifiedtime > %(MODIFIED_AFTER)s "
+        "AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        {
+            "MODIFIED_AFTER": modified_after,
+            "ODSCODE_STARTING_CHARACTER_CAPITALISED": starting_character.upper(),
+            "ODSCODE_STARTING_CHARACTER": starting_character.lower(),
+        },
+    )
+    odscodes = [row["odscode"] for row in await cursor.fetchall()]
+    await cursor.close()
+    logger.info(f"Found {len(odscodes)} pharmacy ODS codes with services modified after {modified_after}.")
+    return odscodes
@@ -2,39 +2,57 @@ from unittest.mock import MagicMock, call, patch
 
 from application.quality_checker.check_dos import (
     check_for_multiple_of_service_type,
+    check_for_palliative_care_profiling,
     check_for_zcode_profiling_on_incorrect_type,
     check_pharmacy_profiling,
 )
-from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION
+from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION, PALLIATIVE_CARE
 
 FILE_PATH = "application.quality_checker.check_dos"
 
 
 @patch(f"{FILE_PATH}.check_for_multiple_of_service_type")
-@patch(f"{FILE_PATH}.search_for_matching_services")
-@patch(f"{FILE_PATH}.search_for_pharmacy_ods_codes")
+@patch(f"{FILE_PATH}.search_for_pharmacies_with_multiple_of_service_types")
 def test_check_pharmacy_profiling(
-    mock_search_for_pharmacy_ods_codes: MagicMock,
-    mock_search_for_matching_services: MagicMock,
+    mock_search_for_pharmacies_with_multiple_of_service_types: MagicMock,
     mock_check_for_multiple_of_service_type: MagicMock,
 ) -> None:
     # Arrange
     connection = MagicMock()
-    odscode = "ABC123"
-    mock_search_for_pharmacy_ods_codes.return_value = [odscode]
+    odscode = "ABC12"
+    matched_services = [MagicMock(), MagicMock()]
+    mock_search_for_pharmacies_with_multiple_of_service_types.return_value = iter([(odscode, matched_services)])
     # Act
     check_pharmacy_profiling(connection)
     # Assert
-    mock_search_for_pharmacy_ods_codes.assert_called_once_with(connection)
-    mock_search_for_matching_services.assert_called_once_with(connection, odscode)
+    mock_search_for_pharmacies_with_multiple_of_service_types.assert_called_once_with(
+        connection,
+        [BLOOD_PRESSURE, CONTRACEPTION],
+        None,
+    )
     mock_check_for_multiple_of_service_type.assert_has_calls(
         calls=[
-            call(mock_search_for_matching_services.return_value, BLOOD_PRESSURE),
-            call(mock_search_for_matching_services.return_value, CONTRACEPTION),
+            call(connection, matched_services, BLOOD_PRESSURE),
+            call(connection, matched_services, CONTRACEPTION),
         ],
     )
 
 
+@patch(f"{FILE_PATH}.check_for_multiple_of_service_type")
+@patch(f"{FILE_PATH}.search_for_pharmacies_with_multiple_of_service_types")
+def test_check_pharmacy_profiling_no_matches(
+    mock_search_for_pharmacies_with_multiple_of_service_types: MagicMock,
+    mock_check_for_multiple_of_service_type: MagicMock,
+) -> None:
+    # Arrange
+    connection = MagicMock()
+    mock_search_for_pharmacies_with_multiple_of_service_types.return_value = iter([])
+    # Act
+    check_pharmacy_profiling(connection)
+    # Assert
+    mock_check_for_multiple_of_service_type.assert_not_called()
+
+
 @patch(f"{FILE_PATH}.log_to_quality_check_report")
 @patch(f"{FILE_PATH}.search_for_incorrectly_profiled_z_code_on_incorrect_type")
 def test_check_for_zcode_profiling_on_incorrect_type(
@@ -49,8 +67,13 @@ def test_check_for_zcode_profiling_on_incorrect_type(
     # Act
     check_for_zcode_profiling_on_incorrect_type(connection, BLOOD_PRESSURE)
     # Assert
-    mock_search_for_incorrectly_profiled_z_code_on_incorrect_type.assert_called_once_with(connection, BLOOD_PRESSURE)
+    mock_search_for_incorrectly_profiled_z_code_on_incorrect_type.assert_called_once_with(
+        connection,
+        BLOOD_PRESSURE,
+        None,
+    )
     mock_log_to_quality_check_report.assert_called_once_with(
+        connection,
         matched_services,
         "Blood Pressure ZCode is on invalid service type",
         BLOOD_PRESSURE.DOS_SG_SD_ID,
@@ -58,20 +81,32 @@ def test_check_for_zcode_profiling_on_incorrect_type(
 
 
 @patch(f"{FILE_PATH}.log_to_quality_check_report")
-@patch(f"{FILE_PATH}.search_for_incorrectly_profiled_z_code_on_incorrect_type")
-def test_check_for_zcode_profiling_on_incorrect_type_no_matches(
-    mock_search_for_incorrectly_profiled_z_code_on_incorrect_type: MagicMock,
+@patch(f"{FILE_PATH}.search_for_incorrectly_profiled_z_code_on_correct_type")
+@patch(f"{FILE_PATH}.check_for_zcode_profiling_on_incorrect_type")
+def test_check_for_palliative_care_profiling(
+    mock_check_for_zcode_profiling_on_incorrect_type: MagicMock,
+    mock_search_for_incorrectly_profiled_z_code_on_correct_type: MagicMock,
     mock_log_to_quality_check_report: MagicMock,
 ) -> None:
     # Arrange
     connection = MagicMock()
-    matched_services = []
-    mock_search_for_incorrectly_profiled_z_code_on_incorrect_type.return_value = matched_services
+    mock_log_to_quality_check_report.return_value = 0
+    odscodes = ["FA123", "FB456"]
     # Act
-    check_for_zcode_profiling_on_incorrect_type(connection, BLOOD_PRESSURE)
+    check_for_palliative_care_profiling(connection, odscodes)
     # Assert
-    mock_search_for_incorrectly_profiled_z_code_on_incorrect_type.assert_called_once_with(connection, BLOOD_PRESSURE)
-    mock_log_to_quality_check_report.assert_not_called()
+    mock_check_for_zcode_profiling_on_incorrect_type.assert_called_once_with(connection, PALLIATIVE_CARE, odscodes)
+    mock_search_for_incorrectly_profiled_z_code_on_correct_type.assert_called_once_with(
+        connection,
+        PALLIATIVE_CARE,
+        odscodes,
+    )
+    mock_log_to_quality_check_report.assert_called_once_with(
+        connection,
+        mock_search_for_incorrectly_profiled_z_code_on_correct_type.return_value,
+        "Palliative Care ZCode is on the correct service type, but the service is incorrectly profiled",
+        PALLIATIVE_CARE.DOS_SG_SD_ID,
+    )
 
 
 @patch(f"{FILE_PATH}.log_to_quality_check_report")
@@ -85,10 +120,12 @@ def test_check_for_multiple_of_service_type(mock_log_to_quality_check_report: Ma
         MagicMock(typeid=CONTRACEPTION.DOS_TYPE_ID),
     ]
     matched_services = to_be_matched_services + not_to_be_matched_services
+    connection = MagicMock()
     # Act
-    check_for_multiple_of_service_type(matched_services, BLOOD_PRESSURE)
+    check_for_multiple_of_service_type(connection, matched_services, BLOOD_PRESSURE)
     # Assert
     mock_log_to_quality_check_report.assert_called_once_with(
+        connection,
         to_be_matched_services,
         "Multiple 'Pharmacy' type services found (type 148)",
     )
@@ -100,7 +137,8 @@ def test_check_for_multiple_of_service_type_no_matches(mock_log_to_quality_check
     not_to_be_matched_services = [
         MagicMock(typeid=CONTRACEPTION.DOS_TYPE_ID),
     ]
+    connection = MagicMock()
     # Act
-    check_for_multiple_of_service_type(not_to_be_matched_services, BLOOD_PRESSURE)
+    check_for_multiple_of_service_type(connection, not_to_be_matched_services, BLOOD_PRESSURE)
     # Assert
     mock_log_to_quality_check_report.assert_not_called()
@@ -0,0 +1,43 @@
+from collections.abc import Generator
+from datetime import datetime
+from os import environ
+from unittest.mock import patch
+
+import pytest
+
+from application.quality_checker.high_water_mark import get_high_water_mark, put_high_water_mark
+
+FILE_PATH = "application.quality_checker.high_water_mark"
+
+
+@pytest.fixture()
+def _quality_checker_state_table(dynamodb_client: object) -> Generator[None, None, None]:
+    environ["QUALITY_CHECKER_STATE_TABLE_NAME"] = "QUALITY_CHECKER_STATE_TABLE"
+    dynamodb_client.create_table(
+        TableName=environ["QUALITY_CHECKER_STATE_TABLE_NAME"],
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[{"AttributeName": "Id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "Id", "AttributeType": "S"}],
+    )
+    with patch(f"{FILE_PATH}.dynamodb", dynamodb_client):
+        yield
+    del environ["QUALITY_CHECKER_STATE_TABLE_NAME"]
+
+
+@pytest.mark.usefixtures("_quality_checker_state_table")
+def test_get_high_water_mark_not_set() -> None:
+    # Act
+    high_water_mark = get_high_water_mark()
+    # Assert
+    assert high_water_mark is None
+
+
+@pytest.mark.usefixtures("_quality_checker_state_table")
+def test_put_high_water_mark() -> None:
+    # Arrange
+    high_water_mark = datetime(2024, 3, 13, 10, 37, 7, 123456)
+    # Act
+    put_high_water_mark(high_water_mark)
+    put_high_water_mark(high_water_mark.replace(minute=45))
+    # Assert
+    assert get_high_water_mark() == datetime(2024, 3, 13, 10, 45, 7, 123456)
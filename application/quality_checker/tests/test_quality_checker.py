@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from datetime import datetime
+from os import environ
+from threading import Barrier
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -7,6 +10,8 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from application.quality_checker.quality_checker import (
     check_dos_data_quality,
     lambda_handler,
+    run_quality_check,
+    run_quality_checks,
 )
 from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION
 
@@ -37,28 +42,208 @@ def test_lambda_handler(
     # Act
     lambda_handler(event, lambda_context)
     # Assert
-    mock_check_dos_data_quality.assert_called_once_with()
+    mock_check_dos_data_quality.assert_called_once_with(incremental=False)
 
 
+@patch(f"{FILE_PATH}.check_dos_data_quality")
+def test_lambda_handler_incremental(
+    mock_check_dos_data_quality: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    event = {"detail-type": "Scheduled Event", "source": "aws.events", "detail": {"mode": "incremental"}}
+    # Act
+    lambda_handler(event, lambda_context)
+    # Assert
+    mock_check_dos_data_quality.assert_called_once_with(incremental=True)
+
+
+@patch(f"{FILE_PATH}.put_high_water_mark")
+@patch(f"{FILE_PATH}.get_high_water_mark")
+@patch(f"{FILE_PATH}.get_latest_service_modified_time")
 @patch(f"{FILE_PATH}.check_for_zcode_profiling_on_incorrect_type")
+@patch(f"{FILE_PATH}.check_for_palliative_care_profiling")
 @patch(f"{FILE_PATH}.check_pharmacy_profiling")
+@patch(f"{FILE_PATH}.connect_to_db_reader_async")
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 def test_check_dos_data_quality(
     mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_reader_async: MagicMock,
     mock_check_pharmacy_profiling: MagicMock,
+    mock_check_for_palliative_care_profiling: MagicMock,
     mock_check_for_zcode_profiling_on_incorrect_type: MagicMock,
+    mock_get_latest_service_modified_time: MagicMock,
+    mock_get_high_water_mark: MagicMock,
+    mock_put_high_water_mark: MagicMock,
 ) -> None:
     # Arrange
+    db_connection = mock_connect_to_db_reader.return_value.__enter__.return_value
+    async_db_connection = mock_connect_to_db_reader_async.return_value.__aenter__.return_value
     # Act
     check_dos_data_quality()
     # Assert
-    mock_connect_to_db_reader.assert_called_once_with()
-    mock_check_pharmacy_profiling.assert_called_once_with(
-        mock_connect_to_db_reader().__enter__(),
-    )
+    assert mock_connect_to_db_reader.call_count == 4
+    mock_connect_to_db_reader_async.assert_called_once_with()
+    mock_get_latest_service_modified_time.assert_awaited_once_with(async_db_connection)
+    mock_get_high_water_mark.assert_not_called()
+    mock_check_pharmacy_profiling.assert_called_once_with(db_connection, odscodes=None)
+    mock_check_for_palliative_care_profiling.assert_called_once_with(db_connection, odscodes=None)
     mock_check_for_zcode_profiling_on_incorrect_type.assert_has_calls(
         calls=[
-            call(mock_connect_to_db_reader().__enter__(), BLOOD_PRESSURE),
-            call(mock_connect_to_db_reader().__enter__(), CONTRACEPTION),
+            call(db_connection, service_type=BLOOD_PRESSURE, odscodes=None),
+            call(db_connection, service_type=CONTRACEPTION, odscodes=None),
         ],
+        any_order=True,
+    )
+    mock_put_high_water_mark.assert_called_once_with(mock_get_latest_service_modified_time.return_value)
+
+
+@patch(f"{FILE_PATH}.put_high_water_mark")
+@patch(f"{FILE_PATH}.get_high_water_mark")
+@patch(f"{FILE_PATH}.search_for_modified_pharmacy_odscodes")
+@patch(f"{FILE_PATH}.get_latest_service_modified_time")
+@patch(f"{FILE_PATH}.run_quality_checks")
+@patch(f"{FILE_PATH}.get_quality_checks")
+@patch(f"{FILE_PATH}.connect_to_db_reader_async")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_check_dos_data_quality_incremental(
+    mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_reader_async: MagicMock,
+    mock_get_quality_checks: MagicMock,
+    mock_run_quality_checks: MagicMock,
+    mock_get_latest_service_modified_time: MagicMock,
+    mock_search_for_modified_pharmacy_odscodes: MagicMock,
+    mock_get_high_water_mark: MagicMock,
+    mock_put_high_water_mark: MagicMock,
+) -> None:
+    # Arrange
+    async_db_connection = mock_connect_to_db_reader_async.return_value.__aenter__.return_value
+    mock_get_high_water_mark.return_value = datetime(2024, 3, 13, 10, 37, 7)
+    mock_search_for_modified_pharmacy_odscodes.return_value = ["FA123"]
+    # Act
+    check_dos_data_quality(incremental=True)
+    # Assert
+    assert mock_connect_to_db_reader_async.call_count == 2
+    mock_get_latest_service_modified_time.assert_awaited_once_with(async_db_connection)
+    mock_search_for_modified_pharmacy_odscodes.assert_awaited_once_with(
+        async_db_connection,
+        datetime(2024, 3, 13, 10, 32, 7),
     )
+    mock_get_quality_checks.assert_called_once_with(["FA123"])
+    mock_run_quality_checks.assert_called_once_with(mock_get_quality_checks.return_value)
+    mock_put_high_water_mark.assert_called_once_with(mock_get_latest_service_modified_time.return_value)
+
+
+@patch(f"{FILE_PATH}.put_high_water_mark")
+@patch(f"{FILE_PATH}.get_high_water_mark")
+@patch(f"{FILE_PATH}.search_for_modified_pharmacy_odscodes")
+@patch(f"{FILE_PATH}.get_latest_service_modified_time")
+@patch(f"{FILE_PATH}.run_quality_checks")
+@patch(f"{FILE_PATH}.connect_to_db_reader_async")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_check_dos_data_quality_incremental_no_modified_pharmacies(
+    mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_reader_async: MagicMock,
+    mock_run_quality_checks: MagicMock,
+    mock_get_latest_service_modified_time: MagicMock,
+    mock_search_for_modified_pharmacy_odscodes: MagicMock,
+    mock_get_high_water_mark: MagicMock,
+    mock_put_high_water_mark: MagicMock,
+) -> None:
+    # Arrange
+    mock_search_for_modified_pharmacy_odscodes.return_value = []
+    # Act
+    check_dos_data_quality(incremental=True)
+    # Assert
+    mock_run_quality_checks.assert_not_called()
+    mock_put_high_water_mark.assert_called_once_with(mock_get_latest_service_modified_time.return_value)
+
+
+@patch(f"{FILE_PATH}.put_high_water_mark")
+@patch(f"{FILE_PATH}.get_high_water_mark")
+@patch(f"{FILE_PATH}.search_for_modified_pharmacy_odscodes")
+@patch(f"{FILE_PATH}.get_latest_service_modified_time")
+@patch(f"{FILE_PATH}.run_quality_checks")
+@patch(f"{FILE_PATH}.get_quality_checks")
+@patch(f"{FILE_PATH}.connect_to_db_reader_async")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_check_dos_data_quality_incremental_without_high_water_mark(
+    mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_reader_async: MagicMock,
+    mock_get_quality_checks: MagicMock,
+    mock_run_quality_checks: MagicMock,
+    mock_get_latest_service_modified_time: MagicMock,
+    mock_search_for_modified_pharmacy_odscodes: MagicMock,
+    mock_get_high_water_mark: MagicMock,
+    mock_put_high_water_mark: MagicMock,
+) -> None:
+    # Arrange
+    mock_get_high_water_mark.return_value = None
+    # Act
+    check_dos_data_quality(incremental=True)
+    # Assert
+    mock_search_for_modified_pharmacy_odscodes.assert_not_called()
+    mock_get_quality_checks.assert_called_once_with(None)
+    mock_run_quality_checks.assert_called_once_with(mock_get_quality_checks.return_value)
+    mock_put_high_water_mark.assert_called_once_with(mock_get_latest_service_modified_time.return_value)
+
+
+@patch(f"{FILE_PATH}.put_high_water_mark")
+@patch(f"{FILE_PATH}.get_latest_service_modified_time")
+@patch(f"{FILE_PATH}.run_quality_checks")
+@patch(f"{FILE_PATH}.connect_to_db_reader_async")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_check_dos_data_quality_does_not_save_high_water_mark_on_error(
+    mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_reader_async: MagicMock,
+    mock_run_quality_checks: MagicMock,
+    mock_get_latest_service_modified_time: MagicMock,
+    mock_put_high_water_mark: MagicMock,
+) -> None:
+    # Arrange
+    mock_run_quality_checks.side_effect = ValueError("Check failed")
+    # Act & Assert
+    with pytest.raises(ValueError, match="Check failed"):
+        check_dos_data_quality()
+    mock_put_high_water_mark.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_run_quality_checks_concurrently(mock_connect_to_db_reader: MagicMock) -> None:
+    # Arrange
+    environ["QUALITY_CHECKER_MAX_CONCURRENCY"] = "2"
+    # Each check waits for the other, so they only finish if they run at the same time
+    barrier = Barrier(2, timeout=5)
+    quality_checks = {"first": lambda _: barrier.wait(), "second": lambda _: barrier.wait()}
+    # Act
+    run_quality_checks(quality_checks)
+    # Assert
+    assert mock_connect_to_db_reader.call_count == 2
+    # Clean up
+    del environ["QUALITY_CHECKER_MAX_CONCURRENCY"]
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_run_quality_checks_raises_error_after_all_checks_finish(mock_connect_to_db_reader: MagicMock) -> None:
+    # Arrange
+    # Set up the connection before the checks run, as mocks aren't thread safe when creating their return values
+    db_connection = mock_connect_to_db_reader.return_value.__enter__.return_value
+    failing_check = MagicMock(side_effect=ValueError("Check failed"))
+    other_check = MagicMock()
+    quality_checks = {"failing": failing_check, "other": other_check}
+    # Act & Assert
+    with pytest.raises(ValueError, match="Check failed"):
+        run_quality_checks(quality_checks)
+    failing_check.assert_called_once_with(db_connection)
+    other_check.assert_called_once_with(db_connection)
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_run_quality_check(mock_connect_to_db_reader: MagicMock) -> None:
+    # Arrange
+    quality_check = MagicMock()
+    # Act
+    run_quality_check("my_check", quality_check)
+    # Assert
+    mock_connect_to_db_reader.assert_called_once_with()
+    quality_check.assert_called_once_with(mock_connect_to_db_reader.return_value.__enter__.return_value)
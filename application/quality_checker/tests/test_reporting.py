@@ -1,7 +1,9 @@
+from os import environ
 from unittest.mock import MagicMock, patch
 
 from aws_lambda_powertools.logging import Logger
 
+from application.conftest import dummy_dos_service
 from application.quality_checker.reporting import log_to_quality_check_report
 
 FILE_PATH = "application.quality_checker.reporting"
@@ -15,9 +17,11 @@ def test_log_to_quality_check_report(mock_warning_logger: MagicMock) -> None:
         dos_service,
     ]
     reason = "reason"
+    connection = MagicMock()
     # Act
-    log_to_quality_check_report(matched_services, reason)
+    reported_count = log_to_quality_check_report(connection, matched_services, reason)
     # Assert
+    assert reported_count == 1
     mock_warning_logger.assert_called_once_with(
         reason,
         report_key="QUALITY_CHECK_REPORT_KEY",
@@ -33,3 +37,70 @@ def test_log_to_quality_check_report(mock_warning_logger: MagicMock) -> None:
         environment="local",
         cloudwatch_metric_filter_matching_attribute="QualityCheckerIssueFound",
     )
+
+
+@patch.object(Logger, "warning")
+@patch(f"{FILE_PATH}.get_regions")
+def test_log_to_quality_check_report_resolves_regions_in_bulk(
+    mock_get_regions: MagicMock,
+    mock_warning_logger: MagicMock,
+) -> None:
+    # Arrange
+    services = [dummy_dos_service(), dummy_dos_service(), dummy_dos_service()]
+    services[0].id, services[1].id, services[2].id = 1, 2, 3
+    services[0].region, services[1].region, services[2].region = "", "", "North West"
+    mock_get_regions.return_value = {1: "South East", 2: "Region not found"}
+    connection = MagicMock()
+    # Act
+    log_to_quality_check_report(connection, services, "reason")
+    # Assert
+    assert list(mock_get_regions.call_args.args[0]) == [1, 2]
+    assert mock_get_regions.call_args.args[1] == connection
+    assert [call.kwargs["dos_region"] for call in mock_warning_logger.call_args_list] == [
+        "South East",
+        "Region not found",
+        "North West",
+    ]
+
+
+@patch.object(Logger, "warning")
+@patch(f"{FILE_PATH}.get_regions")
+def test_log_to_quality_check_report_streams_services_in_batches(
+    mock_get_regions: MagicMock,
+    mock_warning_logger: MagicMock,
+) -> None:
+    # Arrange
+    environ["QUALITY_CHECK_REPORT_BATCH_SIZE"] = "2"
+    services = [dummy_dos_service(), dummy_dos_service(), dummy_dos_service()]
+    for service_id, service in enumerate(services, start=1):
+        service.id, service.region = service_id, ""
+    mock_get_regions.side_effect = [{1: "South East", 2: "North West"}, {3: "London"}]
+    connection = MagicMock()
+    # Act
+    reported_count = log_to_quality_check_report(connection, (service for service in services), "reason")
+    # Assert
+    assert reported_count == 3
+    assert [list(call.args[0]) for call in mock_get_regions.call_args_list] == [[1, 2], [3]]
+    assert [call.kwargs["dos_region"] for call in mock_warning_logger.call_args_list] == [
+        "South East",
+        "North West",
+        "London",
+    ]
+    # Clean up
+    del environ["QUALITY_CHECK_REPORT_BATCH_SIZE"]
+
+
+@patch.object(Logger, "warning")
+@patch(f"{FILE_PATH}.get_regions")
+def test_log_to_quality_check_report_no_services(
+    mock_get_regions: MagicMock,
+    mock_warning_logger: MagicMock,
+) -> None:
+    # Arrange
+    connection = MagicMock()
+    # Act
+    reported_count = log_to_quality_check_report(connection, iter([]), "reason")
+    # Assert
+    assert reported_count == 0
+    mock_get_regions.assert_not_called()
+    mock_warning_logger.assert_not_called()
@@ -1,44 +1,21 @@
+from asyncio import run
 from datetime import UTC, datetime
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from application.quality_checker.search_dos import (
+    get_latest_service_modified_time,
     search_for_incorrectly_profiled_z_code_on_correct_type,
     search_for_incorrectly_profiled_z_code_on_incorrect_type,
-    search_for_matching_services,
-    search_for_pharmacy_ods_codes,
+    search_for_modified_pharmacy_odscodes,
+    search_for_pharmacies_with_multiple_of_service_types,
 )
-from common.commissioned_service_type import BLOOD_PRESSURE, PALLIATIVE_CARE
-from common.constants import DOS_ACTIVE_STATUS_ID, PHARMACY_SERVICE_TYPE_IDS
+from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION, PALLIATIVE_CARE
 from common.dos import DoSService
 
 FILE_PATH = "application.quality_checker.search_dos"
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_search_for_pharmacy_ods_codes(mock_query_dos_db: MagicMock) -> None:
-    # Arrange
-    connection = MagicMock()
-    odscode = "ABC123"
-    mock_query_dos_db.return_value.fetchall.return_value = [{"left": odscode}]
-    # Act
-    response = search_for_pharmacy_ods_codes(connection)
-    # Assert
-    assert response == {odscode}
-    mock_query_dos_db.assert_called_once_with(
-        connection,
-        "SELECT LEFT(odscode, 5) FROM services s WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = "
-        "%(ACTIVE_STATUS_ID)s AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
-        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
-        {
-            "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137, 148, 149],
-            "ACTIVE_STATUS_ID": 1,
-            "ODSCODE_STARTING_CHARACTER_CAPITALISED": "F",
-            "ODSCODE_STARTING_CHARACTER": "f",
-        },
-    )
-
-
 def get_service_data() -> dict[str, Any]:
     return {
         "id": 9999,
@@ -69,51 +46,86 @@ def get_service_data() -> dict[str, Any]:
     }
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_search_for_matching_services(mock_query_dos_db: MagicMock) -> None:
+@patch(f"{FILE_PATH}.stream_dos_db")
+def test_search_for_pharmacies_with_multiple_of_service_types(mock_stream_dos_db: MagicMock) -> None:
     # Arrange
     connection = MagicMock()
-    odscode = "ABC12"
     service = get_service_data()
-    dos_service = DoSService(service)
-    mock_query_dos_db.return_value.fetchall.return_value = [service]
+    other_service = get_service_data() | {"id": 10000, "odscode": "FA932"}
+    different_pharmacy_service = get_service_data() | {"id": 10001, "odscode": "FB123"}
+    mock_stream_dos_db.return_value = iter(
+        [
+            {"pharmacy_odscode": "FA932"} | service,
+            {"pharmacy_odscode": "FA932"} | other_service,
+            {"pharmacy_odscode": "FB123"} | different_pharmacy_service,
+        ],
+    )
     # Act
-    response = search_for_matching_services(connection, odscode)
+    response = search_for_pharmacies_with_multiple_of_service_types(
+        connection,
+        [BLOOD_PRESSURE, CONTRACEPTION],
+        ["FA932", "FB123"],
+    )
     # Assert
-    assert response == [dos_service]
-    mock_query_dos_db.assert_called_once_with(
+    assert list(response) == [
+        ("FA932", [DoSService(service), DoSService(other_service)]),
+        ("FB123", [DoSService(different_pharmacy_service)]),
+    ]
+    mock_stream_dos_db.assert_called_once_with(
         connection,
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, publicphone, "
-        "publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id LEFT JOIN "
-        "servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODSCODE)s AND s.statusid = "
-        "%(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s)",
+        "WITH pharmacy_odscodes AS (SELECT DISTINCT LEFT(odscode, 5) odscode FROM services s "
+        "WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s "
+        "AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s) "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(odscode, 5) = ANY(%(ODSCODES)s))), "
+        "matched_services AS (SELECT po.odscode pharmacy_odscode, s.id, s.typeid FROM services s "
+        "INNER JOIN pharmacy_odscodes po ON LEFT(s.odscode, 5) = po.odscode "
+        "WHERE s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
+        "UNION ALL SELECT po.odscode pharmacy_odscode, s.id, s.typeid FROM services s "
+        "INNER JOIN pharmacy_odscodes po ON LENGTH(po.odscode) < 5 AND s.odscode LIKE po.odscode || '%%' "
+        "AND LEFT(s.odscode, 5) <> po.odscode "
+        "WHERE s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s)), "
+        "multiple_of_service_type AS (SELECT pharmacy_odscode, typeid FROM matched_services "
+        "GROUP BY pharmacy_odscode, typeid HAVING COUNT(*) > 1) "
+        "SELECT ms.pharmacy_odscode, s.id, uid, s.name, odscode, address, postcode, web, s.typeid,"
+        "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
+        "FROM matched_services ms INNER JOIN multiple_of_service_type mst "
+        "ON ms.pharmacy_odscode = mst.pharmacy_odscode AND ms.typeid = mst.typeid "
+        "INNER JOIN services s ON ms.id = s.id LEFT JOIN servicetypes st ON s.typeid = st.id "
+        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+        "ORDER BY ms.pharmacy_odscode, s.typeid, s.id",
         {
-            "ODSCODE": f"{odscode}%",
-            "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
-            "PHARMACY_SERVICE_TYPE_IDS": PHARMACY_SERVICE_TYPE_IDS,
+            "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137, 148, 149],
+            "ACTIVE_STATUS_ID": 1,
+            "ODSCODE_STARTING_CHARACTER_CAPITALISED": "F",
+            "ODSCODE_STARTING_CHARACTER": "f",
+            "SERVICE_TYPE_IDS": [148, 149],
+            "ODSCODES": ["FA932", "FB123"],
         },
+        cursor_name="pharmacies_with_multiple_of_service_types",
     )
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_search_for_incorrectly_profiled_z_code_on_incorrect_type(mock_query_dos_db: MagicMock) -> None:
+@patch(f"{FILE_PATH}.stream_dos_db")
+def test_search_for_incorrectly_profiled_z_code_on_incorrect_type(mock_stream_dos_db: MagicMock) -> None:
     # Arrange
     connection = MagicMock()
     service = get_service_data()
     dos_service = DoSService(service)
-    mock_query_dos_db.return_value.fetchall.return_value = [service]
+    mock_stream_dos_db.return_value = iter([service])
     # Act
     response = search_for_incorrectly_profiled_z_code_on_incorrect_type(connection, BLOOD_PRESSURE)
     # Assert
-    assert response == [dos_service]
-    mock_query_dos_db.assert_called_once_with(
+    assert list(response) == [dos_service]
+    mock_stream_dos_db.assert_called_once_with(
         connection,
         "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
         "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON "
         "s.typeid = st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id LEFT JOIN servicesgsds sgsds on s.id = "
         "sgsds.serviceid WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s AND "
         "s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) AND LEFT(s.odscode,1) in "
-        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s) "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(s.odscode, 5) = ANY(%(ODSCODES)s))",
         {
             "ACTIVE_STATUS_ID": 1,
             "SERVICE_TYPE_IDS": [13, 131, 132, 134, 137, 149],
@@ -121,29 +133,32 @@ def test_search_for_incorrectly_profiled_z_code_on_incorrect_type(mock_query_dos
             "SYMPTOM_DISCRIMINATOR": 14207,
             "ODSCODE_STARTING_CHARACTER_CAPITALISED": "F",
             "ODSCODE_STARTING_CHARACTER": "f",
+            "ODSCODES": None,
         },
+        cursor_name="incorrectly_profiled_z_code_on_incorrect_type",
     )
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_search_for_incorrectly_profiled_z_code_on_correct_type(mock_query_dos_db: MagicMock) -> None:
+@patch(f"{FILE_PATH}.stream_dos_db")
+def test_search_for_incorrectly_profiled_z_code_on_correct_type(mock_stream_dos_db: MagicMock) -> None:
     # Arrange
     connection = MagicMock()
     service = get_service_data()
     dos_service = DoSService(service)
-    mock_query_dos_db.return_value.fetchall.return_value = [service]
+    mock_stream_dos_db.return_value = iter([service])
     # Act
     response = search_for_incorrectly_profiled_z_code_on_correct_type(connection, PALLIATIVE_CARE)
     # Assert
-    assert response == [dos_service]
-    mock_query_dos_db.assert_called_once_with(
+    assert list(response) == [dos_service]
+    mock_stream_dos_db.assert_called_once_with(
         connection,
         "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
         "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid = "
         "st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id LEFT JOIN servicesgsds sgsds on s.id = "
         "sgsds.serviceid WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s AND "
         "s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) AND LEFT(s.odscode,1) in "
-        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)AND LENGTH(s.odscode) > 5",
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)AND LENGTH(s.odscode) > 5 "
+        "AND (%(ODSCODES)s::varchar[] IS NULL OR LEFT(s.odscode, 5) = ANY(%(ODSCODES)s))",
         {
             "ACTIVE_STATUS_ID": 1,
             "SERVICE_TYPE_IDS": [13],
@@ -151,5 +166,47 @@ def test_search_for_incorrectly_profiled_z_code_on_correct_type(mock_query_dos_d
             "SYMPTOM_DISCRIMINATOR": 14167,
             "ODSCODE_STARTING_CHARACTER_CAPITALISED": "F",
             "ODSCODE_STARTING_CHARACTER": "f",
+            "ODSCODES": None,
+        },
+        cursor_name="incorrectly_profiled_z_code_on_correct_type",
+    )
+
+
+@patch(f"{FILE_PATH}.query_dos_db_async")
+def test_get_latest_service_modified_time(mock_query_dos_db_async: AsyncMock) -> None:
+    # Arrange
+    connection = AsyncMock()
+    latest_modified_time = datetime(2024, 3, 13, 10, 37, 7)
+    mock_query_dos_db_async.return_value.fetchone.return_value = {"latest_modified_time": latest_modified_time}
+    # Act
+    response = run(get_latest_service_modified_time(connection))
+    # Assert
+    assert response == latest_modified_time
+    mock_query_dos_db_async.assert_awaited_once_with(
+        connection,
+        "SELECT MAX(modifiedtime) latest_modified_time FROM services",
+    )
+    mock_query_dos_db_async.return_value.close.assert_awaited_once_with()
+
+
+@patch(f"{FILE_PATH}.query_dos_db_async")
+def test_search_for_modified_pharmacy_odscodes(mock_query_dos_db_async: AsyncMock) -> None:
+    # Arrange
+    connection = AsyncMock()
+    modified_after = datetime(2024, 3, 13, 10, 37, 7)
+    mock_query_dos_db_async.return_value.fetchall.return_value = [{"odscode": "FA932"}, {"odscode": "FB123"}]
+    # Act
+    response = run(search_for_modified_pharmacy_odscodes(connection, modified_after))
+    # Assert
+    assert response == ["FA932", "FB123"]
+    mock_query_dos_db_async.assert_awaited_once_with(
+        connection,
+        "SELECT DISTINCT LEFT(odscode, 5) odscode FROM services WHERE modifiedtime > %(MODIFIED_AFTER)s "
+        "AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
+        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        {
+            "MODIFIED_AFTER": modified_after,
+            "ODSCODE_STARTING_CHARACTER_CAPITALISED": "F",
+            "ODSCODE_STARTING_CHARACTER": "f",
         },
     )
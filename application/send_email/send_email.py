@@ -1,7 +1,7 @@
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from os import environ
-from smtplib import SMTP, SMTPException
+from smtplib import SMTP, SMTPAuthenticationError, SMTPException
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
@@ -63,7 +63,15 @@ def send_email(email_address: str, html_content: str, subject: str, correlation_
             logger.info("Sent EHLO")
             smtp.starttls()
             logger.info("Started TLS")
-            smtp.login(di_system_email_address, di_system_email_password)
+            try:
+                smtp.login(di_system_email_address, di_system_email_password)
+            except SMTPAuthenticationError:
+                # The cached secret may be out of date if it has been rotated
+                logger.warning("SMTP authentication failed, refreshing email secrets")
+                email_secrets = get_secret(environ["EMAIL_SECRET_NAME"], force_refresh=True)
+                di_system_email_address = email_secrets["DI_SYSTEM_MAILBOX_ADDRESS"]
+                di_system_email_password = email_secrets["DI_SYSTEM_MAILBOX_PASSWORD"]
+                smtp.login(di_system_email_address, di_system_email_password)
             logger.info("Logged in to SMTP server")
             smtp.sendmail(from_addr=di_system_email_address, to_addrs=[to_email_address], msg=msg.as_string())
             logger.warning("Sent email", cloudwatch_metric_filter_matching_attribute="EmailSent")
@@ -1,6 +1,6 @@
 from os import environ
-from smtplib import SMTPException
-from unittest.mock import MagicMock, patch
+from smtplib import SMTPAuthenticationError, SMTPException
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -86,6 +86,46 @@ def test_send_email(
     del environ["EMAIL_SECRET_NAME"]
 
 
+@patch(f"{FILE_PATH}.MIMEMultipart")
+@patch(f"{FILE_PATH}.SMTP")
+@patch(f"{FILE_PATH}.get_secret")
+def test_send_email_refreshes_secret_on_authentication_failure(
+    mock_get_secret: MagicMock,
+    mock_smtp: MagicMock,
+    mock_mime_multipart: MagicMock,
+) -> None:
+    # Arrange
+    environ["AWS_ACCOUNT_NAME"] = "test"
+    environ["EMAIL_SECRET_NAME"] = secret_name = "mock_secret_name"
+    di_system_mailbox_address = "di_system_mailbox_address"
+    mock_get_secret.side_effect = [
+        {"DI_SYSTEM_MAILBOX_ADDRESS": di_system_mailbox_address, "DI_SYSTEM_MAILBOX_PASSWORD": "old_password"},
+        {"DI_SYSTEM_MAILBOX_ADDRESS": di_system_mailbox_address, "DI_SYSTEM_MAILBOX_PASSWORD": "new_password"},
+    ]
+    mock_smtp.return_value.login.side_effect = [SMTPAuthenticationError(535, b"Authentication unsuccessful"), None]
+    # Act
+    send_email(
+        email_address=RECIPIENT_EMAIL_ADDRESS,
+        html_content=EMAIL_BODY,
+        subject=EMAIL_SUBJECT,
+        correlation_id=CORRELATION_ID,
+    )
+    # Assert
+    assert mock_get_secret.call_args_list == [call(secret_name), call(secret_name, force_refresh=True)]
+    assert mock_smtp.return_value.login.call_args_list == [
+        call(di_system_mailbox_address, "old_password"),
+        call(di_system_mailbox_address, "new_password"),
+    ]
+    mock_smtp.return_value.sendmail.assert_called_once_with(
+        from_addr=di_system_mailbox_address,
+        to_addrs=[RECIPIENT_EMAIL_ADDRESS],
+        msg=mock_mime_multipart.return_value.as_string.return_value,
+    )
+    # Clean up
+    del environ["AWS_ACCOUNT_NAME"]
+    del environ["EMAIL_SECRET_NAME"]
+
+
 @patch(f"{FILE_PATH}.MIMEMultipart")
 @patch(f"{FILE_PATH}.SMTP")
 @patch(f"{FILE_PATH}.get_secret")
@@ -1,28 +1,30 @@
 from aws_lambda_powertools.logging import Logger
 
-from common.dos import DoSService, get_matching_dos_services
+from common.dos import DoSService, get_matching_dos_services_for_odscodes
 from common.nhs import NHSEntity
 
 logger = Logger(child=True)
 
 
-def get_matching_services(nhs_entity: NHSEntity) -> list[DoSService]:
-    """Gets the matching DoS services for the given nhs entity.
-
-    Using the nhs entity attributed to this object, it finds the
-    matching DoS services from the db and filters the results.
+def get_matching_services_for_nhs_entities(nhs_entities: list[NHSEntity]) -> list[list[DoSService]]:
+    """Gets the matching DoS services for many nhs entities with a single query.
 
     Args:
-        nhs_entity (NHSEntity): The nhs entity to match against.
+        nhs_entities (list[NHSEntity]): The nhs entities to match against.
 
     Returns:
-        list[DoSService]: The list of matching DoS services.
+        list[list[DoSService]]: The list of matching DoS services for each nhs entity, in the same order.
     """
-    # Check database for services with same first 5 digits of ODSCode
-    logger.debug(f"Getting matching DoS Services for odscode '{nhs_entity.odscode}'.")
-    matching_services = get_matching_dos_services(nhs_entity.odscode)
-    logger.info(
-        f"Found {len(matching_services)} services in DB with matching first 5 chars of ODSCode: {matching_services}",
-    )
-
+    # Check database for services with same first 5 digits of ODSCode as any of the nhs entities
+    logger.debug(f"Getting matching DoS Services for {len(nhs_entities)} odscodes.")
+    services_by_ods_prefix = get_matching_dos_services_for_odscodes(nhs_entity.odscode for nhs_entity in nhs_entities)
+    matching_services = []
+    for nhs_entity in nhs_entities:
+        # Each nhs entity gets its own list as reviewing the matches removes services from it
+        services = list(services_by_ods_prefix.get(nhs_entity.odscode[:5], []))
+        logger.info(
+            f"Found {len(services)} services in DB with matching first 5 chars of ODSCode: {services}",
+            ods_code=nhs_entity.odscode,
+        )
+        matching_services.append(services)
     return matching_services
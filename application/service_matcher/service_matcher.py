@@ -1,81 +1,145 @@
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from hashlib import sha256
-from json import dumps
+from json import dumps, loads
 from os import environ, getenv
 from typing import Any
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
+from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing.lambda_context import LambdaContext
 from boto3 import client
 
-from .matching import get_matching_services
+from .matching import get_matching_services_for_nhs_entities
 from .review_matches import review_matches
 from common.middlewares import unhandled_exception_logging
 from common.nhs import NHSEntity
 from common.types import HoldingQueueChangeEventItem, UpdateRequest
-from common.utilities import extract_body
+from common.utilities import BatchItemFailures, extract_body, get_message_group_id
 
 logger = Logger()
 tracer = Tracer()
 sqs = client("sqs")
+MAX_SEND_MESSAGE_BATCH_SIZE = 10
+
+
+@dataclass
+class MatchingChangeEvent:
+    """A change event from the batch being matched to DoS services."""
+
+    record: SQSRecord
+    message_group_id: str
+    holding_queue_change_event_item: HoldingQueueChangeEventItem
+    nhs_entity: NHSEntity
+    update_requests: list[UpdateRequest] = field(default_factory=list)
 
 
 @unhandled_exception_logging()
 @tracer.capture_lambda_handler()
 @logger.inject_lambda_context(clear_state=True)
 @event_source(data_class=SQSEvent)
-def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: ARG001
+def lambda_handler(event: SQSEvent, context: LambdaContext) -> dict[str, list[dict[str, str]]]:  # noqa: ARG001
     """Entrypoint handler for the service_matcher lambda.
 
+    The DoS services for every change event in the batch are matched with a single query
+    and all of the resulting update requests are sent together.
+
     Args:
-        event (SQSEvent): Lambda function invocation event (list of 1 SQS Message)
-            Change Event has been validate by the ingest change event lambda
+        event (SQSEvent): Lambda function invocation event (list of SQS Messages)
+            Change Events have been validated by the ingest change event lambda
         context (LambdaContext): Lambda function context object
 
     Event: The event payload should contain a NHS Entity (Service)
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Partial batch response with the change events that failed
     """
-    record = next(event.records)
-    holding_queue_change_event_item: HoldingQueueChangeEventItem = extract_body(record.body)
-    logger.set_correlation_id(holding_queue_change_event_item["correlation_id"])
-    change_event = holding_queue_change_event_item["change_event"]
-
-    nhs_entity = NHSEntity(change_event)
-    logger.append_keys(ods_code=nhs_entity.odscode, org_type=nhs_entity.org_type, org_sub_type=nhs_entity.org_sub_type)
-    logger.info("Created NHS Entity for processing", nhs_entity=nhs_entity)
-
-    matching_services = get_matching_services(nhs_entity)
-    matching_services = review_matches(matching_services, nhs_entity)
-    if matching_services is None:
-        return
-    update_requests: list[UpdateRequest] = [
-        {"change_event": change_event, "service_id": str(dos_service.id)} for dos_service in matching_services
-    ]
-
-    send_update_requests(
-        update_requests=update_requests,
-        message_received=holding_queue_change_event_item["message_received"],
-        record_id=holding_queue_change_event_item["dynamo_record_id"],
-        sequence_number=holding_queue_change_event_item["sequence_number"],
+    failures = BatchItemFailures()
+    change_events = read_change_events(event.records, failures)
+    if not change_events:
+        return failures.response()
+    matching_services = get_matching_services_for_nhs_entities(
+        [change_event.nhs_entity for change_event in change_events],
     )
+    for change_event, services in zip(change_events, matching_services, strict=True):
+        if failures.is_message_group_failed(change_event.message_group_id):
+            failures.add(change_event.record, change_event.message_group_id)
+            continue
+        nhs_entity = change_event.nhs_entity
+        logger.set_correlation_id(change_event.holding_queue_change_event_item["correlation_id"])
+        logger.append_keys(
+            ods_code=nhs_entity.odscode, org_type=nhs_entity.org_type, org_sub_type=nhs_entity.org_sub_type
+        )
+        try:
+            reviewed_services = review_matches(services, nhs_entity)
+        except Exception:
+            logger.exception("Unable to review matched services")
+            failures.add(change_event.record, change_event.message_group_id)
+            continue
+        if reviewed_services is not None:
+            change_event.update_requests = [
+                {
+                    "change_event": change_event.holding_queue_change_event_item["change_event"],
+                    "service_id": str(dos_service.id),
+                }
+                for dos_service in reviewed_services
+            ]
+    logger.remove_keys(["ods_code", "org_type", "org_sub_type"])
+    send_update_requests(change_events=change_events, failures=failures)
+    return failures.response()
+
+
+def read_change_events(records: Iterator[SQSRecord], failures: BatchItemFailures) -> list[MatchingChangeEvent]:
+    """Reads the change events from the holding queue records.
+
+    Args:
+        records (Iterator[SQSRecord]): SQS records containing the change events
+        failures (BatchItemFailures): Failures in the batch so far
 
+    Returns:
+        list[MatchingChangeEvent]: The change events to match
+    """
+    change_events: list[MatchingChangeEvent] = []
+    for record in records:
+        message_group_id = get_message_group_id(record)
+        if failures.is_message_group_failed(message_group_id):
+            failures.add(record, message_group_id)
+            continue
+        try:
+            holding_queue_change_event_item: HoldingQueueChangeEventItem = extract_body(record.body)
+            logger.set_correlation_id(holding_queue_change_event_item["correlation_id"])
+            nhs_entity = NHSEntity(holding_queue_change_event_item["change_event"])
+            logger.info("Created NHS Entity for processing", nhs_entity=nhs_entity, ods_code=nhs_entity.odscode)
+        except Exception:
+            logger.exception("Unable to read change event", message_id=record.message_id)
+            failures.add(record, message_group_id)
+            continue
+        change_events.append(
+            MatchingChangeEvent(
+                record=record,
+                message_group_id=message_group_id,
+                holding_queue_change_event_item=holding_queue_change_event_item,
+                nhs_entity=nhs_entity,
+            ),
+        )
+    return change_events
 
-def divide_chunks(to_chunk: list, chunk_size: int) -> Any:  # noqa: ANN401
-    """Yield successive n-sized chunks from l."""
-    # looping till length l
-    for i in range(0, len(to_chunk), chunk_size):
-        yield to_chunk[i : i + chunk_size]
 
+def build_update_request_messages(change_event: MatchingChangeEvent) -> list[dict[str, Any]]:
+    """Builds the update request queue messages for a change event.
+
+    Args:
+        change_event (MatchingChangeEvent): Change event with its update requests
 
-def send_update_requests(
-    update_requests: list[dict[str, Any]],
-    message_received: int,
-    record_id: str,
-    sequence_number: int,
-) -> None:
-    """Sends update request payload off to next part of workflow."""
+    Returns:
+        list[dict[str, Any]]: send_message_batch entries for the update requests
+    """
+    holding_queue_change_event_item = change_event.holding_queue_change_event_item
+    sequence_number = holding_queue_change_event_item["sequence_number"]
     messages = []
-    for update_request in update_requests:
+    for update_request in change_event.update_requests:
         service_id = update_request.get("service_id")
         update_request_json = dumps(update_request)
         encoded = update_request_json.encode()
@@ -99,9 +163,18 @@ def send_update_requests(
                 "MessageDeduplicationId": message_deduplication_id,
                 "MessageGroupId": message_group_id,
                 "MessageAttributes": {
-                    "correlation_id": {"DataType": "String", "StringValue": logger.get_correlation_id()},
-                    "message_received": {"DataType": "Number", "StringValue": str(message_received)},
-                    "dynamo_record_id": {"DataType": "String", "StringValue": record_id},
+                    "correlation_id": {
+                        "DataType": "String",
+                        "StringValue": holding_queue_change_event_item["correlation_id"],
+                    },
+                    "message_received": {
+                        "DataType": "Number",
+                        "StringValue": str(holding_queue_change_event_item["message_received"]),
+                    },
+                    "dynamo_record_id": {
+                        "DataType": "String",
+                        "StringValue": holding_queue_change_event_item["dynamo_record_id"],
+                    },
                     "ods_code": {
                         "DataType": "String",
                         "StringValue": update_request.get("change_event").get("ODSCode"),
@@ -111,15 +184,82 @@ def send_update_requests(
                 },
             },
         )
-    chunks = list(divide_chunks(messages, 10))
+    return messages
+
+
+def chunk_update_request_messages(
+    change_events: list[MatchingChangeEvent],
+) -> list[list[tuple[MatchingChangeEvent, dict[str, Any]]]]:
+    """Splits the update request messages of the change events into send_message_batch sized chunks.
+
+    A chunk never holds update requests from two change events in the same message group, so if a change event
+    fails to send, the later change events for the same ODS code can still be held back until it is retried.
+    Entry ids are also kept unique within a chunk as send_message_batch requires.
+
+    Args:
+        change_events (list[MatchingChangeEvent]): Change events with their update requests
+
+    Returns:
+        list[list[tuple[MatchingChangeEvent, dict[str, Any]]]]: Chunks of messages with the change event they are for
+    """
+    chunks: list[list[tuple[MatchingChangeEvent, dict[str, Any]]]] = []
+    chunk: list[tuple[MatchingChangeEvent, dict[str, Any]]] = []
+    for change_event in change_events:
+        for message in build_update_request_messages(change_event):
+            if len(chunk) == MAX_SEND_MESSAGE_BATCH_SIZE or any(
+                (other.message_group_id == change_event.message_group_id and other is not change_event)
+                or other_message["Id"] == message["Id"]
+                for other, other_message in chunk
+            ):
+                chunks.append(chunk)
+                chunk = []
+            chunk.append((change_event, message))
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def send_update_requests(change_events: list[MatchingChangeEvent], failures: BatchItemFailures) -> None:
+    """Sends update request payloads off to next part of workflow in consolidated batches.
+
+    Args:
+        change_events (list[MatchingChangeEvent]): Change events with their update requests
+        failures (BatchItemFailures): Failures in the batch so far, updated with any change events that fail to send
+    """
+    chunks = chunk_update_request_messages(
+        [change_event for change_event in change_events if not failures.is_failed(change_event.record)],
+    )
     for i, chunk in enumerate(chunks):
-        # TODO: Handle errors?
+        # Hold back update requests for an ODS code once an earlier change event for it has failed
+        for change_event, _ in chunk:
+            if failures.is_message_group_failed(change_event.message_group_id):
+                failures.add(change_event.record, change_event.message_group_id)
+        entries = [
+            (change_event, message) for change_event, message in chunk if not failures.is_failed(change_event.record)
+        ]
+        if not entries:
+            continue
         logger.debug(f"Sending off message chunk {i+1}/{len(chunks)}")
-        response = sqs.send_message_batch(QueueUrl=environ["UPDATE_REQUEST_QUEUE_URL"], Entries=chunk)
-        logger.debug("Sent off message chunk", response=response)
-        logger.warning(
-            "Sent Off Update Request",
-            service_id=service_id,
-            environment=getenv("ENVIRONMENT"),
-            cloudwatch_metric_filter_matching_attribute="UpdateRequestSent",
+        response = sqs.send_message_batch(
+            QueueUrl=environ["UPDATE_REQUEST_QUEUE_URL"],
+            Entries=[message for _, message in entries],
         )
+        logger.debug("Sent off message chunk", response=response)
+        failed_entry_ids = {failure["Id"] for failure in response.get("Failed", [])}
+        for change_event, message in entries:
+            service_id = loads(message["MessageBody"])["service_id"]
+            if message["Id"] in failed_entry_ids:
+                logger.error(
+                    "Unable to send update request",
+                    service_id=service_id,
+                    ods_code=change_event.nhs_entity.odscode,
+                    failure=next(failure for failure in response["Failed"] if failure["Id"] == message["Id"]),
+                )
+                failures.add(change_event.record, change_event.message_group_id)
+            else:
+                logger.warning(
+                    "Sent Off Update Request",
+                    service_id=service_id,
+                    environment=getenv("ENVIRONMENT"),
+                    cloudwatch_metric_filter_matching_attribute="UpdateRequestSent",
+                )
@@ -1,38 +1,29 @@
 from unittest.mock import MagicMock, patch
 
 from application.conftest import dummy_dos_service
-from application.service_matcher.matching import get_matching_services
+from application.service_matcher.matching import get_matching_services_for_nhs_entities
 from common.nhs import NHSEntity
 
 FILE_PATH = "application.service_matcher.matching"
 
 
-@patch(f"{FILE_PATH}.get_matching_dos_services")
-def test_get_matching_services(
-    mock_get_matching_dos_services: MagicMock,
+@patch(f"{FILE_PATH}.get_matching_dos_services_for_odscodes")
+def test_get_matching_services_for_nhs_entities(
+    mock_get_matching_dos_services_for_odscodes: MagicMock,
     change_event: dict[str, str],
 ) -> None:
     # Arrange
     nhs_entity = NHSEntity(change_event)
+    other_nhs_entity = NHSEntity(change_event | {"ODSCode": "FZZ99"})
     service = dummy_dos_service()
-    service.typeid = 13
-    service.statusid = 1
-    mock_get_matching_dos_services.return_value = [service]
+    mock_get_matching_dos_services_for_odscodes.return_value = {nhs_entity.odscode[:5]: [service], "FZZ99": []}
     # Act
-    matching_services = get_matching_services(nhs_entity)
+    matching_services = get_matching_services_for_nhs_entities([nhs_entity, other_nhs_entity, nhs_entity])
     # Assert
-    assert matching_services == [service]
-
-
-@patch(f"{FILE_PATH}.get_matching_dos_services")
-def test_get_unmatching_services(
-    mock_get_matching_dos_services: MagicMock,
-    change_event: dict[str, str],
-) -> None:
-    # Arrange
-    nhs_entity = NHSEntity(change_event)
-    mock_get_matching_dos_services.return_value = []
-    # Act
-    response = get_matching_services(nhs_entity)
-    # Assert
-    assert response == []
+    assert matching_services == [[service], [], [service]]
+    assert matching_services[0] is not matching_services[2]
+    assert list(mock_get_matching_dos_services_for_odscodes.call_args.args[0]) == [
+        nhs_entity.odscode,
+        "FZZ99",
+        nhs_entity.odscode,
+    ]
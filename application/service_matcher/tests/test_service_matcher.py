@@ -1,15 +1,22 @@
 import hashlib
+from copy import deepcopy
 from json import dumps
 from os import environ
 from unittest.mock import MagicMock, patch
 
-import pytest
 from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from application.common.types import HoldingQueueChangeEventItem
+from application.common.utilities import BatchItemFailures, extract_body
 from application.conftest import PHARMACY_STANDARD_EVENT, dummy_dos_service
-from application.service_matcher.service_matcher import lambda_handler, send_update_requests
+from application.service_matcher.service_matcher import (
+    MatchingChangeEvent,
+    chunk_update_request_messages,
+    lambda_handler,
+    send_update_requests,
+)
 from common.nhs import NHSEntity
 
 FILE_PATH = "application.service_matcher.service_matcher"
@@ -33,117 +40,177 @@ def _get_message_attributes(
     }
 
 
+def sqs_record(message_id: str, odscode: str, sequence_number: int = 1) -> dict:
+    """Creates an SQS record for a change event from the given pharmacy."""
+    record = deepcopy(SQS_EVENT["Records"][0])
+    record["messageId"] = message_id
+    change_event = PHARMACY_STANDARD_EVENT.copy()
+    change_event["ODSCode"] = odscode
+    record["body"] = dumps(
+        HoldingQueueChangeEventItem(
+            change_event=change_event,
+            message_received=1234567890,
+            sequence_number=sequence_number,
+            dynamo_record_id=f"{message_id}-record-id",
+            correlation_id=f"{message_id}-correlation-id",
+        ),
+    )
+    record["attributes"]["MessageGroupId"] = odscode
+    return record
+
+
+def matching_change_event(message_id: str, odscode: str, service_ids: list[str]) -> MatchingChangeEvent:
+    """Creates a matched change event with update requests for the given services."""
+    record = SQSRecord(sqs_record(message_id, odscode))
+    holding_queue_change_event_item = extract_body(record.body)
+    return MatchingChangeEvent(
+        record=record,
+        message_group_id=odscode,
+        holding_queue_change_event_item=holding_queue_change_event_item,
+        nhs_entity=NHSEntity(holding_queue_change_event_item["change_event"]),
+        update_requests=[
+            {"change_event": holding_queue_change_event_item["change_event"], "service_id": service_id}
+            for service_id in service_ids
+        ],
+    )
+
+
 @patch(f"{FILE_PATH}.review_matches")
-@patch(f"{FILE_PATH}.get_matching_services")
+@patch(f"{FILE_PATH}.get_matching_services_for_nhs_entities")
 @patch(f"{FILE_PATH}.send_update_requests")
-@patch(f"{FILE_PATH}.NHSEntity")
-@patch(f"{FILE_PATH}.extract_body")
 def test_lambda_handler(
-    mock_extract_body: MagicMock,
-    mock_nhs_entity: MagicMock,
     mock_send_update_requests: MagicMock,
-    mock_get_matching_services: MagicMock,
+    mock_get_matching_services_for_nhs_entities: MagicMock,
     mock_review_matches: MagicMock,
     change_event: dict[str, str],
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    mock_entity = NHSEntity(change_event)
-    sqs_event = SQS_EVENT.copy()
-    sqs_event["Records"][0]["body"] = dumps(HOLDING_QUEUE_CHANGE_EVENT_ITEM)
-    mock_extract_body.return_value = HOLDING_QUEUE_CHANGE_EVENT_ITEM
-    mock_nhs_entity.return_value = mock_entity
+    sqs_event = deepcopy(SQS_EVENT)
     service = dummy_dos_service()
-    mock_get_matching_services.return_value = [service]
+    mock_get_matching_services_for_nhs_entities.return_value = [[service]]
     mock_review_matches.return_value = [service]
     environ["ENV"] = "test"
     # Act
     response = lambda_handler(sqs_event, lambda_context)
     # Assert
-    assert response is None, f"Response should be None but is {response}"
-    mock_extract_body.assert_called_once_with(sqs_event["Records"][0]["body"])
-    mock_nhs_entity.assert_called_once_with(change_event)
-    mock_get_matching_services.assert_called_once_with(mock_entity)
-    mock_review_matches.assert_called_once_with([service], mock_entity)
-    mock_send_update_requests.assert_called_once_with(
-        update_requests=[{"change_event": change_event, "service_id": service.id}],
-        message_received=HOLDING_QUEUE_CHANGE_EVENT_ITEM["message_received"],
-        record_id=HOLDING_QUEUE_CHANGE_EVENT_ITEM["dynamo_record_id"],
-        sequence_number=HOLDING_QUEUE_CHANGE_EVENT_ITEM["sequence_number"],
-    )
+    assert response == {"batchItemFailures": []}
+    nhs_entities = mock_get_matching_services_for_nhs_entities.call_args.args[0]
+    assert [nhs_entity.odscode for nhs_entity in nhs_entities] == [change_event["ODSCode"]]
+    mock_review_matches.assert_called_once_with([service], nhs_entities[0])
+    mock_send_update_requests.assert_called_once()
+    change_events = mock_send_update_requests.call_args.kwargs["change_events"]
+    assert len(change_events) == 1
+    assert change_events[0].update_requests == [{"change_event": change_event, "service_id": str(service.id)}]
+    assert change_events[0].holding_queue_change_event_item == HOLDING_QUEUE_CHANGE_EVENT_ITEM
     # Clean up
     del environ["ENV"]
 
 
-@patch(f"{FILE_PATH}.get_matching_services")
+@patch(f"{FILE_PATH}.review_matches")
+@patch(f"{FILE_PATH}.get_matching_services_for_nhs_entities")
 @patch(f"{FILE_PATH}.send_update_requests")
-@patch(f"{FILE_PATH}.NHSEntity")
-@patch(f"{FILE_PATH}.extract_body")
 def test_lambda_handler_unmatched_service(
-    mock_extract_body: MagicMock,
-    mock_nhs_entity: MagicMock,
     mock_send_update_requests: MagicMock,
-    mock_get_matching_services: MagicMock,
-    change_event: dict[str, str],
+    mock_get_matching_services_for_nhs_entities: MagicMock,
+    mock_review_matches: MagicMock,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
-    mock_entity = NHSEntity(change_event)
-    sqs_event = SQS_EVENT.copy()
-    sqs_event["Records"][0]["body"] = dumps(HOLDING_QUEUE_CHANGE_EVENT_ITEM)
-    mock_extract_body.return_value = HOLDING_QUEUE_CHANGE_EVENT_ITEM
-    mock_nhs_entity.return_value = mock_entity
-    mock_get_matching_services.return_value = []
+    sqs_event = deepcopy(SQS_EVENT)
+    mock_get_matching_services_for_nhs_entities.return_value = [[]]
+    mock_review_matches.return_value = None
     environ["ENV"] = "test"
     # Act
     response = lambda_handler(sqs_event, lambda_context)
     # Assert
-    assert response is None, f"Response should be None but is {response}"
-    mock_extract_body.assert_called_once_with(sqs_event["Records"][0]["body"])
-    mock_nhs_entity.assert_called_once_with(change_event)
-    mock_get_matching_services.assert_called_once_with(mock_entity)
-    mock_send_update_requests.assert_not_called()
+    assert response == {"batchItemFailures": []}
+    mock_review_matches.assert_called_once()
+    change_events = mock_send_update_requests.call_args.kwargs["change_events"]
+    assert change_events[0].update_requests == []
     # Clean up
     del environ["ENV"]
 
 
-def test_lambda_handler_should_throw_exception_if_event_records_len_not_eq_one(lambda_context: LambdaContext) -> None:
+@patch(f"{FILE_PATH}.get_matching_services_for_nhs_entities")
+@patch(f"{FILE_PATH}.send_update_requests")
+def test_lambda_handler_no_records(
+    mock_send_update_requests: MagicMock,
+    mock_get_matching_services_for_nhs_entities: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
     # Arrange
-    sqs_event = SQS_EVENT.copy()
+    sqs_event = deepcopy(SQS_EVENT)
     sqs_event["Records"] = []
     environ["ENV"] = "test"
-    # Act / Assert
-    with pytest.raises(StopIteration):
-        lambda_handler(sqs_event, lambda_context)
+    # Act
+    response = lambda_handler(sqs_event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    mock_get_matching_services_for_nhs_entities.assert_not_called()
+    mock_send_update_requests.assert_not_called()
     # Clean up
     del environ["ENV"]
 
 
+@patch.object(Logger, "exception")
+@patch(f"{FILE_PATH}.review_matches")
+@patch(f"{FILE_PATH}.get_matching_services_for_nhs_entities")
+@patch(f"{FILE_PATH}.send_update_requests")
+def test_lambda_handler_batch_partial_failure(
+    mock_send_update_requests: MagicMock,
+    mock_get_matching_services_for_nhs_entities: MagicMock,
+    mock_review_matches: MagicMock,
+    mock_logger_exception: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    unreadable_record = sqs_record("1", "FA001")
+    unreadable_record["body"] = "not json"
+    sqs_event = deepcopy(SQS_EVENT)
+    sqs_event["Records"] = [
+        unreadable_record,
+        sqs_record("2", "FB001"),
+        # Held back as the change event before it for the same pharmacy failed
+        sqs_record("3", "FA001", sequence_number=2),
+        sqs_record("4", "FC001"),
+    ]
+    service_b, service_c = dummy_dos_service(), dummy_dos_service()
+    mock_get_matching_services_for_nhs_entities.return_value = [[service_b], [service_c]]
+    mock_review_matches.side_effect = [Exception("Review failed"), [service_c]]
+    environ["ENV"] = "test"
+    # Act
+    response = lambda_handler(sqs_event, lambda_context)
+    # Assert
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "1"}, {"itemIdentifier": "3"}, {"itemIdentifier": "2"}]
+    }
+    nhs_entities = mock_get_matching_services_for_nhs_entities.call_args.args[0]
+    assert [nhs_entity.odscode for nhs_entity in nhs_entities] == ["FB001", "FC001"]
+    change_events = mock_send_update_requests.call_args.kwargs["change_events"]
+    assert [change_event.record.message_id for change_event in change_events] == ["2", "4"]
+    assert change_events[0].update_requests == []
+    assert change_events[1].update_requests[0]["service_id"] == str(service_c.id)
+    assert mock_logger_exception.call_count == 2
+    # Clean up
+    del environ["ENV"]
+    Logger().set_correlation_id(None)
+
+
 @patch(f"{FILE_PATH}.sqs")
-@patch.object(Logger, "get_correlation_id", return_value="1")
 @patch.object(Logger, "warning")
-def test_send_update_requests(
-    mock_logger: MagicMock,
-    get_correlation_id_mock: MagicMock,
-    mock_sqs: MagicMock,
-) -> None:
+def test_send_update_requests(mock_logger: MagicMock, mock_sqs: MagicMock) -> None:
     # Arrange
     q_name = "test-queue"
     environ["UPDATE_REQUEST_QUEUE_URL"] = q_name
-    message_received = 1642501355616
-    record_id = "someid"
-    sequence_number = 1
     odscode = "FXXX1"
-    update_requests = [{"service_id": "1", "change_event": {"ODSCode": odscode}}]
+    change_event = matching_change_event("1", odscode, ["1"])
+    failures = BatchItemFailures()
+    mock_sqs.send_message_batch.return_value = {"Successful": [{"Id": "1-1"}]}
     # Act
-    send_update_requests(
-        update_requests=update_requests,
-        message_received=message_received,
-        record_id=record_id,
-        sequence_number=sequence_number,
-    )
+    send_update_requests(change_events=[change_event], failures=failures)
     # Assert
-    payload = dumps(update_requests[0])
+    payload = dumps(change_event.update_requests[0])
     encoded = payload.encode()
     hashed_payload = hashlib.sha256(encoded).hexdigest()
     entry_details = {
@@ -152,15 +219,15 @@ def test_send_update_requests(
         "MessageDeduplicationId": f"1-{hashed_payload}",
         "MessageGroupId": "1",
         "MessageAttributes": _get_message_attributes(
-            "1",
-            message_received,
-            record_id,
+            "1-correlation-id",
+            1234567890,
+            "1-record-id",
             odscode,
             f"1-{hashed_payload}",
             "1",
         ),
     }
-    mock_sqs.send_message_batch.assert_called_with(
+    mock_sqs.send_message_batch.assert_called_once_with(
         QueueUrl=q_name,
         Entries=[entry_details],
     )
@@ -170,10 +237,52 @@ def test_send_update_requests(
         environment="local",
         cloudwatch_metric_filter_matching_attribute="UpdateRequestSent",
     )
+    assert failures.response() == {"batchItemFailures": []}
     # Clean up
     del environ["UPDATE_REQUEST_QUEUE_URL"]
 
 
+@patch(f"{FILE_PATH}.sqs")
+@patch.object(Logger, "error")
+def test_send_update_requests_partial_failure(mock_logger_error: MagicMock, mock_sqs: MagicMock) -> None:
+    # Arrange
+    environ["UPDATE_REQUEST_QUEUE_URL"] = "test-queue"
+    change_events = [
+        matching_change_event("1", "FA001", ["1", "2"]),
+        matching_change_event("2", "FB001", ["3"]),
+        matching_change_event("3", "FA001", ["1"]),
+    ]
+    failures = BatchItemFailures()
+    mock_sqs.send_message_batch.return_value = {"Failed": [{"Id": "2-1", "Code": "InternalError"}]}
+    # Act
+    send_update_requests(change_events=change_events, failures=failures)
+    # Assert
+    mock_sqs.send_message_batch.assert_called_once()
+    entries = mock_sqs.send_message_batch.call_args.kwargs["Entries"]
+    assert [entry["Id"] for entry in entries] == ["1-1", "2-1", "3-1"]
+    assert failures.response() == {"batchItemFailures": [{"itemIdentifier": "1"}, {"itemIdentifier": "3"}]}
+    mock_logger_error.assert_called_once()
+    # Clean up
+    del environ["UPDATE_REQUEST_QUEUE_URL"]
+
+
+def test_chunk_update_request_messages() -> None:
+    # Arrange
+    change_events = [
+        matching_change_event("1", "FA001", [str(service_id) for service_id in range(1, 13)]),
+        matching_change_event("2", "FB001", ["13"]),
+        matching_change_event("3", "FA001", ["14"]),
+    ]
+    # Act
+    chunks = chunk_update_request_messages(change_events)
+    # Assert
+    assert [[change_event.record.message_id for change_event, _ in chunk] for chunk in chunks] == [
+        ["1"] * 10,
+        ["1", "1", "2"],
+        ["3"],
+    ]
+
+
 HOLDING_QUEUE_CHANGE_EVENT_ITEM = HoldingQueueChangeEventItem(
     change_event=PHARMACY_STANDARD_EVENT.copy(),
     message_received=1234567890,
@@ -192,6 +301,7 @@ SQS_EVENT = {
                 "SentTimestamp": "1642619743522",
                 "SenderId": "AIDAIENQZJOLO23YVJ4VO",
                 "ApproximateFirstReceiveTimestamp": "1545082649185",
+                "MessageGroupId": "FXXX1",
             },
             "messageAttributes": {
                 "correlation-id": {"stringValue": "1", "dataType": "String"},
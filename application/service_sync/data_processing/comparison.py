@@ -8,6 +8,7 @@ from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION, PALL
 from common.dos import get_valid_dos_location
 from common.dos_location import DoSLocation
 from common.opening_times import (
+    OpenPeriodSet,
     SpecifiedOpeningTime,
     StandardOpeningTimes,
     opening_period_times_from_list,
@@ -124,10 +125,14 @@ def compare_standard_opening_times(changes: ChangesToDoS, weekday: str) -> bool:
     dos_opening_times = dos_standard_open_dates.get_openings(weekday)
     nhs_opening_times = nhs_standard_open_dates.get_openings(weekday.title())
     if not dos_standard_open_dates.same_openings(nhs_standard_open_dates, weekday):
+        dos_open_period_set = OpenPeriodSet(dos_opening_times)
+        nhs_open_period_set = OpenPeriodSet(nhs_opening_times)
         logger.info(
             f"{weekday.title()} opening times not equal. "
             f"dos={opening_period_times_from_list(dos_opening_times)}, "
             f"nhs={opening_period_times_from_list(nhs_opening_times)}",
+            added=opening_period_times_from_list(nhs_open_period_set - dos_open_period_set),
+            removed=opening_period_times_from_list(dos_open_period_set - nhs_open_period_set),
         )
         # Set variable for the correct day
         setattr(changes, f"current_{weekday}_opening_times", dos_opening_times)
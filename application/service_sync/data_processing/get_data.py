@@ -1,24 +1,34 @@
+from contextlib import nullcontext
+
 from aws_lambda_powertools.logging import Logger
+from psycopg import Connection, Pipeline
 from psycopg.rows import DictRow
 
 from .service_histories import ServiceHistories
+from common.constants import PHARMACY_SERVICE_TYPE_IDS
 from common.dos import (
     DoSService,
-    get_specified_opening_times_from_db,
-    get_standard_opening_times_from_db,
+    db_rows_to_spec_open_times,
+    db_rows_to_std_open_times,
     has_blood_pressure,
     has_contraception,
-    has_palliative_care,
+    query_palliative_care,
+    query_specified_opening_times,
+    query_standard_opening_times,
 )
-from common.dos_db_connection import connect_to_db_writer, query_dos_db
+from common.dos_db_connection import query_dos_db
 
 logger = Logger(child=True)
 
 
-def get_dos_service_and_history(service_id: int) -> tuple[DoSService, ServiceHistories]:
+def get_dos_service_and_history(connection: Connection, service_id: int) -> tuple[DoSService, ServiceHistories]:
     """Retrieves DoS Services from DoS database.
 
+    The service row is locked until the end of the transaction so that concurrent updates
+    to the same service can not interleave between reading and writing it back.
+
     Args:
+        connection (Connection): Connection to the DoS database writer
         service_id (str): Id of service to retrieve
 
     Returns:
@@ -29,44 +39,44 @@ def get_dos_service_and_history(service_id: int) -> tuple[DoSService, ServiceHis
         "SELECT s.id, uid, s.name, odscode, address, town, postcode, web, typeid, statusid, ss.name status_name, "
         "publicphone, publicname, st.name service_type_name, easting, northing, latitude, longitude FROM services s "
         "LEFT JOIN servicetypes st ON s.typeid = st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "WHERE s.id = %(SERVICE_ID)s"
+        "WHERE s.id = %(SERVICE_ID)s FOR UPDATE OF s"
     )
     query_vars = {"SERVICE_ID": service_id}
-    # Connect to the DoS database
-    with connect_to_db_writer() as connection:
-        # Query the DoS database for the service
-        cursor = query_dos_db(connection=connection, query=sql_query, query_vars=query_vars)
-        rows: list[DictRow] = cursor.fetchall()
-        if len(rows) == 1:
-            # Select first row (service) and create DoSService object
-            service = DoSService(rows[0])
-            logger.append_keys(service_name=service.name)
-            logger.append_keys(service_uid=service.uid)
-            logger.append_keys(type_id=service.typeid)
-        elif not rows:
-            msg = f"Service ID {service_id} not found"
-            raise ValueError(msg)
-        else:
-            msg = f"Multiple services found for Service Id: {service_id}"
-            raise ValueError(msg)
-        # Set up remaining service data
-        service.standard_opening_times = get_standard_opening_times_from_db(
-            connection=connection,
-            service_id=service_id,
-        )
-        service.specified_opening_times = get_specified_opening_times_from_db(
-            connection=connection,
-            service_id=service_id,
-        )
-        # Set up palliative care flag
-        service.palliative_care = has_palliative_care(service=service, connection=connection)
-        # Set up blood pressure flag
-        service.blood_pressure = has_blood_pressure(service=service)
-        # Set up contraception flag
-        service.contraception = has_contraception(service=service)
-        # Set up service history
-        service_histories = ServiceHistories(service_id=service_id)
-        service_histories.get_service_history_from_db(connection)
-        service_histories.create_service_histories_entry()
-        # Connection closed by context manager
+    service_histories = ServiceHistories(service_id=service_id)
+    # Issue all the reads together in pipeline mode so they cost a single round trip to the database
+    with connection.pipeline() if Pipeline.is_supported() else nullcontext():
+        service_cursor = query_dos_db(connection=connection, query=sql_query, query_vars=query_vars)
+        standard_opening_times_cursor = query_standard_opening_times(connection=connection, service_id=service_id)
+        specified_opening_times_cursor = query_specified_opening_times(connection=connection, service_id=service_id)
+        palliative_care_cursor = query_palliative_care(connection=connection, service_id=service_id)
+        service_history_cursor = service_histories.query_service_history(connection)
+        rows: list[DictRow] = service_cursor.fetchall()
+        standard_opening_times_rows = standard_opening_times_cursor.fetchall()
+        specified_opening_times_rows = specified_opening_times_cursor.fetchall()
+        palliative_care_rows = palliative_care_cursor.fetchall()
+        service_history_rows = service_history_cursor.fetchall()
+    if len(rows) == 1:
+        # Select first row (service) and create DoSService object
+        service = DoSService(rows[0])
+        logger.append_keys(service_name=service.name)
+        logger.append_keys(service_uid=service.uid)
+        logger.append_keys(type_id=service.typeid)
+    elif not rows:
+        msg = f"Service ID {service_id} not found"
+        raise ValueError(msg)
+    else:
+        msg = f"Multiple services found for Service Id: {service_id}"
+        raise ValueError(msg)
+    # Set up remaining service data
+    service.standard_opening_times = db_rows_to_std_open_times(standard_opening_times_rows)
+    service.specified_opening_times = db_rows_to_spec_open_times(specified_opening_times_rows)
+    # Set up palliative care flag, only pharmacies can have palliative care
+    service.palliative_care = service.typeid in PHARMACY_SERVICE_TYPE_IDS and len(palliative_care_rows) > 0
+    # Set up blood pressure flag
+    service.blood_pressure = has_blood_pressure(service=service)
+    # Set up contraception flag
+    service.contraception = has_contraception(service=service)
+    # Set up service history
+    service_histories.load_service_history(service_history_rows)
+    service_histories.create_service_histories_entry()
     return service, service_histories
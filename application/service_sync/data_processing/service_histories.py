@@ -5,8 +5,8 @@ from time import time
 from typing import Any, Self
 
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection
-from psycopg.rows import dict_row
+from psycopg import Connection, Cursor
+from psycopg.rows import DictRow, dict_row
 from pytz import timezone
 
 from .service_histories_change import ServiceHistoriesChange
@@ -52,13 +52,33 @@ class ServiceHistories:
         Args:
             connection (Connection): The connection to the database
         """
+        cursor = self.query_service_history(connection)
+        self.load_service_history(cursor.fetchall())
+
+    def query_service_history(self: Self, connection: Connection) -> Cursor[DictRow]:
+        """Runs the query for the service_histories json without fetching the results.
+
+        Args:
+            connection (Connection): The connection to the database
+
+        Returns:
+            Cursor[DictRow]: Cursor to fetch the service history rows from
+        """
         cursor = connection.cursor(row_factory=dict_row)
         # Get the history json from the database for the service
         cursor.execute(
             query="Select history from servicehistories where serviceid = %(SERVICE_ID)s",
             params={"SERVICE_ID": self.service_id},
         )
-        if results := cursor.fetchall():
+        return cursor
+
+    def load_service_history(self: Self, results: list[DictRow]) -> None:
+        """Sets the existing service history from the service history rows fetched from the database.
+
+        Args:
+            results (list[DictRow]): Rows returned by the service history query
+        """
+        if results:
             # Change History exists in the database
             logger.debug(f"Service history exists in the database for serviceid {self.service_id}")
             service_history = results[0]["history"]
@@ -8,66 +8,138 @@ FILE_PATH = "application.service_sync.data_processing.get_data"
 
 
 @patch(f"{FILE_PATH}.ServiceHistories")
-@patch(f"{FILE_PATH}.get_specified_opening_times_from_db")
-@patch(f"{FILE_PATH}.get_standard_opening_times_from_db")
+@patch(f"{FILE_PATH}.db_rows_to_spec_open_times")
+@patch(f"{FILE_PATH}.db_rows_to_std_open_times")
+@patch(f"{FILE_PATH}.query_palliative_care")
+@patch(f"{FILE_PATH}.query_specified_opening_times")
+@patch(f"{FILE_PATH}.query_standard_opening_times")
 @patch(f"{FILE_PATH}.DoSService")
 @patch(f"{FILE_PATH}.query_dos_db")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_get_dos_service_and_history(
-    mock_connect_to_db_writer: MagicMock,
     mock_query_dos_db: MagicMock,
     mock_dos_service: MagicMock,
-    mock_get_standard_opening_times_from_db: MagicMock,
-    mock_get_specified_opening_times_from_db: MagicMock,
+    mock_query_standard_opening_times: MagicMock,
+    mock_query_specified_opening_times: MagicMock,
+    mock_query_palliative_care: MagicMock,
+    mock_db_rows_to_std_open_times: MagicMock,
+    mock_db_rows_to_spec_open_times: MagicMock,
     mock_service_histories: MagicMock,
 ) -> None:
     # Arrange
     service_id = 12345
+    connection = MagicMock()
     mock_query_dos_db.return_value.fetchall.return_value = [["Test"]]
+    mock_dos_service.return_value.typeid = 13
+    mock_query_palliative_care.return_value.fetchall.return_value = [{"z_code": 1}]
     # Act
-    dos_service, service_history = get_dos_service_and_history(service_id)
+    dos_service, service_history = get_dos_service_and_history(connection=connection, service_id=service_id)
     # Assert
     assert mock_dos_service() == dos_service
-    mock_get_standard_opening_times_from_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
-        service_id=service_id,
+    assert mock_query_dos_db.call_args.kwargs["query"].endswith("FOR UPDATE OF s")
+    connection.pipeline.assert_called_once_with()
+    mock_query_standard_opening_times.assert_called_once_with(connection=connection, service_id=service_id)
+    mock_query_specified_opening_times.assert_called_once_with(connection=connection, service_id=service_id)
+    mock_query_palliative_care.assert_called_once_with(connection=connection, service_id=service_id)
+    mock_db_rows_to_std_open_times.assert_called_once_with(
+        mock_query_standard_opening_times.return_value.fetchall.return_value,
     )
-    mock_get_specified_opening_times_from_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
-        service_id=service_id,
+    mock_db_rows_to_spec_open_times.assert_called_once_with(
+        mock_query_specified_opening_times.return_value.fetchall.return_value,
     )
+    assert dos_service.standard_opening_times == mock_db_rows_to_std_open_times.return_value
+    assert dos_service.specified_opening_times == mock_db_rows_to_spec_open_times.return_value
+    assert dos_service.palliative_care is True
     assert mock_service_histories() == service_history
-    mock_service_histories.return_value.get_service_history_from_db.assert_called_once_with(
-        mock_connect_to_db_writer().__enter__(),
+    mock_service_histories.return_value.query_service_history.assert_called_once_with(connection)
+    mock_service_histories.return_value.load_service_history.assert_called_once_with(
+        mock_service_histories.return_value.query_service_history.return_value.fetchall.return_value,
     )
     mock_service_histories.return_value.create_service_histories_entry.assert_called_once_with()
 
 
+@patch(f"{FILE_PATH}.ServiceHistories")
+@patch(f"{FILE_PATH}.query_palliative_care")
+@patch(f"{FILE_PATH}.query_specified_opening_times")
+@patch(f"{FILE_PATH}.query_standard_opening_times")
+@patch(f"{FILE_PATH}.DoSService")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_service_and_history_palliative_care_not_pharmacy(
+    mock_query_dos_db: MagicMock,
+    mock_dos_service: MagicMock,
+    mock_query_standard_opening_times: MagicMock,
+    mock_query_specified_opening_times: MagicMock,
+    mock_query_palliative_care: MagicMock,
+    mock_service_histories: MagicMock,
+) -> None:
+    # Arrange
+    service_id = 12345
+    connection = MagicMock()
+    mock_query_dos_db.return_value.fetchall.return_value = [["Test"]]
+    mock_query_standard_opening_times.return_value.fetchall.return_value = []
+    mock_query_specified_opening_times.return_value.fetchall.return_value = []
+    mock_dos_service.return_value.typeid = 1
+    mock_query_palliative_care.return_value.fetchall.return_value = [{"z_code": 1}]
+    # Act
+    dos_service, _ = get_dos_service_and_history(connection=connection, service_id=service_id)
+    # Assert
+    assert dos_service.palliative_care is False
+
+
+@patch(f"{FILE_PATH}.Pipeline")
+@patch(f"{FILE_PATH}.ServiceHistories")
+@patch(f"{FILE_PATH}.query_palliative_care")
+@patch(f"{FILE_PATH}.query_specified_opening_times")
+@patch(f"{FILE_PATH}.query_standard_opening_times")
+@patch(f"{FILE_PATH}.DoSService")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_get_dos_service_and_history_pipeline_not_supported(
+    mock_query_dos_db: MagicMock,
+    mock_dos_service: MagicMock,
+    mock_query_standard_opening_times: MagicMock,
+    mock_query_specified_opening_times: MagicMock,
+    mock_query_palliative_care: MagicMock,
+    mock_service_histories: MagicMock,
+    mock_pipeline: MagicMock,
+) -> None:
+    # Arrange
+    service_id = 12345
+    connection = MagicMock()
+    mock_pipeline.is_supported.return_value = False
+    mock_query_dos_db.return_value.fetchall.return_value = [["Test"]]
+    mock_query_standard_opening_times.return_value.fetchall.return_value = []
+    mock_query_specified_opening_times.return_value.fetchall.return_value = []
+    mock_query_palliative_care.return_value.fetchall.return_value = []
+    # Act
+    dos_service, service_history = get_dos_service_and_history(connection=connection, service_id=service_id)
+    # Assert
+    assert mock_dos_service() == dos_service
+    assert mock_service_histories() == service_history
+    connection.pipeline.assert_not_called()
+
+
 @patch(f"{FILE_PATH}.query_dos_db")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_get_dos_service_and_history_no_match(
-    mock_connect_to_db_writer: MagicMock,
     mock_query_dos_db: MagicMock,
 ) -> None:
     # Arrange
     service_id = 12345
+    connection = MagicMock()
     mock_query_dos_db.return_value.fetchall.return_value = []
     # Act
     with pytest.raises(ValueError, match=f"Service ID {service_id} not found"):
-        get_dos_service_and_history(service_id)
-    mock_connect_to_db_writer.assert_called_once()
+        get_dos_service_and_history(connection=connection, service_id=service_id)
+    mock_query_dos_db.assert_called_once()
 
 
 @patch(f"{FILE_PATH}.query_dos_db")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_get_dos_service_and_history_mutiple_matches(
-    mock_connect_to_db_writer: MagicMock,
     mock_query_dos_db: MagicMock,
 ) -> None:
     # Arrange
     service_id = 12345
+    connection = MagicMock()
     mock_query_dos_db.return_value.fetchall.return_value = [["Test"], ["Test"]]
     # Act
     with pytest.raises(ValueError, match=f"Multiple services found for Service Id: {service_id}"):
-        get_dos_service_and_history(service_id)
-    mock_connect_to_db_writer.assert_called_once()
+        get_dos_service_and_history(connection=connection, service_id=service_id)
+    mock_query_dos_db.assert_called_once()
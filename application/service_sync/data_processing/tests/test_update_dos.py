@@ -23,62 +23,56 @@ from application.service_sync.data_processing.update_dos import (
 FILE_PATH = "application.service_sync.data_processing.update_dos"
 
 
-@patch(f"{FILE_PATH}.log_service_updates")
 @patch(f"{FILE_PATH}.save_palliative_care_into_db")
 @patch(f"{FILE_PATH}.save_specified_opening_times_into_db")
 @patch(f"{FILE_PATH}.save_standard_opening_times_into_db")
 @patch(f"{FILE_PATH}.save_demographics_into_db")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_update_dos_data(
-    mock_connect_to_db_writer: MagicMock,
     mock_save_demographics_into_db: MagicMock,
     mock_save_standard_opening_times_into_db: MagicMock,
     mock_save_specified_opening_times_into_db: MagicMock,
     mock_save_palliative_care_into_db: MagicMock,
-    mock_log_service_updates: MagicMock,
 ) -> None:
     # Arrange
     changes_to_dos = MagicMock()
     service_histories = MagicMock()
     service_id = 1
+    connection = MagicMock()
     # Act
-    update_dos_data(changes_to_dos, service_id, service_histories)
+    response = update_dos_data(connection, changes_to_dos, service_id, service_histories)
     # Assert
     mock_save_demographics_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         demographics_changes=changes_to_dos.demographic_changes,
     )
     mock_save_standard_opening_times_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
     )
     mock_save_specified_opening_times_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         is_changes=changes_to_dos.specified_opening_times_changes,
         specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
     )
     mock_save_palliative_care_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         dos_service=changes_to_dos.dos_service,
         is_changes=changes_to_dos.palliative_care_changes,
         palliative_care=changes_to_dos.nhs_entity.palliative_care,
     )
-    service_histories.save_service_histories.assert_called_once_with(connection=mock_connect_to_db_writer().__enter__())
-    mock_connect_to_db_writer.return_value.__enter__.return_value.commit.assert_called_once()
-    mock_connect_to_db_writer.return_value.__enter__.return_value.close.assert_called_once()
-    mock_log_service_updates.assert_called_once_with(changes_to_dos=changes_to_dos, service_histories=service_histories)
+    service_histories.save_service_histories.assert_called_once_with(connection=connection)
+    assert response is True
+    connection.commit.assert_not_called()
 
 
 @patch(f"{FILE_PATH}.save_palliative_care_into_db")
 @patch(f"{FILE_PATH}.save_specified_opening_times_into_db")
 @patch(f"{FILE_PATH}.save_standard_opening_times_into_db")
 @patch(f"{FILE_PATH}.save_demographics_into_db")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_update_dos_data_no_changes(
-    mock_connect_to_db_writer: MagicMock,
     mock_save_demographics_into_db: MagicMock,
     mock_save_standard_opening_times_into_db: MagicMock,
     mock_save_specified_opening_times_into_db: MagicMock,
@@ -88,37 +82,39 @@ def test_update_dos_data_no_changes(
     changes_to_dos = MagicMock()
     service_histories = MagicMock()
     service_id = 1
+    connection = MagicMock()
     mock_save_demographics_into_db.return_value = False
     mock_save_standard_opening_times_into_db.return_value = False
     mock_save_specified_opening_times_into_db.return_value = False
     mock_save_palliative_care_into_db.return_value = False
     # Act
-    update_dos_data(changes_to_dos, service_id, service_histories)
+    response = update_dos_data(connection, changes_to_dos, service_id, service_histories)
     # Assert
     mock_save_demographics_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         demographics_changes=changes_to_dos.demographic_changes,
     )
     mock_save_standard_opening_times_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
     )
     mock_save_specified_opening_times_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         service_id=service_id,
         is_changes=changes_to_dos.specified_opening_times_changes,
         specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
     )
     mock_save_palliative_care_into_db.assert_called_once_with(
-        connection=mock_connect_to_db_writer().__enter__(),
+        connection=connection,
         dos_service=changes_to_dos.dos_service,
         is_changes=changes_to_dos.palliative_care_changes,
         palliative_care=changes_to_dos.nhs_entity.palliative_care,
     )
+    assert response is False
     service_histories.save_service_histories.assert_not_called()
-    mock_connect_to_db_writer.return_value.__enter__.return_value.close.assert_called_once()
+    connection.commit.assert_not_called()
 
 
 @patch(f"{FILE_PATH}.SQL")
@@ -166,10 +162,36 @@ def test_save_standard_opening_times_into_db(mock_query_dos_db: MagicMock) -> No
         6: [open_period],
         7: [open_period],
     }
+    mock_query_dos_db.return_value.fetchall.return_value = [{"id": day + 100, "dayid": day} for day in range(1, 8)]
     # Act
     response = save_standard_opening_times_into_db(mock_connection, service_id, standard_opening_times_changes)
     # Assert
     assert True is response
+    assert mock_query_dos_db.call_count == 3
+    delete_call, insert_days_call, insert_times_call = mock_query_dos_db.call_args_list
+    assert delete_call.kwargs["query_vars"] == {"SERVICE_ID": service_id, "DAY_IDS": [1, 2, 3, 4, 5, 6, 7]}
+    assert insert_days_call.kwargs["query_vars"] == {"SERVICE_ID": service_id, "DAY_IDS": [1, 2, 3, 4, 5, 6, 7]}
+    assert insert_times_call.kwargs["query_vars"] == {
+        "SERVICE_DAY_OPENING_IDS": [101, 102, 103, 104, 105, 106, 107],
+        "OPEN_PERIOD_STARTS": [time(1, 0, 0)] * 7,
+        "OPEN_PERIOD_ENDS": [time(2, 0, 0)] * 7,
+    }
+
+
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_save_standard_opening_times_into_db_closed_days(mock_query_dos_db: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    service_id = 1
+    # Act
+    response = save_standard_opening_times_into_db(mock_connection, service_id, {1: [], 2: []})
+    # Assert
+    assert True is response
+    mock_query_dos_db.assert_called_once_with(
+        connection=mock_connection,
+        query="DELETE FROM servicedayopenings WHERE serviceid=%(SERVICE_ID)s AND dayid = ANY(%(DAY_IDS)s)",
+        query_vars={"SERVICE_ID": service_id, "DAY_IDS": [1, 2]},
+    )
 
 
 @patch(f"{FILE_PATH}.query_dos_db")
@@ -183,6 +205,15 @@ def test_save_specified_opening_times_into_db(mock_query_dos_db: MagicMock) -> N
     response = save_specified_opening_times_into_db(mock_connection, service_id, True, specified_opening_time_list)
     # Assert
     assert True is response
+    assert mock_query_dos_db.call_count == 2
+    assert mock_query_dos_db.call_args.kwargs["query_vars"] == {
+        "SPECIFIED_OPENING_TIMES_DATES": [date(2022, 12, 24)],
+        "SERVICE_ID": service_id,
+        "OPEN_PERIOD_DATES": [date(2022, 12, 24)],
+        "OPEN_PERIOD_STARTS": [time(1, 0, 0)],
+        "OPEN_PERIOD_ENDS": [time(2, 0, 0)],
+        "IS_CLOSED": [False],
+    }
 
 
 @patch(f"{FILE_PATH}.query_dos_db")
@@ -196,6 +227,31 @@ def test_save_specified_opening_times_into_db_closed(mock_query_dos_db: MagicMoc
     response = save_specified_opening_times_into_db(mock_connection, service_id, True, specified_opening_time_list)
     # Assert
     assert True is response
+    assert mock_query_dos_db.call_count == 2
+    assert mock_query_dos_db.call_args.kwargs["query_vars"] == {
+        "SPECIFIED_OPENING_TIMES_DATES": [date(2022, 12, 24)],
+        "SERVICE_ID": service_id,
+        "OPEN_PERIOD_DATES": [date(2022, 12, 24)],
+        "OPEN_PERIOD_STARTS": [time(0, 0, 0)],
+        "OPEN_PERIOD_ENDS": [time(0, 0, 0)],
+        "IS_CLOSED": [True],
+    }
+
+
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_save_specified_opening_times_into_db_all_removed(mock_query_dos_db: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    service_id = 1
+    # Act
+    response = save_specified_opening_times_into_db(mock_connection, service_id, True, [])
+    # Assert
+    assert True is response
+    mock_query_dos_db.assert_called_once_with(
+        connection=mock_connection,
+        query="DELETE FROM servicespecifiedopeningdates WHERE serviceid=%(SERVICE_ID)s ",
+        query_vars={"SERVICE_ID": service_id},
+    )
 
 
 @patch(f"{FILE_PATH}.validate_z_code_exists")
@@ -1,8 +1,12 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from datetime import time
+from time import time_ns
+
 from aws_lambda_powertools.logging import Logger
 from psycopg import Connection
 from psycopg.sql import SQL, Identifier, Literal
 
-from ..service_update_logger import log_service_updates
 from .changes_to_dos import ChangesToDoS
 from .service_histories import ServiceHistories
 from .validation import validate_z_code_exists, validate_z_code_exists_on_service
@@ -21,82 +25,96 @@ from common.constants import (
     DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
 )
 from common.dos import DoSService
-from common.dos_db_connection import connect_to_db_writer, query_dos_db
+from common.dos_db_connection import query_dos_db
 from common.opening_times import OpenPeriod, SpecifiedOpeningTime
 
 logger = Logger(child=True)
 
 
-def update_dos_data(changes_to_dos: ChangesToDoS, service_id: int, service_histories: ServiceHistories) -> None:
-    """Updates the DoS database with the changes to the service.
+@contextmanager
+def time_statement(statement_timings: dict[str, int], statement_name: str) -> Generator[None, None, None]:
+    """Records how long the statements run inside the context manager take.
+
+    Args:
+        statement_timings (dict[str, int]): Timings in milliseconds to add the statement timing to
+        statement_name (str): Name to record the timing against
+    """
+    time_start = time_ns() // 1000000
+    yield
+    statement_timings[statement_name] = (time_ns() // 1000000) - time_start
+
+
+def update_dos_data(
+    connection: Connection,
+    changes_to_dos: ChangesToDoS,
+    service_id: int,
+    service_histories: ServiceHistories,
+) -> bool:
+    """Saves the changes to the service into the DoS database.
+
+    The changes are not committed, so they are saved as part of the caller's transaction.
 
     Args:
+        connection (connection): Connection to the DoS database
         changes_to_dos (ChangesToDoS): Changes to the dos service
         service_id (int): Id of service to update
         service_histories (ServiceHistories): Service history of the service
+
+    Returns:
+        bool: True if any changes were saved, False otherwise
     """
-    connection = None
-    try:
-        # Save all the changes to the DoS database with a single transaction
-        with connect_to_db_writer() as connection:
-            is_demographic_changes = save_demographics_into_db(
-                connection=connection,
-                service_id=service_id,
-                demographics_changes=changes_to_dos.demographic_changes,
-            )
-            is_standard_opening_times_changes = save_standard_opening_times_into_db(
-                connection=connection,
-                service_id=service_id,
-                standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
-            )
-            is_specified_opening_times_changes = save_specified_opening_times_into_db(
-                connection=connection,
-                service_id=service_id,
-                is_changes=changes_to_dos.specified_opening_times_changes,
-                specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
-            )
-            is_palliative_care_changes = save_palliative_care_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.palliative_care_changes,
-                palliative_care=changes_to_dos.nhs_entity.palliative_care,
-            )
-            is_blood_pressure_changes, service_histories = save_blood_pressure_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.blood_pressure_changes,
-                blood_pressure=changes_to_dos.nhs_entity.blood_pressure,
-                service_histories=service_histories,
-            )
-            is_contraception_changes, service_histories = save_contraception_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.contraception_changes,
-                contraception=changes_to_dos.nhs_entity.contraception,
-                service_histories=service_histories,
-            )
-            # If there are any changes, update the service history and commit the changes to the database
-            if any(
-                [
-                    is_demographic_changes,
-                    is_standard_opening_times_changes,
-                    is_specified_opening_times_changes,
-                    is_palliative_care_changes,
-                    is_blood_pressure_changes,
-                    is_contraception_changes,
-                ],
-            ):
-                service_histories.save_service_histories(connection=connection)
-                connection.commit()
-                logger.info(f"Updates successfully committed to the DoS database for service id {service_id}")
-                log_service_updates(changes_to_dos=changes_to_dos, service_histories=service_histories)
-            else:
-                logger.info(f"No changes to save for service id {service_id}")
-    finally:
-        # Close the connection even if an error occurs
-        if connection:
-            # Close without committing causes the transaction to be rolled back
-            connection.close()
+    is_demographic_changes = save_demographics_into_db(
+        connection=connection,
+        service_id=service_id,
+        demographics_changes=changes_to_dos.demographic_changes,
+    )
+    is_standard_opening_times_changes = save_standard_opening_times_into_db(
+        connection=connection,
+        service_id=service_id,
+        standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
+    )
+    is_specified_opening_times_changes = save_specified_opening_times_into_db(
+        connection=connection,
+        service_id=service_id,
+        is_changes=changes_to_dos.specified_opening_times_changes,
+        specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
+    )
+    is_palliative_care_changes = save_palliative_care_into_db(
+        connection=connection,
+        dos_service=changes_to_dos.dos_service,
+        is_changes=changes_to_dos.palliative_care_changes,
+        palliative_care=changes_to_dos.nhs_entity.palliative_care,
+    )
+    is_blood_pressure_changes, service_histories = save_blood_pressure_into_db(
+        connection=connection,
+        dos_service=changes_to_dos.dos_service,
+        is_changes=changes_to_dos.blood_pressure_changes,
+        blood_pressure=changes_to_dos.nhs_entity.blood_pressure,
+        service_histories=service_histories,
+    )
+    is_contraception_changes, service_histories = save_contraception_into_db(
+        connection=connection,
+        dos_service=changes_to_dos.dos_service,
+        is_changes=changes_to_dos.contraception_changes,
+        contraception=changes_to_dos.nhs_entity.contraception,
+        service_histories=service_histories,
+    )
+    # If there are any changes, update the service history
+    if any(
+        [
+            is_demographic_changes,
+            is_standard_opening_times_changes,
+            is_specified_opening_times_changes,
+            is_palliative_care_changes,
+            is_blood_pressure_changes,
+            is_contraception_changes,
+        ],
+    ):
+        service_histories.save_service_histories(connection=connection)
+        logger.info(f"Updates saved to the DoS database for service id {service_id}")
+        return True
+    logger.info(f"No changes to save for service id {service_id}")
+    return False
 
 
 def save_demographics_into_db(connection: Connection, service_id: int, demographics_changes: dict) -> bool:
@@ -142,6 +160,8 @@ def save_standard_opening_times_into_db(
 ) -> bool:
     """Saves the standard opening times changes to the DoS database.
 
+    All changed days are replaced with a fixed number of statements however many days and periods have changed.
+
     Args:
         connection (connection): Connection to the DoS database
         service_id (int): Id of the service to update
@@ -152,48 +172,62 @@ def save_standard_opening_times_into_db(
     """
     if standard_opening_times_changes:
         logger.info(f"Saving standard opening times changes for service id {service_id}")
-        for dayid, opening_periods in standard_opening_times_changes.items():
-            logger.info(f"Deleting standard opening times for dayid: {dayid}")
+        statement_timings: dict[str, int] = {}
+        day_ids = list(standard_opening_times_changes.keys())
+        logger.info(f"Deleting standard opening times for dayids: {day_ids}")
+        with time_statement(statement_timings, "delete_servicedayopenings"):
             # Cascade delete the standard opening times in both
             # servicedayopenings table and servicedayopeningtimes table
             cursor = query_dos_db(
                 connection=connection,
-                query="""DELETE FROM servicedayopenings WHERE serviceid=%(SERVICE_ID)s AND dayid=%(DAY_ID)s""",
-                query_vars={"SERVICE_ID": service_id, "DAY_ID": dayid},
+                query="""DELETE FROM servicedayopenings WHERE serviceid=%(SERVICE_ID)s AND dayid = ANY(%(DAY_IDS)s)""",
+                query_vars={"SERVICE_ID": service_id, "DAY_IDS": day_ids},
             )
             cursor.close()
-            if opening_periods != []:
-                logger.info(f"Saving standard opening times for dayid: {dayid}")
+        open_day_ids = [dayid for dayid, opening_periods in standard_opening_times_changes.items() if opening_periods]
+        if open_day_ids:
+            logger.info(f"Saving standard opening times for dayids: {open_day_ids}")
+            with time_statement(statement_timings, "insert_servicedayopenings"):
                 cursor = query_dos_db(
                     connection=connection,
                     query=(
                         """INSERT INTO servicedayopenings (serviceid, dayid) """
-                        """VALUES (%(SERVICE_ID)s, %(DAY_ID)s) RETURNING id"""
+                        """SELECT %(SERVICE_ID)s, UNNEST(%(DAY_IDS)s::integer[]) RETURNING id, dayid"""
                     ),
-                    query_vars={"SERVICE_ID": service_id, "DAY_ID": dayid},
+                    query_vars={"SERVICE_ID": service_id, "DAY_IDS": open_day_ids},
                 )
-                # Get the id of the newly created servicedayopenings entry by using the RETURNING clause
-                service_day_opening_id = cursor.fetchone()["id"]
+                # Get the ids of the newly created servicedayopenings entries by using the RETURNING clause
+                service_day_opening_ids = {row["dayid"]: row["id"] for row in cursor.fetchall()}
                 cursor.close()
-
+            service_day_opening_id_list, start_times, end_times = [], [], []
+            for dayid in open_day_ids:
                 open_period: OpenPeriod  # Type hint for the for loop
-                for open_period in opening_periods:
+                for open_period in standard_opening_times_changes[dayid]:
                     logger.info(f"Saving standard opening times period for dayid: {dayid}, period: {open_period}")
-                    cursor = query_dos_db(
-                        connection=connection,
-                        query=(
-                            """INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) """
-                            """VALUES (%(SERVICE_DAY_OPENING_ID)s, %(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s);"""
-                        ),
-                        query_vars={
-                            "SERVICE_DAY_OPENING_ID": service_day_opening_id,
-                            "OPEN_PERIOD_START": open_period.start,
-                            "OPEN_PERIOD_END": open_period.end,
-                        },
-                    )
-                    cursor.close()
-            else:
-                logger.info(f"No standard opening times to add for dayid: {dayid}")
+                    service_day_opening_id_list.append(service_day_opening_ids[dayid])
+                    start_times.append(open_period.start)
+                    end_times.append(open_period.end)
+            with time_statement(statement_timings, "insert_servicedayopeningtimes"):
+                cursor = query_dos_db(
+                    connection=connection,
+                    query=(
+                        """INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) """
+                        """SELECT * FROM UNNEST(%(SERVICE_DAY_OPENING_IDS)s::integer[], """
+                        """%(OPEN_PERIOD_STARTS)s::time[], %(OPEN_PERIOD_ENDS)s::time[])"""
+                    ),
+                    query_vars={
+                        "SERVICE_DAY_OPENING_IDS": service_day_opening_id_list,
+                        "OPEN_PERIOD_STARTS": start_times,
+                        "OPEN_PERIOD_ENDS": end_times,
+                    },
+                )
+                cursor.close()
+        else:
+            logger.info(f"No standard opening times to add for dayids: {day_ids}")
+        logger.info(
+            f"Saved standard opening times changes for service id {service_id}",
+            statement_timings_ms=statement_timings,
+        )
         return True
     logger.info(f"No standard opening times changes to save for service id {service_id}")
     return False
@@ -207,6 +241,8 @@ def save_specified_opening_times_into_db(
 ) -> bool:
     """Saves the specified opening times changes to the DoS database.
 
+    All specified opening dates and their times are replaced with two statements however many dates there are.
+
     Args:
         connection (connection): Connection to the DoS database
         service_id (int): Id of the service to update
@@ -217,69 +253,65 @@ def save_specified_opening_times_into_db(
         bool: True if changes were made to the database, False if no changes were made
     """
     if is_changes:
+        statement_timings: dict[str, int] = {}
         logger.info(f"Deleting all specified opening times for service id {service_id}")
-        # Cascade delete the standard opening times in both
-        # servicedayopenings table and servicedayopeningtimes table
-        cursor = query_dos_db(
-            connection=connection,
-            query=("""DELETE FROM servicespecifiedopeningdates WHERE serviceid=%(SERVICE_ID)s """),
-            query_vars={"SERVICE_ID": service_id},
-        )
-        cursor.close()
-        for specified_opening_times_day in specified_opening_times_changes:
-            logger.info(f"Saving specfied opening times for: {specified_opening_times_day}")
+        with time_statement(statement_timings, "delete_servicespecifiedopeningdates"):
+            # Cascade delete the specified opening times in both
+            # servicespecifiedopeningdates table and servicespecifiedopeningtimes table
             cursor = query_dos_db(
                 connection=connection,
-                query=(
-                    """INSERT INTO servicespecifiedopeningdates (date,serviceid) """
-                    """VALUES (%(SPECIFIED_OPENING_TIMES_DATE)s,%(SERVICE_ID)s) RETURNING id;"""
-                ),
-                query_vars={"SPECIFIED_OPENING_TIMES_DATE": specified_opening_times_day.date, "SERVICE_ID": service_id},
+                query=("""DELETE FROM servicespecifiedopeningdates WHERE serviceid=%(SERVICE_ID)s """),
+                query_vars={"SERVICE_ID": service_id},
             )
-            # Get the id of the newly created servicedayopenings entry by using the RETURNING clause
-            service_specified_opening_date_id = cursor.fetchone()["id"]
             cursor.close()
-            if specified_opening_times_day.is_open:
-                # If the day is open, save the potentially mutiple opening times
-                open_period: OpenPeriod  # Type hint for the for loop
-                for open_period in specified_opening_times_day.open_periods:
-                    logger.debug(
-                        "Saving standard opening times period for dayid: "
-                        f"{specified_opening_times_day.date}, period: {open_period}",
-                    )
-                    cursor = query_dos_db(
-                        connection=connection,
-                        query=(
-                            """INSERT INTO servicespecifiedopeningtimes """
-                            """(starttime, endtime, isclosed, servicespecifiedopeningdateid) """
-                            """VALUES (%(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s,"""
-                            """%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);"""
-                        ),
-                        query_vars={
-                            "OPEN_PERIOD_START": open_period.start,
-                            "OPEN_PERIOD_END": open_period.end,
-                            "IS_CLOSED": not specified_opening_times_day.is_open,
-                            "SERVICE_SPECIFIED_OPENING_DATE_ID": service_specified_opening_date_id,
-                        },
-                    )
-                    cursor.close()
-            else:
-                # If the day is closed, save the single closed all day times
+        if specified_opening_times_changes:
+            dates, times_dates, start_times, end_times, is_closed = [], [], [], [], []
+            for specified_opening_times_day in specified_opening_times_changes:
+                logger.info(f"Saving specfied opening times for: {specified_opening_times_day}")
+                dates.append(specified_opening_times_day.date)
+                if specified_opening_times_day.is_open:
+                    # If the day is open, save the potentially mutiple opening times
+                    open_period: OpenPeriod  # Type hint for the for loop
+                    for open_period in specified_opening_times_day.open_periods:
+                        times_dates.append(specified_opening_times_day.date)
+                        start_times.append(open_period.start)
+                        end_times.append(open_period.end)
+                        is_closed.append(False)
+                else:
+                    # If the day is closed, save the single closed all day times
+                    times_dates.append(specified_opening_times_day.date)
+                    start_times.append(time(0, 0, 0))
+                    end_times.append(time(0, 0, 0))
+                    is_closed.append(True)
+            with time_statement(statement_timings, "insert_servicespecifiedopeningdates_and_times"):
+                # Insert the dates and use the ids from the RETURNING clause to insert the times for each date
                 cursor = query_dos_db(
                     connection=connection,
                     query=(
+                        """WITH dates AS (INSERT INTO servicespecifiedopeningdates (date,serviceid) """
+                        """SELECT UNNEST(%(SPECIFIED_OPENING_TIMES_DATES)s::date[]),%(SERVICE_ID)s """
+                        """RETURNING id, date) """
                         """INSERT INTO servicespecifiedopeningtimes """
                         """(starttime, endtime, isclosed, servicespecifiedopeningdateid) """
-                        """VALUES ('00:00:00', '00:00:00',"""
-                        """%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);"""
+                        """SELECT times.starttime, times.endtime, times.isclosed, dates.id """
+                        """FROM UNNEST(%(OPEN_PERIOD_DATES)s::date[], %(OPEN_PERIOD_STARTS)s::time[], """
+                        """%(OPEN_PERIOD_ENDS)s::time[], %(IS_CLOSED)s::boolean[]) """
+                        """AS times (date, starttime, endtime, isclosed) INNER JOIN dates ON dates.date = times.date;"""
                     ),
                     query_vars={
-                        "IS_CLOSED": not specified_opening_times_day.is_open,
-                        "SERVICE_SPECIFIED_OPENING_DATE_ID": service_specified_opening_date_id,
+                        "SPECIFIED_OPENING_TIMES_DATES": dates,
+                        "SERVICE_ID": service_id,
+                        "OPEN_PERIOD_DATES": times_dates,
+                        "OPEN_PERIOD_STARTS": start_times,
+                        "OPEN_PERIOD_ENDS": end_times,
+                        "IS_CLOSED": is_closed,
                     },
                 )
                 cursor.close()
-
+        logger.info(
+            f"Saved specified opening times changes for service id {service_id}",
+            statement_timings_ms=statement_timings,
+        )
         return True
     logger.info(f"No specified opening times changes to save for service id {service_id}")
     return False
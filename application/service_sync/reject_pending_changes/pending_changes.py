@@ -14,7 +14,7 @@ from pytz import timezone
 from ..service_update_logger import ServiceUpdateLogger
 from .s3 import put_content_to_s3
 from common.constants import DI_CHANGE_ITEMS, DOS_INTEGRATION_USER_NAME
-from common.dos_db_connection import connect_to_db_writer, query_dos_db
+from common.dos_db_connection import query_dos_db
 from common.types import EmailFile, EmailMessage
 
 logger = Logger(child=True)
@@ -78,23 +78,38 @@ class PendingChange:
             return False
 
 
-def check_and_remove_pending_dos_changes(service_id: str) -> None:
-    """Checks for pending changes in DoS and removes them if they exist.
+def reject_pending_dos_changes(connection: Connection, service_id: str) -> list[PendingChange]:
+    """Checks for pending changes in DoS and rejects them if they exist.
+
+    The rejection is not committed, so it is saved as part of the caller's transaction.
 
     Args:
+        connection (connection): The connection to the DoS database
         service_id (str): The ID of the service to check
+
+    Returns:
+        List[PendingChange]: The pending changes that have been rejected
     """
-    with connect_to_db_writer() as connection:
-        pending_changes = get_pending_changes(connection=connection, service_id=service_id)
-        if pending_changes != [] and pending_changes is not None:
-            logger.info("Pending Changes to be rejected", pending_changes=pending_changes)
-            reject_pending_changes(connection=connection, pending_changes=pending_changes)
-            connection.commit()
-            log_rejected_changes(pending_changes)
-            send_rejection_emails(pending_changes)
-            logger.info("All pending changes rejected and emails sent")
-        else:
-            logger.info("No valid pending changes found")
+    pending_changes = get_pending_changes(connection=connection, service_id=service_id)
+    if pending_changes != [] and pending_changes is not None:
+        logger.info("Pending Changes to be rejected", pending_changes=pending_changes)
+        reject_pending_changes(connection=connection, pending_changes=pending_changes)
+        return pending_changes
+    logger.info("No valid pending changes found")
+    return []
+
+
+def notify_rejected_changes(pending_changes: list[PendingChange]) -> None:
+    """Logs the rejected changes and emails the users who made them.
+
+    This should only be called once the rejection has been committed to the DoS database.
+
+    Args:
+        pending_changes (List[PendingChange]): The pending changes that have been rejected
+    """
+    log_rejected_changes(pending_changes)
+    send_rejection_emails(pending_changes)
+    logger.info("All pending changes rejected and emails sent")
 
 
 def get_pending_changes(connection: Connection, service_id: str) -> list[PendingChange] | None:
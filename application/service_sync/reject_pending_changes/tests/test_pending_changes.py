@@ -9,10 +9,11 @@ from pytz import timezone
 from application.service_sync.reject_pending_changes.pending_changes import (
     PendingChange,
     build_change_rejection_email_contents,
-    check_and_remove_pending_dos_changes,
     get_pending_changes,
     log_rejected_changes,
+    notify_rejected_changes,
     reject_pending_changes,
+    reject_pending_dos_changes,
     send_rejection_emails,
 )
 
@@ -97,94 +98,77 @@ def test_pending_change_is_valid_exception() -> None:
     assert False is is_valid
 
 
-@patch(f"{FILE_PATH}.send_rejection_emails")
-@patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
-def test_check_and_remove_pending_dos_changes(
-    mock_connect_to_db_writer: MagicMock,
+def test_reject_pending_dos_changes(
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
-    mock_log_rejected_changes: MagicMock,
-    mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
     service_id = "test"
+    connection = MagicMock()
     mock_get_pending_changes.return_value = get_pending_changes_response = [PendingChange(ROW)]
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = reject_pending_dos_changes(connection=connection, service_id=service_id)
     # Assert
-    assert None is response
-    mock_connect_to_db_writer.assert_called_once()
-    mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
-        service_id=service_id,
-    )
+    assert get_pending_changes_response == response
+    mock_get_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_reject_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
+        connection=connection,
         pending_changes=get_pending_changes_response,
     )
-    mock_log_rejected_changes.assert_called_once_with(get_pending_changes_response)
-    mock_send_rejection_emails.assert_called_once_with(get_pending_changes_response)
+    connection.commit.assert_not_called()
 
 
-@patch(f"{FILE_PATH}.send_rejection_emails")
-@patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
-def test_check_and_remove_pending_dos_changes_no_pending_changes(
-    mock_connect_to_db_writer: MagicMock,
+def test_reject_pending_dos_changes_no_pending_changes(
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
-    mock_log_rejected_changes: MagicMock,
-    mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
     service_id = "test"
+    connection = MagicMock()
     mock_get_pending_changes.return_value = None
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = reject_pending_dos_changes(connection=connection, service_id=service_id)
     # Assert
-    assert None is response
-    mock_connect_to_db_writer.assert_called_once()
-    mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
-        service_id=service_id,
-    )
+    assert response == []
+    mock_get_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_reject_pending_changes.assert_not_called()
-    mock_log_rejected_changes.assert_not_called()
-    mock_send_rejection_emails.assert_not_called()
 
 
-@patch(f"{FILE_PATH}.send_rejection_emails")
-@patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
-def test_check_and_remove_pending_dos_changes_invalid_changes(
-    mock_connect_to_db_writer: MagicMock,
+def test_reject_pending_dos_changes_invalid_changes(
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
-    mock_log_rejected_changes: MagicMock,
-    mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
     service_id = "test"
+    connection = MagicMock()
     mock_get_pending_changes.return_value = []
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = reject_pending_dos_changes(connection=connection, service_id=service_id)
     # Assert
-    assert None is response
-    mock_connect_to_db_writer.assert_called_once()
-    mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
-        service_id=service_id,
-    )
+    assert response == []
+    mock_get_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_reject_pending_changes.assert_not_called()
-    mock_log_rejected_changes.assert_not_called()
-    mock_send_rejection_emails.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.send_rejection_emails")
+@patch(f"{FILE_PATH}.log_rejected_changes")
+def test_notify_rejected_changes(
+    mock_log_rejected_changes: MagicMock,
+    mock_send_rejection_emails: MagicMock,
+) -> None:
+    # Arrange
+    pending_changes = [PendingChange(ROW)]
+    # Act
+    notify_rejected_changes(pending_changes)
+    # Assert
+    mock_log_rejected_changes.assert_called_once_with(pending_changes)
+    mock_send_rejection_emails.assert_called_once_with(pending_changes)
 
 
 @patch(f"{FILE_PATH}.PendingChange.__repr__")
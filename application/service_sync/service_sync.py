@@ -12,11 +12,14 @@ from boto3 import client
 from .data_processing.check_for_change import compare_nhs_uk_and_dos_data
 from .data_processing.get_data import get_dos_service_and_history
 from .data_processing.update_dos import update_dos_data
-from .reject_pending_changes.pending_changes import check_and_remove_pending_dos_changes
+from .reject_pending_changes.pending_changes import notify_rejected_changes, reject_pending_dos_changes
+from .service_update_logger import log_service_updates
+from common.dos import dos_location_cache
+from common.dos_db_connection import connect_to_db_writer
 from common.middlewares import unhandled_exception_logging
 from common.nhs import NHSEntity
 from common.types import UpdateRequest
-from common.utilities import extract_body
+from common.utilities import BatchItemFailures, extract_body, get_message_group_id
 
 tracer = Tracer()
 logger = Logger()
@@ -26,15 +29,50 @@ logger = Logger()
 @unhandled_exception_logging
 @logger.inject_lambda_context(clear_state=True)
 @event_source(data_class=SQSEvent)
-def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: ARG001
+def lambda_handler(event: SQSEvent, context: LambdaContext) -> dict[str, list[dict[str, str]]]:  # noqa: ARG001
     """Entrypoint handler for the service_sync lambda.
 
+    Processes every update request in the batch in order. Once an update request fails, the rest of the
+    update requests in its FIFO message group are skipped so updates to a service are never applied out of order.
+    Each update request is removed from the queue with its own delete_message call as soon as it has been
+    processed, rather than in one delete_message_batch call at the end. If the lambda times out part way through
+    the batch, only the unprocessed update requests are redelivered.
+
     Args:
         event (SQSEvent): Lambda function invocation event
         context (LambdaContext): Lambda function context object
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Partial batch response with the failed and skipped update requests
+    """
+    failures = BatchItemFailures()
+    for record in event.records:
+        message_group_id = get_message_group_id(record)
+        if failures.is_message_group_failed(message_group_id):
+            logger.warning(
+                "Skipping update request as an earlier update request in its message group failed",
+                message_id=record.message_id,
+                message_group_id=message_group_id,
+            )
+            failures.add(record, message_group_id)
+        elif process_update_request(record):
+            remove_sqs_message_from_queue(receipt_handle=record.receipt_handle)
+        else:
+            failures.add(record, message_group_id)
+    dos_location_cache.log_stats()
+    return failures.response()
+
+
+def process_update_request(record: SQSRecord) -> bool:
+    """Processes a single update request, updating the DoS service if it has changed.
+
+    Args:
+        record (SQSRecord): SQS record containing the update request
+
+    Returns:
+        bool: True if the update request was processed, False if it failed
     """
     try:
-        record: SQSRecord = next(event.records)
         update_request: UpdateRequest = extract_body(record.body)
         logger.set_correlation_id(str(record.message_attributes.get("correlation_id", {}).get("stringValue")))
         logger.append_keys(
@@ -42,24 +80,39 @@ def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: AR
             service_id=update_request["service_id"],
         )
         service_id: str = update_request["service_id"]
-        check_and_remove_pending_dos_changes(service_id)
         # Set up NHS UK Service
         change_event: dict[str, Any] = update_request["change_event"]
         nhs_entity = NHSEntity(change_event)
-        # Get current DoS state
-        dos_service, service_histories = get_dos_service_and_history(service_id=int(service_id))
-        # Compare NHS UK and DoS data
-        changes_to_dos = compare_nhs_uk_and_dos_data(
-            dos_service=dos_service,
-            nhs_entity=nhs_entity,
-            service_histories=service_histories,
-        )
-        # Update Service History with changes to be made
-        service_histories = changes_to_dos.service_histories
-        # Update DoS data
-        update_dos_data(changes_to_dos=changes_to_dos, service_id=int(service_id), service_histories=service_histories)
-        # Delete the message from the queue
-        remove_sqs_message_from_queue(receipt_handle=record.receipt_handle)
+        # Process the whole update request with a single connection and transaction
+        with connect_to_db_writer() as connection:
+            pending_changes = reject_pending_dos_changes(connection=connection, service_id=service_id)
+            # Get current DoS state
+            dos_service, service_histories = get_dos_service_and_history(
+                connection=connection,
+                service_id=int(service_id),
+            )
+            # Compare NHS UK and DoS data
+            changes_to_dos = compare_nhs_uk_and_dos_data(
+                dos_service=dos_service,
+                nhs_entity=nhs_entity,
+                service_histories=service_histories,
+            )
+            # Update Service History with changes to be made
+            service_histories = changes_to_dos.service_histories
+            # Update DoS data
+            is_changes = update_dos_data(
+                connection=connection,
+                changes_to_dos=changes_to_dos,
+                service_id=int(service_id),
+                service_histories=service_histories,
+            )
+            if pending_changes or is_changes:
+                connection.commit()
+                logger.info(f"Updates successfully committed to the DoS database for service id {service_id}")
+        if pending_changes:
+            notify_rejected_changes(pending_changes)
+        if is_changes:
+            log_service_updates(changes_to_dos=changes_to_dos, service_histories=service_histories)
         # Log custom metrics
         logger.warning(
             "Update Request Success",
@@ -74,6 +127,11 @@ def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: AR
             environment=getenv("ENVIRONMENT"),
             cloudwatch_metric_filter_matching_attribute="UpdateRequestError",
         )
+        return False
+    finally:
+        # Keys describing this update request must not leak into the logs of the next one
+        logger.remove_keys(["ods_code", "service_id", "service_name", "service_uid", "type_id"])
+    return True
 
 
 def remove_sqs_message_from_queue(receipt_handle: str) -> None:
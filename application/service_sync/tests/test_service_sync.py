@@ -1,6 +1,7 @@
+from copy import deepcopy
 from json import dumps
 from os import environ
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -26,6 +27,7 @@ SQS_EVENT = {
                 "SentTimestamp": "1642619743522",
                 "SenderId": "AIDAIENQZJOLO23YVJ4VO",
                 "ApproximateFirstReceiveTimestamp": "1545082649185",
+                "MessageGroupId": SERVICE_ID,
             },
             "messageAttributes": {
                 "correlation-id": {"stringValue": "1", "dataType": "String"},
@@ -41,7 +43,10 @@ SQS_EVENT = {
 }
 
 
-@patch(f"{FILE_PATH}.check_and_remove_pending_dos_changes")
+@patch(f"{FILE_PATH}.log_service_updates")
+@patch(f"{FILE_PATH}.notify_rejected_changes")
+@patch(f"{FILE_PATH}.reject_pending_dos_changes")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
 @patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
 @patch(f"{FILE_PATH}.update_dos_data")
 @patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
@@ -53,7 +58,10 @@ def test_lambda_handler(
     mock_compare_nhs_uk_and_dos_data: MagicMock,
     mock_update_dos_data: MagicMock,
     mock_remove_sqs_message_from_queue: MagicMock,
-    mock_check_and_remove_pending_dos_changes: MagicMock,
+    mock_connect_to_db_writer: MagicMock,
+    mock_reject_pending_dos_changes: MagicMock,
+    mock_notify_rejected_changes: MagicMock,
+    mock_log_service_updates: MagicMock,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
@@ -63,28 +71,77 @@ def test_lambda_handler(
     nhs_entity = MagicMock()
     mock_nhs_entity.return_value = nhs_entity
     mock_get_dos_service_and_history.return_value = dos_service, service_histories
+    mock_reject_pending_dos_changes.return_value = pending_changes = [MagicMock()]
+    mock_update_dos_data.return_value = True
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
     # Act
-    lambda_handler(event=SQS_EVENT, context=lambda_context)
+    response = lambda_handler(event=SQS_EVENT, context=lambda_context)
     # Assert
-    mock_check_and_remove_pending_dos_changes.assert_called_once_with(SERVICE_ID)
+    assert response == {"batchItemFailures": []}
+    mock_connect_to_db_writer.assert_called_once_with()
+    mock_reject_pending_dos_changes.assert_called_once_with(connection=connection, service_id=SERVICE_ID)
     mock_nhs_entity.assert_called_once_with(CHANGE_EVENT)
-    mock_get_dos_service_and_history.assert_called_once_with(service_id=int(SERVICE_ID))
+    mock_get_dos_service_and_history.assert_called_once_with(connection=connection, service_id=int(SERVICE_ID))
     mock_compare_nhs_uk_and_dos_data.assert_called_once_with(
         dos_service=dos_service,
         nhs_entity=nhs_entity,
         service_histories=service_histories,
     )
     mock_update_dos_data.assert_called_once_with(
+        connection=connection,
         changes_to_dos=mock_compare_nhs_uk_and_dos_data(),
         service_id=int(SERVICE_ID),
         service_histories=mock_compare_nhs_uk_and_dos_data().service_histories,
     )
+    connection.commit.assert_called_once_with()
+    mock_notify_rejected_changes.assert_called_once_with(pending_changes)
+    mock_log_service_updates.assert_called_once_with(
+        changes_to_dos=mock_compare_nhs_uk_and_dos_data(),
+        service_histories=mock_compare_nhs_uk_and_dos_data().service_histories,
+    )
     mock_remove_sqs_message_from_queue.assert_called_once_with(receipt_handle=RECEIPT_HANDLE)
     # Cleanup
     del environ["ENV"]
 
 
-@patch(f"{FILE_PATH}.check_and_remove_pending_dos_changes")
+@patch(f"{FILE_PATH}.log_service_updates")
+@patch(f"{FILE_PATH}.notify_rejected_changes")
+@patch(f"{FILE_PATH}.reject_pending_dos_changes")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
+@patch(f"{FILE_PATH}.update_dos_data")
+@patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
+@patch(f"{FILE_PATH}.get_dos_service_and_history")
+@patch(f"{FILE_PATH}.NHSEntity")
+def test_lambda_handler_no_changes(
+    mock_nhs_entity: MagicMock,
+    mock_get_dos_service_and_history: MagicMock,
+    mock_compare_nhs_uk_and_dos_data: MagicMock,
+    mock_update_dos_data: MagicMock,
+    mock_remove_sqs_message_from_queue: MagicMock,
+    mock_connect_to_db_writer: MagicMock,
+    mock_reject_pending_dos_changes: MagicMock,
+    mock_notify_rejected_changes: MagicMock,
+    mock_log_service_updates: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    mock_get_dos_service_and_history.return_value = MagicMock(), MagicMock()
+    mock_reject_pending_dos_changes.return_value = []
+    mock_update_dos_data.return_value = False
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
+    # Act
+    lambda_handler(event=SQS_EVENT, context=lambda_context)
+    # Assert
+    connection.commit.assert_not_called()
+    mock_notify_rejected_changes.assert_not_called()
+    mock_log_service_updates.assert_not_called()
+    mock_remove_sqs_message_from_queue.assert_called_once_with(receipt_handle=RECEIPT_HANDLE)
+
+
+@patch(f"{FILE_PATH}.notify_rejected_changes")
+@patch(f"{FILE_PATH}.reject_pending_dos_changes")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
 @patch.object(Logger, "exception")
 @patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
 @patch(f"{FILE_PATH}.update_dos_data")
@@ -98,21 +155,27 @@ def test_lambda_handler_exception(
     mock_update_dos_data: MagicMock,
     mock_remove_sqs_message_from_queue: MagicMock,
     mock_logger_exception: MagicMock,
-    mock_check_and_remove_pending_dos_changes: MagicMock,
+    mock_connect_to_db_writer: MagicMock,
+    mock_reject_pending_dos_changes: MagicMock,
+    mock_notify_rejected_changes: MagicMock,
     lambda_context: LambdaContext,
 ) -> None:
     # Arrange
     nhs_entity = MagicMock()
     mock_nhs_entity.return_value = nhs_entity
     mock_get_dos_service_and_history.side_effect = Exception("Error")
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
     # Act
-    lambda_handler(event=SQS_EVENT, context=lambda_context)
+    response = lambda_handler(event=SQS_EVENT, context=lambda_context)
     # Assert
-    mock_check_and_remove_pending_dos_changes.assert_called_once_with(SERVICE_ID)
+    assert response == {"batchItemFailures": [{"itemIdentifier": SQS_EVENT["Records"][0]["messageId"]}]}
+    mock_reject_pending_dos_changes.assert_called_once_with(connection=connection, service_id=SERVICE_ID)
     mock_nhs_entity.assert_called_once_with(CHANGE_EVENT)
-    mock_get_dos_service_and_history.assert_called_once_with(service_id=int(SERVICE_ID))
+    mock_get_dos_service_and_history.assert_called_once_with(connection=connection, service_id=int(SERVICE_ID))
     mock_compare_nhs_uk_and_dos_data.assert_not_called()
     mock_update_dos_data.assert_not_called()
+    connection.commit.assert_not_called()
+    mock_notify_rejected_changes.assert_not_called()
     mock_remove_sqs_message_from_queue.assert_not_called()
     mock_logger_exception.assert_called_once_with(
         "Error processing update request",
@@ -121,6 +184,119 @@ def test_lambda_handler_exception(
     )
 
 
+def sqs_record(message_id: str, service_id: str) -> dict:
+    """Creates an SQS record for an update request to the given service."""
+    record = deepcopy(SQS_EVENT["Records"][0])
+    record["messageId"] = message_id
+    record["receiptHandle"] = f"{message_id}-receipt-handle"
+    record["body"] = dumps(UpdateRequest(change_event=CHANGE_EVENT, service_id=service_id))
+    record["attributes"]["MessageGroupId"] = service_id
+    return record
+
+
+@patch(f"{FILE_PATH}.log_service_updates")
+@patch(f"{FILE_PATH}.notify_rejected_changes")
+@patch(f"{FILE_PATH}.reject_pending_dos_changes")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch.object(Logger, "exception")
+@patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
+@patch(f"{FILE_PATH}.update_dos_data")
+@patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
+@patch(f"{FILE_PATH}.get_dos_service_and_history")
+@patch(f"{FILE_PATH}.NHSEntity")
+def test_lambda_handler_batch_partial_failure(
+    mock_nhs_entity: MagicMock,
+    mock_get_dos_service_and_history: MagicMock,
+    mock_compare_nhs_uk_and_dos_data: MagicMock,
+    mock_update_dos_data: MagicMock,
+    mock_remove_sqs_message_from_queue: MagicMock,
+    mock_logger_exception: MagicMock,
+    mock_connect_to_db_writer: MagicMock,
+    mock_reject_pending_dos_changes: MagicMock,
+    mock_notify_rejected_changes: MagicMock,
+    mock_log_service_updates: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    event = {
+        "Records": [
+            sqs_record(message_id="1", service_id="1"),
+            sqs_record(message_id="2", service_id="2"),
+            sqs_record(message_id="3", service_id="1"),
+            sqs_record(message_id="4", service_id="2"),
+        ],
+    }
+    mock_reject_pending_dos_changes.return_value = []
+    mock_get_dos_service_and_history.side_effect = [
+        (MagicMock(), MagicMock()),
+        Exception("Error"),
+        (MagicMock(), MagicMock()),
+    ]
+    mock_update_dos_data.return_value = True
+    # Act
+    response = lambda_handler(event=event, context=lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": [{"itemIdentifier": "2"}, {"itemIdentifier": "4"}]}
+    assert [call.kwargs["service_id"] for call in mock_get_dos_service_and_history.call_args_list] == [1, 2, 1]
+    assert mock_connect_to_db_writer.return_value.__enter__.return_value.commit.call_count == 2
+    assert mock_log_service_updates.call_count == 2
+    mock_logger_exception.assert_called_once()
+    assert mock_remove_sqs_message_from_queue.call_args_list == [
+        call(receipt_handle="1-receipt-handle"),
+        call(receipt_handle="3-receipt-handle"),
+    ]
+
+
+@patch(f"{FILE_PATH}.dos_location_cache")
+@patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
+@patch(f"{FILE_PATH}.process_update_request")
+def test_lambda_handler_removes_each_message_once_processed(
+    mock_process_update_request: MagicMock,
+    mock_remove_sqs_message_from_queue: MagicMock,
+    mock_dos_location_cache: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    event = {"Records": [sqs_record(message_id="1", service_id="1"), sqs_record(message_id="2", service_id="2")]}
+    removed_before_processing = []
+    mock_process_update_request.side_effect = lambda _: (
+        removed_before_processing.append(mock_remove_sqs_message_from_queue.call_count) or True
+    )
+    # Act
+    response = lambda_handler(event=event, context=lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    assert removed_before_processing == [0, 1]
+    assert mock_remove_sqs_message_from_queue.call_count == 2
+    mock_dos_location_cache.log_stats.assert_called_once_with()
+
+
+@patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
+@patch(f"{FILE_PATH}.process_update_request")
+def test_lambda_handler_batch_skips_later_messages_in_failed_message_group(
+    mock_process_update_request: MagicMock,
+    mock_remove_sqs_message_from_queue: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    event = {
+        "Records": [
+            sqs_record(message_id="1", service_id="1"),
+            sqs_record(message_id="2", service_id="1"),
+            sqs_record(message_id="3", service_id="1"),
+        ],
+    }
+    mock_process_update_request.return_value = False
+    # Act
+    response = lambda_handler(event=event, context=lambda_context)
+    # Assert
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "1"}, {"itemIdentifier": "2"}, {"itemIdentifier": "3"}],
+    }
+    mock_process_update_request.assert_called_once()
+    mock_remove_sqs_message_from_queue.assert_not_called()
+
+
 @patch.object(Logger, "info")
 @patch(f"{FILE_PATH}.client")
 def test_remove_sqs_message_from_queue(mock_client: MagicMock, mock_logger_info: MagicMock) -> None:
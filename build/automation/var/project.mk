@@ -109,6 +109,7 @@ TF_VAR_change_event_dlq := $(PROJECT_ID)-$(SHARED_ENVIRONMENT)-change-event-dead
 # Dynamodb
 TF_VAR_change_events_table_name := $(PROJECT_ID)-$(SHARED_ENVIRONMENT)-change-events
 DYNAMO_DB_TABLE := $(TF_VAR_change_events_table_name)
+TF_VAR_quality_checker_state_table_name := $(PROJECT_ID)-$(SHARED_ENVIRONMENT)-quality-checker-state
 TF_VAR_ddb_delete_protection :=$(DDB_DELETE_PROTECTION)
 
 # Log Group Filters for Firehose
@@ -263,3 +264,4 @@ TF_VAR_odscode_starting_character := $(ODSCODE_STARTING_CHARACTER)
 # Lambda Schedules
 TF_VAR_quality_checker_schedule_role := $(QUALITY_CHECKER_LAMBDA)-schedule-role
 TF_VAR_quality_checker_lambda_schedule_name := $(QUALITY_CHECKER_LAMBDA)-schedule
+TF_VAR_quality_checker_lambda_incremental_schedule_name := $(QUALITY_CHECKER_LAMBDA)-incremental-schedule
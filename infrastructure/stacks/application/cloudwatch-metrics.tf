@@ -286,3 +286,63 @@ resource "aws_cloudwatch_log_metric_filter" "dos_contraception_z_code_does_not_e
     }
   }
 }
+
+resource "aws_cloudwatch_log_metric_filter" "dos_location_cache_hit" {
+  name           = "${var.project_id}-${var.blue_green_environment}-dos-location-cache-hit"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"DoSLocationCacheStats\" }"
+  log_group_name = module.service_sync_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "DoSLocationCacheHit"
+    namespace = "uec-dos-int"
+    value     = "$.dos_location_cache_hits"
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
+resource "aws_cloudwatch_log_metric_filter" "dos_location_cache_negative_hit" {
+  name           = "${var.project_id}-${var.blue_green_environment}-dos-location-cache-negative-hit"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"DoSLocationCacheStats\" }"
+  log_group_name = module.service_sync_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "DoSLocationCacheNegativeHit"
+    namespace = "uec-dos-int"
+    value     = "$.dos_location_cache_negative_hits"
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
+resource "aws_cloudwatch_log_metric_filter" "dos_location_cache_miss" {
+  name           = "${var.project_id}-${var.blue_green_environment}-dos-location-cache-miss"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"DoSLocationCacheStats\" }"
+  log_group_name = module.service_sync_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "DoSLocationCacheMiss"
+    namespace = "uec-dos-int"
+    value     = "$.dos_location_cache_misses"
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
+resource "aws_cloudwatch_log_metric_filter" "dos_location_cache_eviction" {
+  name           = "${var.project_id}-${var.blue_green_environment}-dos-location-cache-eviction"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"DoSLocationCacheStats\" }"
+  log_group_name = module.service_sync_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "DoSLocationCacheEviction"
+    namespace = "uec-dos-int"
+    value     = "$.dos_location_cache_evictions"
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
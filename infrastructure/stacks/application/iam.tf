@@ -193,6 +193,27 @@ data "aws_iam_policy_document" "ingest_change_event_policy" {
 }
 
 data "aws_iam_policy_document" "quality_checker_policy" {
+  statement {
+    effect = "Allow"
+    actions = [
+      "kms:Decrypt",
+    ]
+    resources = [
+      data.aws_kms_key.signing_key.arn,
+    ]
+  }
+
+  statement {
+    effect = "Allow"
+    actions = [
+      "dynamodb:GetItem",
+      "dynamodb:PutItem",
+    ]
+    resources = [
+      "arn:aws:dynamodb:${var.aws_region}:${var.aws_account_id}:table/${var.quality_checker_state_table_name}",
+    ]
+  }
+
   statement {
     effect = "Allow"
     actions = [
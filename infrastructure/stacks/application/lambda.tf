@@ -266,7 +266,7 @@ module "service_matcher_lambda" {
   create_package                 = false
   image_uri                      = "${var.docker_registry}/${var.service_matcher}:${var.service_matcher_version}"
   package_type                   = "Image"
-  timeout                        = 10
+  timeout                        = 100 # 10 seconds for each change event in a batch of 10
   memory_size                    = 192
   architectures                  = ["arm64"]
   kms_key_arn                    = data.aws_kms_key.signing_key.arn
@@ -319,7 +319,7 @@ module "service_sync_lambda" {
   create_package                 = false
   image_uri                      = "${var.docker_registry}/${var.service_sync}:${var.service_sync_version}"
   package_type                   = "Image"
-  timeout                        = 20
+  timeout                        = 200 # 20 seconds for each update request in a batch of 10
   memory_size                    = 512
   architectures                  = ["arm64"]
   kms_key_arn                    = data.aws_kms_key.signing_key.arn
@@ -459,6 +459,7 @@ module "quality_checker_lambda" {
     "DB_WRITER_SERVER"                   = var.dos_db_writer_route_53
     "DB_SCHEMA"                          = var.dos_db_schema
     "ODSCODE_STARTING_CHARACTER"         = var.odscode_starting_character
+    "QUALITY_CHECKER_STATE_TABLE_NAME"   = var.quality_checker_state_table_name
   }
 }
 
@@ -5,7 +5,7 @@ resource "aws_sqs_queue" "holding_queue" {
   deduplication_scope         = "messageGroup"
   message_retention_seconds   = 1209600 # 14 days
   fifo_throughput_limit       = "perMessageGroupId"
-  visibility_timeout_seconds  = 10 # Must be same as service matcher max execution time
+  visibility_timeout_seconds  = 100 # Must be same as service matcher max execution time
   kms_master_key_id           = data.aws_kms_key.signing_key.key_id
   redrive_policy = jsonencode({
     deadLetterTargetArn = aws_sqs_queue.holding_queue_dlq.arn
@@ -21,7 +21,7 @@ resource "aws_sqs_queue" "update_request_queue" {
   deduplication_scope         = "messageGroup"
   message_retention_seconds   = 1209600 # 14 days
   fifo_throughput_limit       = "perMessageGroupId"
-  visibility_timeout_seconds  = 30 # Service sync max execution time
+  visibility_timeout_seconds  = 210 # Service sync max execution time plus 10 seconds
   kms_master_key_id           = data.aws_kms_key.signing_key.key_id
   redrive_policy = jsonencode({
     deadLetterTargetArn = aws_sqs_queue.update_request_dlq.arn
@@ -31,17 +31,19 @@ resource "aws_sqs_queue" "update_request_queue" {
 }
 
 resource "aws_lambda_event_source_mapping" "holding_queue_event_source_mapping" {
-  batch_size       = 1
-  event_source_arn = aws_sqs_queue.holding_queue.arn
-  enabled          = true
-  function_name    = module.service_matcher_lambda.lambda_function_arn
+  batch_size              = 10
+  event_source_arn        = aws_sqs_queue.holding_queue.arn
+  enabled                 = true
+  function_name           = module.service_matcher_lambda.lambda_function_arn
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 resource "aws_lambda_event_source_mapping" "update_request_event_source_mapping" {
-  batch_size       = 1
-  event_source_arn = aws_sqs_queue.update_request_queue.arn
-  enabled          = true
-  function_name    = module.service_sync_lambda.lambda_function_arn
+  batch_size              = 10
+  event_source_arn        = aws_sqs_queue.update_request_queue.arn
+  enabled                 = true
+  function_name           = module.service_sync_lambda.lambda_function_arn
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 resource "aws_sqs_queue" "holding_queue_dlq" {
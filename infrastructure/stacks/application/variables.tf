@@ -58,6 +58,11 @@ variable "change_events_table_name" {
   description = "Name of the table that stores received pharmacy change events"
 }
 
+variable "quality_checker_state_table_name" {
+  type        = string
+  description = "Name of the table that stores the quality checker's high water mark"
+}
+
 ############
 # SQS
 ############
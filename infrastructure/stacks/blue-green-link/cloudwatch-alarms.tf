@@ -259,3 +259,21 @@ resource "aws_cloudwatch_metric_alarm" "notify_when_quality_checker_schedule_fai
   threshold                 = "1"
   treat_missing_data        = "notBreaching"
 }
+
+resource "aws_cloudwatch_metric_alarm" "notify_when_quality_checker_incremental_schedule_failed_invocation" {
+  count                     = can(regex("ds-*", var.blue_green_environment)) ? 0 : 1
+  alarm_description         = "Alert for when the Quality Checker Incremental Schedule has failed invocation"
+  alarm_name                = "${var.project_id} | ${var.blue_green_environment} | Quality Checker Incremental Schedule Failed Invocation"
+  alarm_actions             = [data.aws_sns_topic.sns_topic_app_alerts_for_slack_default_region.arn]
+  comparison_operator       = "GreaterThanOrEqualToThreshold"
+  datapoints_to_alarm       = "1"
+  dimensions                = { RuleName = var.quality_checker_lambda_incremental_schedule_name }
+  evaluation_periods        = "1"
+  insufficient_data_actions = []
+  metric_name               = "FailedInvocations"
+  namespace                 = "AWS/Events"
+  period                    = "60"
+  statistic                 = "Sum"
+  threshold                 = "1"
+  treat_missing_data        = "notBreaching"
+}
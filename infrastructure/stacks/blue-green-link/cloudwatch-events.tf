@@ -8,3 +8,19 @@ resource "aws_cloudwatch_event_target" "quality_checker_schedule_trigger" {
   rule = aws_cloudwatch_event_rule.quality_checker_schedule.name
   arn  = data.aws_lambda_function.quality_checker.arn
 }
+
+resource "aws_cloudwatch_event_rule" "quality_checker_incremental_schedule" {
+  name                = var.quality_checker_lambda_incremental_schedule_name
+  description         = "Trigger the quality checker lambda to check pharmacies modified since its previous run"
+  schedule_expression = "cron(30 4 ? * TUE-SUN *)"
+}
+
+resource "aws_cloudwatch_event_target" "quality_checker_incremental_schedule_trigger" {
+  rule  = aws_cloudwatch_event_rule.quality_checker_incremental_schedule.name
+  arn   = data.aws_lambda_function.quality_checker.arn
+  input = jsonencode({
+    "detail-type" = "Scheduled Event"
+    source        = "aws.events"
+    detail        = { mode = "incremental" }
+  })
+}
@@ -171,6 +171,11 @@ variable "quality_checker_lambda_schedule_name" {
   description = "Name of the cloudwatch event for the quality checker lambda"
 }
 
+variable "quality_checker_lambda_incremental_schedule_name" {
+  type        = string
+  description = "Name of the cloudwatch event for the incremental quality checker lambda runs"
+}
+
 # ############################
 # # IAM
 # ############################
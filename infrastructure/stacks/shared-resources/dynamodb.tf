@@ -49,3 +49,28 @@ resource "aws_dynamodb_table" "message-history-table" {
     aws_kms_key.signing_key
   ]
 }
+
+resource "aws_dynamodb_table" "quality-checker-state-table" {
+  name                        = var.quality_checker_state_table_name
+  billing_mode                = "PAY_PER_REQUEST"
+  hash_key                    = "Id"
+  deletion_protection_enabled = var.ddb_delete_protection
+
+  server_side_encryption {
+    enabled     = true
+    kms_key_arn = aws_kms_key.signing_key.arn
+  }
+
+  attribute {
+    name = "Id"
+    type = "S"
+  }
+
+  tags = {
+    "backup_plan" = "none"
+  }
+
+  depends_on = [
+    aws_kms_key.signing_key
+  ]
+}
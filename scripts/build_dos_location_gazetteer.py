@@ -0,0 +1,66 @@
+"""Builds a DoS location gazetteer file from the locations table of a DoS database.
+
+The gazetteer is read by common.dos_location_gazetteer.DoSLocationGazetteer. When DOS_LOCATION_GAZETTEER_PATH
+points at it, get_dos_locations looks postcodes up in it before going to the DoS DB. Writing it into
+application/service_sync before running make build-lambda packages it into the service_sync image.
+
+Run from the repository root with:
+    PYTHONPATH=application DB_SERVER=localhost DB_PORT=5432 DB_NAME=pathwaysdos DB_SCHEMA=pathwaysdos \
+    DB_USER_NAME=postgres DB_PASSWORD=postgres python scripts/build_dos_location_gazetteer.py \
+    application/service_sync/dos_locations.gazetteer
+"""
+
+from collections.abc import Generator
+from dataclasses import fields
+from os import environ, getenv
+from sys import argv
+
+from psycopg import Connection
+from psycopg.rows import dict_row
+
+from common.dos_db_connection import connection_to_db
+from common.dos_location import DoSLocation
+from common.dos_location_gazetteer import write_dos_location_gazetteer
+
+
+def stream_dos_locations(connection: Connection) -> Generator[DoSLocation, None, None]:
+    """Streams every location from the locations table without holding the whole result set in memory.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+
+    Yields:
+        Generator[DoSLocation, None, None]: DoS locations
+    """
+    db_column_names = [f.name for f in fields(DoSLocation)]
+    with connection.cursor(name="dos_location_gazetteer", row_factory=dict_row) as cursor:
+        cursor.itersize = 10000
+        cursor.execute(f"SELECT {', '.join(db_column_names)} FROM locations WHERE postcode IS NOT NULL")  # noqa: S608
+        for row in cursor:
+            yield DoSLocation(**row)
+
+
+def build_dos_location_gazetteer(path: str) -> None:
+    """Exports the locations table of the DoS database to a gazetteer file.
+
+    Args:
+        path (str): Path of the gazetteer file to write
+    """
+    connection = connection_to_db(
+        server=environ["DB_SERVER"],
+        port=environ["DB_PORT"],
+        db_name=environ["DB_NAME"],
+        db_schema=environ["DB_SCHEMA"],
+        db_user=environ["DB_USER_NAME"],
+        db_password=getenv("DB_PASSWORD", ""),
+    )
+    try:
+        location_count = write_dos_location_gazetteer(stream_dos_locations(connection), path)
+    finally:
+        connection.rollback()
+        connection.close()
+    print(f"Wrote {location_count} DoS locations to {path}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    build_dos_location_gazetteer(argv[1] if len(argv) > 1 else "dos_locations.gazetteer")
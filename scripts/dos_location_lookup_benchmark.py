@@ -0,0 +1,133 @@
+"""Benchmarks looking up DoS locations by postcode with whitespace variations and with the normalised postcode.
+
+Seeds LOCATION_COUNT synthetic postcodes (roughly the size of the full UK postcode file) into the locations
+table of a database with the DoS schema and times LOOKUP_COUNT random lookups with:
+- the previous query matching any whitespace variation of the postcode, without and with a plain postcode index
+- the normalised postcode query used by get_dos_locations with locations_normalised_postcode_idx
+The seed data and indexes are rolled back afterwards so the script can be pointed at a local copy of a DoS database.
+
+Run from the repository root with:
+    PYTHONPATH=application DB_SERVER=localhost DB_PORT=5432 DB_NAME=pathwaysdos DB_SCHEMA=pathwaysdos \
+    DB_USER_NAME=postgres DB_PASSWORD=postgres python scripts/dos_location_lookup_benchmark.py
+"""
+
+from collections.abc import Callable
+from os import environ, getenv
+from random import Random
+from statistics import mean, median, quantiles
+from time import perf_counter
+
+from psycopg import Connection
+
+from common.dos import NORMALISED_POSTCODE_SQL
+from common.dos_db_connection import connection_to_db
+
+LOCATION_COUNT = int(getenv("LOCATION_COUNT", "1750000"))
+LOOKUP_COUNT = int(getenv("LOOKUP_COUNT", "2000"))
+
+
+def seed_locations(connection: Connection) -> list[str]:
+    """Seeds synthetic locations with unique postcodes into the database.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+
+    Returns:
+        list[str]: Postcodes to look up, in a mix of formats and including some that don't exist
+    """
+    # Postcodes look like AB12 3CD, built from the row number so they are unique
+    connection.execute(
+        "INSERT INTO locations (postcode, easting, northing, postaltown, latitude, longitude) "
+        "SELECT chr(65 + (i / 676000) %% 26) || chr(65 + (i / 6760000) %% 26) || (i / 6760) %% 100 || ' ' "
+        "|| (i / 676) %% 10 || chr(65 + (i / 26) %% 26) || chr(65 + i %% 26), "
+        "i %% 700000, i %% 1300000, 'Town', 50 + (i %% 1000) / 1000.0, -3 + (i %% 1000) / 1000.0 "
+        "FROM generate_series(0, %(LOCATION_COUNT)s - 1) i",
+        {"LOCATION_COUNT": LOCATION_COUNT},
+    )
+    random = Random(0)  # noqa: S311
+    postcodes = [
+        row[0]
+        for row in connection.execute(
+            "SELECT postcode FROM locations ORDER BY random() LIMIT %(LOOKUP_COUNT)s",
+            {"LOOKUP_COUNT": LOOKUP_COUNT},
+        ).fetchall()
+    ]
+    lookups = []
+    for postcode in postcodes:
+        normalised_postcode = postcode.replace(" ", "")
+        lookups.append(random.choice([postcode, normalised_postcode, normalised_postcode.lower()]))
+    # One in ten lookups is for a postcode that isn't in the table
+    lookups[::10] = [f"ZZ{i % 100} 9ZZ" for i in range(len(lookups[::10]))]
+    return lookups
+
+
+def whitespace_variations_lookup(connection: Connection, postcode: str) -> list[tuple]:
+    """Looks up the locations for a postcode with the previous whitespace variation query."""
+    norm_pc = postcode.replace(" ", "").upper()
+    postcode_variations = [norm_pc] + [f"{norm_pc[:i]} {norm_pc[i:]}" for i in range(1, len(norm_pc))]
+    return connection.execute(
+        "SELECT id, postcode, easting, northing, postaltown, latitude, longitude FROM locations "
+        "WHERE postcode = ANY(%(pc_variations)s)",
+        {"pc_variations": postcode_variations},
+    ).fetchall()
+
+
+def normalised_postcode_lookup(connection: Connection, postcode: str) -> list[tuple]:
+    """Looks up the locations for a postcode with the normalised postcode query used by get_dos_locations."""
+    return connection.execute(
+        "SELECT id, postcode, easting, northing, postaltown, latitude, longitude FROM locations "  # noqa: S608
+        f"WHERE {NORMALISED_POSTCODE_SQL} = %(normalised_postcode)s",
+        {"normalised_postcode": postcode.replace(" ", "").upper()},
+    ).fetchall()
+
+
+def benchmark(name: str, lookup: Callable, connection: Connection, postcodes: list[str]) -> None:
+    """Looks up every postcode with the given function and prints the timings.
+
+    Args:
+        name (str): Name of the lookup being benchmarked
+        lookup (Callable): Function to look up a postcode with
+        connection (Connection): Connection to the DoS database
+        postcodes (list[str]): Postcodes to look up
+    """
+    timings = []
+    found = 0
+    for postcode in postcodes:
+        start = perf_counter()
+        found += len(lookup(connection, postcode)) > 0
+        timings.append((perf_counter() - start) * 1000)
+    print(  # noqa: T201
+        f"{name}: mean={mean(timings):.3f}ms median={median(timings):.3f}ms "
+        f"p95={quantiles(timings, n=20)[-1]:.3f}ms found={found}/{len(postcodes)}",
+    )
+
+
+def dos_location_lookup_benchmark() -> None:
+    """Seeds the benchmark locations, benchmarks each lookup and rolls the seed data back."""
+    connection = connection_to_db(
+        server=environ["DB_SERVER"],
+        port=environ["DB_PORT"],
+        db_name=environ["DB_NAME"],
+        db_schema=environ["DB_SCHEMA"],
+        db_user=environ["DB_USER_NAME"],
+        db_password=getenv("DB_PASSWORD", ""),
+    )
+    try:
+        postcodes = seed_locations(connection)
+        connection.execute("ANALYZE locations")
+        print(f"Seeded {LOCATION_COUNT} locations, looking up {len(postcodes)} postcodes")  # noqa: T201
+        # Every lookup without an index reads the whole table, so only time a sample of them
+        benchmark("whitespace variations, no index", whitespace_variations_lookup, connection, postcodes[:50])
+        connection.execute("CREATE INDEX benchmark_locations_postcode_idx ON locations (postcode)")
+        connection.execute("ANALYZE locations")
+        benchmark("whitespace variations, postcode index", whitespace_variations_lookup, connection, postcodes)
+        connection.execute(f"CREATE INDEX benchmark_normalised_postcode_idx ON locations (({NORMALISED_POSTCODE_SQL}))")
+        connection.execute("ANALYZE locations")
+        benchmark("normalised postcode, normalised index", normalised_postcode_lookup, connection, postcodes)
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    dos_location_lookup_benchmark()
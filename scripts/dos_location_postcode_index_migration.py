@@ -0,0 +1,54 @@
+"""Adds the normalised postcode index that get_dos_locations relies on to the DoS locations table.
+
+get_dos_locations looks locations up by their postcode with the whitespace removed and upper cased. This
+functional index on the same expression lets that lookup be an index scan instead of reading the whole table.
+Until the index exists get_dos_locations falls back to matching every whitespace variation of the postcode.
+The index uses text_pattern_ops so the cache preload's LIKE 'district___' prefix matches can use it whatever
+the database collation. The index is built concurrently so the locations table stays writable while it is created.
+
+Run from the repository root with:
+    PYTHONPATH=application DB_SERVER=localhost DB_PORT=5432 DB_NAME=pathwaysdos DB_SCHEMA=pathwaysdos \
+    DB_USER_NAME=postgres DB_PASSWORD=postgres python scripts/dos_location_postcode_index_migration.py [--rollback]
+"""
+
+from os import environ, getenv
+from sys import argv
+
+from common.dos import NORMALISED_POSTCODE_INDEX, NORMALISED_POSTCODE_SQL
+from common.dos_db_connection import connection_to_db
+
+MIGRATION_SQL = (
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {NORMALISED_POSTCODE_INDEX} "
+    f"ON locations (({NORMALISED_POSTCODE_SQL}) text_pattern_ops)"
+)
+ROLLBACK_SQL = f"DROP INDEX CONCURRENTLY IF EXISTS {NORMALISED_POSTCODE_INDEX}"
+
+
+def dos_location_postcode_index_migration(rollback: bool = False) -> None:
+    """Creates, or with rollback drops, the normalised postcode index on the locations table.
+
+    Args:
+        rollback (bool): Whether to drop the index instead of creating it
+    """
+    connection = connection_to_db(
+        server=environ["DB_SERVER"],
+        port=environ["DB_PORT"],
+        db_name=environ["DB_NAME"],
+        db_schema=environ["DB_SCHEMA"],
+        db_user=environ["DB_USER_NAME"],
+        db_password=getenv("DB_PASSWORD", ""),
+    )
+    # Indexes can only be created and dropped concurrently outside of a transaction
+    connection.autocommit = True
+    try:
+        sql = ROLLBACK_SQL if rollback else MIGRATION_SQL
+        print(sql)  # noqa: T201
+        connection.execute(sql)
+        if not rollback:
+            connection.execute("ANALYZE locations")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    dos_location_postcode_index_migration(rollback="--rollback" in argv[1:])
@@ -0,0 +1,248 @@
+"""Benchmarks reading a service's current DoS state with get_dos_service_and_history and a single statement.
+
+Seeds SERVICE_COUNT synthetic pharmacies with realistic opening times, z codes and service histories into a
+database with the DoS schema, reads each of them with get_dos_service_and_history and get_dos_service_snapshot
+and prints the timings. The seed data is rolled back afterwards so the script can be pointed at a local copy
+of a DoS database.
+
+Run from the repository root with:
+    PYTHONPATH=application DB_SERVER=localhost DB_PORT=5432 DB_NAME=pathwaysdos DB_SCHEMA=pathwaysdos \
+    DB_USER_NAME=postgres DB_PASSWORD=postgres python scripts/dos_service_snapshot_benchmark.py
+"""
+
+from collections.abc import Callable
+from datetime import date, time, timedelta
+from json import dumps
+from os import environ, getenv
+from statistics import mean, median, quantiles
+from time import perf_counter
+
+from psycopg import Connection
+from psycopg.rows import DictRow
+from service_sync.data_processing.get_data import get_dos_service_and_history
+from service_sync.data_processing.service_histories import ServiceHistories
+
+from common.constants import (
+    DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
+    DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
+    PHARMACY_SERVICE_TYPE_IDS,
+)
+from common.dos import (
+    DoSService,
+    db_rows_to_spec_open_times,
+    db_rows_to_std_open_times,
+    has_blood_pressure,
+    has_contraception,
+)
+from common.dos_db_connection import connection_to_db, query_dos_db
+
+SERVICE_COUNT = int(getenv("SERVICE_COUNT", "2000"))
+ITERATIONS = int(getenv("ITERATIONS", "3"))
+# Typical pharmacy: split opening hours on weekdays, mornings on Saturday and closed on Sunday
+DAY_OPEN_PERIODS = {
+    1: [("09:00", "13:00"), ("14:00", "18:00")],
+    2: [("09:00", "13:00"), ("14:00", "18:00")],
+    3: [("09:00", "13:00"), ("14:00", "18:00")],
+    4: [("09:00", "13:00"), ("14:00", "18:00")],
+    5: [("09:00", "13:00"), ("14:00", "18:00")],
+    6: [("09:00", "12:30")],
+}
+SPECIFIED_OPENING_DATES = 16
+SERVICE_HISTORY_ENTRIES = 40
+
+
+def get_dos_service_snapshot(connection: Connection, service_id: int) -> tuple[DoSService, ServiceHistories]:
+    """Retrieves a DoS service and its service history from the DoS database in a single statement.
+
+    The opening times are aggregated into JSON arrays by lateral joins alongside the service row, the
+    palliative care z code and the service history, so the full current state of the service is read
+    with one statement rather than one per table. service_sync reads with get_dos_service_and_history,
+    which pipelines its queries into a single round trip, so this is only kept for the benchmark.
+
+    The service row is locked until the end of the transaction so that concurrent updates
+    to the same service can not interleave between reading and writing it back.
+
+    Args:
+        connection (Connection): Connection to the DoS database writer
+        service_id (int): Id of service to retrieve
+
+    Returns:
+        Tuple[DoSService, ServiceHistories]: Tuple of DoS service and service history
+    """
+    sql_query = (
+        "SELECT s.id, uid, s.name, odscode, address, town, postcode, web, typeid, statusid, ss.name status_name, "
+        "publicphone, publicname, st.name service_type_name, easting, northing, latitude, longitude, "
+        "sot.standard_opening_times, ssot.specified_opening_times, "
+        "EXISTS (SELECT 1 FROM servicesgsds sgsds WHERE sgsds.serviceid = s.id "
+        "AND sgsds.sgid = %(PALLIATIVE_CARE_SYMPTOM_GROUP)s "
+        "AND sgsds.sdid = %(PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR)s) has_palliative_care_z_code, "
+        "sh.history FROM services s "
+        "LEFT JOIN servicetypes st ON s.typeid = st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+        "LEFT JOIN LATERAL (SELECT json_agg(json_build_object("
+        "'name', otd.name, 'starttime', sdot.starttime, 'endtime', sdot.endtime)) standard_opening_times "
+        "FROM servicedayopenings sdo INNER JOIN servicedayopeningtimes sdot ON sdo.id = sdot.servicedayopeningid "
+        "LEFT JOIN openingtimedays otd ON sdo.dayid = otd.id WHERE sdo.serviceid = s.id) sot ON TRUE "
+        "LEFT JOIN LATERAL (SELECT json_agg(json_build_object("
+        "'date', ssod.date, 'starttime', ssot.starttime, 'endtime', ssot.endtime, 'isclosed', ssot.isclosed)) "
+        "specified_opening_times FROM servicespecifiedopeningdates ssod "
+        "INNER JOIN servicespecifiedopeningtimes ssot ON ssod.id = ssot.servicespecifiedopeningdateid "
+        "WHERE ssod.serviceid = s.id) ssot ON TRUE "
+        # Read at most one service history row, as load_service_history only uses the first
+        "LEFT JOIN LATERAL (SELECT history FROM servicehistories WHERE serviceid = s.id LIMIT 1) sh ON TRUE "
+        "WHERE s.id = %(SERVICE_ID)s FOR UPDATE OF s"
+    )
+    query_vars = {
+        "SERVICE_ID": service_id,
+        "PALLIATIVE_CARE_SYMPTOM_GROUP": DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
+        "PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR": DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
+    }
+    cursor = query_dos_db(connection=connection, query=sql_query, query_vars=query_vars)
+    rows: list[DictRow] = cursor.fetchall()
+    cursor.close()
+    if not rows:
+        msg = f"Service ID {service_id} not found"
+        raise ValueError(msg)
+    if len(rows) > 1:
+        msg = f"Multiple services found for Service Id: {service_id}"
+        raise ValueError(msg)
+    row = rows[0]
+    standard_opening_times_rows = row.pop("standard_opening_times") or []
+    specified_opening_times_rows = row.pop("specified_opening_times") or []
+    has_palliative_care_z_code = row.pop("has_palliative_care_z_code")
+    history = row.pop("history")
+    service = DoSService(row)
+    # JSON has no time or date types so they are decoded from their ISO format
+    service.standard_opening_times = db_rows_to_std_open_times(
+        {
+            "name": opening_time["name"],
+            "starttime": time.fromisoformat(opening_time["starttime"]),
+            "endtime": time.fromisoformat(opening_time["endtime"]),
+        }
+        for opening_time in standard_opening_times_rows
+    )
+    service.specified_opening_times = db_rows_to_spec_open_times(
+        {
+            "date": date.fromisoformat(opening_time["date"]),
+            "starttime": time.fromisoformat(opening_time["starttime"]),
+            "endtime": time.fromisoformat(opening_time["endtime"]),
+            "isclosed": opening_time["isclosed"],
+        }
+        for opening_time in specified_opening_times_rows
+    )
+    # Set up palliative care flag, only pharmacies can have palliative care
+    service.palliative_care = service.typeid in PHARMACY_SERVICE_TYPE_IDS and has_palliative_care_z_code
+    # Set up blood pressure flag
+    service.blood_pressure = has_blood_pressure(service=service)
+    # Set up contraception flag
+    service.contraception = has_contraception(service=service)
+    # Set up service history
+    service_histories = ServiceHistories(service_id=service_id)
+    service_histories.load_service_history([{"history": history}] if history is not None else [])
+    service_histories.create_service_histories_entry()
+    return service, service_histories
+
+
+def seed_services(connection: Connection) -> list[int]:
+    """Seeds synthetic pharmacy services into the database.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+
+    Returns:
+        list[int]: Ids of the seeded services
+    """
+    service_ids = [
+        row[0]
+        for row in connection.execute(
+            "INSERT INTO services (uid, name, odscode, address, town, postcode, typeid, statusid) "
+            "SELECT 'BENCH' || i, 'Benchmark Pharmacy ' || i, 'FB' || LPAD(i::text, 3, '0'), '1 High Street', "
+            "'Exeter', 'EX1 1AA', 13, 1 FROM generate_series(1, %(SERVICE_COUNT)s) i RETURNING id",
+            {"SERVICE_COUNT": SERVICE_COUNT},
+        ).fetchall()
+    ]
+    history = dumps(
+        {
+            str(1700000000 + entry): {
+                "new": {"cmsurlwebsite": {"changetype": "modify", "data": "https://www.example.com", "previous": ""}},
+                "initiator": {"userid": "DOS_INTEGRATION", "timestamp": "2023-11-14 22:13:20"},
+                "approver": {"userid": "DOS_INTEGRATION", "timestamp": "2023-11-14 22:13:20"},
+            }
+            for entry in range(SERVICE_HISTORY_ENTRIES)
+        },
+    )
+    with connection.cursor() as cursor:
+        for service_id in service_ids:
+            for day_id, open_periods in DAY_OPEN_PERIODS.items():
+                cursor.execute(
+                    "INSERT INTO servicedayopenings (serviceid, dayid) VALUES (%s, %s) RETURNING id",
+                    (service_id, day_id),
+                )
+                day_opening_id = cursor.fetchone()[0]
+                cursor.executemany(
+                    "INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) VALUES (%s, %s, %s)",
+                    [(day_opening_id, start, end) for start, end in open_periods],
+                )
+            for day in range(SPECIFIED_OPENING_DATES):
+                cursor.execute(
+                    "INSERT INTO servicespecifiedopeningdates (date, serviceid) VALUES (%s, %s) RETURNING id",
+                    (date(2024, 1, 1) + timedelta(days=day * 7), service_id),
+                )
+                cursor.execute(
+                    "INSERT INTO servicespecifiedopeningtimes "
+                    "(servicespecifiedopeningdateid, starttime, endtime, isclosed) VALUES (%s, %s, %s, %s)",
+                    (cursor.fetchone()[0], "10:00", "16:00", day % 4 == 0),
+                )
+            if service_id % 2 == 0:
+                cursor.execute(
+                    "INSERT INTO servicesgsds (serviceid, sgid, sdid) VALUES (%s, 360, 14167)",
+                    (service_id,),
+                )
+            cursor.execute("INSERT INTO servicehistories (serviceid, history) VALUES (%s, %s)", (service_id, history))
+    # Refresh the planner statistics so the seeded rows are read with the same plans as a populated database
+    connection.execute("ANALYZE")
+    return service_ids
+
+
+def benchmark(name: str, get_service: Callable, connection: Connection, service_ids: list[int]) -> None:
+    """Reads every service with the given function and prints the timings.
+
+    Args:
+        name (str): Name of the function being benchmarked
+        get_service (Callable): Function to read a service with
+        connection (Connection): Connection to the DoS database
+        service_ids (list[int]): Ids of the services to read
+    """
+    timings = []
+    for _ in range(ITERATIONS):
+        for service_id in service_ids:
+            start = perf_counter()
+            get_service(connection=connection, service_id=service_id)
+            timings.append((perf_counter() - start) * 1000)
+    print(  # noqa: T201
+        f"{name}: mean={mean(timings):.3f}ms median={median(timings):.3f}ms "
+        f"p95={quantiles(timings, n=20)[-1]:.3f}ms total={sum(timings):.0f}ms",
+    )
+
+
+def dos_service_snapshot_benchmark() -> None:
+    """Seeds the benchmark services, benchmarks both read paths and rolls the seed data back."""
+    connection = connection_to_db(
+        server=environ["DB_SERVER"],
+        port=environ["DB_PORT"],
+        db_name=environ["DB_NAME"],
+        db_schema=environ["DB_SCHEMA"],
+        db_user=environ["DB_USER_NAME"],
+        db_password=getenv("DB_PASSWORD", ""),
+    )
+    try:
+        service_ids = seed_services(connection)
+        print(f"Seeded {len(service_ids)} services, reading each {ITERATIONS} times")  # noqa: T201
+        benchmark("get_dos_service_and_history", get_dos_service_and_history, connection, service_ids)
+        benchmark("get_dos_service_snapshot", get_dos_service_snapshot, connection, service_ids)
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    dos_service_snapshot_benchmark()
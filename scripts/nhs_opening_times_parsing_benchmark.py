@@ -0,0 +1,143 @@
+"""Benchmarks parsing NHS UK specified opening times with strptime and with the NHS UK date and time parsers.
+
+Builds a change event with SPECIFIED_OPENING_DATES additional opening dates, each with two open periods, and
+times building its specified opening times ITERATIONS times with:
+- the previous parsing, which called strptime for every date and up to twice for every time
+- NHSEntity, with the date and time caches cleared before every iteration
+- NHSEntity, with the date and time caches already warm, as they are for later change events in a lambda
+  (the date cache holds 1024 dates, so with more dates than that the warm caches don't help)
+The results of each are checked to be the same.
+
+Run from the repository root with:
+    PYTHONPATH=application AWS_REGION=eu-west-2 AWS_DEFAULT_REGION=eu-west-2 \
+    python scripts/nhs_opening_times_parsing_benchmark.py
+"""
+
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from os import getenv
+from statistics import mean, median
+from time import perf_counter
+
+from common.nhs import NHSEntity, is_spec_opening_json, string_to_date
+from common.opening_times import OpenPeriod, SpecifiedOpeningTime, string_to_seconds
+
+SPECIFIED_OPENING_DATES = int(getenv("SPECIFIED_OPENING_DATES", "1000"))
+ITERATIONS = int(getenv("ITERATIONS", "20"))
+
+
+def build_change_event() -> dict:
+    """Builds a change event with morning and afternoon openings on every additional opening date.
+
+    Returns:
+        dict: The change event
+    """
+    opening_times = []
+    for day in range(SPECIFIED_OPENING_DATES):
+        opening_date = (date(2024, 1, 1) + timedelta(days=day)).strftime("%b %d %Y")
+        for opening_time, closing_time in (("09:00", "12:30"), (f"13:{day % 60:02d}", "17:45")):
+            opening_times.append(
+                {
+                    "Weekday": "",
+                    "OpeningTime": opening_time,
+                    "ClosingTime": closing_time,
+                    "OpeningTimeType": "Additional",
+                    "AdditionalOpeningDate": opening_date,
+                    "IsOpen": True,
+                },
+            )
+    return {"ODSCode": "FA123", "OpeningTimes": opening_times}
+
+
+def strptime_time(time_str: str) -> time | None:
+    """Converts a string to a time the way string_to_time used to."""
+    for time_format in ("%H:%M", "%H:%M:%S"):
+        with suppress(ValueError):
+            return datetime.strptime(str(time_str), time_format).time()
+    return None
+
+
+def strptime_is_spec_opening_json(item: dict) -> bool:
+    """Checks an additional opening time the way is_spec_opening_json used to."""
+    if str(item.get("OpeningTimeType")).upper() != "ADDITIONAL":
+        return False
+    try:
+        datetime.strptime(str(item.get("AdditionalOpeningDate")), "%b  %d  %Y")
+    except ValueError:
+        return False
+    if item.get("IsOpen"):
+        return None not in (strptime_time(item.get("OpeningTime")), strptime_time(item.get("ClosingTime")))
+    return True
+
+
+def strptime_specified_opening_times(change_event: dict) -> list[SpecifiedOpeningTime]:
+    """Builds the specified opening times the way NHSEntity used to."""
+    specified_times_list = list(filter(strptime_is_spec_opening_json, change_event.get("OpeningTimes", [])))
+    specified_times_list = sorted(specified_times_list, key=lambda item: item["AdditionalOpeningDate"])
+    specified_opening_times = []
+    for date_str, op_dict_list in groupby(specified_times_list, lambda item: (item["AdditionalOpeningDate"])):
+        open_periods = []
+        specified_date = datetime.strptime(date_str, "%b  %d  %Y").date()
+        is_open = True
+        for item in list(op_dict_list):
+            if item["IsOpen"]:
+                open_periods.append(
+                    OpenPeriod(strptime_time(item["OpeningTime"]), strptime_time(item["ClosingTime"])),
+                )
+            else:
+                is_open = False
+        specified_opening_times.append(SpecifiedOpeningTime(open_periods, specified_date, is_open))
+    return specified_opening_times
+
+
+def cold_nhs_entity_specified_opening_times(change_event: dict) -> list[SpecifiedOpeningTime]:
+    """Builds the specified opening times with NHSEntity after clearing the date and time caches."""
+    string_to_date.cache_clear()
+    string_to_seconds.cache_clear()
+    return NHSEntity(change_event).specified_opening_times
+
+
+def warm_nhs_entity_specified_opening_times(change_event: dict) -> list[SpecifiedOpeningTime]:
+    """Builds the specified opening times with NHSEntity with the date and time caches as they are."""
+    return NHSEntity(change_event).specified_opening_times
+
+
+def benchmark(name: str, parse: Callable, change_event: dict) -> list[SpecifiedOpeningTime]:
+    """Parses the change event ITERATIONS times with the given function and prints the timings.
+
+    Args:
+        name (str): Name of the parsing being benchmarked
+        parse (Callable): Function to build the specified opening times with
+        change_event (dict): The change event to parse
+
+    Returns:
+        list[SpecifiedOpeningTime]: The specified opening times from the last iteration
+    """
+    timings = []
+    for _ in range(ITERATIONS):
+        start = perf_counter()
+        specified_opening_times = parse(change_event)
+        timings.append((perf_counter() - start) * 1000)
+    print(f"{name}: mean={mean(timings):.2f}ms median={median(timings):.2f}ms")  # noqa: T201
+    return specified_opening_times
+
+
+def nhs_opening_times_parsing_benchmark() -> None:
+    """Benchmarks each way of parsing the specified opening times and checks they give the same result."""
+    change_event = build_change_event()
+    print(  # noqa: T201
+        f"Parsing {len(change_event['OpeningTimes'])} opening times on {SPECIFIED_OPENING_DATES} dates, "
+        f"{ITERATIONS} iterations",
+    )
+    expected = benchmark("strptime", strptime_specified_opening_times, change_event)
+    cold = benchmark("NHS UK parsers, cold caches", cold_nhs_entity_specified_opening_times, change_event)
+    warm = benchmark("NHS UK parsers, warm caches", warm_nhs_entity_specified_opening_times, change_event)
+    assert SpecifiedOpeningTime.equal_lists(cold, expected)  # noqa: S101
+    assert SpecifiedOpeningTime.equal_lists(warm, expected)  # noqa: S101
+    assert all(map(is_spec_opening_json, change_event["OpeningTimes"]))  # noqa: S101
+
+
+if __name__ == "__main__":
+    nhs_opening_times_parsing_benchmark()